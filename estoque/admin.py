@@ -9,7 +9,11 @@ Data: 2025-12-02
 """
 
 from django.contrib import admin
-from .models import Produto, MovimentacaoEstoque
+from . import busca
+from .models import (
+    EstoqueSnapshot, MovimentacaoEstoque, MovimentacaoEstoqueArquivo, Produto,
+    ReconciliacaoEstoque, ResumoMovimentacaoArquivada,
+)
 
 
 @admin.register(Produto)
@@ -28,6 +32,7 @@ class ProdutoAdmin(admin.ModelAdmin):
         'preco_venda',
         'estoque_atual',
         'estoque_minimo',
+        'valor_estoque',
         'ativo',
         'usuario_criacao',
         'data_criacao'
@@ -82,6 +87,45 @@ class ProdutoAdmin(admin.ModelAdmin):
     # Número de itens por página
     list_per_page = 25
     
+    def get_queryset(self, request):
+        """
+        Anota o valor do estoque calculado pelo banco de dados.
+        
+        Args:
+            request: Objeto HttpRequest
+            
+        Returns:
+            QuerySet: Produtos com o valor do estoque anotado
+        """
+        return super().get_queryset(request).com_valor_estoque()
+    
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Busca pelo índice textual em vez de ``icontains`` nos search_fields.
+        
+        Args:
+            request: Objeto HttpRequest
+            queryset: Produtos da listagem
+            search_term: Termo digitado
+            
+        Returns:
+            tuple: (QuerySet filtrado, False - sem duplicatas)
+        """
+        return busca.filtrar_produtos(queryset, search_term), False
+    
+    @admin.display(description='Valor em Estoque', ordering='valor_estoque_custo')
+    def valor_estoque(self, obj):
+        """
+        Exibe o valor do estoque a preço de custo.
+        
+        Args:
+            obj: Instância de Produto anotada por get_queryset
+            
+        Returns:
+            Decimal: Valor total do estoque do produto
+        """
+        return obj.valor_estoque_custo
+    
     def save_model(self, request, obj, form, change):
         """
         Sobrescreve o método de salvamento para registrar o usuário.
@@ -162,6 +206,20 @@ class MovimentacaoEstoqueAdmin(admin.ModelAdmin):
     # Campos com autocompletar (melhora performance com muitos registros)
     autocomplete_fields = ['produto']
     
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Busca pelo índice textual (observação e nome do produto).
+        
+        Args:
+            request: Objeto HttpRequest
+            queryset: Movimentações da listagem
+            search_term: Termo digitado
+            
+        Returns:
+            tuple: (QuerySet filtrado, False - sem duplicatas)
+        """
+        return busca.filtrar_movimentacoes(queryset, search_term), False
+    
     def save_model(self, request, obj, form, change):
         """
         Sobrescreve o método de salvamento para registrar o usuário.
@@ -193,3 +251,254 @@ class MovimentacaoEstoqueAdmin(admin.ModelAdmin):
             bool: True se pode excluir, False caso contrário
         """
         return request.user.is_superuser
+
+
+@admin.register(EstoqueSnapshot)
+class EstoqueSnapshotAdmin(admin.ModelAdmin):
+    """
+    Configuração administrativa para o modelo EstoqueSnapshot.
+    
+    Exibe as posições diárias de estoque gravadas pelo comando
+    ``gerar_snapshots_estoque``.
+    """
+    
+    # Campos exibidos na listagem
+    list_display = [
+        'dia',
+        'produto',
+        'quantidade',
+        'entradas',
+        'saidas',
+        'preco_custo'
+    ]
+    
+    # Navegação por data
+    date_hierarchy = 'dia'
+    
+    # Campos de busca
+    search_fields = [
+        'produto__nome'
+    ]
+    
+    # Evita uma consulta por linha para o nome do produto
+    list_select_related = ['produto']
+    
+    # Ordenação padrão (mais recentes primeiro)
+    ordering = ['-dia', 'produto']
+    
+    # Número de itens por página
+    list_per_page = 50
+    
+    def has_add_permission(self, request):
+        """
+        Desabilita a adição manual via admin.
+        
+        Snapshots são gerados pelo comando ``gerar_snapshots_estoque``.
+        
+        Returns:
+            bool: False (não permite adicionar)
+        """
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        """
+        Desabilita a edição via admin.
+        
+        Returns:
+            bool: False (não permite editar)
+        """
+        return False
+
+
+
+@admin.register(ReconciliacaoEstoque)
+class ReconciliacaoEstoqueAdmin(admin.ModelAdmin):
+    """
+    Configuração administrativa para o modelo ReconciliacaoEstoque.
+    
+    Exibe o histórico das reconciliações e o relatório de cada uma.
+    """
+    
+    # Campos exibidos na listagem
+    list_display = [
+        'iniciada_em',
+        'completa',
+        'produtos_verificados',
+        'divergencias',
+        'relatorio'
+    ]
+    
+    # Campos que podem ser usados para filtrar
+    list_filter = [
+        'completa'
+    ]
+    
+    # Campos somente leitura
+    readonly_fields = [
+        'iniciada_em',
+        'concluida_em',
+        'completa',
+        'produtos_verificados',
+        'divergencias',
+        'relatorio'
+    ]
+    
+    # Ordenação padrão (mais recentes primeiro)
+    ordering = ['-iniciada_em']
+    
+    # Número de itens por página
+    list_per_page = 50
+    
+    def has_add_permission(self, request):
+        """
+        Desabilita a adição manual via admin.
+        
+        Reconciliações são registradas pelo comando ``reconciliar_estoque``.
+        
+        Returns:
+            bool: False (não permite adicionar)
+        """
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        """
+        Desabilita a edição via admin.
+        
+        Returns:
+            bool: False (não permite editar)
+        """
+        return False
+
+
+@admin.register(MovimentacaoEstoqueArquivo)
+class MovimentacaoEstoqueArquivoAdmin(admin.ModelAdmin):
+    """
+    Configuração administrativa para o modelo MovimentacaoEstoqueArquivo.
+    
+    Consulta das movimentações de meses arquivados, somente leitura.
+    """
+    
+    # Campos exibidos na listagem
+    list_display = [
+        'produto',
+        'tipo',
+        'quantidade',
+        'valor_unitario',
+        'usuario',
+        'data_movimentacao'
+    ]
+    
+    # Campos que podem ser usados para filtrar
+    list_filter = [
+        'tipo',
+        'data_movimentacao'
+    ]
+    
+    # Campos de busca
+    search_fields = [
+        'produto__nome',
+        'observacao'
+    ]
+    
+    # Navegação por data
+    date_hierarchy = 'data_movimentacao'
+    
+    # Evita uma consulta por linha na listagem
+    list_select_related = ['produto', 'usuario']
+    
+    # Número de itens por página
+    list_per_page = 50
+    
+    def has_add_permission(self, request):
+        """
+        Desabilita a adição manual via admin.
+        
+        Movimentações são arquivadas pelo comando ``arquivar_historico``.
+        
+        Returns:
+            bool: False (não permite adicionar)
+        """
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        """
+        Desabilita a edição via admin.
+        
+        Returns:
+            bool: False (não permite editar)
+        """
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        """
+        Desabilita a exclusão via admin.
+        
+        Returns:
+            bool: False (não permite excluir)
+        """
+        return False
+
+
+@admin.register(ResumoMovimentacaoArquivada)
+class ResumoMovimentacaoArquivadaAdmin(admin.ModelAdmin):
+    """
+    Configuração administrativa para o modelo ResumoMovimentacaoArquivada.
+    
+    Exibe os totais mensais das movimentações arquivadas por produto.
+    """
+    
+    # Campos exibidos na listagem
+    list_display = [
+        'produto',
+        'mes',
+        'tipo',
+        'quantidade',
+        'valor_total',
+        'movimentacoes'
+    ]
+    
+    # Campos que podem ser usados para filtrar
+    list_filter = [
+        'tipo',
+        'mes'
+    ]
+    
+    # Campos de busca
+    search_fields = [
+        'produto__nome'
+    ]
+    
+    # Evita uma consulta por linha na listagem
+    list_select_related = ['produto']
+    
+    # Número de itens por página
+    list_per_page = 50
+    
+    def has_add_permission(self, request):
+        """
+        Desabilita a adição manual via admin.
+        
+        Os resumos são atualizados pelo arquivamento do histórico.
+        
+        Returns:
+            bool: False (não permite adicionar)
+        """
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        """
+        Desabilita a edição via admin.
+        
+        Returns:
+            bool: False (não permite editar)
+        """
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        """
+        Desabilita a exclusão via admin.
+        
+        Returns:
+            bool: False (não permite excluir)
+        """
+        return False
@@ -1,6 +1,21 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def garantir_indices_busca(sender, using, **kwargs):
+    """Recria os triggers do índice de busca descartados por migrações."""
+    from .busca import garantir_triggers
+
+    garantir_triggers(connections[using])
 
 
 class EstoqueConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'estoque'
+
+    def ready(self):
+        # Registrar os sinais que invalidam os indicadores em cache
+        from . import signals  # noqa: F401
+
+        post_migrate.connect(garantir_indices_busca, sender=self)
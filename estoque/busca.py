@@ -0,0 +1,302 @@
+"""
+Busca textual de produtos e movimentações de estoque.
+
+A busca por ``icontains`` (``LIKE '%termo%'``) percorre a tabela inteira a
+cada consulta. Este arquivo usa o índice textual próprio de cada banco:
+
+- SQLite: tabelas virtuais FTS5 com conteúdo externo (o texto continua
+  apenas na tabela original), tokenizador ``unicode61`` sem acentos
+  ("cafe" encontra "Café") e índices de prefixo ("caf" encontra "Café").
+  Triggers mantêm o índice em sincronia com inclusões, alterações e
+  exclusões. A relevância vem do ``bm25`` (nome pesa mais que descrição).
+- PostgreSQL: índices GIN de trigramas (``pg_trgm``) sobre
+  ``estoque_sem_acentos(coluna)`` (``lower`` + ``unaccent``). A busca
+  compara exatamente essa expressão (``LIKE '%termo%'``), o que ignora
+  acentos e permite ao planejador usar os índices; a relevância vem da
+  similaridade de trigramas.
+- Outros bancos: ``icontains`` sem índice.
+
+Os índices são criados pelas migrações ``0005_indices_busca`` e
+``0009_busca_sem_acentos_postgres``. No SQLite,
+migrações que recriam ``estoque_produto`` (ou a tabela de movimentações)
+descartam os triggers; ``garantir_triggers`` os recria após cada
+``migrate`` (ver apps.py).
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import F, Func, Q, TextField, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.lookups import Contains
+
+from .models import Produto
+
+
+# Máximo de palavras consideradas em um termo de busca
+MAX_PALAVRAS = 8
+
+# Pesos do bm25 por coluna (nome, descricao)
+PESOS_PRODUTO = (10.0, 1.0)
+
+TRIGGERS_SQLITE = [
+    """
+    CREATE TRIGGER IF NOT EXISTS estoque_produto_fts_ai AFTER INSERT ON estoque_produto BEGIN
+        INSERT INTO estoque_produto_fts(rowid, nome, descricao)
+        VALUES (new.id, new.nome, new.descricao);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS estoque_produto_fts_ad AFTER DELETE ON estoque_produto BEGIN
+        INSERT INTO estoque_produto_fts(estoque_produto_fts, rowid, nome, descricao)
+        VALUES ('delete', old.id, old.nome, old.descricao);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS estoque_produto_fts_au
+    AFTER UPDATE OF nome, descricao ON estoque_produto BEGIN
+        INSERT INTO estoque_produto_fts(estoque_produto_fts, rowid, nome, descricao)
+        VALUES ('delete', old.id, old.nome, old.descricao);
+        INSERT INTO estoque_produto_fts(rowid, nome, descricao)
+        VALUES (new.id, new.nome, new.descricao);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS estoque_movimentacao_fts_ai
+    AFTER INSERT ON estoque_movimentacaoestoque BEGIN
+        INSERT INTO estoque_movimentacao_fts(rowid, observacao)
+        VALUES (new.id, new.observacao);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS estoque_movimentacao_fts_ad
+    AFTER DELETE ON estoque_movimentacaoestoque BEGIN
+        INSERT INTO estoque_movimentacao_fts(estoque_movimentacao_fts, rowid, observacao)
+        VALUES ('delete', old.id, old.observacao);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS estoque_movimentacao_fts_au
+    AFTER UPDATE OF observacao ON estoque_movimentacaoestoque BEGIN
+        INSERT INTO estoque_movimentacao_fts(estoque_movimentacao_fts, rowid, observacao)
+        VALUES ('delete', old.id, old.observacao);
+        INSERT INTO estoque_movimentacao_fts(rowid, observacao)
+        VALUES (new.id, new.observacao);
+    END
+    """,
+]
+
+
+def garantir_triggers(conexao):
+    """
+    Recria os triggers de sincronização do índice FTS5, se ausentes.
+
+    Args:
+        conexao: Conexão de banco de dados do Django
+    """
+    if conexao.vendor != 'sqlite':
+        return
+
+    tabelas = conexao.introspection.table_names()
+    if 'estoque_produto_fts' not in tabelas:
+        # Migração de busca ainda não aplicada
+        return
+
+    with conexao.cursor() as cursor:
+        for sql in TRIGGERS_SQLITE:
+            cursor.execute(sql)
+
+
+def palavras(termo):
+    """
+    Separa o termo de busca em palavras (letras e números).
+
+    Args:
+        termo (str): Texto digitado pelo usuário
+
+    Returns:
+        list: Até ``MAX_PALAVRAS`` palavras
+    """
+    return re.findall(r'\w+', termo or '')[:MAX_PALAVRAS]
+
+
+def consulta_fts(termo):
+    """
+    Monta a expressão MATCH do FTS5: todas as palavras, cada uma como prefixo.
+
+    As palavras são colocadas entre aspas, então operadores do FTS5
+    digitados pelo usuário (AND, OR, NEAR, ``-``) são tratados como texto.
+
+    Returns:
+        str: Expressão MATCH, ou None se o termo não tiver palavras
+    """
+    lista = palavras(termo)
+    if not lista:
+        return None
+    return ' '.join(f'"{palavra}"*' for palavra in lista)
+
+
+class SemAcentos(Func):
+    """
+    Texto sem acentos e em minúsculas no PostgreSQL.
+
+    Função criada pela migração 0009; os índices de trigramas são sobre
+    ``estoque_sem_acentos(coluna)``, então a consulta precisa usar a mesma
+    expressão para que o índice seja considerado.
+    """
+
+    function = 'estoque_sem_acentos'
+    output_field = TextField()
+
+
+def _filtro_sem_acentos(termo, campos):
+    """Filtro do PostgreSQL: todas as palavras em algum dos campos, sem acentos."""
+    filtro = Q()
+    for palavra in palavras(termo):
+        valor = SemAcentos(Value(palavra))
+        filtro &= Q(*[Contains(SemAcentos(F(campo)), valor) for campo in campos], _connector=Q.OR)
+    return filtro
+
+
+def _filtro_icontains(termo, campos):
+    """Filtro de reserva: todas as palavras em algum dos campos."""
+    if connection.vendor == 'postgresql':
+        return _filtro_sem_acentos(termo, campos)
+
+    filtro = Q()
+    for palavra in palavras(termo):
+        filtro &= Q(*[Q(**{f'{campo}__icontains': palavra}) for campo in campos], _connector=Q.OR)
+    return filtro
+
+
+def filtrar_produtos(queryset, termo):
+    """
+    Restringe um queryset de produtos aos que correspondem ao termo.
+
+    A ordenação do queryset é preservada (para ordenar por relevância use
+    ``buscar_produtos``).
+
+    Args:
+        queryset (QuerySet): Produtos a filtrar
+        termo (str): Texto digitado pelo usuário
+
+    Returns:
+        QuerySet: Produtos correspondentes
+    """
+    if not palavras(termo):
+        return queryset
+
+    if connection.vendor == 'sqlite':
+        return queryset.filter(pk__in=RawSQL(
+            'SELECT rowid FROM estoque_produto_fts WHERE estoque_produto_fts MATCH %s',
+            [consulta_fts(termo)]
+        ))
+
+    # PostgreSQL (índice de trigramas) e demais bancos
+    return queryset.filter(_filtro_icontains(termo, ['nome', 'descricao']))
+
+
+def buscar_produtos(termo, limite=20, queryset=None, apenas_nome=False, deslocamento=0):
+    """
+    Busca produtos ordenados por relevância.
+
+    Args:
+        termo (str): Texto digitado pelo usuário
+        limite (int): Quantidade máxima de resultados
+        queryset (QuerySet): Produtos considerados (padrão: todos)
+        apenas_nome (bool): Procurar só no nome (autocompletar)
+        deslocamento (int): Resultados a pular (páginas seguintes)
+
+    Returns:
+        list: Produtos mais relevantes primeiro
+    """
+    if queryset is None:
+        queryset = Produto.objects.all()
+    if not palavras(termo):
+        return []
+
+    fatia = slice(deslocamento, deslocamento + limite)
+
+    if connection.vendor == 'sqlite':
+        consulta = consulta_fts(termo)
+        if apenas_nome:
+            consulta = f'nome : ({consulta})'
+
+        # Junção com o índice FTS5 para filtrar e ordenar pelo bm25 em uma
+        # única consulta (o ORM não tem expressão para MATCH/bm25)
+        return list(
+            queryset.extra(
+                tables=['estoque_produto_fts'],
+                where=[
+                    'estoque_produto_fts.rowid = estoque_produto.id',
+                    'estoque_produto_fts MATCH %s',
+                ],
+                params=[consulta],
+                select={'relevancia': 'bm25(estoque_produto_fts, %s, %s)'},
+                select_params=PESOS_PRODUTO,
+                order_by=['relevancia', 'nome'],
+            )[fatia]
+        )
+
+    if apenas_nome:
+        produtos = queryset.filter(_filtro_icontains(termo, ['nome']))
+    else:
+        produtos = filtrar_produtos(queryset, termo)
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        return list(
+            produtos.annotate(relevancia=TrigramSimilarity(
+                SemAcentos('nome'), SemAcentos(Value(termo))
+            ))
+            .order_by('-relevancia', 'nome')[fatia]
+        )
+    return list(produtos.order_by('nome')[fatia])
+
+
+def filtrar_movimentacoes(queryset, termo):
+    """
+    Restringe movimentações às que correspondem ao termo na observação ou
+    no nome do produto.
+
+    Args:
+        queryset (QuerySet): Movimentações a filtrar
+        termo (str): Texto digitado pelo usuário
+
+    Returns:
+        QuerySet: Movimentações correspondentes
+    """
+    if not palavras(termo):
+        return queryset
+
+    if connection.vendor == 'sqlite':
+        consulta = consulta_fts(termo)
+        return queryset.filter(
+            Q(pk__in=RawSQL(
+                'SELECT rowid FROM estoque_movimentacao_fts '
+                'WHERE estoque_movimentacao_fts MATCH %s',
+                [consulta]
+            ))
+            | Q(produto_id__in=RawSQL(
+                'SELECT rowid FROM estoque_produto_fts '
+                'WHERE estoque_produto_fts MATCH %s',
+                [f'nome : ({consulta})']
+            ))
+        )
+
+    if connection.vendor == 'postgresql':
+        # Uma subconsulta por tabela, como no SQLite: o OU entre colunas de
+        # tabelas diferentes da junção não pode usar os índices
+        return queryset.filter(
+            Q(pk__in=queryset.model.objects.filter(
+                _filtro_sem_acentos(termo, ['observacao'])
+            ).values('pk'))
+            | Q(produto_id__in=Produto.objects.filter(
+                _filtro_sem_acentos(termo, ['nome'])
+            ).values('pk'))
+        )
+
+    return queryset.filter(_filtro_icontains(termo, ['observacao', 'produto__nome']))
@@ -0,0 +1,463 @@
+"""
+Geração de dados sintéticos em volume de produção.
+
+Produz um catálogo de produtos e um histórico coerente de operação da
+loja, para reproduzir localmente a lentidão que só aparece com volume:
+
+- popularidade dos produtos com cauda longa (Zipf): poucos produtos
+  concentram a maior parte das vendas;
+- vendas diárias com sazonalidade anual e semanal (sábado forte, domingo
+  fraco) e ruído;
+- reposição de estoque pela manhã dos produtos que ficaram abaixo do
+  mínimo (vendas nunca deixam o estoque negativo; sem estoque, a venda é
+  perdida);
+- uma receita por dia com o total vendido, uma despesa por dia com o
+  total comprado e despesas fixas mensais (aluguel e salários);
+- o capital de giro com a cadeia valor_anterior → valor_novo íntegra e o
+  ``SaldoCapital`` final igual ao último lançamento.
+
+Os registros são gravados em lotes, com as datas do histórico: as
+movimentações (a maior parte do volume) com ``executemany`` direto e os
+demais modelos com ``bulk_create`` (os campos ``auto_now``/``auto_now_add``
+são desligados durante a gravação). Como ``bulk_create`` não dispara sinais, os indicadores
+financeiros e os saldos diários do capital são reconstruídos e o cache dos
+dashboards invalidado ao final.
+
+A mesma semente e a mesma data final geram sempre os mesmos dados.
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import ROUND_CEILING, Decimal
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from financeiro.models import CapitalGiro, Despesa, IndicadorFinanceiro, Receita, SaldoCapital, SaldoDiario
+from gestao_erp import cache
+from gestao_erp.modelos import datas_informadas
+from .models import MovimentacaoEstoque, Produto
+
+
+# Registros gravados por transação
+TAMANHO_LOTE_PADRAO = 10000
+
+# Maior valor aceito por Receita/Despesa (max_digits=10)
+VALOR_MAXIMO_LANCAMENTO = Decimal('99999999.99')
+
+# Expoente da distribuição de popularidade (maior = mais concentrada)
+EXPOENTE_ZIPF = 0.9
+
+# Quantidades vendidas por item e seus pesos
+QUANTIDADES_VENDA = (1, 2, 3, 4, 5, 6, 10, 12)
+PESOS_QUANTIDADE = (50, 20, 10, 6, 5, 4, 3, 2)
+
+# Peso das vendas por dia da semana (segunda = 0)
+FATOR_DIA_SEMANA = (0.9, 0.95, 1.0, 1.05, 1.2, 1.35, 0.55)
+
+# Amplitude da sazonalidade anual (pico em dezembro)
+AMPLITUDE_SAZONAL = 0.3
+
+# Dias de venda cobertos pelo estoque mínimo e pela reposição
+DIAS_ESTOQUE_MINIMO = 3
+DIAS_REPOSICAO = 10
+
+# Despesas fixas mensais, em múltiplos da venda média diária esperada
+DESPESAS_FIXAS = (
+    ('ALUGUEL', 'Aluguel da loja', 2),
+    ('SALARIO', 'Folha de pagamento', 5),
+)
+
+# Dia do mês em que as despesas fixas são pagas
+DIA_DESPESAS_FIXAS = 5
+
+_CENTAVO = Decimal('0.01')
+
+PALAVRAS = [
+    'café', 'açúcar', 'feijão', 'arroz', 'macarrão', 'óleo', 'sabão', 'pão',
+    'leite', 'manteiga', 'queijo', 'presunto', 'maçã', 'limão', 'melão',
+    'tomate', 'cebola', 'alho', 'batata', 'cenoura', 'farinha', 'biscoito',
+    'chocolate', 'detergente', 'amaciante', 'shampoo', 'sabonete', 'papel',
+]
+
+QUALIFICADORES = [
+    'orgânico', 'integral', 'premium', 'tradicional', 'light', 'extra',
+    'especial', 'econômico', 'zero', 'caseiro', 'importado', 'nacional',
+]
+
+EMBALAGENS = ['100g', '200g', '500g', '1kg', '2kg', '5kg', '1L', '2L', 'un', 'cx 12']
+
+
+_COLUNAS_MOVIMENTACAO = (
+    'produto_id', 'tipo', 'quantidade', 'valor_unitario', 'observacao',
+    'usuario_id', 'data_movimentacao',
+)
+
+
+
+def _sql_movimentacao():
+    """INSERT de uma movimentação com as colunas de _COLUNAS_MOVIMENTACAO."""
+    nome = connection.ops.quote_name
+    return 'INSERT INTO {} ({}) VALUES ({})'.format(
+        nome(MovimentacaoEstoque._meta.db_table),
+        ', '.join(nome(coluna) for coluna in _COLUNAS_MOVIMENTACAO),
+        ', '.join(['%s'] * len(_COLUNAS_MOVIMENTACAO)),
+    )
+
+
+class ResultadoGeracao:
+    """
+    Resumo de uma geração de dados sintéticos.
+
+    Attributes:
+        produtos (int): Produtos criados
+        movimentacoes (int): Movimentações de estoque criadas
+        vendas_perdidas (int): Vendas não realizadas por falta de estoque
+        receitas (int): Receitas criadas
+        despesas (int): Despesas criadas
+        lancamentos_capital (int): Lançamentos de capital de giro criados
+        duracao (float): Tempo total em segundos
+    """
+
+    def __init__(self):
+        self.produtos = 0
+        self.movimentacoes = 0
+        self.vendas_perdidas = 0
+        self.receitas = 0
+        self.despesas = 0
+        self.lancamentos_capital = 0
+        self.duracao = 0.0
+
+    @property
+    def movimentacoes_por_segundo(self):
+        """Vazão da geração em movimentações gravadas por segundo."""
+        if not self.duracao:
+            return 0.0
+        return self.movimentacoes / self.duracao
+
+
+def fator_sazonal(dia):
+    """
+    Multiplicador das vendas de um dia (sazonalidade anual e semanal).
+
+    Args:
+        dia (date): Dia das vendas
+
+    Returns:
+        float: Fator em torno de 1.0
+    """
+    # Pico no fim do ano (dia 350) e vale no meio do ano
+    anual = 1 + AMPLITUDE_SAZONAL * math.cos(
+        2 * math.pi * (dia.timetuple().tm_yday - 350) / 365
+    )
+    return anual * FATOR_DIA_SEMANA[dia.weekday()]
+
+
+def _quantidade_media():
+    """Quantidade média de unidades por item vendido."""
+    return sum(
+        quantidade * peso for quantidade, peso in zip(QUANTIDADES_VENDA, PESOS_QUANTIDADE)
+    ) / sum(PESOS_QUANTIDADE)
+
+
+def _parcelas(total):
+    """Divide um total em parcelas que cabem em uma Receita/Despesa."""
+    while total > VALOR_MAXIMO_LANCAMENTO:
+        yield VALOR_MAXIMO_LANCAMENTO
+        total -= VALOR_MAXIMO_LANCAMENTO
+    if total > 0:
+        yield total
+
+
+class GeradorDadosSinteticos:
+    """
+    Gera produtos, movimentações, receitas, despesas e capital de giro.
+
+    Args:
+        usuario (User): Usuário responsável pelos registros
+        semente (int): Semente do gerador aleatório
+        data_final (date): Último dia do histórico (padrão: hoje)
+        tamanho_lote (int): Registros gravados por transação
+        progresso (callable): Chamado com (dias processados, total de dias)
+    """
+
+    def __init__(self, usuario, semente=42, data_final=None,
+                 tamanho_lote=TAMANHO_LOTE_PADRAO, progresso=None):
+        self.usuario = usuario
+        self.aleatorio = random.Random(semente)
+        self.data_final = data_final or timezone.localdate()
+        self.tamanho_lote = tamanho_lote
+        self.progresso = progresso
+        self.fuso = timezone.get_current_timezone()
+
+        self.resultado = ResultadoGeracao()
+        self._movimentacoes = []
+        self._receitas = []
+        self._despesas = []
+        self._capital = []
+        self._saldo = Decimal('0.00')
+        self._despesas_fixas = []
+
+    def gerar(self, produtos, dias, vendas_por_dia, capital_inicial=Decimal('100000.00')):
+        """
+        Gera o catálogo e o histórico de ``dias`` dias até ``data_final``.
+
+        Args:
+            produtos (int): Quantidade de produtos a criar
+            dias (int): Dias de histórico
+            vendas_por_dia (int): Média de itens vendidos por dia
+            capital_inicial (Decimal): Aporte no primeiro dia
+
+        Returns:
+            ResultadoGeracao: Resumo da geração
+        """
+        inicio = time.perf_counter()
+        data_inicial = self.data_final - timedelta(days=dias - 1)
+
+        with datas_informadas(Produto, Receita, Despesa, CapitalGiro):
+            self._saldo = SaldoCapital.obter_valor()
+            catalogo = self._criar_produtos(produtos, vendas_por_dia, data_inicial)
+
+            preco_medio = sum(catalogo['preco_venda']) / len(catalogo['preco_venda'])
+            venda_media_diaria = preco_medio * Decimal(vendas_por_dia * _quantidade_media())
+            self._despesas_fixas = [
+                (categoria, descricao, (venda_media_diaria * multiplo).quantize(_CENTAVO))
+                for categoria, descricao, multiplo in DESPESAS_FIXAS
+            ]
+
+            if capital_inicial > 0:
+                self._lancar_capital(
+                    capital_inicial, 'ENTRADA', 'Capital inicial',
+                    self._momento(data_inicial, 7 * 3600)
+                )
+
+            for indice in range(dias):
+                self._gerar_dia(data_inicial + timedelta(days=indice), vendas_por_dia, catalogo)
+                if len(self._movimentacoes) >= self.tamanho_lote:
+                    self._gravar()
+                if self.progresso:
+                    self.progresso(indice + 1, dias)
+
+            self._gravar()
+            self._finalizar(catalogo)
+
+        self.resultado.duracao = time.perf_counter() - inicio
+        return self.resultado
+
+    def _momento(self, dia, segundos):
+        """Data e hora (no fuso do projeto) ``segundos`` após a meia-noite."""
+        return datetime(dia.year, dia.month, dia.day, tzinfo=self.fuso) + timedelta(seconds=segundos)
+
+    def _criar_produtos(self, quantidade, vendas_por_dia, data_inicial):
+        """Cria o catálogo e calcula popularidade e estoques de cada produto."""
+        aleatorio = self.aleatorio
+        criado_em = self._momento(data_inicial, 6 * 3600)
+
+        # Popularidade de cauda longa, com a ordem dos produtos embaralhada
+        posicoes = list(range(1, quantidade + 1))
+        aleatorio.shuffle(posicoes)
+        pesos = [1 / posicao ** EXPOENTE_ZIPF for posicao in posicoes]
+        total_pesos = sum(pesos)
+        quantidade_media = _quantidade_media()
+
+        novos = []
+        minimos = []
+        alvos = []
+        for indice, peso in enumerate(pesos):
+            demanda_diaria = vendas_por_dia * quantidade_media * peso / total_pesos
+            minimo = max(2, math.ceil(demanda_diaria * DIAS_ESTOQUE_MINIMO))
+            minimos.append(minimo)
+            alvos.append(minimo + max(5, math.ceil(demanda_diaria * DIAS_REPOSICAO)))
+
+            preco_custo = Decimal(str(round(aleatorio.lognormvariate(2.5, 1.0), 2))).max(Decimal('0.50'))
+            margem = Decimal(str(round(aleatorio.uniform(1.15, 2.2), 2)))
+            nome = ' '.join([
+                aleatorio.choice(PALAVRAS).capitalize(),
+                aleatorio.choice(QUALIFICADORES),
+                aleatorio.choice(EMBALAGENS),
+            ])
+            novos.append(Produto(
+                nome=f'{nome} #{indice + 1}',
+                descricao=' '.join(aleatorio.sample(PALAVRAS + QUALIFICADORES, 6)),
+                preco_custo=preco_custo,
+                preco_venda=(preco_custo * margem).quantize(_CENTAVO),
+                estoque_atual=0,
+                estoque_minimo=minimo,
+                usuario_criacao=self.usuario,
+                data_criacao=criado_em,
+                data_modificacao=criado_em,
+            ))
+
+        ids = []
+        for inicio in range(0, len(novos), self.tamanho_lote):
+            with transaction.atomic():
+                criados = Produto.objects.bulk_create(novos[inicio:inicio + self.tamanho_lote])
+            ids.extend(produto.pk for produto in criados)
+        self.resultado.produtos = len(ids)
+
+        acumulados = []
+        soma = 0.0
+        for peso in pesos:
+            soma += peso
+            acumulados.append(soma)
+
+        # Preços já no formato do banco, convertidos uma vez por produto
+        campo_valor = MovimentacaoEstoque._meta.get_field('valor_unitario')
+
+        def adaptar_preco(valor):
+            return connection.ops.adapt_decimalfield_value(
+                valor, campo_valor.max_digits, campo_valor.decimal_places
+            )
+
+        return {
+            'ids': ids,
+            'pesos_acumulados': acumulados,
+            'preco_custo': [produto.preco_custo for produto in novos],
+            'preco_venda': [produto.preco_venda for produto in novos],
+            'custo_banco': [adaptar_preco(produto.preco_custo) for produto in novos],
+            'venda_banco': [adaptar_preco(produto.preco_venda) for produto in novos],
+            'minimo': minimos,
+            'alvo': alvos,
+            'estoque': [0] * quantidade,
+            # Todos começam sem estoque: a primeira manhã faz a carga inicial
+            'repor': set(range(quantidade)),
+        }
+
+    def _gerar_dia(self, dia, vendas_por_dia, catalogo):
+        """Gera a reposição da manhã, as vendas e os lançamentos de um dia."""
+        aleatorio = self.aleatorio
+        ids = catalogo['ids']
+        estoque = catalogo['estoque']
+        usuario_id = self.usuario.pk
+        adaptar_data = connection.ops.adapt_datetimefield_value
+
+        # Reposição às 8h dos produtos abaixo do mínimo
+        compras = Decimal('0.00')
+        abertura_banco = adaptar_data(self._momento(dia, 8 * 3600))
+        for indice in sorted(catalogo['repor']):
+            quantidade = catalogo['alvo'][indice] - estoque[indice]
+            estoque[indice] += quantidade
+            custo = catalogo['preco_custo'][indice]
+            compras += custo * quantidade
+            self._movimentacoes.append((
+                ids[indice], 'ENTRADA', quantidade, catalogo['custo_banco'][indice],
+                'Reposição de estoque', usuario_id, abertura_banco,
+            ))
+        catalogo['repor'].clear()
+
+        if compras:
+            self._lancar(Despesa, 'COMPRA', f'Compra de mercadorias {dia:%d/%m/%Y}', compras, dia, 8 * 3600)
+
+        if dia.day == DIA_DESPESAS_FIXAS:
+            for categoria, descricao, valor in self._despesas_fixas:
+                self._lancar(Despesa, categoria, f'{descricao} {dia:%m/%Y}', valor, dia, 10 * 3600)
+
+        # Vendas entre 9h e 21h
+        quantidade_vendas = round(vendas_por_dia * fator_sazonal(dia) * aleatorio.uniform(0.85, 1.15))
+        escolhidos = aleatorio.choices(
+            range(len(ids)), cum_weights=catalogo['pesos_acumulados'], k=quantidade_vendas
+        )
+        quantidades = aleatorio.choices(QUANTIDADES_VENDA, weights=PESOS_QUANTIDADE, k=quantidade_vendas)
+        horarios = sorted(aleatorio.randrange(9 * 3600, 21 * 3600) for _ in range(quantidade_vendas))
+
+        vendas = Decimal('0.00')
+        for indice, quantidade, segundos in zip(escolhidos, quantidades, horarios):
+            disponivel = estoque[indice]
+            if not disponivel:
+                self.resultado.vendas_perdidas += 1
+                continue
+
+            quantidade = min(quantidade, disponivel)
+            estoque[indice] = disponivel - quantidade
+            preco = catalogo['preco_venda'][indice]
+            vendas += preco * quantidade
+            self._movimentacoes.append((
+                ids[indice], 'SAIDA', quantidade, catalogo['venda_banco'][indice],
+                None, usuario_id, adaptar_data(self._momento(dia, segundos)),
+            ))
+            if estoque[indice] < catalogo['minimo'][indice]:
+                catalogo['repor'].add(indice)
+
+        if vendas:
+            self._lancar(Receita, 'VENDA', f'Vendas do dia {dia:%d/%m/%Y}', vendas, dia, 21 * 3600)
+
+    def _lancar(self, modelo, categoria, descricao, valor, dia, segundos):
+        """Cria receitas/despesas do valor e os lançamentos de capital."""
+        momento = self._momento(dia, segundos)
+        destino = self._receitas if modelo is Receita else self._despesas
+
+        for parcela in _parcelas(valor):
+            destino.append(modelo(
+                descricao=descricao,
+                valor=parcela,
+                data=dia,
+                categoria=categoria,
+                usuario=self.usuario,
+                data_criacao=momento,
+            ))
+            if modelo is Receita:
+                self._lancar_capital(parcela, 'ENTRADA', descricao, momento)
+            else:
+                if parcela > self._saldo:
+                    # Sem caixa para pagar: aporte dos sócios antes da saída
+                    self._lancar_capital(
+                        (parcela - self._saldo).quantize(Decimal('1'), rounding=ROUND_CEILING),
+                        'ENTRADA', 'Aporte de capital', momento
+                    )
+                self._lancar_capital(-parcela, 'SAIDA', descricao, momento)
+
+    def _lancar_capital(self, delta, tipo, descricao, momento):
+        """Acrescenta um lançamento à cadeia do capital de giro."""
+        anterior = self._saldo
+        self._saldo = anterior + delta
+        self._capital.append(CapitalGiro(
+            valor_anterior=anterior,
+            valor_novo=self._saldo,
+            tipo_movimentacao=tipo,
+            descricao=descricao,
+            usuario=self.usuario,
+            data_movimentacao=momento,
+        ))
+
+    def _gravar(self):
+        """Grava os registros acumulados em uma transação."""
+        with transaction.atomic():
+            if self._movimentacoes:
+                # INSERT direto com as tuplas já convertidas: montar e
+                # preparar uma instância do modelo por linha custava mais
+                # que a própria gravação
+                with connection.cursor() as cursor:
+                    cursor.executemany(_sql_movimentacao(), self._movimentacoes)
+            Receita.objects.bulk_create(self._receitas, batch_size=self.tamanho_lote)
+            Despesa.objects.bulk_create(self._despesas, batch_size=self.tamanho_lote)
+            # Em ordem: a cadeia do capital é verificada pela ordem dos ids
+            CapitalGiro.objects.bulk_create(self._capital, batch_size=self.tamanho_lote)
+
+        self.resultado.movimentacoes += len(self._movimentacoes)
+        self.resultado.receitas += len(self._receitas)
+        self.resultado.despesas += len(self._despesas)
+        self.resultado.lancamentos_capital += len(self._capital)
+        self._movimentacoes = []
+        self._receitas = []
+        self._despesas = []
+        self._capital = []
+
+    def _finalizar(self, catalogo):
+        """Grava estoques e saldo finais, indicadores e invalida o cache."""
+        atualizados = [
+            Produto(pk=pk, estoque_atual=estoque)
+            for pk, estoque in zip(catalogo['ids'], catalogo['estoque'])
+        ]
+        with transaction.atomic():
+            Produto.objects.bulk_update(atualizados, ['estoque_atual'], batch_size=self.tamanho_lote)
+            SaldoCapital.objects.update_or_create(
+                pk=SaldoCapital.PK_UNICO, defaults={'valor': self._saldo}
+            )
+            IndicadorFinanceiro.reconstruir()
+            SaldoDiario.reconstruir()
+            cache.invalidar('estoque', 'financeiro')
@@ -0,0 +1,296 @@
+"""
+Importação em lote de movimentações de estoque.
+
+Este arquivo implementa a ingestão de arquivos exportados pelo PDV
+(CSV ou JSON Lines) sem passar por uma requisição por movimentação.
+O arquivo é lido em fluxo e processado em lotes: cada lote aplica as
+variações líquidas de estoque por produto, grava as movimentações com
+``bulk_create`` e gera um único lançamento agregado no capital de giro.
+
+Formato esperado de cada linha (cabeçalho no CSV, chaves no JSON):
+    produto, tipo, quantidade, valor_unitario, observacao (opcional)
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+import csv
+import json
+import time
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+from financeiro.models import CapitalGiro
+from gestao_erp import cache
+from .models import Produto, MovimentacaoEstoque
+
+
+# Formatos de arquivo aceitos
+FORMATOS = ('csv', 'jsonl')
+
+# Quantidade padrão de linhas processadas por transação
+TAMANHO_LOTE_PADRAO = 1000
+
+# Máximo de erros guardados no resultado (os demais são apenas contados)
+LIMITE_ERROS = 1000
+
+
+class ResultadoImportacao:
+    """
+    Resumo de uma importação de movimentações.
+
+    Attributes:
+        linhas_lidas (int): Linhas lidas do arquivo
+        importadas (int): Movimentações gravadas
+        rejeitadas (int): Linhas rejeitadas por erro de validação
+        lotes (int): Lotes processados
+        erros (list): Tuplas (linha, mensagem) dos primeiros erros
+        duracao (float): Tempo total em segundos
+    """
+
+    def __init__(self):
+        self.linhas_lidas = 0
+        self.importadas = 0
+        self.rejeitadas = 0
+        self.lotes = 0
+        self.erros = []
+        self.duracao = 0.0
+
+    @property
+    def linhas_por_segundo(self):
+        """Vazão da importação em linhas lidas por segundo."""
+        if not self.duracao:
+            return 0.0
+        return self.linhas_lidas / self.duracao
+
+    def registrar_erro(self, linha, mensagem):
+        """Registra uma linha rejeitada."""
+        self.rejeitadas += 1
+        if len(self.erros) < LIMITE_ERROS:
+            self.erros.append((linha, mensagem))
+
+
+def detectar_formato(nome_arquivo):
+    """
+    Deduz o formato pelo nome do arquivo.
+
+    Args:
+        nome_arquivo (str): Nome ou caminho do arquivo
+
+    Returns:
+        str: ``jsonl`` para .jsonl/.json/.ndjson, ``csv`` nos demais casos
+    """
+    if str(nome_arquivo).lower().endswith(('.jsonl', '.json', '.ndjson')):
+        return 'jsonl'
+    return 'csv'
+
+
+def ler_linhas(arquivo, formato):
+    """
+    Lê o arquivo em fluxo, uma linha por vez.
+
+    Args:
+        arquivo: Arquivo de texto já aberto
+        formato (str): ``csv`` ou ``jsonl``
+
+    Yields:
+        tuple: (número da linha, dicionário com os campos ou None se inválida)
+    """
+    if formato == 'csv':
+        leitor = csv.DictReader(arquivo)
+        for dados in leitor:
+            yield leitor.line_num, dados
+    elif formato == 'jsonl':
+        for numero, texto in enumerate(arquivo, start=1):
+            if not texto.strip():
+                continue
+            try:
+                dados = json.loads(texto)
+            except ValueError:
+                dados = None
+            yield numero, dados if isinstance(dados, dict) else None
+    else:
+        raise ValueError(f"Formato de arquivo inválido: {formato}")
+
+
+def _montar_movimentacao(dados, usuario):
+    """
+    Converte uma linha do arquivo em movimentação (não salva).
+
+    Aplica as mesmas validações de campo do modelo (choices de tipo,
+    quantidade e valor mínimos) e a regra de tipo de
+    ``MovimentacaoEstoque.calcular_variacao_estoque``.
+
+    Raises:
+        ValueError: Se a linha for inválida
+    """
+    if dados is None:
+        raise ValueError("Linha mal formatada")
+
+    try:
+        movimentacao = MovimentacaoEstoque(
+            produto_id=int(dados['produto']),
+            tipo=str(dados['tipo']).strip().upper(),
+            quantidade=int(dados['quantidade']),
+            valor_unitario=Decimal(str(dados['valor_unitario'])),
+            observacao=dados.get('observacao') or '',
+            usuario=usuario
+        )
+    except KeyError as erro:
+        raise ValueError(f"Campo obrigatório ausente: {erro.args[0]}")
+    except (TypeError, ValueError, InvalidOperation):
+        raise ValueError("Valor numérico inválido")
+
+    # Um código acima de 64 bits não chega ao banco (estouraria na consulta)
+    if not 0 < movimentacao.produto_id <= Produto.MAIOR_CODIGO:
+        raise ValueError("Código de produto inválido")
+
+    try:
+        movimentacao.clean_fields(exclude=['produto', 'usuario'])
+    except ValidationError as erro:
+        raise ValueError('; '.join(
+            f"{campo}: {' '.join(mensagens)}"
+            for campo, mensagens in erro.message_dict.items()
+        ))
+
+    movimentacao.calcular_variacao_estoque()
+    return movimentacao
+
+
+def _importar_lote(lote, usuario, resultado):
+    """
+    Valida e grava um lote de linhas em uma única transação.
+
+    Args:
+        lote (list): Tuplas (número da linha, dados)
+        usuario (User): Usuário responsável pelas movimentações
+        resultado (ResultadoImportacao): Resumo a ser atualizado
+    """
+    candidatas = []
+    for numero, dados in lote:
+        try:
+            candidatas.append((numero, _montar_movimentacao(dados, usuario)))
+        except ValueError as erro:
+            resultado.registrar_erro(numero, str(erro))
+
+    if not candidatas:
+        return
+
+    validas = []
+    try:
+        with transaction.atomic():
+            # Estoque atual dos produtos do lote (bloqueados até o fim do lote)
+            estoques = dict(
+                Produto.objects.select_for_update().filter(
+                    pk__in={movimentacao.produto_id for _, movimentacao in candidatas}
+                ).values_list('pk', 'estoque_atual')
+            )
+
+            # Aplicar as linhas em ordem, como faria o save() de cada uma
+            variacoes = defaultdict(int)
+            saldo_capital = Decimal('0.00')
+            for numero, movimentacao in candidatas:
+                disponivel = estoques.get(movimentacao.produto_id)
+                if disponivel is None:
+                    resultado.registrar_erro(numero, "Produto não encontrado")
+                    continue
+
+                variacao = movimentacao.calcular_variacao_estoque()
+                if disponivel + variacao < 0:
+                    resultado.registrar_erro(
+                        numero,
+                        f"Estoque insuficiente! Disponível: {disponivel}, "
+                        f"Solicitado: {movimentacao.quantidade}"
+                    )
+                    continue
+
+                estoques[movimentacao.produto_id] = disponivel + variacao
+                variacoes[movimentacao.produto_id] += variacao
+                # Venda (SAIDA) gera entrada de capital; compra (ENTRADA), saída
+                valor_total = movimentacao.calcular_valor_total()
+                saldo_capital += valor_total if variacao < 0 else -valor_total
+                validas.append((numero, movimentacao))
+
+            if not validas:
+                return
+
+            # Variação líquida por produto em um único UPDATE
+            variacoes = {pk: delta for pk, delta in variacoes.items() if delta}
+            if variacoes:
+                Produto.objects.filter(pk__in=variacoes).update(
+                    estoque_atual=F('estoque_atual') + Case(
+                        *[When(pk=pk, then=Value(delta)) for pk, delta in variacoes.items()],
+                        output_field=IntegerField()
+                    )
+                )
+
+            MovimentacaoEstoque.objects.bulk_create(
+                [movimentacao for _, movimentacao in validas],
+                batch_size=500
+            )
+
+            # Um único lançamento agregado no capital de giro por lote
+            descricao = (
+                f'Importação de {len(validas)} movimentações '
+                f'(linhas {validas[0][0]} a {validas[-1][0]})'
+            )
+            if saldo_capital > 0:
+                CapitalGiro.adicionar_capital(saldo_capital, descricao, usuario)
+            elif saldo_capital < 0:
+                CapitalGiro.retirar_capital(-saldo_capital, descricao, usuario)
+    except ValueError as erro:
+        # Lote inteiro desfeito (ex: capital insuficiente para as compras)
+        for numero, _ in validas:
+            resultado.registrar_erro(numero, f"Lote não importado: {erro}")
+        return
+
+    # bulk_create e update() não disparam os sinais de invalidação
+    cache.invalidar('estoque', 'financeiro')
+
+    resultado.importadas += len(validas)
+
+
+def importar_movimentacoes(arquivo, usuario, formato='csv', tamanho_lote=TAMANHO_LOTE_PADRAO):
+    """
+    Importa movimentações de estoque a partir de um arquivo CSV ou JSON Lines.
+
+    O arquivo é lido em fluxo e processado em lotes de ``tamanho_lote``
+    linhas, com número de consultas por lote independente da quantidade
+    de linhas. Linhas inválidas (tipo desconhecido, estoque insuficiente,
+    produto inexistente...) são rejeitadas e relatadas sem interromper a
+    importação.
+
+    Args:
+        arquivo: Arquivo de texto já aberto
+        usuario (User): Usuário responsável pelas movimentações
+        formato (str): ``csv`` ou ``jsonl``
+        tamanho_lote (int): Linhas por transação
+
+    Returns:
+        ResultadoImportacao: Resumo da importação
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de arquivo inválido: {formato}")
+
+    resultado = ResultadoImportacao()
+    inicio = time.perf_counter()
+
+    lote = []
+    for numero, dados in ler_linhas(arquivo, formato):
+        resultado.linhas_lidas += 1
+        lote.append((numero, dados))
+        if len(lote) >= tamanho_lote:
+            _importar_lote(lote, usuario, resultado)
+            resultado.lotes += 1
+            lote = []
+
+    if lote:
+        _importar_lote(lote, usuario, resultado)
+        resultado.lotes += 1
+
+    resultado.duracao = time.perf_counter() - inicio
+    return resultado
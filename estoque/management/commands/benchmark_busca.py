@@ -0,0 +1,114 @@
+"""
+Comando para medir a latência da busca textual de produtos.
+
+Gera produtos sintéticos dentro de uma transação que é desfeita ao final
+(o banco não é alterado) e compara a busca pelo índice textual com o
+``icontains`` usado anteriormente.
+
+Uso:
+    python manage.py benchmark_busca --produtos 100000 --repeticoes 20
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+
+from estoque import busca
+from estoque.models import Produto
+
+
+# Vocabulário dos nomes sintéticos (com acentos, para exercitar o tokenizador)
+PALAVRAS = [
+    'café', 'açúcar', 'feijão', 'arroz', 'macarrão', 'óleo', 'sabão', 'pão',
+    'leite', 'manteiga', 'queijo', 'presunto', 'maçã', 'limão', 'melão',
+    'tomate', 'cebola', 'alho', 'batata', 'cenoura', 'orgânico', 'integral',
+    'premium', 'tradicional', 'light', 'extra', 'especial', 'econômico',
+]
+
+# Termos pesquisados: palavra inteira, prefixo, sem acento e duas palavras
+TERMOS = ['cafe', 'acu', 'macarrao integral', 'org', 'limao', 'premium pao', 'zzz']
+
+
+class Command(BaseCommand):
+    """Mede a latência da busca de produtos com um catálogo sintético."""
+
+    help = 'Mede a latência da busca textual de produtos (dados descartados ao final)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--produtos', type=int, default=100000)
+        parser.add_argument('--repeticoes', type=int, default=20)
+        parser.add_argument('--semente', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options['produtos'] < 1 or options['repeticoes'] < 1:
+            raise CommandError('Quantidade de produtos e repetições devem ser positivas.')
+
+        usuario = User.objects.order_by('pk').first()
+        if usuario is None:
+            raise CommandError('Cadastre ao menos um usuário antes de executar.')
+
+        with transaction.atomic():
+            self.gerar_catalogo(options['produtos'], options['semente'], usuario)
+            self.stdout.write(
+                f"{options['produtos']} produtos sintéticos ({connection.vendor})"
+            )
+            for termo in TERMOS:
+                self.medir(termo, options['repeticoes'])
+
+            # Nada do que foi gerado é gravado
+            transaction.set_rollback(True)
+
+    def gerar_catalogo(self, quantidade, semente, usuario):
+        aleatorio = random.Random(semente)
+        Produto.objects.bulk_create(
+            (
+                Produto(
+                    nome=' '.join(aleatorio.sample(PALAVRAS, 3)) + f' {indice}',
+                    descricao=' '.join(aleatorio.sample(PALAVRAS, 6)),
+                    preco_custo=Decimal('1.00'),
+                    preco_venda=Decimal('2.00'),
+                    usuario_criacao=usuario,
+                )
+                for indice in range(quantidade)
+            ),
+            batch_size=5000
+        )
+
+    def medir(self, termo, repeticoes):
+        def icontains():
+            filtro = Q()
+            for palavra in busca.palavras(termo):
+                filtro &= Q(nome__icontains=palavra) | Q(descricao__icontains=palavra)
+            return list(Produto.objects.filter(filtro).order_by('nome')[:20])
+
+        def indice():
+            return busca.buscar_produtos(termo, limite=20)
+
+        resultados = {}
+        for nome, funcao in (('icontains', icontains), ('índice', indice)):
+            tempos = []
+            for _ in range(repeticoes):
+                inicio = time.perf_counter()
+                funcao()
+                tempos.append((time.perf_counter() - inicio) * 1000)
+            tempos.sort()
+            resultados[nome] = (
+                statistics.median(tempos),
+                tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))],
+            )
+
+        self.stdout.write(
+            f'{termo!r:22} ' + '  '.join(
+                f'{nome}: p50 {p50:7.2f} ms / p95 {p95:7.2f} ms'
+                for nome, (p50, p95) in resultados.items()
+            )
+        )
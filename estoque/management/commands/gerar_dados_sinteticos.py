@@ -0,0 +1,110 @@
+"""
+Comando para gerar dados sintéticos em volume de produção.
+
+Os dados são acrescentados ao banco configurado (nada é apagado). Use um
+banco separado para testes de volume.
+
+Uso:
+    python manage.py gerar_dados_sinteticos --produtos 5000 --dias 365 --vendas-por-dia 2000
+    python manage.py gerar_dados_sinteticos --produtos 50000 --dias 730 --vendas-por-dia 14000 --semente 7
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from estoque.dados_sinteticos import TAMANHO_LOTE_PADRAO, GeradorDadosSinteticos
+
+
+class Command(BaseCommand):
+    """Gera produtos e um histórico sintético de vendas, compras e caixa."""
+
+    help = 'Gera produtos, movimentações, receitas, despesas e capital de giro sintéticos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--produtos', type=int, default=1000)
+        parser.add_argument('--dias', type=int, default=365)
+        parser.add_argument(
+            '--vendas-por-dia',
+            type=int,
+            default=500,
+            help='Média de itens vendidos por dia (varia com a sazonalidade)'
+        )
+        parser.add_argument('--semente', type=int, default=42)
+        parser.add_argument(
+            '--data-final',
+            help='Último dia do histórico, AAAA-MM-DD (padrão: hoje)'
+        )
+        parser.add_argument(
+            '--capital-inicial',
+            default='100000.00',
+            help='Aporte de capital no primeiro dia (padrão: 100000.00)'
+        )
+        parser.add_argument(
+            '--usuario',
+            help='Usuário responsável (padrão: primeiro superusuário)'
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=TAMANHO_LOTE_PADRAO,
+            help=f'Registros por transação (padrão: {TAMANHO_LOTE_PADRAO})'
+        )
+
+    def handle(self, *args, **options):
+        if min(options['produtos'], options['dias'], options['lote']) < 1:
+            raise CommandError('Produtos, dias e lote devem ser positivos.')
+        if options['vendas_por_dia'] < 0:
+            raise CommandError('Vendas por dia não pode ser negativo.')
+
+        try:
+            capital_inicial = Decimal(options['capital_inicial'])
+        except InvalidOperation:
+            raise CommandError('Capital inicial inválido.')
+
+        data_final = None
+        if options['data_final']:
+            try:
+                data_final = date.fromisoformat(options['data_final'])
+            except ValueError:
+                raise CommandError('Data final inválida (use AAAA-MM-DD).')
+
+        # Obter o usuário responsável
+        if options['usuario']:
+            usuario = User.objects.filter(username=options['usuario']).first()
+        else:
+            usuario = User.objects.filter(is_superuser=True).order_by('pk').first()
+        if usuario is None:
+            raise CommandError('Usuário responsável não encontrado.')
+
+        # Progresso a cada 10% dos dias
+        passo = max(1, options['dias'] // 10)
+
+        def progresso(dia, total):
+            if dia % passo == 0 or dia == total:
+                self.stdout.write(f'  {dia}/{total} dias')
+
+        gerador = GeradorDadosSinteticos(
+            usuario,
+            semente=options['semente'],
+            data_final=data_final,
+            tamanho_lote=options['lote'],
+            progresso=progresso if options['verbosity'] >= 1 else None,
+        )
+        resultado = gerador.gerar(
+            options['produtos'], options['dias'], options['vendas_por_dia'],
+            capital_inicial=capital_inicial
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{resultado.produtos} produtos, {resultado.movimentacoes} movimentações '
+            f'({resultado.vendas_perdidas} vendas perdidas por falta de estoque), '
+            f'{resultado.receitas} receitas, {resultado.despesas} despesas, '
+            f'{resultado.lancamentos_capital} lançamentos de capital '
+            f'({resultado.duracao:.1f}s, {resultado.movimentacoes_por_segundo:.0f} movimentações/s)'
+        ))
@@ -0,0 +1,76 @@
+"""
+Comando para importar movimentações de estoque em lote.
+
+Uso:
+    python manage.py importar_movimentacoes vendas.csv --usuario admin
+    python manage.py importar_movimentacoes vendas.jsonl --lote 5000
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from estoque.importacao import (
+    FORMATOS,
+    TAMANHO_LOTE_PADRAO,
+    detectar_formato,
+    importar_movimentacoes,
+)
+
+
+class Command(BaseCommand):
+    """Importa movimentações de estoque de um arquivo CSV ou JSON Lines."""
+
+    help = 'Importa movimentações de estoque (CSV ou JSON Lines) em lote'
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help='Caminho do arquivo a importar')
+        parser.add_argument(
+            '--formato',
+            choices=FORMATOS,
+            help='Formato do arquivo (padrão: deduzido pela extensão)'
+        )
+        parser.add_argument(
+            '--usuario',
+            help='Usuário responsável (padrão: primeiro superusuário)'
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=TAMANHO_LOTE_PADRAO,
+            help=f'Linhas por transação (padrão: {TAMANHO_LOTE_PADRAO})'
+        )
+
+    def handle(self, *args, **options):
+        # Obter o usuário responsável
+        if options['usuario']:
+            usuario = User.objects.filter(username=options['usuario']).first()
+        else:
+            usuario = User.objects.filter(is_superuser=True).order_by('pk').first()
+        if usuario is None:
+            raise CommandError('Usuário responsável não encontrado.')
+
+        if options['lote'] < 1:
+            raise CommandError('O tamanho do lote deve ser positivo.')
+
+        formato = options['formato'] or detectar_formato(options['arquivo'])
+
+        try:
+            with open(options['arquivo'], encoding='utf-8-sig', newline='') as arquivo:
+                resultado = importar_movimentacoes(
+                    arquivo, usuario, formato=formato, tamanho_lote=options['lote']
+                )
+        except OSError as erro:
+            raise CommandError(f'Não foi possível ler o arquivo: {erro}')
+
+        for linha, mensagem in resultado.erros:
+            self.stderr.write(f'Linha {linha}: {mensagem}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{resultado.importadas} movimentações importadas, '
+            f'{resultado.rejeitadas} rejeitadas, '
+            f'{resultado.linhas_lidas} linhas em {resultado.lotes} lotes '
+            f'({resultado.duracao:.2f}s, {resultado.linhas_por_segundo:.0f} linhas/s)'
+        ))
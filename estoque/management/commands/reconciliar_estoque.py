@@ -0,0 +1,66 @@
+"""
+Comando para conferir o estoque dos produtos com as movimentações.
+
+Compara ``estoque_atual`` com entradas - saídas de cada produto e grava as
+divergências em CSV (ver ``estoque.reconciliacao``). Sem ``--completo``,
+confere apenas os produtos alterados ou movimentados desde a última
+execução; a primeira execução é sempre completa.
+
+Uso:
+    python manage.py reconciliar_estoque
+    python manage.py reconciliar_estoque --completo --processos 4
+    python manage.py reconciliar_estoque --relatorio /tmp/divergencias.csv
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from estoque.reconciliacao import reconciliar
+
+
+class Command(BaseCommand):
+    """Confere o estoque e grava o relatório de divergências."""
+
+    help = 'Confere o estoque dos produtos com a soma das movimentações'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--completo',
+            action='store_true',
+            help='Confere todos os produtos, e não apenas os alterados'
+        )
+        parser.add_argument(
+            '--processos',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Processos da execução completa (padrão: número de CPUs)'
+        )
+        parser.add_argument('--relatorio', help='Arquivo CSV das divergências')
+
+    def handle(self, *args, **options):
+        if options['processos'] < 1:
+            raise CommandError('O número de processos deve ser positivo.')
+
+        reconciliacao, _ = reconciliar(
+            completa=options['completo'],
+            processos=options['processos'],
+            relatorio=options['relatorio'],
+        )
+
+        modo = 'completa' if reconciliacao.completa else 'incremental'
+        duracao = (reconciliacao.concluida_em - reconciliacao.iniciada_em).total_seconds()
+        resumo = (
+            f'Reconciliação {modo}: {reconciliacao.produtos_verificados} produtos '
+            f'conferidos em {duracao:.1f}s'
+        )
+        if reconciliacao.divergencias:
+            self.stdout.write(self.style.WARNING(
+                f'{resumo}, {reconciliacao.divergencias} divergências. '
+                f'Relatório: {reconciliacao.relatorio}'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{resumo}, nenhuma divergência.'))
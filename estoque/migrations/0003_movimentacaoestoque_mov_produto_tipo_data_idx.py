@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estoque', '0002_alter_movimentacaoestoque_options_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movimentacaoestoque',
+            index=models.Index(fields=['produto', 'tipo', 'data_movimentacao'], name='mov_produto_tipo_data_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estoque', '0003_movimentacaoestoque_mov_produto_tipo_data_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='produto',
+            index=models.Index(fields=['nome', 'id'], name='produto_nome_id_idx'),
+        ),
+    ]
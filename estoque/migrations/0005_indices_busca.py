@@ -0,0 +1,131 @@
+# Índices de busca textual de produtos e movimentações.
+#
+# SQLite: tabelas virtuais FTS5 com conteúdo externo (o texto fica apenas na
+# tabela original), tokenizador unicode61 sem acentos e índices de prefixo,
+# mantidas em sincronia por triggers.
+# PostgreSQL: extensão pg_trgm e índices GIN de trigramas; a 0009 os recria
+# sobre o texto sem acentos, a expressão que a busca usa.
+
+from django.db import migrations
+
+
+SQLITE_CRIAR = [
+    # Produtos: nome e descrição
+    """
+    CREATE VIRTUAL TABLE estoque_produto_fts USING fts5(
+        nome, descricao,
+        content='estoque_produto', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER estoque_produto_fts_ai AFTER INSERT ON estoque_produto BEGIN
+        INSERT INTO estoque_produto_fts(rowid, nome, descricao)
+        VALUES (new.id, new.nome, new.descricao);
+    END
+    """,
+    """
+    CREATE TRIGGER estoque_produto_fts_ad AFTER DELETE ON estoque_produto BEGIN
+        INSERT INTO estoque_produto_fts(estoque_produto_fts, rowid, nome, descricao)
+        VALUES ('delete', old.id, old.nome, old.descricao);
+    END
+    """,
+    """
+    CREATE TRIGGER estoque_produto_fts_au AFTER UPDATE OF nome, descricao ON estoque_produto BEGIN
+        INSERT INTO estoque_produto_fts(estoque_produto_fts, rowid, nome, descricao)
+        VALUES ('delete', old.id, old.nome, old.descricao);
+        INSERT INTO estoque_produto_fts(rowid, nome, descricao)
+        VALUES (new.id, new.nome, new.descricao);
+    END
+    """,
+    "INSERT INTO estoque_produto_fts(estoque_produto_fts) VALUES ('rebuild')",
+
+    # Movimentações: observação
+    """
+    CREATE VIRTUAL TABLE estoque_movimentacao_fts USING fts5(
+        observacao,
+        content='estoque_movimentacaoestoque', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER estoque_movimentacao_fts_ai AFTER INSERT ON estoque_movimentacaoestoque BEGIN
+        INSERT INTO estoque_movimentacao_fts(rowid, observacao)
+        VALUES (new.id, new.observacao);
+    END
+    """,
+    """
+    CREATE TRIGGER estoque_movimentacao_fts_ad AFTER DELETE ON estoque_movimentacaoestoque BEGIN
+        INSERT INTO estoque_movimentacao_fts(estoque_movimentacao_fts, rowid, observacao)
+        VALUES ('delete', old.id, old.observacao);
+    END
+    """,
+    """
+    CREATE TRIGGER estoque_movimentacao_fts_au AFTER UPDATE OF observacao ON estoque_movimentacaoestoque BEGIN
+        INSERT INTO estoque_movimentacao_fts(estoque_movimentacao_fts, rowid, observacao)
+        VALUES ('delete', old.id, old.observacao);
+        INSERT INTO estoque_movimentacao_fts(rowid, observacao)
+        VALUES (new.id, new.observacao);
+    END
+    """,
+    "INSERT INTO estoque_movimentacao_fts(estoque_movimentacao_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REMOVER = [
+    "DROP TRIGGER IF EXISTS estoque_produto_fts_ai",
+    "DROP TRIGGER IF EXISTS estoque_produto_fts_ad",
+    "DROP TRIGGER IF EXISTS estoque_produto_fts_au",
+    "DROP TABLE IF EXISTS estoque_produto_fts",
+    "DROP TRIGGER IF EXISTS estoque_movimentacao_fts_ai",
+    "DROP TRIGGER IF EXISTS estoque_movimentacao_fts_ad",
+    "DROP TRIGGER IF EXISTS estoque_movimentacao_fts_au",
+    "DROP TABLE IF EXISTS estoque_movimentacao_fts",
+]
+
+POSTGRES_CRIAR = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS produto_nome_trgm_idx "
+    "ON estoque_produto USING gin (nome gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS produto_descricao_trgm_idx "
+    "ON estoque_produto USING gin (descricao gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS movimentacao_observacao_trgm_idx "
+    "ON estoque_movimentacaoestoque USING gin (observacao gin_trgm_ops)",
+]
+
+POSTGRES_REMOVER = [
+    "DROP INDEX IF EXISTS produto_nome_trgm_idx",
+    "DROP INDEX IF EXISTS produto_descricao_trgm_idx",
+    "DROP INDEX IF EXISTS movimentacao_observacao_trgm_idx",
+]
+
+
+def _executar(schema_editor, comandos):
+    for sql in comandos:
+        schema_editor.execute(sql)
+
+
+def criar_indices(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _executar(schema_editor, SQLITE_CRIAR)
+    elif vendor == 'postgresql':
+        _executar(schema_editor, POSTGRES_CRIAR)
+
+
+def remover_indices(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _executar(schema_editor, SQLITE_REMOVER)
+    elif vendor == 'postgresql':
+        _executar(schema_editor, POSTGRES_REMOVER)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estoque', '0004_produto_produto_nome_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indices, remover_indices),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estoque', '0005_indices_busca'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstoqueSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia', models.DateField(verbose_name='Dia')),
+                ('quantidade', models.IntegerField(verbose_name='Estoque ao Final do Dia')),
+                ('entradas', models.IntegerField(default=0, verbose_name='Entradas no Dia')),
+                ('saidas', models.IntegerField(default=0, verbose_name='Saídas no Dia')),
+                ('preco_custo', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Preço de Custo')),
+                ('preco_venda', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Preço de Venda')),
+                ('produto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='estoque.produto', verbose_name='Produto')),
+            ],
+            options={
+                'verbose_name': 'Snapshot de Estoque',
+                'verbose_name_plural': 'Snapshots de Estoque',
+                'ordering': ['-dia', 'produto'],
+                'indexes': [models.Index(fields=['dia'], name='snapshot_dia_idx')],
+                'constraints': [models.UniqueConstraint(fields=('produto', 'dia'), name='snapshot_produto_dia_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estoque', '0006_estoquesnapshot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReconciliacaoEstoque',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('iniciada_em', models.DateTimeField(verbose_name='Iniciada em')),
+                ('concluida_em', models.DateTimeField(verbose_name='Concluída em')),
+                ('completa', models.BooleanField(default=False, help_text='Conferiu todos os produtos (e não apenas os alterados)', verbose_name='Completa')),
+                ('produtos_verificados', models.IntegerField(default=0, verbose_name='Produtos Verificados')),
+                ('divergencias', models.IntegerField(default=0, verbose_name='Divergências')),
+                ('relatorio', models.CharField(blank=True, help_text='Arquivo CSV com as divergências encontradas', max_length=500, verbose_name='Relatório')),
+            ],
+            options={
+                'verbose_name': 'Reconciliação de Estoque',
+                'verbose_name_plural': 'Reconciliações de Estoque',
+                'ordering': ['-iniciada_em'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='movimentacaoestoque',
+            index=models.Index(fields=['data_movimentacao'], name='mov_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='produto',
+            index=models.Index(fields=['data_modificacao'], name='produto_modificacao_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:27
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estoque', '0007_reconciliacaoestoque'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovimentacaoEstoqueArquivo',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('ENTRADA', 'Entrada'), ('SAIDA', 'Saída')], max_length=7, verbose_name='Tipo de Movimentação')),
+                ('quantidade', models.IntegerField(verbose_name='Quantidade')),
+                ('valor_unitario', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Valor Unitário')),
+                ('observacao', models.TextField(blank=True, null=True, verbose_name='Observação')),
+                ('data_movimentacao', models.DateTimeField(verbose_name='Data da Movimentação')),
+                ('produto', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='movimentacoes_arquivadas', to='estoque.produto', verbose_name='Produto')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Responsável')),
+            ],
+            options={
+                'verbose_name': 'Movimentação de Estoque Arquivada',
+                'verbose_name_plural': 'Movimentações de Estoque Arquivadas',
+                'db_table': 'estoque_movimentacaoestoque_arquivo',
+                'ordering': ['-data_movimentacao'],
+                'indexes': [models.Index(fields=['produto', 'tipo', 'data_movimentacao'], name='mov_arquivo_produto_idx'), models.Index(fields=['data_movimentacao'], name='mov_arquivo_data_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumoMovimentacaoArquivada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField(help_text='Primeiro dia do mês', verbose_name='Mês')),
+                ('tipo', models.CharField(choices=[('ENTRADA', 'Entrada'), ('SAIDA', 'Saída')], max_length=7, verbose_name='Tipo de Movimentação')),
+                ('quantidade', models.IntegerField(default=0, verbose_name='Quantidade')),
+                ('valor_total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Valor Total')),
+                ('movimentacoes', models.IntegerField(default=0, verbose_name='Movimentações')),
+                ('produto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumos_arquivados', to='estoque.produto', verbose_name='Produto')),
+            ],
+            options={
+                'verbose_name': 'Resumo de Movimentações Arquivadas',
+                'verbose_name_plural': 'Resumos de Movimentações Arquivadas',
+                'ordering': ['-mes', 'produto'],
+                'constraints': [models.UniqueConstraint(fields=('produto', 'mes', 'tipo'), name='resumo_arquivo_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Busca sem acentos no PostgreSQL.
+#
+# Os índices de trigramas da 0005 eram sobre as colunas puras, mas a busca
+# compara o texto sem acentos e em minúsculas (como o FTS5 do SQLite): o
+# PostgreSQL só usa um índice de expressão quando a consulta usa a mesma
+# expressão. Esta migração cria a função IMMUTABLE estoque_sem_acentos
+# (lower + unaccent, que sozinho não é IMMUTABLE) e recria os índices GIN
+# sobre ela; estoque/busca.py filtra por estoque_sem_acentos(coluna) LIKE.
+# No SQLite não faz nada (FTS5 já ignora acentos).
+
+from django.db import migrations
+
+
+POSTGRES_CRIAR = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    # Dicionário informado explicitamente: a forma de um argumento depende
+    # do search_path e por isso não é IMMUTABLE
+    """
+    CREATE OR REPLACE FUNCTION estoque_sem_acentos(texto text) RETURNS text
+    AS $$ SELECT lower(public.unaccent('public.unaccent'::regdictionary, texto)) $$
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    """,
+    "DROP INDEX IF EXISTS produto_nome_trgm_idx",
+    "DROP INDEX IF EXISTS produto_descricao_trgm_idx",
+    "DROP INDEX IF EXISTS movimentacao_observacao_trgm_idx",
+    "CREATE INDEX produto_nome_trgm_idx "
+    "ON estoque_produto USING gin (estoque_sem_acentos(nome) gin_trgm_ops)",
+    "CREATE INDEX produto_descricao_trgm_idx "
+    "ON estoque_produto USING gin (estoque_sem_acentos(descricao) gin_trgm_ops)",
+    "CREATE INDEX movimentacao_observacao_trgm_idx "
+    "ON estoque_movimentacaoestoque USING gin (estoque_sem_acentos(observacao) gin_trgm_ops)",
+]
+
+POSTGRES_REMOVER = [
+    "DROP INDEX IF EXISTS produto_nome_trgm_idx",
+    "DROP INDEX IF EXISTS produto_descricao_trgm_idx",
+    "DROP INDEX IF EXISTS movimentacao_observacao_trgm_idx",
+    "CREATE INDEX produto_nome_trgm_idx "
+    "ON estoque_produto USING gin (nome gin_trgm_ops)",
+    "CREATE INDEX produto_descricao_trgm_idx "
+    "ON estoque_produto USING gin (descricao gin_trgm_ops)",
+    "CREATE INDEX movimentacao_observacao_trgm_idx "
+    "ON estoque_movimentacaoestoque USING gin (observacao gin_trgm_ops)",
+    "DROP FUNCTION IF EXISTS estoque_sem_acentos(text)",
+]
+
+
+def _executar(schema_editor, comandos):
+    if schema_editor.connection.vendor == 'postgresql':
+        for sql in comandos:
+            schema_editor.execute(sql)
+
+
+def criar_indices(apps, schema_editor):
+    _executar(schema_editor, POSTGRES_CRIAR)
+
+
+def remover_indices(apps, schema_editor):
+    _executar(schema_editor, POSTGRES_REMOVER)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estoque', '0008_movimentacaoestoquearquivo'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indices, remover_indices),
+    ]
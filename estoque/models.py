@@ -8,12 +8,85 @@ Autor: Manus AI
 Data: 2025-12-02
 """
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum
 from django.contrib.auth.models import User
+from django.utils import timezone
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 
 
+class ProdutoQuerySet(models.QuerySet):
+    """
+    QuerySet com consultas reutilizáveis de produtos.
+    
+    Os cálculos de valor de estoque são feitos pelo banco de dados, sem
+    carregar as instâncias de Produto na memória. Dashboards, relatórios
+    e o admin usam estes métodos para ter o mesmo caminho rápido.
+    """
+    
+    def ativos(self):
+        """Filtra apenas os produtos ativos."""
+        return self.filter(ativo=True)
+    
+    def com_estoque_baixo(self):
+        """Filtra os produtos com estoque abaixo do mínimo."""
+        return self.filter(estoque_atual__lt=F('estoque_minimo'))
+    
+    def com_valor_estoque(self):
+        """
+        Anota o valor do estoque de cada produto.
+        
+        Returns:
+            QuerySet: Produtos com ``valor_estoque_custo`` e
+            ``valor_estoque_venda`` calculados no banco
+        """
+        return self.annotate(
+            valor_estoque_custo=ExpressionWrapper(
+                F('preco_custo') * F('estoque_atual'),
+                output_field=DecimalField(max_digits=14, decimal_places=2)
+            ),
+            valor_estoque_venda=ExpressionWrapper(
+                F('preco_venda') * F('estoque_atual'),
+                output_field=DecimalField(max_digits=14, decimal_places=2)
+            ),
+        )
+    
+    def indicadores(self):
+        """
+        Calcula os indicadores de estoque em uma única consulta agregada.
+        
+        Returns:
+            dict: ``total_produtos``, ``produtos_estoque_baixo``,
+            ``valor_estoque_custo`` e ``valor_estoque_venda``
+        """
+        indicadores = self.aggregate(
+            total_produtos=Count('pk'),
+            produtos_estoque_baixo=Count(
+                'pk', filter=Q(estoque_atual__lt=F('estoque_minimo'))
+            ),
+            valor_estoque_custo=Sum(
+                ExpressionWrapper(
+                    F('preco_custo') * F('estoque_atual'),
+                    output_field=DecimalField(max_digits=14, decimal_places=2)
+                )
+            ),
+            valor_estoque_venda=Sum(
+                ExpressionWrapper(
+                    F('preco_venda') * F('estoque_atual'),
+                    output_field=DecimalField(max_digits=14, decimal_places=2)
+                )
+            ),
+        )
+        
+        # Somas de conjuntos vazios retornam None
+        for chave in ('valor_estoque_custo', 'valor_estoque_venda'):
+            if indicadores[chave] is None:
+                indicadores[chave] = Decimal('0.00')
+        
+        return indicadores
+
+
 class Produto(models.Model):
     """
     Modelo que representa um produto no sistema de estoque.
@@ -32,6 +105,9 @@ class Produto(models.Model):
         data_modificacao (datetime): Data e hora da última modificação
     """
     
+    # Maior código (id) possível: inteiro de 64 bits com sinal
+    MAIOR_CODIGO = 2 ** 63 - 1
+    
     # Informações básicas do produto
     nome = models.CharField(
         max_length=200,
@@ -115,15 +191,42 @@ class Produto(models.Model):
         verbose_name="Data de Modificação"
     )
     
+    # Gerenciador com as consultas de ProdutoQuerySet
+    objects = ProdutoQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Produto"
         verbose_name_plural = "Produtos"
         ordering = ['nome']  # Ordenar alfabeticamente por nome
+        indexes = [
+            # Ordenação da listagem paginada por cursor
+            models.Index(fields=['nome', 'id'], name='produto_nome_id_idx'),
+            # Produtos alterados desde a última reconciliação/snapshot
+            models.Index(fields=['data_modificacao'], name='produto_modificacao_idx'),
+        ]
     
     def __str__(self):
         """Retorna representação em string do produto."""
         return self.nome
     
+    @classmethod
+    def interpretar_codigo(cls, valor):
+        """
+        Converte um código de produto informado como texto.
+        
+        Args:
+            valor (str): Texto informado (parâmetro de URL, termo de busca)
+            
+        Returns:
+            int: Código do produto, ou None se o texto não for um código
+            possível (não numérico ou acima de ``MAIOR_CODIGO``, que o
+            banco não aceitaria na consulta)
+        """
+        if not (valor.isascii() and valor.isdigit()):
+            return None
+        codigo = int(valor)
+        return codigo if codigo <= cls.MAIOR_CODIGO else None
+    
     def calcular_margem_lucro(self):
         """
         Calcula a margem de lucro do produto.
@@ -246,6 +349,15 @@ class MovimentacaoEstoque(models.Model):
         verbose_name = "Movimentação de Estoque"
         verbose_name_plural = "Movimentações de Estoque"
         ordering = ['-data_movimentacao']  # Mais recentes primeiro
+        indexes = [
+            # Vendas/compras de um produto em uma janela de datas (relatórios)
+            models.Index(
+                fields=['produto', 'tipo', 'data_movimentacao'],
+                name='mov_produto_tipo_data_idx'
+            ),
+            # Movimentações a partir de um momento (reconciliação, snapshots)
+            models.Index(fields=['data_movimentacao'], name='mov_data_idx'),
+        ]
     
     def __str__(self):
         """Retorna representação em string da movimentação."""
@@ -260,32 +372,353 @@ class MovimentacaoEstoque(models.Model):
         """
         return self.quantidade * self.valor_unitario
     
+    def calcular_variacao_estoque(self):
+        """
+        Calcula o efeito da movimentação sobre o estoque do produto.
+        
+        Returns:
+            int: Quantidade positiva para ENTRADA e negativa para SAIDA
+            
+        Raises:
+            ValueError: Se o tipo de movimentação for inválido
+        """
+        if self.tipo == 'ENTRADA':
+            return self.quantidade
+        if self.tipo == 'SAIDA':
+            return -self.quantidade
+        raise ValueError(f"Tipo de movimentação inválido: {self.tipo}")
+    
+    def aplicar_no_estoque(self):
+        """
+        Aplica a movimentação no estoque do produto de forma atômica.
+        
+        Executa um único UPDATE condicional
+        (``estoque_atual = estoque_atual - n WHERE estoque_atual >= n`` nas
+        saídas), que altera apenas a coluna de estoque e não depende do valor
+        carregado em memória. Duas saídas simultâneas não conseguem vender
+        o mesmo item.
+        
+        Raises:
+            ValueError: Se a quantidade não for positiva, se o tipo for
+                inválido ou se não houver estoque suficiente
+        """
+        # Uma saída negativa passaria pela condição e aumentaria o estoque
+        if self.quantidade is None or self.quantidade <= 0:
+            raise ValueError("A quantidade deve ser maior que zero.")
+        
+        variacao = self.calcular_variacao_estoque()
+        
+        produtos = Produto.objects.filter(pk=self.produto_id)
+        if variacao < 0:
+            # Só debita se houver estoque suficiente (condição no próprio UPDATE)
+            produtos = produtos.filter(estoque_atual__gte=self.quantidade)
+        
+        if not produtos.update(estoque_atual=F('estoque_atual') + variacao):
+            disponivel = Produto.objects.values_list(
+                'estoque_atual', flat=True
+            ).get(pk=self.produto_id)
+            raise ValueError(
+                f"Estoque insuficiente! Disponível: {disponivel}, "
+                f"Solicitado: {self.quantidade}"
+            )
+        
+        # Mantém a instância em memória coerente com o banco
+        self.produto.estoque_atual += variacao
+    
     def save(self, *args, **kwargs):
         """
         Sobrescreve o método save para atualizar o estoque automaticamente.
         
-        Ao salvar uma movimentação:
+        Ao salvar uma nova movimentação:
         - ENTRADA: adiciona ao estoque
-        - SAIDA: subtrai do estoque
+        - SAIDA: subtrai do estoque (se houver saldo suficiente)
+        
+        A atualização do estoque e a gravação da movimentação acontecem
+        na mesma transação.
         """
         # Verificar se é uma nova movimentação
         is_new = self.pk is None
         
-        if is_new:
-            # Atualizar estoque do produto
-            if self.tipo == 'ENTRADA':
-                self.produto.estoque_atual += self.quantidade
-            elif self.tipo == 'SAIDA':
-                # Verificar se há estoque suficiente
-                if self.produto.estoque_atual < self.quantidade:
-                    raise ValueError(
-                        f"Estoque insuficiente! Disponível: {self.produto.estoque_atual}, "
-                        f"Solicitado: {self.quantidade}"
-                    )
-                self.produto.estoque_atual -= self.quantidade
+        with transaction.atomic():
+            if is_new:
+                self.aplicar_no_estoque()
             
-            # Salvar o produto com o estoque atualizado
-            self.produto.save()
+            # Salvar a movimentação
+            super().save(*args, **kwargs)
+
+
+class EstoqueSnapshot(models.Model):
+    """
+    Posição de estoque de um produto ao final de um dia.
+    
+    Gerado pelo comando ``gerar_snapshots_estoque`` (ver snapshots.py)
+    apenas para os produtos movimentados, criados ou alterados no dia: nos
+    demais dias a posição é a do snapshot anterior. A posição em uma data
+    qualquer é o último snapshot até ela mais as movimentações dos dias
+    ainda não processados.
+    
+    Attributes:
+        produto (Produto): Produto da posição
+        dia (date): Dia de referência (fuso local)
+        quantidade (int): Estoque ao final do dia
+        entradas (int): Quantidade que entrou no dia
+        saidas (int): Quantidade que saiu no dia
+        preco_custo (Decimal): Preço de custo na geração do snapshot
+        preco_venda (Decimal): Preço de venda na geração do snapshot
+    """
+    
+    produto = models.ForeignKey(
+        Produto,
+        on_delete=models.CASCADE,
+        related_name='snapshots',
+        verbose_name="Produto"
+    )
+    
+    dia = models.DateField(verbose_name="Dia")
+    
+    quantidade = models.IntegerField(verbose_name="Estoque ao Final do Dia")
+    
+    entradas = models.IntegerField(default=0, verbose_name="Entradas no Dia")
+    
+    saidas = models.IntegerField(default=0, verbose_name="Saídas no Dia")
+    
+    preco_custo = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        verbose_name="Preço de Custo"
+    )
+    
+    preco_venda = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        verbose_name="Preço de Venda"
+    )
+    
+    class Meta:
+        verbose_name = "Snapshot de Estoque"
+        verbose_name_plural = "Snapshots de Estoque"
+        ordering = ['-dia', 'produto']
+        constraints = [
+            # Também serve de índice para "último snapshot até a data"
+            models.UniqueConstraint(
+                fields=['produto', 'dia'],
+                name='snapshot_produto_dia_unico'
+            ),
+        ]
+        indexes = [
+            # Último dia processado
+            models.Index(fields=['dia'], name='snapshot_dia_idx'),
+        ]
+    
+    def __str__(self):
+        """Retorna representação em string do snapshot."""
+        return f"{self.produto.nome} em {self.dia:%d/%m/%Y}: {self.quantidade}"
+
+
+class ReconciliacaoEstoque(models.Model):
+    """
+    Execução concluída do comando ``reconciliar_estoque``.
+    
+    A última execução é o ponto de verificação da seguinte: a reconciliação
+    incremental confere apenas os produtos alterados ou movimentados desde
+    ``iniciada_em`` (ver reconciliacao.py).
+    
+    Attributes:
+        iniciada_em (datetime): Início da execução (ponto de verificação)
+        concluida_em (datetime): Fim da execução
+        completa (bool): Conferiu todos os produtos
+        produtos_verificados (int): Produtos conferidos
+        divergencias (int): Produtos com estoque diferente das movimentações
+        relatorio (str): Arquivo CSV com as divergências
+    """
+    
+    iniciada_em = models.DateTimeField(verbose_name="Iniciada em")
+    
+    concluida_em = models.DateTimeField(verbose_name="Concluída em")
+    
+    completa = models.BooleanField(
+        default=False,
+        verbose_name="Completa",
+        help_text="Conferiu todos os produtos (e não apenas os alterados)"
+    )
+    
+    produtos_verificados = models.IntegerField(
+        default=0,
+        verbose_name="Produtos Verificados"
+    )
+    
+    divergencias = models.IntegerField(
+        default=0,
+        verbose_name="Divergências"
+    )
+    
+    relatorio = models.CharField(
+        max_length=500,
+        blank=True,
+        verbose_name="Relatório",
+        help_text="Arquivo CSV com as divergências encontradas"
+    )
+    
+    class Meta:
+        verbose_name = "Reconciliação de Estoque"
+        verbose_name_plural = "Reconciliações de Estoque"
+        ordering = ['-iniciada_em']
+    
+    def __str__(self):
+        """Retorna representação em string da reconciliação."""
+        modo = 'completa' if self.completa else 'incremental'
+        return f"Reconciliação {modo} de {timezone.localtime(self.iniciada_em):%d/%m/%Y %H:%M}"
+
+
+class MovimentacaoEstoqueArquivo(models.Model):
+    """
+    Movimentação de estoque de um período encerrado, fora da tabela principal.
+    
+    O comando ``arquivar_historico`` move as movimentações antigas para
+    esta tabela (mesmas colunas e mesmo id) e acumula seus totais em
+    ResumoMovimentacaoArquivada; ``restaurar_historico`` as devolve. As
+    consultas que alcançam períodos arquivados leem as duas tabelas
+    (``fontes``).
+    
+    Attributes:
+        id (int): Id original da movimentação
+        produto (Produto): Produto movimentado
+        tipo (str): ENTRADA ou SAIDA
+        quantidade (int): Quantidade movimentada
+        valor_unitario (Decimal): Valor unitário da movimentação
+        observacao (str): Observações sobre a movimentação
+        usuario (User): Usuário responsável pela movimentação
+        data_movimentacao (datetime): Data e hora da movimentação
+    """
+    
+    id = models.BigIntegerField(primary_key=True, verbose_name="ID")
+    
+    produto = models.ForeignKey(
+        Produto,
+        on_delete=models.PROTECT,
+        related_name='movimentacoes_arquivadas',
+        verbose_name="Produto"
+    )
+    
+    tipo = models.CharField(
+        max_length=7,
+        choices=MovimentacaoEstoque.TIPO_MOVIMENTACAO,
+        verbose_name="Tipo de Movimentação"
+    )
+    
+    quantidade = models.IntegerField(verbose_name="Quantidade")
+    
+    valor_unitario = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        verbose_name="Valor Unitário"
+    )
+    
+    observacao = models.TextField(blank=True, null=True, verbose_name="Observação")
+    
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.PROTECT,
+        related_name='+',
+        verbose_name="Responsável"
+    )
+    
+    data_movimentacao = models.DateTimeField(verbose_name="Data da Movimentação")
+    
+    class Meta:
+        db_table = 'estoque_movimentacaoestoque_arquivo'
+        verbose_name = "Movimentação de Estoque Arquivada"
+        verbose_name_plural = "Movimentações de Estoque Arquivadas"
+        ordering = ['-data_movimentacao']
+        indexes = [
+            models.Index(
+                fields=['produto', 'tipo', 'data_movimentacao'],
+                name='mov_arquivo_produto_idx'
+            ),
+            models.Index(fields=['data_movimentacao'], name='mov_arquivo_data_idx'),
+        ]
+    
+    def __str__(self):
+        """Retorna representação em string da movimentação arquivada."""
+        return f"{self.tipo} de {self.quantidade}x {self.produto.nome} (arquivada)"
+    
+    @classmethod
+    def fontes(cls, inicio=None):
+        """
+        Tabelas com as movimentações a partir de ``inicio``.
         
-        # Salvar a movimentação
-        super().save(*args, **kwargs)
+        A tabela de arquivo só entra quando tem movimentações a partir de
+        ``inicio`` (uma consulta indexada pela data mais recente); juntas,
+        as duas tabelas têm sempre o histórico completo.
+        
+        Args:
+            inicio (datetime): Início do período consultado (None: desde o
+                início do histórico)
+            
+        Returns:
+            list: MovimentacaoEstoque e, se necessário, esta classe
+        """
+        limite = cls.objects.aggregate(limite=models.Max('data_movimentacao'))['limite']
+        if limite is None or (inicio is not None and inicio > limite):
+            return [MovimentacaoEstoque]
+        return [MovimentacaoEstoque, cls]
+
+
+class ResumoMovimentacaoArquivada(models.Model):
+    """
+    Totais mensais das movimentações arquivadas de cada produto.
+    
+    Fica na base principal no lugar das movimentações arquivadas: a
+    reconciliação e os totais do produto usam estes totais, sem ler a
+    tabela de arquivo. Mantido por ``arquivar_historico`` e
+    ``restaurar_historico``.
+    
+    Attributes:
+        produto (Produto): Produto movimentado
+        mes (date): Primeiro dia do mês
+        tipo (str): ENTRADA ou SAIDA
+        quantidade (int): Quantidade total movimentada no mês
+        valor_total (Decimal): Soma de quantidade x valor unitário
+        movimentacoes (int): Quantidade de movimentações arquivadas
+    """
+    
+    produto = models.ForeignKey(
+        Produto,
+        on_delete=models.CASCADE,
+        related_name='resumos_arquivados',
+        verbose_name="Produto"
+    )
+    
+    mes = models.DateField(verbose_name="Mês", help_text="Primeiro dia do mês")
+    
+    tipo = models.CharField(
+        max_length=7,
+        choices=MovimentacaoEstoque.TIPO_MOVIMENTACAO,
+        verbose_name="Tipo de Movimentação"
+    )
+    
+    quantidade = models.IntegerField(default=0, verbose_name="Quantidade")
+    
+    valor_total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name="Valor Total"
+    )
+    
+    movimentacoes = models.IntegerField(default=0, verbose_name="Movimentações")
+    
+    class Meta:
+        verbose_name = "Resumo de Movimentações Arquivadas"
+        verbose_name_plural = "Resumos de Movimentações Arquivadas"
+        ordering = ['-mes', 'produto']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['produto', 'mes', 'tipo'],
+                name='resumo_arquivo_unico'
+            ),
+        ]
+    
+    def __str__(self):
+        """Retorna representação em string do resumo."""
+        return f"{self.tipo} de {self.produto.nome} em {self.mes.strftime('%m/%Y')}"
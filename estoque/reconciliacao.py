@@ -0,0 +1,213 @@
+"""
+Reconciliação do estoque com o histórico de movimentações.
+
+``Produto.estoque_atual`` pode se afastar da soma das movimentações
+(entradas - saídas): estoque inicial informado no cadastro sem
+movimentação, edições de ``estoque_atual`` no admin, exclusão ou edição de
+movimentações por superusuários. ``reconciliar`` confere cada produto com
+uma única consulta agrupada e grava as divergências em um relatório CSV.
+
+A execução incremental confere apenas os produtos alterados ou
+movimentados desde a última reconciliação concluída
+(``ReconciliacaoEstoque``), com uma margem para transações que estavam em
+andamento naquele momento. Exclusões e edições de movimentações marcam o
+produto como alterado (ver signals.py). A execução completa divide os
+produtos em faixas de ids entre processos.
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+import csv
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Case, F, IntegerField, Max, Min, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import MovimentacaoEstoque, Produto, ReconciliacaoEstoque, ResumoMovimentacaoArquivada
+
+
+# Transações abertas antes do ponto de verificação podem gravar
+# movimentações com data anterior a ele depois de concluída a execução
+MARGEM = timedelta(minutes=5)
+
+# Faixa de ids de produtos por tarefa na execução completa
+PRODUTOS_POR_TAREFA = 5000
+
+COLUNAS_RELATORIO = ['produto_id', 'nome', 'estoque_atual', 'estoque_calculado', 'diferenca']
+
+
+def estoque_calculado():
+    """
+    Expressão da soma das movimentações do produto (entradas - saídas).
+
+    Inclui as movimentações arquivadas pelos resumos mensais
+    (ResumoMovimentacaoArquivada), sem ler a tabela de arquivo.
+    """
+    arquivadas = ResumoMovimentacaoArquivada.objects.filter(
+        produto=OuterRef('pk')
+    ).order_by().values('produto').annotate(
+        variacao=Coalesce(Sum('quantidade', filter=Q(tipo='ENTRADA')), 0)
+        - Coalesce(Sum('quantidade', filter=Q(tipo='SAIDA')), 0)
+    ).values('variacao')
+    return Coalesce(
+        Sum(Case(
+            When(movimentacoes__tipo='ENTRADA', then=F('movimentacoes__quantidade')),
+            When(movimentacoes__tipo='SAIDA', then=-F('movimentacoes__quantidade')),
+            default=Value(0),
+            output_field=IntegerField(),
+        )),
+        Value(0),
+    ) + Coalesce(Subquery(arquivadas), Value(0))
+
+
+def divergencias(produtos):
+    """
+    Produtos cujo estoque difere da soma das movimentações.
+
+    Uma consulta agrupada (LEFT JOIN + GROUP BY); só as divergências
+    voltam do banco.
+
+    Args:
+        produtos (QuerySet): Produtos conferidos
+
+    Returns:
+        list: Tuplas (id, nome, estoque atual, estoque calculado)
+    """
+    return list(
+        produtos.order_by().annotate(
+            estoque_calculado=estoque_calculado()
+        ).exclude(
+            estoque_atual=F('estoque_calculado')
+        ).values_list('pk', 'nome', 'estoque_atual', 'estoque_calculado')
+    )
+
+
+def produtos_alterados_desde(momento):
+    """
+    Produtos alterados (cadastro, admin) ou movimentados desde ``momento``.
+
+    Args:
+        momento (datetime): Início do intervalo
+
+    Returns:
+        QuerySet: Produtos a conferir
+    """
+    movimentados = MovimentacaoEstoque.objects.filter(
+        data_movimentacao__gte=momento
+    ).values('produto_id')
+    return Produto.objects.filter(Q(data_modificacao__gte=momento) | Q(pk__in=movimentados))
+
+
+def conferir_faixa(inicio, fim):
+    """
+    Confere os produtos com id em ``[inicio, fim)``.
+
+    Roda em um processo filho na execução completa; a conexão é aberta no
+    próprio processo e fechada ao final.
+
+    Returns:
+        tuple: (produtos conferidos, divergências)
+    """
+    try:
+        produtos = Produto.objects.filter(pk__gte=inicio, pk__lt=fim)
+        return produtos.count(), divergencias(produtos)
+    finally:
+        connections.close_all()
+
+
+def _faixas():
+    limites = Produto.objects.aggregate(menor=Min('pk'), maior=Max('pk'))
+    if limites['menor'] is None:
+        return []
+    return [
+        (inicio, inicio + PRODUTOS_POR_TAREFA)
+        for inicio in range(limites['menor'], limites['maior'] + 1, PRODUTOS_POR_TAREFA)
+    ]
+
+
+def _conferir_todos(processos):
+    faixas = _faixas()
+    if processos < 2 or len(faixas) < 2:
+        produtos = Produto.objects.all()
+        return produtos.count(), divergencias(produtos)
+
+    # Processos filhos não podem herdar conexões abertas do pai, nem o pool
+    # do PostgreSQL: close_all() só devolve as conexões a ele, e as threads
+    # do pool não existem no processo filho (a primeira consulta trava)
+    connections.close_all()
+    for conexao in connections.all(initialized_only=True):
+        if hasattr(conexao, 'close_pool'):
+            conexao.close_pool()
+    verificados, encontradas = 0, []
+    with ProcessPoolExecutor(
+        max_workers=min(processos, len(faixas)), mp_context=multiprocessing.get_context('fork')
+    ) as executor:
+        for quantidade, da_faixa in executor.map(conferir_faixa, *zip(*faixas)):
+            verificados += quantidade
+            encontradas.extend(da_faixa)
+    return verificados, encontradas
+
+
+def caminho_relatorio(momento):
+    """Arquivo padrão do relatório: ``relatorios/`` no diretório do projeto."""
+    return os.path.join(
+        settings.BASE_DIR, 'relatorios',
+        f'reconciliacao_estoque_{timezone.localtime(momento):%Y%m%d_%H%M%S}.csv'
+    )
+
+
+def gravar_relatorio(caminho, encontradas):
+    """Grava as divergências em CSV (uma linha por produto)."""
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    with open(caminho, 'w', newline='', encoding='utf-8') as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(COLUNAS_RELATORIO)
+        for produto_id, nome, atual, calculado in encontradas:
+            escritor.writerow([produto_id, nome, atual, calculado, atual - calculado])
+
+
+def reconciliar(completa=False, processos=1, relatorio=None):
+    """
+    Confere o estoque dos produtos com as movimentações.
+
+    Sem reconciliação anterior, a execução é completa.
+
+    Args:
+        completa (bool): Confere todos os produtos
+        processos (int): Processos da execução completa
+        relatorio (str): Arquivo CSV das divergências (padrão:
+            ``caminho_relatorio``)
+
+    Returns:
+        tuple: (ReconciliacaoEstoque gravada, lista de divergências)
+    """
+    iniciada_em = timezone.now()
+    anterior = ReconciliacaoEstoque.objects.order_by('-iniciada_em').first()
+    completa = completa or anterior is None
+
+    if completa:
+        verificados, encontradas = _conferir_todos(processos)
+    else:
+        produtos = produtos_alterados_desde(anterior.iniciada_em - MARGEM)
+        verificados, encontradas = produtos.count(), divergencias(produtos)
+
+    encontradas.sort()
+    relatorio = relatorio or caminho_relatorio(iniciada_em)
+    gravar_relatorio(relatorio, encontradas)
+
+    reconciliacao = ReconciliacaoEstoque.objects.create(
+        iniciada_em=iniciada_em,
+        concluida_em=timezone.now(),
+        completa=completa,
+        produtos_verificados=verificados,
+        divergencias=len(encontradas),
+        relatorio=relatorio,
+    )
+    return reconciliacao, encontradas
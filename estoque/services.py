@@ -0,0 +1,203 @@
+"""
+Serviços do módulo de Estoque.
+
+Este arquivo concentra regras de negócio reutilizáveis do estoque que não
+pertencem a um único modelo, como o registro de movimentações (estoque e
+capital de giro juntos) e o ranking de vendas usado nos relatórios.
+
+O ranking inclui as movimentações arquivadas (MovimentacaoEstoqueArquivo)
+quando a janela alcança um período arquivado.
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from financeiro.models import CapitalGiro
+from .models import Produto, MovimentacaoEstoque, MovimentacaoEstoqueArquivo
+
+
+def registrar_movimentacao(produto, tipo, quantidade, valor_unitario, usuario, observacao=''):
+    """
+    Registra uma movimentação de estoque e seu efeito no capital de giro.
+
+    A baixa/entrada no estoque (UPDATE condicional), a gravação da
+    movimentação e a atualização do capital de giro acontecem em uma única
+    transação: se qualquer etapa falhar (estoque ou capital insuficiente),
+    nada é gravado.
+
+    - ENTRADA: compra, retira do capital de giro
+    - SAIDA: venda, adiciona ao capital de giro
+
+    Args:
+        produto (Produto): Produto movimentado
+        tipo (str): ENTRADA ou SAIDA
+        quantidade (int): Quantidade movimentada
+        valor_unitario (Decimal): Valor unitário da movimentação
+        usuario (User): Usuário responsável
+        observacao (str): Observações sobre a movimentação
+
+    Returns:
+        MovimentacaoEstoque: Movimentação registrada
+
+    Raises:
+        ValueError: Tipo inválido, estoque insuficiente ou capital insuficiente
+    """
+    with transaction.atomic():
+        movimentacao = MovimentacaoEstoque(
+            produto=produto,
+            tipo=tipo,
+            quantidade=quantidade,
+            valor_unitario=valor_unitario,
+            observacao=observacao,
+            usuario=usuario
+        )
+        movimentacao.save()
+
+        valor_total = movimentacao.calcular_valor_total()
+
+        if tipo == 'ENTRADA':
+            # Entrada de estoque = saída de capital (compra)
+            CapitalGiro.retirar_capital(
+                valor=valor_total,
+                descricao=f'Compra de {quantidade}x {produto.nome}',
+                usuario=usuario
+            )
+        else:
+            # Saída de estoque = entrada de capital (venda)
+            CapitalGiro.adicionar_capital(
+                valor=valor_total,
+                descricao=f'Venda de {quantidade}x {produto.nome}',
+                usuario=usuario
+            )
+
+    return movimentacao
+
+
+def _filtro_vendas(data_inicio=None, data_fim=None, prefixo='movimentacoes__'):
+    """
+    Monta o filtro de saídas (vendas) dentro de uma janela de datas.
+
+    Args:
+        data_inicio (datetime): Início da janela (inclusivo, opcional)
+        data_fim (datetime): Fim da janela (exclusivo, opcional)
+        prefixo (str): Caminho até os campos da movimentação
+
+    Returns:
+        Q: Filtro a ser aplicado na agregação
+    """
+    filtro = Q(**{f'{prefixo}tipo': 'SAIDA'})
+    if data_inicio is not None:
+        filtro &= Q(**{f'{prefixo}data_movimentacao__gte': data_inicio})
+    if data_fim is not None:
+        filtro &= Q(**{f'{prefixo}data_movimentacao__lt': data_fim})
+    return filtro
+
+
+def _valor_saida(prefixo=''):
+    """Expressão de quantidade x valor unitário da movimentação."""
+    return ExpressionWrapper(
+        F(f'{prefixo}quantidade') * F(f'{prefixo}valor_unitario'),
+        output_field=DecimalField(max_digits=14, decimal_places=2)
+    )
+
+
+def produtos_com_vendas(data_inicio=None, data_fim=None, fontes=None):
+    """
+    Anota em cada produto ativo a quantidade vendida e a receita na janela.
+
+    A agregação é feita pelo banco em uma única consulta agrupada
+    (LEFT JOIN + GROUP BY), em vez de uma consulta por produto. Se a
+    janela alcança um período arquivado, as vendas arquivadas entram na
+    mesma consulta como subconsultas por produto.
+
+    Args:
+        data_inicio (datetime): Início da janela (inclusivo, opcional)
+        data_fim (datetime): Fim da janela (exclusivo, opcional)
+        fontes (list): Tabelas de movimentações consultadas (padrão:
+            ``MovimentacaoEstoqueArquivo.fontes(data_inicio)``)
+
+    Returns:
+        QuerySet: Produtos ativos anotados com ``quantidade`` e ``receita``
+    """
+    if fontes is None:
+        fontes = MovimentacaoEstoqueArquivo.fontes(data_inicio)
+    filtro = _filtro_vendas(data_inicio, data_fim)
+    zero = Value(Decimal('0.00'))
+    campo_valor = DecimalField(max_digits=14, decimal_places=2)
+
+    quantidade = Coalesce(Sum('movimentacoes__quantidade', filter=filtro), 0)
+    receita = Coalesce(
+        Sum(_valor_saida('movimentacoes__'), filter=filtro), zero, output_field=campo_valor
+    )
+
+    if MovimentacaoEstoqueArquivo in fontes:
+        arquivadas = MovimentacaoEstoqueArquivo.objects.filter(
+            _filtro_vendas(data_inicio, data_fim, prefixo=''),
+            produto=OuterRef('pk')
+        ).order_by().values('produto')
+        quantidade = quantidade + Coalesce(
+            Subquery(arquivadas.annotate(total=Sum('quantidade')).values('total')), 0
+        )
+        receita = receita + Coalesce(
+            Subquery(arquivadas.annotate(total=Sum(_valor_saida())).values('total')),
+            zero,
+            output_field=campo_valor
+        )
+
+    return Produto.objects.ativos().annotate(quantidade=quantidade, receita=receita)
+
+
+def ranking_vendas(data_inicio=None, data_fim=None, limite=10):
+    """
+    Calcula o ranking de vendas de produtos em uma janela de datas.
+
+    O número de consultas é constante (quatro), independente da quantidade
+    de produtos cadastrados:
+    - verificação do arquivo (``MovimentacaoEstoqueArquivo.fontes``)
+    - produtos mais vendidos (top-N por quantidade)
+    - produtos com menor giro (bottom-N, incluindo os sem venda)
+    - totais de unidades vendidas e receita no período (mais uma consulta
+      se a janela alcança o arquivo)
+
+    Args:
+        data_inicio (datetime): Início da janela (inclusivo, opcional)
+        data_fim (datetime): Fim da janela (exclusivo, opcional)
+        limite (int): Quantidade de produtos em cada lista
+
+    Returns:
+        dict: Listas ``mais_vendidos`` e ``menor_giro`` e os totais
+        ``quantidade_total`` e ``receita_total``
+    """
+    fontes = MovimentacaoEstoqueArquivo.fontes(data_inicio)
+    produtos = produtos_com_vendas(data_inicio, data_fim, fontes)
+
+    mais_vendidos = list(
+        produtos.filter(quantidade__gt=0).order_by('-quantidade', 'nome')[:limite]
+    )
+    menor_giro = list(produtos.order_by('quantidade', 'nome')[:limite])
+
+    # Totais calculados diretamente sobre as movimentações do período
+    quantidade_total, receita_total = 0, Decimal('0.00')
+    for modelo in fontes:
+        totais = modelo.objects.filter(
+            _filtro_vendas(data_inicio, data_fim, prefixo=''),
+            produto__ativo=True
+        ).aggregate(
+            quantidade_total=Sum('quantidade'),
+            receita_total=Sum(_valor_saida()),
+        )
+        quantidade_total += totais['quantidade_total'] or 0
+        receita_total += totais['receita_total'] or Decimal('0.00')
+
+    return {
+        'mais_vendidos': mais_vendidos,
+        'menor_giro': menor_giro,
+        'quantidade_total': quantidade_total,
+        'receita_total': receita_total,
+    }
@@ -0,0 +1,51 @@
+"""
+Sinais do módulo de Estoque.
+
+Invalida os indicadores em cache dos dashboards sempre que produtos ou
+movimentações são gravados. Operações em massa que não disparam sinais
+(``bulk_create``, ``QuerySet.update``) chamam ``gestao_erp.cache.invalidar``
+diretamente (ver importacao.py).
+
+Exclusões e edições de movimentações também atualizam
+``Produto.data_modificacao``, para que a reconciliação incremental confira
+o produto (ver reconciliacao.py).
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from gestao_erp import cache
+from .models import MovimentacaoEstoque, Produto
+
+
+@receiver(post_save, sender=Produto)
+@receiver(post_delete, sender=Produto)
+def invalidar_indicadores_produto(sender, **kwargs):
+    """Cadastro ou alteração de produto muda os totais do estoque."""
+    cache.invalidar('estoque')
+
+
+@receiver(post_save, sender=MovimentacaoEstoque)
+@receiver(post_delete, sender=MovimentacaoEstoque)
+def invalidar_indicadores_movimentacao(sender, **kwargs):
+    """Movimentações alteram o estoque e, via capital de giro, o financeiro."""
+    cache.invalidar('estoque', 'financeiro')
+
+
+@receiver(post_save, sender=MovimentacaoEstoque)
+@receiver(post_delete, sender=MovimentacaoEstoque)
+def marcar_produto_alterado(sender, instance, created=False, **kwargs):
+    """
+    Marca o produto de uma movimentação excluída ou editada como alterado.
+
+    Movimentações novas já são encontradas pela data; as excluídas não
+    deixam rastro e as editadas mantêm a data original. Na exclusão do
+    próprio produto (cascata), não há o que marcar.
+    """
+    if created or isinstance(kwargs.get('origin'), Produto):
+        return
+    Produto.objects.filter(pk=instance.produto_id).update(data_modificacao=timezone.now())
@@ -0,0 +1,382 @@
+"""
+Posição histórica do estoque a partir de snapshots diários.
+
+``gerar_snapshots`` grava um ``EstoqueSnapshot`` por produto e dia apenas
+para os produtos movimentados, criados ou alterados no dia (o primeiro dia
+gerado leva todos os produtos, como base). Em um dia sem snapshot, a
+posição do produto é a do snapshot anterior.
+
+``posicao_em`` responde o estoque e o valor do estoque em uma data
+qualquer: último snapshot de cada produto até a data (consulta pelo índice
+único ``produto, dia``) mais as movimentações dos dias ainda não
+processados, em geral só as do dia corrente. Datas anteriores ao primeiro
+snapshot são calculadas de trás para frente a partir de
+``Produto.estoque_atual``, percorrendo todas as movimentações posteriores.
+
+Os preços usados no valor são os gravados no snapshot (preços do dia da
+geração); o sistema não guarda o histórico de preços.
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+import time as cronometro
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import (
+    ExpressionWrapper, F, IntegerField, Max, Min, OuterRef, Q, Subquery, Sum,
+)
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import EstoqueSnapshot, MovimentacaoEstoqueArquivo, Produto
+
+
+# Dias lidos e gravados por vez na geração
+DIAS_POR_BLOCO = 31
+
+# Snapshots por INSERT
+TAMANHO_LOTE = 1000
+
+CENTAVO = Decimal('0.01')
+
+
+@dataclass
+class ResultadoSnapshots:
+    """Resumo de uma execução de ``gerar_snapshots``."""
+
+    desde: object = None
+    ate: object = None
+    dias: int = 0
+    snapshots: int = 0
+    duracao: float = 0.0
+
+
+@dataclass
+class PosicaoEstoque:
+    """Estoque de cada produto ao final de uma data."""
+
+    data: object
+    itens: list = field(default_factory=list)
+
+    @property
+    def quantidade_total(self):
+        return sum(item['quantidade'] for item in self.itens)
+
+    @property
+    def valor_estoque_custo(self):
+        return sum((item['valor_custo'] for item in self.itens), Decimal('0.00'))
+
+    @property
+    def valor_estoque_venda(self):
+        return sum((item['valor_venda'] for item in self.itens), Decimal('0.00'))
+
+
+def inicio_do_dia(dia):
+    """Início do dia no fuso local (datetime com fuso)."""
+    return timezone.make_aware(datetime.combine(dia, time.min))
+
+
+def _variacao(fontes, produto=None, **filtro):
+    """
+    Consultas de entradas menos saídas por produto, uma por tabela.
+
+    Com ``produto``, cada consulta é uma subconsulta correlacionada.
+    """
+    consultas = []
+    for modelo in fontes:
+        movimentacoes = modelo.objects.filter(**filtro)
+        if produto is not None:
+            movimentacoes = movimentacoes.filter(produto=produto)
+        consultas.append(movimentacoes.order_by().values('produto_id').annotate(
+            variacao=Coalesce(Sum('quantidade', filter=Q(tipo='ENTRADA')), 0)
+            - Coalesce(Sum('quantidade', filter=Q(tipo='SAIDA')), 0)
+        ))
+    return consultas
+
+
+def _variacao_por_produto(inicio, fim, fontes):
+    """Entradas menos saídas por produto em ``[inicio, fim)`` (uma consulta agrupada por tabela)."""
+    variacoes = {}
+    for consulta in _variacao(
+        fontes, data_movimentacao__gte=inicio, data_movimentacao__lt=fim
+    ):
+        for produto_id, variacao in consulta.values_list('produto_id', 'variacao'):
+            variacoes[produto_id] = variacoes.get(produto_id, 0) + variacao
+    return variacoes
+
+
+def _estoque_no_momento(momento, fontes=None):
+    """
+    Expressão do estoque de cada produto em ``momento``: estoque atual menos
+    as movimentações a partir dele (também as arquivadas, se houver).
+
+    Calculada na mesma consulta que lê ``estoque_atual``: uma movimentação
+    gravada entre duas consultas separadas seria contada pela metade.
+    """
+    if fontes is None:
+        fontes = MovimentacaoEstoqueArquivo.fontes(momento)
+    estoque = F('estoque_atual')
+    for consulta in _variacao(fontes, produto=OuterRef('pk'), data_movimentacao__gte=momento):
+        estoque = estoque - Coalesce(Subquery(consulta.values('variacao')), 0)
+    return ExpressionWrapper(estoque, output_field=IntegerField())
+
+
+def _movimentos_por_dia(desde, ate):
+    """
+    Entradas e saídas de cada produto em cada dia do intervalo.
+
+    Returns:
+        dict: ``{dia: {produto_id: (entradas, saidas)}}``
+    """
+    inicio = inicio_do_dia(desde)
+    por_dia = {}
+    for modelo in MovimentacaoEstoqueArquivo.fontes(inicio):
+        linhas = modelo.objects.filter(
+            data_movimentacao__gte=inicio,
+            data_movimentacao__lt=inicio_do_dia(ate + timedelta(days=1)),
+        ).order_by().annotate(
+            dia=TruncDate('data_movimentacao')
+        ).values('dia', 'produto_id').annotate(
+            entradas=Coalesce(Sum('quantidade', filter=Q(tipo='ENTRADA')), 0),
+            saidas=Coalesce(Sum('quantidade', filter=Q(tipo='SAIDA')), 0),
+        ).values_list('dia', 'produto_id', 'entradas', 'saidas')
+
+        for dia, produto_id, entradas, saidas in linhas:
+            anteriores = por_dia.setdefault(dia, {}).get(produto_id, (0, 0))
+            por_dia[dia][produto_id] = (anteriores[0] + entradas, anteriores[1] + saidas)
+    return por_dia
+
+
+def _alterados_por_dia(desde, ate):
+    """Produtos criados ou alterados (admin, cadastro) em cada dia."""
+    inicio, fim = inicio_do_dia(desde), inicio_do_dia(ate + timedelta(days=1))
+    por_dia = {}
+    for campo in ('data_criacao', 'data_modificacao'):
+        linhas = Produto.objects.filter(**{
+            f'{campo}__gte': inicio, f'{campo}__lt': fim
+        }).order_by().annotate(dia=TruncDate(campo)).values_list('dia', 'pk')
+        for dia, produto_id in linhas:
+            por_dia.setdefault(dia, set()).add(produto_id)
+    return por_dia
+
+
+def gerar_snapshots(ate=None, desde=None):
+    """
+    Grava os snapshots dos dias ``desde`` a ``ate``.
+
+    A posição no início de ``desde`` é calculada uma vez (estoque atual
+    menos as movimentações a partir dessa data); cada dia soma as
+    movimentações do próprio dia. Os dias são gravados em ordem, um bloco
+    por transação: se a execução for interrompida, os dias já gravados
+    estão completos e a próxima execução continua do seguinte.
+
+    Snapshots já existentes no intervalo são substituídos.
+
+    Args:
+        ate (date): Último dia (padrão: ontem); precisa estar encerrado
+        desde (date): Primeiro dia (padrão: dia seguinte ao último
+            snapshot ou, sem snapshots, ``ate``)
+
+    Returns:
+        ResultadoSnapshots: Dias processados e snapshots gravados
+
+    Raises:
+        ValueError: Dia não encerrado ou intervalo que deixaria dias sem
+            processar
+    """
+    inicio = cronometro.perf_counter()
+    hoje = timezone.localdate()
+    if ate is None:
+        ate = hoje - timedelta(days=1)
+    if ate >= hoje:
+        raise ValueError('Só é possível gerar snapshots de dias já encerrados.')
+
+    ultimo = EstoqueSnapshot.objects.aggregate(ultimo=Max('dia'))['ultimo']
+    if desde is None:
+        desde = ultimo + timedelta(days=1) if ultimo else ate
+    elif ultimo and desde > ultimo + timedelta(days=1):
+        raise ValueError(
+            f'Os dias entre {ultimo + timedelta(days=1):%d/%m/%Y} e '
+            f'{desde - timedelta(days=1):%d/%m/%Y} ficariam sem snapshots.'
+        )
+
+    resultado = ResultadoSnapshots(desde=desde, ate=ate)
+    if desde > ate:
+        resultado.duracao = cronometro.perf_counter() - inicio
+        return resultado
+
+    # Sem histórico antes de "desde", o primeiro dia leva todos os produtos
+    base_completa = not EstoqueSnapshot.objects.filter(dia__lt=desde).exists()
+
+    # Posição no início de "desde"
+    produtos = {
+        produto_id: {
+            'quantidade': quantidade,
+            'preco_custo': preco_custo,
+            'preco_venda': preco_venda,
+            'criado': timezone.localtime(data_criacao).date(),
+        }
+        for produto_id, quantidade, preco_custo, preco_venda, data_criacao
+        in Produto.objects.annotate(
+            quantidade=_estoque_no_momento(inicio_do_dia(desde))
+        ).values_list(
+            'pk', 'quantidade', 'preco_custo', 'preco_venda', 'data_criacao'
+        ).iterator()
+    }
+
+    bloco_inicio = desde
+    while bloco_inicio <= ate:
+        bloco_fim = min(bloco_inicio + timedelta(days=DIAS_POR_BLOCO - 1), ate)
+        movimentos = _movimentos_por_dia(bloco_inicio, bloco_fim)
+        alterados = _alterados_por_dia(bloco_inicio, bloco_fim)
+
+        snapshots = []
+        dia = bloco_inicio
+        while dia <= bloco_fim:
+            do_dia = movimentos.get(dia, {})
+            for produto_id, (entradas, saidas) in do_dia.items():
+                produtos[produto_id]['quantidade'] += entradas - saidas
+
+            if base_completa and dia == desde:
+                ids = produtos.keys()
+            else:
+                ids = do_dia.keys() | alterados.get(dia, set())
+
+            for produto_id in ids:
+                produto = produtos[produto_id]
+                if produto['criado'] > dia:
+                    continue
+                entradas, saidas = do_dia.get(produto_id, (0, 0))
+                snapshots.append(EstoqueSnapshot(
+                    produto_id=produto_id,
+                    dia=dia,
+                    quantidade=produto['quantidade'],
+                    entradas=entradas,
+                    saidas=saidas,
+                    preco_custo=produto['preco_custo'],
+                    preco_venda=produto['preco_venda'],
+                ))
+            dia += timedelta(days=1)
+
+        with transaction.atomic():
+            EstoqueSnapshot.objects.bulk_create(
+                snapshots,
+                batch_size=TAMANHO_LOTE,
+                update_conflicts=True,
+                unique_fields=['produto', 'dia'],
+                update_fields=['quantidade', 'entradas', 'saidas', 'preco_custo', 'preco_venda'],
+            )
+
+        resultado.dias += (bloco_fim - bloco_inicio).days + 1
+        resultado.snapshots += len(snapshots)
+        bloco_inicio = bloco_fim + timedelta(days=1)
+
+    resultado.duracao = cronometro.perf_counter() - inicio
+    return resultado
+
+
+def posicao_em(data, produtos=None):
+    """
+    Calcula o estoque e o valor do estoque ao final de uma data.
+
+    Consultas: limites dos snapshots, verificação do arquivo, produtos com
+    o último snapshot até a data e as movimentações dos dias seguintes ao
+    último dia processado (normalmente apenas o dia corrente).
+
+    Args:
+        data (date): Data de referência (até hoje)
+        produtos (QuerySet): Produtos considerados (padrão: todos)
+
+    Returns:
+        PosicaoEstoque: Itens por produto existente na data e totais
+
+    Raises:
+        ValueError: Se a data estiver no futuro
+    """
+    if data > timezone.localdate():
+        raise ValueError('A data não pode estar no futuro.')
+
+    fim = inicio_do_dia(data + timedelta(days=1))
+    if produtos is None:
+        produtos = Produto.objects.all()
+    produtos = produtos.filter(data_criacao__lt=fim).order_by('nome', 'pk')
+
+    limites = EstoqueSnapshot.objects.aggregate(
+        primeiro=Min('dia'),
+        ultimo=Max('dia', filter=Q(dia__lte=data)),
+    )
+
+    if limites['primeiro'] is None or data < limites['primeiro']:
+        # Antes dos snapshots: de trás para frente a partir do estoque atual
+        itens = list(produtos.annotate(
+            quantidade=_estoque_no_momento(fim)
+        ).values_list('pk', 'nome', 'quantidade', 'preco_custo', 'preco_venda'))
+    else:
+        ultimo_snapshot = EstoqueSnapshot.objects.filter(
+            produto=OuterRef('pk'), dia__lte=data
+        ).order_by('-dia')
+        linhas = list(produtos.annotate(
+            snapshot_quantidade=Subquery(ultimo_snapshot.values('quantidade')[:1]),
+            snapshot_custo=Subquery(ultimo_snapshot.values('preco_custo')[:1]),
+            snapshot_venda=Subquery(ultimo_snapshot.values('preco_venda')[:1]),
+        ).values_list(
+            'pk', 'nome', 'preco_custo', 'preco_venda',
+            'snapshot_quantidade', 'snapshot_custo', 'snapshot_venda',
+        ))
+
+        # Dias ainda não processados, até a data
+        inicio_pendente = inicio_do_dia(limites['ultimo'] + timedelta(days=1))
+        fontes = MovimentacaoEstoqueArquivo.fontes(inicio_pendente)
+        pendentes = _variacao_por_produto(inicio_pendente, fim, fontes)
+
+        # Produtos criados depois do último dia processado (sem snapshot):
+        # de trás para frente, só pelas movimentações recentes
+        sem_snapshot = [linha[0] for linha in linhas if linha[4] is None]
+        recentes = {}
+        if sem_snapshot:
+            recentes = dict(Produto.objects.filter(pk__in=sem_snapshot).annotate(
+                quantidade=_estoque_no_momento(fim, fontes)
+            ).values_list('pk', 'quantidade'))
+
+        itens = []
+        for produto_id, nome, custo, venda, quantidade, snap_custo, snap_venda in linhas:
+            if quantidade is None:
+                itens.append((produto_id, nome, recentes[produto_id], custo, venda))
+            else:
+                # No SQLite, decimais de subconsultas não vêm arredondados
+                itens.append((
+                    produto_id, nome, quantidade + pendentes.get(produto_id, 0),
+                    snap_custo.quantize(CENTAVO), snap_venda.quantize(CENTAVO)
+                ))
+
+    return PosicaoEstoque(data=data, itens=[
+        {
+            'id': produto_id,
+            'nome': nome,
+            'quantidade': quantidade,
+            'preco_custo': custo,
+            'preco_venda': venda,
+            'valor_custo': custo * quantidade,
+            'valor_venda': venda * quantidade,
+        }
+        for produto_id, nome, quantidade, custo, venda in itens
+    ])
+
+
+def estoque_em(produto, data):
+    """
+    Retorna o estoque de um produto ao final de uma data.
+
+    Args:
+        produto (Produto): Produto consultado
+        data (date): Data de referência
+
+    Returns:
+        int: Quantidade em estoque (0 se o produto ainda não existia)
+    """
+    posicao = posicao_em(data, Produto.objects.filter(pk=produto.pk))
+    return posicao.itens[0]['quantidade'] if posicao.itens else 0
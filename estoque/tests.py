@@ -1,3 +1,1319 @@
-from django.test import TestCase
+"""
+Testes do módulo de Estoque.
 
-# Create your tests here.
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+import csv
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from financeiro.models import CapitalGiro, IndicadorFinanceiro, Receita, SaldoDiario
+from financeiro.periodos import adicionar_meses
+from gestao_erp import cache as cache_indicadores
+from gestao_erp import arquivamento
+from . import busca, reconciliacao, snapshots
+from .importacao import importar_movimentacoes
+from .models import (
+    EstoqueSnapshot, MovimentacaoEstoque, MovimentacaoEstoqueArquivo, Produto,
+    ReconciliacaoEstoque, ResumoMovimentacaoArquivada,
+)
+from .services import ranking_vendas, registrar_movimentacao
+
+
+def criar_produtos(usuario, quantidade, prefixo='Produto'):
+    """Cria produtos ativos em lote para os testes."""
+    return Produto.objects.bulk_create([
+        Produto(
+            nome=f'{prefixo} {indice:05d}',
+            preco_custo=Decimal('10.00'),
+            preco_venda=Decimal('15.00'),
+            estoque_atual=1000,
+            usuario_criacao=usuario,
+        )
+        for indice in range(quantidade)
+    ])
+
+
+def criar_vendas(usuario, produtos, quantidade_por_produto):
+    """Cria uma saída por produto sem passar pela regra de estoque."""
+    return MovimentacaoEstoque.objects.bulk_create([
+        MovimentacaoEstoque(
+            produto=produto,
+            tipo='SAIDA',
+            quantidade=quantidade_por_produto(indice),
+            valor_unitario=Decimal('15.00'),
+            usuario=usuario,
+        )
+        for indice, produto in enumerate(produtos)
+    ])
+
+
+class RankingVendasTests(TestCase):
+    """Testes do serviço de ranking de vendas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('estoquista', password='senha123')
+
+    def test_ordena_mais_vendidos_e_menor_giro(self):
+        produtos = criar_produtos(self.usuario, 4)
+        criar_vendas(self.usuario, produtos[:3], lambda indice: indice + 1)
+
+        ranking = ranking_vendas(limite=2)
+
+        self.assertEqual(
+            [produto.nome for produto in ranking['mais_vendidos']],
+            ['Produto 00002', 'Produto 00001']
+        )
+        self.assertEqual(ranking['mais_vendidos'][0].quantidade, 3)
+        self.assertEqual(ranking['mais_vendidos'][0].receita, Decimal('45.00'))
+        self.assertEqual(
+            [produto.nome for produto in ranking['menor_giro']],
+            ['Produto 00003', 'Produto 00000']
+        )
+        self.assertEqual(ranking['quantidade_total'], 6)
+        self.assertEqual(ranking['receita_total'], Decimal('90.00'))
+
+    def test_respeita_janela_de_datas(self):
+        produtos = criar_produtos(self.usuario, 2)
+        antiga, recente = criar_vendas(self.usuario, produtos, lambda indice: 5)
+        MovimentacaoEstoque.objects.filter(pk=antiga.pk).update(
+            data_movimentacao=timezone.now() - timedelta(days=60)
+        )
+
+        ranking = ranking_vendas(data_inicio=timezone.now() - timedelta(days=30))
+
+        self.assertEqual(
+            [produto.pk for produto in ranking['mais_vendidos']],
+            [recente.produto_id]
+        )
+        self.assertEqual(ranking['quantidade_total'], 5)
+
+    def test_ignora_entradas_e_produtos_inativos(self):
+        ativo, inativo = criar_produtos(self.usuario, 2)
+        Produto.objects.filter(pk=inativo.pk).update(ativo=False)
+        criar_vendas(self.usuario, [ativo, inativo], lambda indice: 2)
+        MovimentacaoEstoque.objects.create(
+            produto=ativo,
+            tipo='ENTRADA',
+            quantidade=50,
+            valor_unitario=Decimal('10.00'),
+            usuario=self.usuario,
+        )
+
+        ranking = ranking_vendas()
+
+        self.assertEqual([produto.pk for produto in ranking['mais_vendidos']], [ativo.pk])
+        self.assertEqual(ranking['quantidade_total'], 2)
+
+    def test_numero_de_consultas_constante(self):
+        """O ranking não pode crescer em consultas conforme o catálogo."""
+        for quantidade in (5, 200):
+            produtos = criar_produtos(self.usuario, quantidade, prefixo=f'Lote {quantidade}')
+            criar_vendas(self.usuario, produtos, lambda indice: indice % 7 + 1)
+
+            # Verificação do arquivo, duas listas e totais
+            with self.assertNumQueries(4):
+                ranking_vendas(limite=10)
+
+
+class RelatorioEstoqueViewTests(TestCase):
+    """Testes da view de relatório de estoque."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_superuser('gerente', password='senha123')
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def test_relatorio_exibe_ranking_do_periodo(self):
+        produtos = criar_produtos(self.usuario, 3)
+        criar_vendas(self.usuario, produtos, lambda indice: indice + 1)
+        hoje = timezone.localdate()
+
+        resposta = self.client.get(reverse('estoque:relatorio'), {
+            'data_inicio': (hoje - timedelta(days=7)).isoformat(),
+            'data_fim': hoje.isoformat(),
+        })
+
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.context['produtos_mais_vendidos'][0].nome, 'Produto 00002')
+        self.assertEqual(resposta.context['quantidade_total'], 6)
+
+
+class RegistrarMovimentacaoTests(TestCase):
+    """Testes do serviço de registro de movimentações."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('vendedor', password='senha123')
+
+    def setUp(self):
+        self.produto = criar_produtos(self.usuario, 1)[0]
+        Produto.objects.filter(pk=self.produto.pk).update(estoque_atual=10)
+        self.produto.refresh_from_db()
+
+    def test_saida_atualiza_somente_coluna_de_estoque(self):
+        with CaptureQueriesContext(connection) as consultas:
+            registrar_movimentacao(
+                self.produto, 'SAIDA', 4, Decimal('15.00'), self.usuario
+            )
+
+        atualizacoes = [
+            consulta['sql'] for consulta in consultas.captured_queries
+            if consulta['sql'].startswith('UPDATE "estoque_produto"')
+        ]
+        self.assertEqual(len(atualizacoes), 1)
+        self.assertIn('SET "estoque_atual" =', atualizacoes[0])
+        self.assertIn('"estoque_atual" >= 4', atualizacoes[0])
+        self.assertNotIn('"nome"', atualizacoes[0])
+
+        self.produto.refresh_from_db()
+        self.assertEqual(self.produto.estoque_atual, 6)
+        self.assertEqual(CapitalGiro.obter_capital_atual(), Decimal('60.00'))
+
+    def test_saida_sem_estoque_nao_grava_nada(self):
+        with self.assertRaisesMessage(ValueError, 'Estoque insuficiente! Disponível: 10'):
+            registrar_movimentacao(
+                self.produto, 'SAIDA', 11, Decimal('15.00'), self.usuario
+            )
+
+        self.produto.refresh_from_db()
+        self.assertEqual(self.produto.estoque_atual, 10)
+        self.assertFalse(MovimentacaoEstoque.objects.exists())
+        self.assertFalse(CapitalGiro.objects.exists())
+
+    def test_entrada_sem_capital_desfaz_estoque_e_movimentacao(self):
+        with self.assertRaisesMessage(ValueError, 'Capital insuficiente'):
+            registrar_movimentacao(
+                self.produto, 'ENTRADA', 5, Decimal('10.00'), self.usuario
+            )
+
+        self.produto.refresh_from_db()
+        self.assertEqual(self.produto.estoque_atual, 10)
+        self.assertFalse(MovimentacaoEstoque.objects.exists())
+
+    def test_tipo_invalido_e_rejeitado(self):
+        with self.assertRaisesMessage(ValueError, 'Tipo de movimentação inválido'):
+            registrar_movimentacao(
+                self.produto, 'AJUSTE', 1, Decimal('15.00'), self.usuario
+            )
+
+    def test_quantidade_nao_positiva_e_rejeitada(self):
+        for tipo, quantidade in (('SAIDA', -5), ('ENTRADA', -5), ('SAIDA', 0)):
+            with self.subTest(tipo=tipo, quantidade=quantidade):
+                with self.assertRaisesMessage(ValueError, 'A quantidade deve ser maior que zero'):
+                    MovimentacaoEstoque(
+                        produto=self.produto, tipo=tipo, quantidade=quantidade,
+                        valor_unitario=Decimal('15.00'), usuario=self.usuario
+                    ).save()
+
+        self.produto.refresh_from_db()
+        self.assertEqual(self.produto.estoque_atual, 10)
+        self.assertFalse(MovimentacaoEstoque.objects.exists())
+
+    def test_view_registra_movimentacao(self):
+        gerente = User.objects.create_superuser('admin', password='senha123')
+        self.client.force_login(gerente)
+
+        resposta = self.client.post(reverse('estoque:registrar_movimentacao'), {
+            'produto': self.produto.pk,
+            'tipo': 'SAIDA',
+            'quantidade': '3',
+            'valor_unitario': '15.10',
+        })
+
+        self.assertRedirects(resposta, reverse('estoque:dashboard'), fetch_redirect_response=False)
+        self.produto.refresh_from_db()
+        self.assertEqual(self.produto.estoque_atual, 7)
+        self.assertEqual(CapitalGiro.obter_capital_atual(), Decimal('45.30'))
+
+
+class MovimentacaoConcorrenteTests(TransactionTestCase):
+    """
+    Benchmark de concorrência das saídas de estoque.
+
+    Vários trabalhadores disputam o mesmo produto; o estoque final deve ser
+    exato (sem venda acima do disponível) para qualquer número de threads.
+    """
+
+    ESTOQUE_INICIAL = 200
+    TENTATIVAS_POR_THREAD = 40
+
+    def executar_saidas(self, threads):
+        usuario = User.objects.create_user(f'carga{threads}', password='senha123')
+        produto = criar_produtos(usuario, 1, prefixo=f'Concorrente {threads}')[0]
+        Produto.objects.filter(pk=produto.pk).update(estoque_atual=self.ESTOQUE_INICIAL)
+        vendas, recusas, erros = [], [], []
+
+        def trabalhador():
+            try:
+                item = Produto.objects.get(pk=produto.pk)
+                for _ in range(self.TENTATIVAS_POR_THREAD):
+                    try:
+                        registrar_movimentacao(item, 'SAIDA', 1, Decimal('15.00'), usuario)
+                        vendas.append(1)
+                    except ValueError:
+                        recusas.append(1)
+            except Exception as erro:  # pragma: no cover - reportado abaixo
+                erros.append(erro)
+            finally:
+                connection.close()
+
+        inicio = time.perf_counter()
+        trabalhadores = [threading.Thread(target=trabalhador) for _ in range(threads)]
+        for trabalhador_thread in trabalhadores:
+            trabalhador_thread.start()
+        for trabalhador_thread in trabalhadores:
+            trabalhador_thread.join()
+        duracao = time.perf_counter() - inicio
+
+        produto.refresh_from_db()
+        return produto, len(vendas), len(recusas), erros, len(vendas) / duracao
+
+    def test_estoque_final_correto_com_trabalhadores_paralelos(self):
+        for threads in (1, 4, 8):
+            with self.subTest(threads=threads):
+                produto, vendas, recusas, erros, vazao = self.executar_saidas(threads)
+                tentativas = threads * self.TENTATIVAS_POR_THREAD
+
+                self.assertEqual(erros, [])
+                self.assertEqual(vendas, min(tentativas, self.ESTOQUE_INICIAL))
+                self.assertEqual(vendas + recusas, tentativas)
+                self.assertEqual(produto.estoque_atual, self.ESTOQUE_INICIAL - vendas)
+                self.assertEqual(
+                    MovimentacaoEstoque.objects.filter(produto=produto).count(), vendas
+                )
+                self.assertGreater(vazao, 0)
+
+
+class ImportacaoMovimentacoesTests(TestCase):
+    """Testes da importação em lote de movimentações."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_superuser('importador', password='senha123')
+
+    def setUp(self):
+        self.produto_a, self.produto_b = criar_produtos(self.usuario, 2)
+        Produto.objects.update(estoque_atual=5)
+        CapitalGiro.adicionar_capital(Decimal('1000.00'), 'Capital inicial', self.usuario)
+
+    def gerar_csv(self, linhas):
+        texto = 'produto,tipo,quantidade,valor_unitario,observacao\n'
+        texto += ''.join(f'{",".join(map(str, linha))}\n' for linha in linhas)
+        return io.StringIO(texto)
+
+    def test_importa_csv_aplicando_variacoes_liquidas(self):
+        arquivo = self.gerar_csv([
+            (self.produto_a.pk, 'SAIDA', 3, '15.00', 'PDV 1'),
+            (self.produto_a.pk, 'ENTRADA', 10, '10.00', 'Reposição'),
+            (self.produto_b.pk, 'saida', 5, '15.00', ''),
+        ])
+
+        resultado = importar_movimentacoes(arquivo, self.usuario)
+
+        self.assertEqual(resultado.importadas, 3)
+        self.assertEqual(resultado.rejeitadas, 0)
+        self.assertEqual(Produto.objects.get(pk=self.produto_a.pk).estoque_atual, 12)
+        self.assertEqual(Produto.objects.get(pk=self.produto_b.pk).estoque_atual, 0)
+        # Vendas (45 + 75) menos compra (100): um único lançamento de +20
+        self.assertEqual(CapitalGiro.objects.count(), 2)
+        self.assertEqual(CapitalGiro.obter_capital_atual(), Decimal('1020.00'))
+
+    def test_rejeita_linhas_invalidas_com_as_regras_do_modelo(self):
+        arquivo = self.gerar_csv([
+            (self.produto_a.pk, 'SAIDA', 4, '15.00', ''),
+            (self.produto_a.pk, 'SAIDA', 2, '15.00', 'sem estoque'),
+            (self.produto_b.pk, 'AJUSTE', 1, '15.00', ''),
+            (self.produto_b.pk, 'SAIDA', 0, '15.00', ''),
+            (999999, 'SAIDA', 1, '15.00', ''),
+            (self.produto_b.pk, 'SAIDA', 'x', '15.00', ''),
+            (99999999999999999999, 'SAIDA', 1, '15.00', ''),
+            (self.produto_b.pk, 'ENTRADA', 99999999999999999999, '15.00', ''),
+        ])
+
+        resultado = importar_movimentacoes(arquivo, self.usuario)
+
+        self.assertEqual(resultado.importadas, 1)
+        self.assertEqual(resultado.rejeitadas, 7)
+        linhas = dict(resultado.erros)
+        self.assertIn('Estoque insuficiente! Disponível: 1', linhas[3])
+        self.assertIn('tipo', linhas[4])
+        self.assertIn('quantidade', linhas[5])
+        self.assertEqual(linhas[6], 'Produto não encontrado')
+        self.assertEqual(linhas[7], 'Valor numérico inválido')
+        self.assertEqual(linhas[8], 'Código de produto inválido')
+        self.assertIn('quantidade', linhas[9])
+        self.assertEqual(Produto.objects.get(pk=self.produto_a.pk).estoque_atual, 1)
+
+    def test_lote_sem_capital_e_desfeito(self):
+        arquivo = self.gerar_csv([
+            (self.produto_a.pk, 'ENTRADA', 200, '10.00', 'Compra grande'),
+        ])
+
+        resultado = importar_movimentacoes(arquivo, self.usuario)
+
+        self.assertEqual(resultado.importadas, 0)
+        self.assertIn('Capital insuficiente', resultado.erros[0][1])
+        self.assertEqual(Produto.objects.get(pk=self.produto_a.pk).estoque_atual, 5)
+        self.assertFalse(MovimentacaoEstoque.objects.exists())
+
+    def test_consultas_por_lote_nao_dependem_do_numero_de_linhas(self):
+        linhas = [(self.produto_a.pk, 'ENTRADA', 1, '1.00', '')] * 300
+        arquivo = self.gerar_csv(linhas)
+
+        with CaptureQueriesContext(connection) as consultas:
+            resultado = importar_movimentacoes(arquivo, self.usuario, tamanho_lote=100)
+
+        self.assertEqual(resultado.importadas, 300)
+        self.assertEqual(resultado.lotes, 3)
+        self.assertEqual(CapitalGiro.objects.count(), 4)
+        self.assertLess(len(consultas), 40)
+
+    def test_importa_json_lines_pelo_comando(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as arquivo:
+            arquivo.write(json.dumps({
+                'produto': self.produto_b.pk, 'tipo': 'SAIDA',
+                'quantidade': 2, 'valor_unitario': '15.00',
+            }) + '\n')
+            arquivo.write('{linha quebrada\n')
+        self.addCleanup(os.remove, arquivo.name)
+        saida, erros = io.StringIO(), io.StringIO()
+
+        call_command('importar_movimentacoes', arquivo.name, stdout=saida, stderr=erros)
+
+        self.assertIn('1 movimentações importadas, 1 rejeitadas', saida.getvalue())
+        self.assertIn('Linha 2: Linha mal formatada', erros.getvalue())
+        self.assertEqual(Produto.objects.get(pk=self.produto_b.pk).estoque_atual, 3)
+
+    def test_view_de_upload(self):
+        self.client.force_login(self.usuario)
+        conteudo = self.gerar_csv([(self.produto_a.pk, 'SAIDA', 1, '15.00', '')]).getvalue()
+
+        resposta = self.client.post(reverse('estoque:importar_movimentacoes'), {
+            'arquivo': SimpleUploadedFile('vendas.csv', conteudo.encode('utf-8-sig')),
+        })
+
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.context['resultado'].importadas, 1)
+        self.assertEqual(Produto.objects.get(pk=self.produto_a.pk).estoque_atual, 4)
+
+
+class IndicadoresEstoqueTests(TestCase):
+    """Testes dos indicadores de estoque calculados pelo banco."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_superuser('painel', password='senha123')
+
+    def test_indicadores_em_uma_consulta(self):
+        produtos = criar_produtos(self.usuario, 3)
+        Produto.objects.filter(pk=produtos[0].pk).update(estoque_atual=2)
+        Produto.objects.filter(pk=produtos[2].pk).update(ativo=False)
+
+        with self.assertNumQueries(1):
+            indicadores = Produto.objects.ativos().indicadores()
+
+        self.assertEqual(indicadores['total_produtos'], 2)
+        self.assertEqual(indicadores['produtos_estoque_baixo'], 1)
+        self.assertEqual(indicadores['valor_estoque_custo'], Decimal('10020.00'))
+        self.assertEqual(indicadores['valor_estoque_venda'], Decimal('15030.00'))
+
+    def test_indicadores_sem_produtos(self):
+        indicadores = Produto.objects.ativos().indicadores()
+
+        self.assertEqual(indicadores['total_produtos'], 0)
+        self.assertEqual(indicadores['valor_estoque_custo'], Decimal('0.00'))
+
+    def test_com_valor_estoque_anota_cada_produto(self):
+        criar_produtos(self.usuario, 1)
+
+        produto = Produto.objects.com_valor_estoque().get()
+
+        self.assertEqual(produto.valor_estoque_custo, produto.valor_total_estoque())
+
+    def test_dashboard_nao_cresce_em_consultas_com_o_catalogo(self):
+        self.client.force_login(self.usuario)
+        consultas = []
+        for quantidade in (5, 100):
+            criar_produtos(self.usuario, quantidade, prefixo=f'Painel {quantidade}')
+            # bulk_create não invalida o cache; medir sempre o cálculo completo
+            cache.clear()
+            with CaptureQueriesContext(connection) as capturadas:
+                resposta = self.client.get(reverse('estoque:dashboard'))
+            self.assertEqual(resposta.status_code, 200)
+            consultas.append(len(capturadas))
+
+        self.assertEqual(consultas[0], consultas[1])
+        self.assertEqual(resposta.context['total_produtos'], 105)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Plano de consulta específico do SQLite')
+class IndicesMovimentacaoTests(TestCase):
+    """Garante que os filtros por produto/tipo/data usam o índice composto."""
+
+    def test_vendas_do_produto_por_periodo_usam_indice(self):
+        plano = MovimentacaoEstoque.objects.filter(
+            produto_id=1,
+            tipo='SAIDA',
+            data_movimentacao__gte=timezone.now() - timedelta(days=30),
+            data_movimentacao__lt=timezone.now()
+        ).explain()
+
+        self.assertIn('mov_produto_tipo_data_idx', plano)
+
+
+class ListaProdutosPaginacaoTests(TestCase):
+    """Testes da paginação por cursor da lista de produtos."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_superuser('catalogo', password='senha123')
+        criar_produtos(cls.usuario, 5)
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+        self.url = reverse('estoque:lista_produtos')
+
+    def test_paginas_em_ordem_alfabetica_com_total(self):
+        primeira = self.client.get(self.url, {'por_pagina': 3})
+        segunda = self.client.get(self.url + primeira.context['pagina'].url_proxima)
+
+        nomes = [p.nome for p in primeira.context['produtos']]
+        nomes += [p.nome for p in segunda.context['produtos']]
+        self.assertEqual(nomes, [f'Produto {i:05d}' for i in range(5)])
+        self.assertEqual(primeira.context['total_produtos'], 5)
+        self.assertContains(primeira, 'Produtos Cadastrados (5)')
+        self.assertIsNone(segunda.context['pagina'].url_proxima)
+
+    def test_link_proxima_preserva_filtros(self):
+        resposta = self.client.get(self.url, {'por_pagina': 1, 'busca': 'Produto'})
+
+        proxima = resposta.context['pagina'].url_proxima
+        self.assertIn('busca=Produto', proxima)
+        self.assertIn('por_pagina=1', proxima)
+
+    @skipUnless(connection.vendor == 'sqlite', 'Plano de consulta específico do SQLite')
+    def test_pagina_seguinte_usa_indice_de_nome(self):
+        primeira = self.client.get(self.url, {'por_pagina': 2})
+
+        with CaptureQueriesContext(connection) as consultas:
+            self.client.get(self.url + primeira.context['pagina'].url_proxima)
+
+        sql = next(
+            consulta['sql'] for consulta in consultas
+            if 'ORDER BY "estoque_produto"."nome"' in consulta['sql']
+        )
+        plano = '\n'.join(
+            linha[-1] for linha in connection.cursor().execute(f'EXPLAIN QUERY PLAN {sql}')
+        )
+        self.assertIn('produto_nome_id_idx', plano)
+
+
+class ExportacaoMovimentacoesTests(TestCase):
+    """Testes da exportação em CSV das movimentações."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_superuser('auditor', password='senha123')
+        cls.produtos = criar_produtos(cls.usuario, 2)
+        criar_vendas(cls.usuario, cls.produtos, lambda indice: indice + 1)
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def test_exporta_movimentacoes_filtradas_por_produto(self):
+        resposta = self.client.get(reverse('estoque:exportar_movimentacoes'), {
+            'produto': self.produtos[1].pk,
+            'tipo': 'SAIDA',
+            'data_inicio': timezone.localdate().isoformat(),
+        })
+
+        self.assertTrue(resposta.streaming)
+        linhas = b''.join(resposta.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual(len(linhas), 2)
+        self.assertTrue(linhas[0].startswith('\ufeffData;Código do Produto;Produto;Tipo'))
+        self.assertIn(';Produto 00001;SAIDA;2;', linhas[1])
+
+    def test_ignora_codigo_de_produto_invalido(self):
+        for produto in ('99999999999999999999', 'x'):
+            with self.subTest(produto=produto):
+                resposta = self.client.get(reverse('estoque:exportar_movimentacoes'), {
+                    'produto': produto,
+                })
+                linhas = b''.join(resposta.streaming_content).decode('utf-8').splitlines()
+                self.assertEqual(len(linhas), 1 + MovimentacaoEstoque.objects.count())
+
+    def test_exige_permissao(self):
+        self.client.force_login(User.objects.create_user('visitante', password='senha123'))
+
+        resposta = self.client.get(reverse('estoque:exportar_movimentacoes'))
+
+        self.assertEqual(resposta.status_code, 403)
+
+
+class CacheDashboardEstoqueTests(TestCase):
+    """Testes da invalidação do cache de indicadores do estoque."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_superuser('almoxarife', password='senha123')
+        CapitalGiro.adicionar_capital(Decimal('1000.00'), 'Aporte', cls.usuario)
+        cls.produto = criar_produtos(cls.usuario, 1)[0]
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.usuario)
+
+    def valor_em_estoque(self):
+        return self.client.get(reverse('estoque:dashboard')).context['valor_total_estoque']
+
+    def test_movimentacao_invalida_estoque_e_financeiro(self):
+        self.assertEqual(self.valor_em_estoque(), Decimal('10000.00'))
+        versao_financeiro = cache_indicadores.obter_versao('financeiro')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            registrar_movimentacao(
+                self.produto, 'SAIDA', 10, Decimal('15.00'), self.usuario
+            )
+
+        self.assertEqual(self.valor_em_estoque(), Decimal('9900.00'))
+        self.assertGreater(cache_indicadores.obter_versao('financeiro'), versao_financeiro)
+
+    def test_importacao_em_lote_invalida_estoque(self):
+        self.valor_em_estoque()
+        arquivo = io.StringIO(
+            'produto,tipo,quantidade,valor_unitario\n'
+            f'{self.produto.pk},SAIDA,100,15.00\n'
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            importar_movimentacoes(arquivo, self.usuario)
+
+        self.assertEqual(self.valor_em_estoque(), Decimal('9000.00'))
+
+
+class BuscaProdutosTests(TestCase):
+    """Testes da busca textual de produtos e movimentações."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_superuser('comprador', password='senha123')
+
+        def criar(nome, descricao='', ativo=True):
+            return Produto.objects.create(
+                nome=nome, descricao=descricao, ativo=ativo,
+                preco_custo=Decimal('5.00'), preco_venda=Decimal('8.00'),
+                estoque_atual=10, usuario_criacao=cls.usuario
+            )
+
+        cls.cafe = criar('Café Torrado Tradicional', 'Pacote 500g')
+        cls.filtro = criar('Filtro de Papel', 'Ideal para café coado')
+        cls.acucar = criar('Açúcar Cristal', 'Pacote 1kg')
+        cls.inativo = criar('Café Solúvel', ativo=False)
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def test_ignora_acentos_e_aceita_prefixo(self):
+        self.assertEqual(busca.buscar_produtos('acucar'), [self.acucar])
+        self.assertEqual(busca.buscar_produtos('torr'), [self.cafe])
+
+    def test_nome_mais_relevante_que_descricao(self):
+        resultados = busca.buscar_produtos('cafe', queryset=Produto.objects.ativos())
+
+        self.assertEqual(resultados, [self.cafe, self.filtro])
+
+    def test_todas_as_palavras_devem_aparecer(self):
+        self.assertEqual(busca.buscar_produtos('cafe pacote'), [self.cafe])
+        # Sintaxe do FTS5 digitada pelo usuário é tratada como texto
+        self.assertEqual(busca.buscar_produtos('caf*"(-'), busca.buscar_produtos('caf'))
+        self.assertEqual(busca.buscar_produtos('   '), [])
+
+    def test_indice_acompanha_alteracoes_e_exclusoes(self):
+        self.acucar.nome = 'Adoçante Líquido'
+        self.acucar.save()
+        self.filtro.delete()
+
+        self.assertEqual(busca.buscar_produtos('acucar'), [])
+        self.assertEqual(busca.buscar_produtos('adocante'), [self.acucar])
+        self.assertEqual(busca.buscar_produtos('coado'), [])
+
+    def test_lista_produtos_usa_a_busca(self):
+        resposta = self.client.get(reverse('estoque:lista_produtos'), {'busca': 'cafe'})
+
+        self.assertEqual(list(resposta.context['produtos']), [self.cafe, self.filtro])
+
+    def test_api_de_busca(self):
+        resposta = self.client.get(reverse('estoque:api_busca_produtos'), {'q': 'caf'})
+
+        self.assertEqual(
+            [produto['id'] for produto in resposta.json()['resultados']],
+            [self.cafe.pk, self.filtro.pk]
+        )
+        self.assertEqual(resposta.json()['resultados'][0]['preco_venda'], '8.00')
+
+        resposta = self.client.get(
+            reverse('estoque:api_busca_produtos'), {'q': 'caf', 'inativos': 'true', 'limite': 'x'}
+        )
+        self.assertEqual(resposta.status_code, 400)
+
+    def test_admin_busca_produtos_e_movimentacoes(self):
+        MovimentacaoEstoque.objects.bulk_create([
+            MovimentacaoEstoque(
+                produto=self.acucar, tipo='SAIDA', quantidade=1,
+                valor_unitario=Decimal('8.00'), usuario=self.usuario,
+                observacao='Pedido do balcão'
+            ),
+            MovimentacaoEstoque(
+                produto=self.cafe, tipo='SAIDA', quantidade=1,
+                valor_unitario=Decimal('8.00'), usuario=self.usuario
+            ),
+        ])
+
+        produtos = self.client.get(reverse('admin:estoque_produto_changelist'), {'q': 'cafe'})
+        movimentacoes = self.client.get(
+            reverse('admin:estoque_movimentacaoestoque_changelist'), {'q': 'balcao'}
+        )
+        por_produto = self.client.get(
+            reverse('admin:estoque_movimentacaoestoque_changelist'), {'q': 'torrado'}
+        )
+
+        self.assertEqual(
+            set(produtos.context['cl'].result_list),
+            {self.cafe, self.filtro, self.inativo}
+        )
+        self.assertEqual(
+            [m.produto for m in movimentacoes.context['cl'].result_list], [self.acucar]
+        )
+        self.assertEqual(
+            [m.produto for m in por_produto.context['cl'].result_list], [self.cafe]
+        )
+
+    @skipUnless(connection.vendor == 'sqlite', 'Índice FTS5 específico do SQLite')
+    def test_triggers_recriados_apos_migrate(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER estoque_produto_fts_ai')
+
+        busca.garantir_triggers(connection)
+        novo = Produto.objects.create(
+            nome='Chá Mate', preco_custo=Decimal('1.00'), preco_venda=Decimal('2.00'),
+            usuario_criacao=self.usuario
+        )
+
+        self.assertEqual(busca.buscar_produtos('cha'), [novo])
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Índices de trigramas específicos do PostgreSQL')
+class BuscaIndicesPostgresTests(TransactionTestCase):
+    """A busca no PostgreSQL usa os índices de trigramas sem acentos."""
+
+    def test_planos_usam_os_indices(self):
+        usuario = User.objects.create_user('planos', password='senha123')
+        criar_vendas(usuario, criar_produtos(usuario, 5000), lambda indice: 1)
+        # As estatísticas dos índices GIN só são atualizadas pelo VACUUM
+        # (fora de transação, por isso TransactionTestCase)
+        with connection.cursor() as cursor:
+            cursor.execute('VACUUM ANALYZE estoque_produto, estoque_movimentacaoestoque')
+
+        plano_produtos = busca.filtrar_produtos(Produto.objects.all(), 'acucar').explain()
+        plano_movimentacoes = busca.filtrar_movimentacoes(
+            MovimentacaoEstoque.objects.all(), 'acucar'
+        ).explain()
+
+        self.assertIn('produto_nome_trgm_idx', plano_produtos)
+        self.assertIn('produto_descricao_trgm_idx', plano_produtos)
+        self.assertIn('movimentacao_observacao_trgm_idx', plano_movimentacoes)
+        self.assertIn('produto_nome_trgm_idx', plano_movimentacoes)
+
+
+class AutocompletarProdutosTests(TestCase):
+    """Testes do autocompletar de produtos do formulário de movimentação."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_superuser('estoquista', password='senha123')
+        cls.produtos = criar_produtos(cls.usuario, 25, prefixo='Parafuso')
+        cls.porca = Produto.objects.create(
+            nome='Porca Sextavada', preco_custo=Decimal('0.10'), preco_venda=Decimal('0.25'),
+            estoque_atual=7, usuario_criacao=cls.usuario
+        )
+        Produto.objects.filter(pk=cls.produtos[0].pk).update(ativo=False)
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+        self.url = reverse('estoque:api_autocompletar_produtos')
+
+    def test_prefixo_do_nome_com_estoque_e_precos(self):
+        resposta = self.client.get(self.url, {'q': 'porc sext'})
+
+        self.assertEqual(resposta.json()['resultados'], [{
+            'id': self.porca.pk,
+            'nome': 'Porca Sextavada',
+            'estoque_atual': 7,
+            'preco_custo': '0.10',
+            'preco_venda': '0.25',
+        }])
+        self.assertFalse(resposta.json()['tem_mais'])
+
+    def test_paginas_sem_repeticao_e_sem_inativos(self):
+        ids = []
+        pagina = 1
+        while True:
+            dados = self.client.get(self.url, {'q': 'paraf', 'pagina': pagina}).json()
+            ids += [item['id'] for item in dados['resultados']]
+            if not dados['tem_mais']:
+                break
+            pagina += 1
+
+        self.assertEqual(pagina, 3)
+        self.assertEqual(sorted(ids), sorted(p.pk for p in self.produtos[1:]))
+
+    def test_codigo_do_produto_aparece_primeiro(self):
+        codigo = str(self.porca.pk)
+        Produto.objects.filter(pk=self.produtos[1].pk).update(nome=f'Parafuso {codigo}')
+
+        dados = self.client.get(self.url, {'q': codigo, 'limite': 1}).json()
+        seguinte = self.client.get(self.url, {'q': codigo, 'limite': 1, 'pagina': 2}).json()
+
+        self.assertEqual(dados['resultados'][0]['id'], self.porca.pk)
+        self.assertTrue(dados['tem_mais'])
+        self.assertEqual(seguinte['resultados'][0]['id'], self.produtos[1].pk)
+
+    def test_codigo_fora_do_intervalo(self):
+        # Acima de 64 bits o banco recusaria o parâmetro: busca só pelo nome
+        for termo in ('99999999999999999999', str(Produto.MAIOR_CODIGO + 1), '²'):
+            with self.subTest(termo=termo):
+                resposta = self.client.get(self.url, {'q': termo})
+                self.assertEqual(resposta.status_code, 200)
+                self.assertEqual(resposta.json()['resultados'], [])
+
+    def test_parametros_invalidos(self):
+        self.assertEqual(self.client.get(self.url, {'q': 'a', 'pagina': 'x'}).status_code, 400)
+
+    def test_formulario_nao_lista_o_catalogo(self):
+        # Carrega o perfil de acesso no cache antes de medir
+        self.client.get(reverse('index'))
+        consultas = []
+        for quantidade in (0, 200):
+            criar_produtos(self.usuario, quantidade, prefixo=f'Catalogo {quantidade}')
+            with CaptureQueriesContext(connection) as capturadas:
+                resposta = self.client.get(reverse('estoque:registrar_movimentacao'))
+            consultas.append(len(capturadas))
+
+        self.assertEqual(consultas[0], consultas[1])
+        self.assertNotContains(resposta, 'Parafuso')
+        self.assertContains(resposta, self.url)
+
+
+
+class DadosSinteticosTests(TestCase):
+    """Testes do comando gerar_dados_sinteticos."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_superuser('gerador', password='senha123')
+
+    def gerar(self, **opcoes):
+        opcoes = {
+            'produtos': 30, 'dias': 45, 'vendas_por_dia': 60,
+            'data_final': '2025-06-30', 'stdout': io.StringIO(), **opcoes
+        }
+        call_command('gerar_dados_sinteticos', **opcoes)
+
+    def test_historico_coerente(self):
+        self.gerar()
+
+        self.assertEqual(Produto.objects.count(), 30)
+        # estoque atual = entradas - saídas, nunca negativo
+        for produto in Produto.objects.all():
+            saldo = sum(m.calcular_variacao_estoque() for m in produto.movimentacoes.all())
+            self.assertEqual(produto.estoque_atual, saldo)
+            self.assertGreaterEqual(produto.estoque_atual, 0)
+
+        # receita diária = vendas do dia; datas do histórico preservadas
+        primeira = MovimentacaoEstoque.objects.order_by('data_movimentacao').first()
+        self.assertEqual(timezone.localtime(primeira.data_movimentacao).date().isoformat(), '2025-05-17')
+        dia = timezone.localtime(primeira.data_movimentacao).date()
+        vendas = sum(
+            m.calcular_valor_total() for m in MovimentacaoEstoque.objects.filter(tipo='SAIDA')
+            if timezone.localtime(m.data_movimentacao).date() == dia
+        )
+        self.assertEqual(Receita.objects.get(data=dia).valor, vendas)
+
+        self.assertEqual(CapitalGiro.verificar_cadeia(), [])
+        self.assertEqual(IndicadorFinanceiro.objects.count(), 2)
+
+    def test_mesma_semente_gera_os_mesmos_dados(self):
+        def retrato():
+            return list(MovimentacaoEstoque.objects.order_by('id').values_list(
+                'produto__nome', 'tipo', 'quantidade', 'valor_unitario', 'data_movimentacao'
+            ))
+
+        self.gerar(semente=7)
+        primeiro = retrato()
+        MovimentacaoEstoque.objects.all().delete()
+        Produto.objects.all().delete()
+
+        self.gerar(semente=7)
+
+        self.assertEqual(retrato(), primeiro)
+
+    def test_parametros_invalidos(self):
+        with self.assertRaises(CommandError):
+            self.gerar(produtos=0)
+        with self.assertRaises(CommandError):
+            self.gerar(data_final='30/06/2025')
+
+
+
+
+class SnapshotsEstoqueTests(TestCase):
+    """Testes dos snapshots diários e da posição de estoque em uma data."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_superuser('estoquista', password='senha123')
+        cls.hoje = timezone.localdate()
+        cls.produto_a = cls.criar_produto('Caneta', cls.hoje - timedelta(days=10))
+        cls.produto_b = cls.criar_produto('Lápis', cls.hoje - timedelta(days=10))
+        cls.mover(cls.produto_a, 'ENTRADA', 100, cls.hoje - timedelta(days=8))
+        cls.mover(cls.produto_a, 'SAIDA', 30, cls.hoje - timedelta(days=5))
+        cls.mover(cls.produto_a, 'SAIDA', 10, cls.hoje)
+        cls.mover(cls.produto_b, 'ENTRADA', 50, cls.hoje - timedelta(days=8))
+        # Estoque inicial sem movimentação
+        cls.produto_c = cls.criar_produto('Borracha', cls.hoje - timedelta(days=2), estoque=7)
+
+    @classmethod
+    def criar_produto(cls, nome, dia, estoque=0):
+        produto = Produto.objects.create(
+            nome=nome,
+            preco_custo=Decimal('10.00'),
+            preco_venda=Decimal('15.00'),
+            estoque_atual=estoque,
+            usuario_criacao=cls.usuario,
+        )
+        momento = snapshots.inicio_do_dia(dia) + timedelta(hours=9)
+        Produto.objects.filter(pk=produto.pk).update(data_criacao=momento, data_modificacao=momento)
+        return produto
+
+    @classmethod
+    def mover(cls, produto, tipo, quantidade, dia):
+        movimentacao = MovimentacaoEstoque(
+            produto=produto, tipo=tipo, quantidade=quantidade,
+            valor_unitario=Decimal('10.00'), usuario=cls.usuario
+        )
+        movimentacao.save()
+        if dia != cls.hoje:
+            MovimentacaoEstoque.objects.filter(pk=movimentacao.pk).update(
+                data_movimentacao=snapshots.inicio_do_dia(dia) + timedelta(hours=12)
+            )
+
+    def quantidades(self, dias_atras):
+        posicao = snapshots.posicao_em(self.hoje - timedelta(days=dias_atras))
+        return {item['nome']: item['quantidade'] for item in posicao.itens}
+
+    def test_posicao_sem_snapshots(self):
+        self.assertEqual(self.quantidades(6), {'Caneta': 100, 'Lápis': 50})
+        self.assertEqual(self.quantidades(0), {'Caneta': 60, 'Lápis': 50, 'Borracha': 7})
+
+    def test_snapshots_apenas_dos_produtos_alterados(self):
+        resultado = snapshots.gerar_snapshots(desde=self.hoje - timedelta(days=9))
+
+        self.assertEqual(resultado.dias, 9)
+        gravados = {
+            (snapshot.produto.nome, (self.hoje - snapshot.dia).days): snapshot.quantidade
+            for snapshot in EstoqueSnapshot.objects.select_related('produto')
+        }
+        # Base completa no primeiro dia; depois só quem mudou
+        self.assertEqual(gravados, {
+            ('Caneta', 9): 0, ('Lápis', 9): 0,
+            ('Caneta', 8): 100, ('Lápis', 8): 50,
+            ('Caneta', 5): 70,
+            ('Borracha', 2): 7,
+        })
+        self.assertEqual(resultado.snapshots, 6)
+        self.assertEqual(
+            EstoqueSnapshot.objects.get(produto=self.produto_a, dia=self.hoje - timedelta(days=8)).entradas,
+            100
+        )
+
+        # Ontem não houve mudanças: a nova execução não grava nada
+        self.assertEqual(snapshots.gerar_snapshots().snapshots, 0)
+        # Regerar substitui os snapshots existentes
+        snapshots.gerar_snapshots(desde=self.hoje - timedelta(days=9))
+        self.assertEqual(EstoqueSnapshot.objects.count(), 6)
+
+    def test_posicao_pelos_snapshots(self):
+        snapshots.gerar_snapshots(desde=self.hoje - timedelta(days=9))
+
+        with CaptureQueriesContext(connection) as consultas:
+            posicao = snapshots.posicao_em(self.hoje)
+        # Limites, verificação do arquivo, produtos com o último snapshot e
+        # movimentações de hoje
+        self.assertEqual(len(consultas), 4)
+        self.assertEqual(
+            {item['nome']: item['quantidade'] for item in posicao.itens},
+            {'Caneta': 60, 'Lápis': 50, 'Borracha': 7}
+        )
+        self.assertEqual(posicao.valor_estoque_custo, Decimal('1170.00'))
+        self.assertEqual(posicao.valor_estoque_venda, Decimal('1755.00'))
+
+        self.assertEqual(self.quantidades(6), {'Caneta': 100, 'Lápis': 50})
+        self.assertEqual(self.quantidades(2), {'Caneta': 70, 'Lápis': 50, 'Borracha': 7})
+        # Antes do primeiro snapshot e antes de os produtos existirem
+        self.assertEqual(self.quantidades(10), {'Caneta': 0, 'Lápis': 0})
+        self.assertEqual(self.quantidades(11), {})
+        self.assertEqual(snapshots.estoque_em(self.produto_a, self.hoje - timedelta(days=1)), 70)
+
+    def test_produto_criado_depois_do_ultimo_snapshot(self):
+        snapshots.gerar_snapshots(desde=self.hoje - timedelta(days=9))
+        novo = self.criar_produto('Régua', self.hoje, estoque=4)
+        self.mover(novo, 'SAIDA', 1, self.hoje)
+
+        self.assertEqual(self.quantidades(0)['Régua'], 3)
+        self.assertEqual(snapshots.estoque_em(novo, self.hoje - timedelta(days=1)), 0)
+
+    def test_intervalos_invalidos(self):
+        with self.assertRaises(ValueError):
+            snapshots.gerar_snapshots(ate=self.hoje)
+        snapshots.gerar_snapshots(ate=self.hoje - timedelta(days=5))
+        with self.assertRaisesMessage(ValueError, 'ficariam sem snapshots'):
+            snapshots.gerar_snapshots(desde=self.hoje - timedelta(days=2))
+        with self.assertRaises(ValueError):
+            snapshots.posicao_em(self.hoje + timedelta(days=1))
+
+    def test_comando_e_api(self):
+        saida = io.StringIO()
+        call_command('gerar_snapshots_estoque', desde=(self.hoje - timedelta(days=9)).isoformat(), stdout=saida)
+        self.assertIn('6 snapshots gravados para 9 dias', saida.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('gerar_snapshots_estoque', desde='31/03/2026', stdout=saida)
+
+        self.client.force_login(self.usuario)
+        url = reverse('estoque:api_posicao_estoque')
+        resposta = self.client.get(url, {'data': (self.hoje - timedelta(days=6)).isoformat()})
+        self.assertEqual(resposta.status_code, 200)
+        dados = resposta.json()
+        self.assertEqual(dados['quantidade_total'], 150)
+        self.assertEqual(dados['valor_estoque_custo'], '1500.00')
+        self.assertEqual(len(dados['produtos']), 2)
+
+        resposta = self.client.get(url, {'produto': self.produto_a.pk, 'itens': 'false'})
+        self.assertEqual(resposta.json()['quantidade_total'], 60)
+        self.assertNotIn('produtos', resposta.json())
+
+        for parametros in ({'data': 'ontem'}, {'produto': 'x'}, {'produto': '99999999999999999999'},
+                           {'data': (self.hoje + timedelta(days=1)).isoformat()}):
+            with self.subTest(parametros=parametros):
+                self.assertEqual(self.client.get(url, parametros).status_code, 400)
+
+
+class ReconciliacaoEstoqueTests(TestCase):
+    """Testes da reconciliação do estoque com as movimentações."""
+
+    def setUp(self):
+        self.usuario = User.objects.create_superuser('conferente', password='senha123')
+        self.caneta = self.criar_produto('Caneta', entradas=[100], saidas=[30])
+        self.lapis = self.criar_produto('Lápis', entradas=[50])
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        self.pasta = pasta.name
+
+    def criar_produto(self, nome, entradas=(), saidas=()):
+        produto = Produto.objects.create(
+            nome=nome,
+            preco_custo=Decimal('10.00'),
+            preco_venda=Decimal('15.00'),
+            estoque_atual=0,
+            usuario_criacao=self.usuario,
+        )
+        for tipo, quantidades in (('ENTRADA', entradas), ('SAIDA', saidas)):
+            for quantidade in quantidades:
+                self.mover(produto, tipo, quantidade)
+        return produto
+
+    def mover(self, produto, tipo, quantidade):
+        movimentacao = MovimentacaoEstoque(
+            produto=produto, tipo=tipo, quantidade=quantidade,
+            valor_unitario=Decimal('10.00'), usuario=self.usuario
+        )
+        movimentacao.save()
+        return movimentacao
+
+    def reconciliar(self, **kwargs):
+        caminho = os.path.join(self.pasta, f'{ReconciliacaoEstoque.objects.count()}.csv')
+        return reconciliacao.reconciliar(relatorio=caminho, **kwargs)
+
+    def envelhecer(self):
+        """Desloca tudo um dia para trás, como se a última execução fosse de ontem."""
+        ontem = timezone.now() - timedelta(days=1)
+        ReconciliacaoEstoque.objects.update(iniciada_em=ontem, concluida_em=ontem)
+        Produto.objects.update(data_modificacao=ontem - timedelta(hours=1))
+        MovimentacaoEstoque.objects.update(data_movimentacao=ontem - timedelta(hours=1))
+
+    def ler_relatorio(self, caminho):
+        with open(caminho, encoding='utf-8') as arquivo:
+            return list(csv.reader(arquivo))
+
+    def test_primeira_execucao_completa(self):
+        Produto.objects.filter(pk=self.lapis.pk).update(estoque_atual=47)
+
+        registro, encontradas = self.reconciliar()
+
+        self.assertTrue(registro.completa)
+        self.assertEqual(registro.produtos_verificados, 2)
+        self.assertEqual(registro.divergencias, 1)
+        self.assertEqual(encontradas, [(self.lapis.pk, 'Lápis', 47, 50)])
+        self.assertEqual(self.ler_relatorio(registro.relatorio), [
+            reconciliacao.COLUNAS_RELATORIO,
+            [str(self.lapis.pk), 'Lápis', '47', '50', '-3'],
+        ])
+
+    def test_estoque_inicial_sem_movimentacao(self):
+        borracha = self.criar_produto('Borracha')
+        Produto.objects.filter(pk=borracha.pk).update(estoque_atual=7)
+
+        _, encontradas = self.reconciliar()
+
+        self.assertEqual(encontradas, [(borracha.pk, 'Borracha', 7, 0)])
+
+    def test_incremental_confere_apenas_alterados(self):
+        self.reconciliar()
+        self.envelhecer()
+        self.mover(self.caneta, 'SAIDA', 5)
+        # Alteração direta sem passar pelo save: não é vista pela incremental
+        Produto.objects.filter(pk=self.lapis.pk).update(estoque_atual=49)
+
+        registro, encontradas = self.reconciliar()
+
+        self.assertFalse(registro.completa)
+        self.assertEqual(registro.produtos_verificados, 1)
+        self.assertEqual(encontradas, [])
+
+        registro, encontradas = self.reconciliar(completa=True)
+        self.assertEqual(registro.produtos_verificados, 2)
+        self.assertEqual(encontradas, [(self.lapis.pk, 'Lápis', 49, 50)])
+
+    def test_incremental_detecta_alteracao_no_cadastro(self):
+        self.reconciliar()
+        self.envelhecer()
+        self.lapis.refresh_from_db()
+        self.lapis.estoque_atual = 60
+        self.lapis.save()
+
+        registro, encontradas = self.reconciliar()
+
+        self.assertEqual(registro.produtos_verificados, 1)
+        self.assertEqual(encontradas, [(self.lapis.pk, 'Lápis', 60, 50)])
+
+    def test_incremental_detecta_movimentacao_excluida(self):
+        saida = self.mover(self.lapis, 'SAIDA', 10)
+        self.reconciliar()
+        self.envelhecer()
+        saida.delete()
+
+        registro, encontradas = self.reconciliar()
+
+        self.assertEqual(registro.produtos_verificados, 1)
+        self.assertEqual(encontradas, [(self.lapis.pk, 'Lápis', 40, 50)])
+
+    def test_margem_para_transacoes_em_andamento(self):
+        self.reconciliar()
+        self.envelhecer()
+        # Gravada por uma transação aberta pouco antes da última execução
+        movimentacao = self.mover(self.caneta, 'SAIDA', 5)
+        anterior = ReconciliacaoEstoque.objects.get()
+        MovimentacaoEstoque.objects.filter(pk=movimentacao.pk).update(
+            data_movimentacao=anterior.iniciada_em - timedelta(minutes=1)
+        )
+
+        registro, _ = self.reconciliar()
+
+        self.assertEqual(registro.produtos_verificados, 1)
+
+    def test_comando(self):
+        Produto.objects.filter(pk=self.caneta.pk).update(estoque_atual=0)
+        caminho = os.path.join(self.pasta, 'divergencias.csv')
+        saida = io.StringIO()
+
+        call_command('reconciliar_estoque', relatorio=caminho, processos=1, stdout=saida)
+
+        self.assertIn('2 produtos conferidos', saida.getvalue())
+        self.assertIn('1 divergências', saida.getvalue())
+        self.assertEqual(len(self.ler_relatorio(caminho)), 2)
+
+        self.caneta.refresh_from_db()
+        self.caneta.estoque_atual = 70
+        self.caneta.save()
+        saida = io.StringIO()
+        call_command('reconciliar_estoque', relatorio=caminho, stdout=saida)
+        self.assertIn('incremental', saida.getvalue())
+        self.assertIn('nenhuma divergência', saida.getvalue())
+
+    def test_comando_processos_invalido(self):
+        with self.assertRaises(CommandError):
+            call_command('reconciliar_estoque', processos=0)
+
+
+class ReconciliacaoParalelaTests(TransactionTestCase):
+    """A execução completa em vários processos encontra as mesmas divergências."""
+
+    def test_processos(self):
+        usuario = User.objects.create_user('paralelo', password='senha123')
+        produtos = criar_produtos(usuario, 30)
+        divergentes = sorted(produto.pk for produto in produtos[::7])
+        Produto.objects.exclude(pk__in=divergentes).update(estoque_atual=0)
+
+        tamanho = reconciliacao.PRODUTOS_POR_TAREFA
+        reconciliacao.PRODUTOS_POR_TAREFA = 8
+        self.addCleanup(setattr, reconciliacao, 'PRODUTOS_POR_TAREFA', tamanho)
+
+        with tempfile.TemporaryDirectory() as pasta:
+            registro, encontradas = reconciliacao.reconciliar(
+                completa=True, processos=2, relatorio=os.path.join(pasta, 'paralela.csv')
+            )
+
+        self.assertEqual(registro.produtos_verificados, 30)
+        self.assertEqual([linha[0] for linha in encontradas], divergentes)
+        self.assertEqual(registro.divergencias, len(divergentes))
+
+
+class ArquivamentoHistoricoTests(TestCase):
+    """Testes do arquivamento das movimentações de meses encerrados."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_superuser('arquivista', password='senha123')
+        cls.antigo = arquivamento.inicio_do_mes(
+            adicionar_meses(timezone.localdate(), -3)
+        ) + timedelta(days=2, hours=12)
+        CapitalGiro.adicionar_capital(Decimal('2000.00'), 'Aporte', cls.usuario)
+        cls.caneta = Produto.objects.create(
+            nome='Caneta', preco_custo=Decimal('10.00'), preco_venda=Decimal('15.00'),
+            estoque_atual=0, usuario_criacao=cls.usuario,
+        )
+        antigas = [
+            registrar_movimentacao(cls.caneta, 'ENTRADA', 100, Decimal('10.00'), cls.usuario),
+            registrar_movimentacao(cls.caneta, 'SAIDA', 30, Decimal('15.00'), cls.usuario),
+        ]
+        registrar_movimentacao(cls.caneta, 'SAIDA', 10, Decimal('15.00'), cls.usuario)
+
+        # As duas primeiras movimentações (e seus lançamentos) ficam no mês antigo
+        MovimentacaoEstoque.objects.filter(pk__in=[m.pk for m in antigas]).update(
+            data_movimentacao=cls.antigo
+        )
+        ultimo_capital = CapitalGiro.objects.order_by('-id')[0].pk
+        CapitalGiro.objects.exclude(pk=ultimo_capital).update(data_movimentacao=cls.antigo)
+        Produto.objects.filter(pk=cls.caneta.pk).update(data_criacao=cls.antigo - timedelta(days=1))
+        SaldoDiario.reconstruir()
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def historico(self, modelo):
+        return list(modelo.objects.order_by('id').values_list('id', 'data_movimentacao'))
+
+    def test_arquivar_e_restaurar(self):
+        movimentacoes = self.historico(MovimentacaoEstoque)
+        lancamentos = self.historico(CapitalGiro)
+        saldo_antigo = CapitalGiro.saldo_em(self.antigo)
+
+        resultado = arquivamento.arquivar(adicionar_meses(timezone.localdate(), -1))
+
+        self.assertEqual(resultado.movimentacoes, 2)
+        self.assertEqual(resultado.lancamentos_capital, 3)
+        self.assertEqual(resultado.meses, [arquivamento.mes_local(self.antigo)])
+        self.assertEqual(MovimentacaoEstoque.objects.count(), 1)
+        self.assertEqual(self.historico(MovimentacaoEstoqueArquivo), movimentacoes[:2])
+        self.assertEqual(
+            set(ResumoMovimentacaoArquivada.objects.values_list('tipo', 'quantidade', 'valor_total', 'movimentacoes')),
+            {('ENTRADA', 100, Decimal('1000.00'), 1), ('SAIDA', 30, Decimal('450.00'), 1)}
+        )
+        self.caneta.refresh_from_db()
+        self.assertEqual(self.caneta.estoque_atual, 60)
+        self.assertEqual(reconciliacao.divergencias(Produto.objects.all()), [])
+        self.assertEqual(CapitalGiro.verificar_cadeia(), [])
+        self.assertEqual(CapitalGiro.saldo_em(self.antigo), saldo_antigo)
+        self.assertEqual(arquivamento.meses_arquivados(), resultado.meses)
+
+        # Um lote por linha: mesmo resultado, em várias transações
+        restaurado = arquivamento.restaurar(self.antigo.date(), tamanho_lote=1)
+
+        self.assertEqual(restaurado.movimentacoes, 2)
+        self.assertEqual(restaurado.lancamentos_capital, 3)
+        self.assertEqual(self.historico(MovimentacaoEstoque), movimentacoes)
+        self.assertEqual(self.historico(CapitalGiro), lancamentos)
+        self.assertFalse(MovimentacaoEstoqueArquivo.objects.exists())
+        self.assertFalse(ResumoMovimentacaoArquivada.objects.exists())
+        self.assertEqual(arquivamento.meses_arquivados(), [])
+
+    def test_leituras_incluem_arquivo(self):
+        snapshots.gerar_snapshots(desde=self.antigo.date() + timedelta(days=1))
+        estoque_antigo = snapshots.estoque_em(self.caneta, self.antigo.date())
+        self.assertEqual(estoque_antigo, 70)
+
+        arquivamento.arquivar(adicionar_meses(timezone.localdate(), -1))
+
+        ranking = ranking_vendas()
+        self.assertEqual(ranking['quantidade_total'], 40)
+        self.assertEqual(ranking['receita_total'], Decimal('600.00'))
+        self.assertEqual(ranking['mais_vendidos'][0].quantidade, 40)
+        self.assertEqual(ranking_vendas(data_inicio=timezone.now() - timedelta(days=1))['quantidade_total'], 10)
+
+        # Antes do primeiro snapshot: calculado de trás para frente
+        self.assertEqual(snapshots.estoque_em(self.caneta, self.antigo.date()), estoque_antigo)
+        self.assertEqual(snapshots.estoque_em(self.caneta, self.antigo.date() - timedelta(days=1)), 0)
+        self.assertEqual(snapshots.estoque_em(self.caneta, timezone.localdate()), 60)
+
+        resposta = self.client.get(reverse('estoque:exportar_movimentacoes'))
+        linhas = b''.join(resposta.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual(len(linhas), 4)
+        # Mesma data nas duas primeiras: ordem pelo id
+        self.assertIn(';ENTRADA;100;', linhas[1])
+        self.assertIn(';SAIDA;30;', linhas[2])
+        self.assertEqual(len(linhas[1].split(';')), 8)
+
+    def test_rejeita_mes_corrente(self):
+        with self.assertRaises(ValueError):
+            arquivamento.arquivar(timezone.localdate())
+        with self.assertRaises(CommandError):
+            call_command('arquivar_historico', ate=timezone.localdate().strftime('%Y-%m'))
+        with self.assertRaises(CommandError):
+            call_command('arquivar_historico', ate='2025-13')
+        with self.assertRaises(CommandError):
+            call_command('restaurar_historico', mes='2025-06', lote=0)
+
+    def test_comandos(self):
+        mes_antigo = self.antigo.strftime('%Y-%m')
+        saida = io.StringIO()
+
+        call_command('arquivar_historico', ate=mes_antigo, stdout=saida)
+        self.assertIn('2 movimentações de estoque e 3 de capital arquivadas', saida.getvalue())
+
+        call_command('restaurar_historico', mes='2020-01', stdout=saida)
+        self.assertIn(f'Meses arquivados: {self.antigo:%m/%Y}', saida.getvalue())
+
+        call_command('restaurar_historico', mes=mes_antigo, stdout=saida)
+        self.assertIn('2 movimentações de estoque e 3 de capital restauradas', saida.getvalue())
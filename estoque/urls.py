@@ -24,7 +24,14 @@ urlpatterns = [
     
     # Movimentações de estoque
     path('movimentacao/', views.registrar_movimentacao, name='registrar_movimentacao'),
+    path('movimentacao/importar/', views.importar_movimentacoes, name='importar_movimentacoes'),
+    path('movimentacao/exportar/', views.exportar_movimentacoes, name='exportar_movimentacoes'),
     
     # Relatórios
     path('relatorio/', views.relatorio_estoque, name='relatorio'),
+    path('api/posicao/', views.api_posicao_estoque, name='api_posicao_estoque'),
+    
+    # APIs de busca
+    path('api/produtos/busca/', views.api_busca_produtos, name='api_busca_produtos'),
+    path('api/produtos/autocompletar/', views.api_autocompletar_produtos, name='api_autocompletar_produtos'),
 ]
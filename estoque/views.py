@@ -8,18 +8,27 @@ Autor: Manus AI
 Data: 2025-12-02
 """
 
+import asyncio
+import io
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, permission_required
 from django.contrib import messages
 from django.db.models import Sum, Q
 from django.http import JsonResponse
-from datetime import datetime, timedelta
-from .models import Produto, MovimentacaoEstoque
-from financeiro.models import CapitalGiro
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from django.utils import timezone
+from gestao_erp import assincrono, cache
+from gestao_erp.exportacao import exportar_csv
+from gestao_erp.paginacao import paginar
+from gestao_erp.roteadores import usar_replica
+from .models import Produto, MovimentacaoEstoque, MovimentacaoEstoqueArquivo
+from . import busca, importacao, services, snapshots
 
 
 @login_required
-def dashboard_estoque(request):
+async def dashboard_estoque(request):
     """
     View principal do dashboard de estoque.
     
@@ -27,7 +36,11 @@ def dashboard_estoque(request):
     - Total de produtos cadastrados
     - Produtos com estoque baixo
     - Movimentações recentes
-    - Valor total do estoque
+    - Valor total do estoque (a custo e a preço de venda)
+    
+    View assíncrona: as consultas independentes (indicadores, movimentações
+    recentes e alertas) são executadas em paralelo (ver
+    gestao_erp/assincrono.py).
     
     Args:
         request: Objeto HttpRequest do Django
@@ -36,40 +49,54 @@ def dashboard_estoque(request):
         HttpResponse: Renderiza o template do dashboard
     """
     # Obter todos os produtos ativos
-    produtos = Produto.objects.filter(ativo=True)
-    
-    # Calcular estatísticas
-    total_produtos = produtos.count()
-    produtos_estoque_baixo = produtos.filter(
-        estoque_atual__lt=models.F('estoque_minimo')
-    ).count()
-    
-    # Calcular valor total do estoque
-    valor_total_estoque = sum(
-        produto.valor_total_estoque() for produto in produtos
-    )
+    produtos = Produto.objects.ativos()
     
     # Obter movimentações recentes (últimos 7 dias)
-    data_limite = datetime.now() - timedelta(days=7)
-    movimentacoes_recentes = MovimentacaoEstoque.objects.filter(
+    data_limite = timezone.now() - timedelta(days=7)
+    movimentacoes_periodo = MovimentacaoEstoque.objects.filter(
         data_movimentacao__gte=data_limite
-    ).select_related('produto', 'usuario')[:10]
+    )
     
-    # Produtos com estoque baixo
-    produtos_alerta = produtos.filter(
-        estoque_atual__lt=models.F('estoque_minimo')
-    ).order_by('estoque_atual')[:5]
+    async def calcular_indicadores():
+        # Estatísticas e valor do estoque em uma única consulta agregada,
+        # em paralelo com a contagem de movimentações do período
+        dados = await assincrono.em_paralelo(
+            indicadores=produtos.indicadores,
+            total_movimentacoes_recentes=movimentacoes_periodo.count,
+        )
+        indicadores = dados['indicadores']
+        indicadores['total_movimentacoes_recentes'] = dados['total_movimentacoes_recentes']
+        return indicadores
+    
+    # Indicadores do dia em cache (invalidados a cada movimentação/produto)
+    # e listas do dashboard, ao mesmo tempo
+    indicadores, listas = await asyncio.gather(
+        cache.aobter_ou_calcular(
+            'estoque', f'dashboard:{timezone.localdate()}', calcular_indicadores
+        ),
+        assincrono.em_paralelo(
+            movimentacoes_recentes=lambda: list(
+                movimentacoes_periodo.select_related('produto', 'usuario')[:10]
+            ),
+            # Produtos com estoque baixo
+            produtos_alerta=lambda: list(
+                produtos.com_estoque_baixo().order_by('estoque_atual')[:5]
+            ),
+        ),
+    )
     
     # Preparar contexto para o template
     context = {
-        'total_produtos': total_produtos,
-        'produtos_estoque_baixo': produtos_estoque_baixo,
-        'valor_total_estoque': valor_total_estoque,
-        'movimentacoes_recentes': movimentacoes_recentes,
-        'produtos_alerta': produtos_alerta,
+        'total_produtos': indicadores['total_produtos'],
+        'produtos_estoque_baixo': indicadores['produtos_estoque_baixo'],
+        'valor_total_estoque': indicadores['valor_estoque_custo'],
+        'valor_total_estoque_venda': indicadores['valor_estoque_venda'],
+        'total_movimentacoes_recentes': indicadores['total_movimentacoes_recentes'],
+        'movimentacoes_recentes': listas['movimentacoes_recentes'],
+        'produtos_alerta': listas['produtos_alerta'],
     }
     
-    return render(request, 'estoque/dashboard.html', context)
+    return await assincrono.renderizar(request, 'estoque/dashboard.html', context)
 
 
 @login_required
@@ -86,31 +113,36 @@ def lista_produtos(request):
         HttpResponse: Renderiza o template com a lista de produtos
     """
     # Obter parâmetros de filtro da URL
-    busca = request.GET.get('busca', '')
+    termo = request.GET.get('busca', '')
     mostrar_inativos = request.GET.get('inativos', 'false') == 'true'
     
     # Iniciar query com todos os produtos
     produtos = Produto.objects.all()
     
-    # Aplicar filtro de busca por nome
-    if busca:
-        produtos = produtos.filter(
-            Q(nome__icontains=busca) | Q(descricao__icontains=busca)
-        )
+    # Aplicar busca textual (nome e descrição) pelo índice de busca
+    if termo:
+        produtos = busca.filtrar_produtos(produtos, termo)
     
     # Aplicar filtro de status
     if not mostrar_inativos:
         produtos = produtos.filter(ativo=True)
     
-    # Ordenar por nome
-    produtos = produtos.order_by('nome').select_related(
-        'usuario_criacao', 'usuario_modificacao'
+    # Total do filtro em uma consulta separada (COUNT)
+    total_produtos = produtos.count()
+    
+    # Paginar por cursor, em ordem alfabética
+    pagina = paginar(
+        produtos.select_related('usuario_criacao', 'usuario_modificacao'),
+        request,
+        ordenacao=('nome', 'id')
     )
     
     # Preparar contexto
     context = {
-        'produtos': produtos,
-        'busca': busca,
+        'produtos': pagina.itens,
+        'pagina': pagina,
+        'total_produtos': total_produtos,
+        'busca': termo,
         'mostrar_inativos': mostrar_inativos,
     }
     
@@ -153,6 +185,15 @@ def detalhes_produto(request, produto_id):
         total=Sum('quantidade')
     )['total'] or 0
     
+    # Somar as movimentações arquivadas (pelos resumos mensais)
+    arquivadas = dict(
+        produto.resumos_arquivados.order_by().values('tipo').annotate(
+            total=Sum('quantidade')
+        ).values_list('tipo', 'total')
+    )
+    total_entradas += arquivadas.get('ENTRADA', 0)
+    total_saidas += arquivadas.get('SAIDA', 0)
+    
     # Preparar contexto
     context = {
         'produto': produto,
@@ -231,14 +272,17 @@ def registrar_movimentacao(request):
             produto_id = request.POST.get('produto')
             tipo = request.POST.get('tipo')
             quantidade = int(request.POST.get('quantidade'))
-            valor_unitario = float(request.POST.get('valor_unitario'))
+            valor_unitario = Decimal(request.POST.get('valor_unitario'))
             observacao = request.POST.get('observacao', '')
             
-            # Obter o produto
-            produto = get_object_or_404(Produto, pk=produto_id)
+            # Obter o produto (apenas os campos usados no registro)
+            produto = get_object_or_404(
+                Produto.objects.only('nome', 'estoque_atual'),
+                pk=produto_id
+            )
             
-            # Criar a movimentação
-            movimentacao = MovimentacaoEstoque(
+            # Registrar movimentação, estoque e capital de giro em uma transação
+            services.registrar_movimentacao(
                 produto=produto,
                 tipo=tipo,
                 quantidade=quantidade,
@@ -246,25 +290,6 @@ def registrar_movimentacao(request):
                 observacao=observacao,
                 usuario=request.user
             )
-            movimentacao.save()
-            
-            # Atualizar capital de giro
-            valor_total = movimentacao.calcular_valor_total()
-            
-            if tipo == 'ENTRADA':
-                # Entrada de estoque = saída de capital (compra)
-                CapitalGiro.retirar_capital(
-                    valor=valor_total,
-                    descricao=f'Compra de {quantidade}x {produto.nome}',
-                    usuario=request.user
-                )
-            elif tipo == 'SAIDA':
-                # Saída de estoque = entrada de capital (venda)
-                CapitalGiro.adicionar_capital(
-                    valor=valor_total,
-                    descricao=f'Venda de {quantidade}x {produto.nome}',
-                    usuario=request.user
-                )
             
             # Mensagem de sucesso
             messages.success(
@@ -285,17 +310,59 @@ def registrar_movimentacao(request):
                 f'Erro ao registrar movimentação: {str(e)}'
             )
     
-    # Obter lista de produtos ativos para o formulário
-    produtos = Produto.objects.filter(ativo=True).order_by('nome')
+    # Os produtos são buscados sob demanda pelo autocompletar do formulário
+    # (api_autocompletar_produtos), sem listar o catálogo inteiro na página
+    return render(request, 'estoque/registrar_movimentacao.html')
+
+
+@login_required
+@permission_required('estoque.add_movimentacaoestoque', raise_exception=True)
+def importar_movimentacoes(request):
+    """
+    View para importar movimentações de estoque em lote.
+    
+    Recebe um arquivo CSV ou JSON Lines (exportação do PDV) e o processa
+    em fluxo, em lotes, aplicando as mesmas validações do registro
+    individual de movimentações.
+    
+    Args:
+        request: Objeto HttpRequest do Django
+        
+    Returns:
+        HttpResponse: Renderiza o formulário com o resultado da importação
+    """
+    resultado = None
+    
+    if request.method == 'POST':
+        arquivo = request.FILES.get('arquivo')
+        
+        if arquivo is None:
+            messages.error(request, 'Selecione um arquivo para importar.')
+        else:
+            # Ler o upload em fluxo como texto (aceita BOM do Excel)
+            texto = io.TextIOWrapper(arquivo.file, encoding='utf-8-sig', newline='')
+            resultado = importacao.importar_movimentacoes(
+                texto,
+                request.user,
+                formato=importacao.detectar_formato(arquivo.name)
+            )
+            
+            messages.success(
+                request,
+                f'Importação concluída: {resultado.importadas} movimentações importadas, '
+                f'{resultado.rejeitadas} rejeitadas '
+                f'({resultado.linhas_por_segundo:.0f} linhas/s).'
+            )
     
     context = {
-        'produtos': produtos,
+        'resultado': resultado,
     }
     
-    return render(request, 'estoque/registrar_movimentacao.html', context)
+    return render(request, 'estoque/importar_movimentacoes.html', context)
 
 
 @login_required
+@usar_replica
 def relatorio_estoque(request):
     """
     View para gerar relatório completo de estoque.
@@ -305,6 +372,9 @@ def relatorio_estoque(request):
     - Produtos com menor giro
     - Análise de lucratividade
     
+    O período pode ser informado pelos parâmetros GET ``data_inicio`` e
+    ``data_fim`` (formato AAAA-MM-DD); o padrão são os últimos 30 dias.
+    
     Args:
         request: Objeto HttpRequest do Django
         
@@ -316,36 +386,277 @@ def relatorio_estoque(request):
         messages.error(request, 'Você não tem permissão para acessar relatórios.')
         return redirect('estoque:dashboard')
     
-    # Obter todos os produtos ativos
-    produtos = Produto.objects.filter(ativo=True)
+    # Obter janela do relatório (padrão: últimos 30 dias)
+    hoje = timezone.localdate()
+    try:
+        data_fim = date.fromisoformat(request.GET.get('data_fim', ''))
+    except ValueError:
+        data_fim = hoje
+    try:
+        data_inicio = date.fromisoformat(request.GET.get('data_inicio', ''))
+    except ValueError:
+        data_inicio = data_fim - timedelta(days=30)
     
-    # Calcular produtos mais vendidos (últimos 30 dias)
-    data_limite = datetime.now() - timedelta(days=30)
-    produtos_mais_vendidos = []
+    # Converter datas em limites [início, fim + 1 dia) no fuso local
+    inicio = timezone.make_aware(datetime.combine(data_inicio, time.min))
+    fim = timezone.make_aware(datetime.combine(data_fim + timedelta(days=1), time.min))
     
-    for produto in produtos:
-        total_vendido = produto.movimentacoes.filter(
-            tipo='SAIDA',
-            data_movimentacao__gte=data_limite
-        ).aggregate(total=Sum('quantidade'))['total'] or 0
-        
-        if total_vendido > 0:
-            produtos_mais_vendidos.append({
-                'produto': produto,
-                'quantidade': total_vendido,
-                'receita': total_vendido * produto.preco_venda
-            })
+    # Ranking calculado no banco com número constante de consultas
+    ranking = services.ranking_vendas(inicio, fim, limite=10)
     
-    # Ordenar por quantidade vendida
-    produtos_mais_vendidos.sort(key=lambda x: x['quantidade'], reverse=True)
-    produtos_mais_vendidos = produtos_mais_vendidos[:10]
+    # Posição atual do estoque (mesma agregação do dashboard)
+    indicadores = Produto.objects.ativos().indicadores()
     
     # Preparar contexto
     context = {
-        'produtos': produtos,
-        'produtos_mais_vendidos': produtos_mais_vendidos,
-        'data_inicio': data_limite.date(),
-        'data_fim': datetime.now().date(),
+        'produtos_mais_vendidos': ranking['mais_vendidos'],
+        'produtos_menor_giro': ranking['menor_giro'],
+        'quantidade_total': ranking['quantidade_total'],
+        'receita_total': ranking['receita_total'],
+        'indicadores': indicadores,
+        'data_inicio': data_inicio,
+        'data_fim': data_fim,
     }
     
     return render(request, 'estoque/relatorio.html', context)
+
+
+@login_required
+@permission_required('estoque.view_movimentacaoestoque', raise_exception=True)
+def exportar_movimentacoes(request):
+    """
+    Exporta as movimentações de estoque em CSV.
+    
+    Filtros opcionais (GET): ``data_inicio`` e ``data_fim`` (AAAA-MM-DD,
+    inclusivos), ``tipo`` (ENTRADA/SAIDA) e ``produto`` (id). Inclui as
+    movimentações arquivadas quando o período alcança o arquivo.
+    
+    Args:
+        request: Objeto HttpRequest do Django
+        
+    Returns:
+        StreamingHttpResponse: Arquivo CSV gerado em fluxo
+    """
+    # Período em limites [início, fim + 1 dia) no fuso local
+    filtro = Q()
+    inicio = None
+    try:
+        data_inicio = date.fromisoformat(request.GET.get('data_inicio', ''))
+        inicio = timezone.make_aware(datetime.combine(data_inicio, time.min))
+        filtro &= Q(data_movimentacao__gte=inicio)
+    except ValueError:
+        pass
+    try:
+        data_fim = date.fromisoformat(request.GET.get('data_fim', ''))
+        filtro &= Q(data_movimentacao__lt=timezone.make_aware(
+            datetime.combine(data_fim + timedelta(days=1), time.min)
+        ))
+    except ValueError:
+        pass
+    
+    tipo = request.GET.get('tipo')
+    if tipo:
+        filtro &= Q(tipo=tipo)
+    produto = Produto.interpretar_codigo(request.GET.get('produto', ''))
+    if produto is not None:
+        filtro &= Q(produto_id=produto)
+    
+    fontes = [
+        modelo.objects.filter(filtro).order_by()
+        for modelo in MovimentacaoEstoqueArquivo.fontes(inicio)
+    ]
+    if len(fontes) > 1:
+        # Período arquivado: as duas tabelas em uma única consulta (UNION
+        # ALL); o id (preservado no arquivo) desempata datas iguais
+        movimentacoes = fontes[0].union(*fontes[1:], all=True).order_by('data_movimentacao', 'id')
+    else:
+        movimentacoes = fontes[0].order_by('data_movimentacao', 'id')
+    
+    return exportar_csv(
+        movimentacoes,
+        [
+            ('data_movimentacao', 'Data'),
+            ('produto_id', 'Código do Produto'),
+            ('produto__nome', 'Produto'),
+            ('tipo', 'Tipo'),
+            ('quantidade', 'Quantidade'),
+            ('valor_unitario', 'Valor Unitário'),
+            ('usuario__username', 'Usuário'),
+            ('observacao', 'Observação'),
+        ],
+        'movimentacoes.csv'
+    )
+
+
+# Quantidade máxima de resultados da API de busca
+LIMITE_BUSCA = 50
+
+
+@login_required
+@permission_required('estoque.view_produto', raise_exception=True)
+def api_busca_produtos(request):
+    """
+    API de busca textual de produtos, ordenada por relevância.
+    
+    Parâmetros GET: ``q`` (termo, aceita prefixos e ignora acentos),
+    ``limite`` (padrão 20, máximo ``LIMITE_BUSCA``) e ``inativos=true``
+    para incluir produtos inativos.
+    
+    Args:
+        request: Objeto HttpRequest do Django
+        
+    Returns:
+        JsonResponse: Lista ``resultados`` com os produtos encontrados
+    """
+    termo = request.GET.get('q', '')
+    try:
+        limite = min(max(int(request.GET.get('limite', 20)), 1), LIMITE_BUSCA)
+    except ValueError:
+        return JsonResponse({'erro': 'Parâmetro "limite" inválido.'}, status=400)
+    
+    produtos = Produto.objects.all()
+    if request.GET.get('inativos') != 'true':
+        produtos = produtos.ativos()
+    
+    resultados = busca.buscar_produtos(
+        termo,
+        limite=limite,
+        queryset=produtos.only('nome', 'preco_venda', 'estoque_atual', 'ativo')
+    )
+    
+    return JsonResponse({
+        'resultados': [
+            {
+                'id': produto.id,
+                'nome': produto.nome,
+                'preco_venda': str(produto.preco_venda),
+                'estoque_atual': produto.estoque_atual,
+                'ativo': produto.ativo,
+            }
+            for produto in resultados
+        ]
+    })
+
+
+# Resultados por página do autocompletar e páginas disponíveis
+LIMITE_AUTOCOMPLETAR = 10
+MAX_PAGINAS_AUTOCOMPLETAR = 10
+
+
+@login_required
+@permission_required('estoque.add_movimentacaoestoque', raise_exception=True)
+def api_autocompletar_produtos(request):
+    """
+    API de autocompletar produtos ativos para o formulário de movimentação.
+    
+    Parâmetros GET:
+    - ``q``: início das palavras do nome (ou código do produto)
+    - ``pagina``: página de resultados (padrão 1)
+    - ``limite``: resultados por página (máximo ``LIMITE_AUTOCOMPLETAR``)
+    
+    O código do produto, quando informado, aparece em primeiro lugar.
+    
+    Args:
+        request: Objeto HttpRequest do Django
+        
+    Returns:
+        JsonResponse: ``resultados`` (com estoque e preços), ``pagina`` e
+        ``tem_mais``
+    """
+    termo = request.GET.get('q', '').strip()
+    try:
+        pagina = int(request.GET.get('pagina', 1))
+        limite = int(request.GET.get('limite', LIMITE_AUTOCOMPLETAR))
+    except ValueError:
+        return JsonResponse({'erro': 'Parâmetros de paginação inválidos.'}, status=400)
+    pagina = min(max(pagina, 1), MAX_PAGINAS_AUTOCOMPLETAR)
+    limite = min(max(limite, 1), LIMITE_AUTOCOMPLETAR)
+    
+    produtos = Produto.objects.ativos().only(
+        'nome', 'estoque_atual', 'preco_custo', 'preco_venda'
+    )
+    
+    # Código do produto (chave primária) ocupa a primeira posição
+    codigo = Produto.interpretar_codigo(termo)
+    por_codigo = list(produtos.filter(pk=codigo)) if codigo is not None else []
+    inicio = (pagina - 1) * limite
+    
+    # Uma linha a mais indica se existe próxima página
+    por_nome = busca.buscar_produtos(
+        termo,
+        limite=limite + 1,
+        queryset=produtos.exclude(pk__in=[produto.pk for produto in por_codigo]),
+        apenas_nome=True,
+        deslocamento=max(inicio - len(por_codigo), 0)
+    )
+    resultados = (por_codigo if pagina == 1 else []) + por_nome
+    tem_mais = len(resultados) > limite
+    
+    return JsonResponse({
+        'resultados': [
+            {
+                'id': produto.id,
+                'nome': produto.nome,
+                'estoque_atual': produto.estoque_atual,
+                'preco_custo': str(produto.preco_custo),
+                'preco_venda': str(produto.preco_venda),
+            }
+            for produto in resultados[:limite]
+        ],
+        'pagina': pagina,
+        'tem_mais': tem_mais,
+    })
+
+
+@login_required
+@permission_required('estoque.view_produto', raise_exception=True)
+@usar_replica
+def api_posicao_estoque(request):
+    """
+    API da posição do estoque em uma data (snapshots diários).
+    
+    Parâmetros GET: ``data`` (AAAA-MM-DD, padrão hoje), ``produto`` (id,
+    repetível) para limitar os produtos e ``itens=false`` para retornar
+    apenas os totais.
+    
+    Args:
+        request: Objeto HttpRequest do Django
+        
+    Returns:
+        JsonResponse: Quantidade e valor de estoque (custo e venda) totais
+        e por produto ao final da data
+    """
+    try:
+        data = date.fromisoformat(request.GET.get('data') or timezone.localdate().isoformat())
+    except ValueError:
+        return JsonResponse({'erro': 'Parâmetro "data" inválido (use AAAA-MM-DD).'}, status=400)
+    
+    ids = [Produto.interpretar_codigo(id_produto) for id_produto in request.GET.getlist('produto')]
+    if None in ids:
+        return JsonResponse({'erro': 'Parâmetro "produto" inválido.'}, status=400)
+    
+    produtos = Produto.objects.filter(pk__in=ids) if ids else None
+    try:
+        posicao = snapshots.posicao_em(data, produtos)
+    except ValueError as erro:
+        return JsonResponse({'erro': str(erro)}, status=400)
+    
+    resposta = {
+        'data': data.isoformat(),
+        'quantidade_total': posicao.quantidade_total,
+        'valor_estoque_custo': str(posicao.valor_estoque_custo),
+        'valor_estoque_venda': str(posicao.valor_estoque_venda),
+    }
+    if request.GET.get('itens') != 'false':
+        resposta['produtos'] = [
+            {
+                'id': item['id'],
+                'nome': item['nome'],
+                'quantidade': item['quantidade'],
+                'valor_custo': str(item['valor_custo']),
+                'valor_venda': str(item['valor_venda']),
+            }
+            for item in posicao.itens
+        ]
+    
+    return JsonResponse(resposta)
@@ -9,7 +9,7 @@ Data: 2025-12-02
 """
 
 from django.contrib import admin
-from .models import Receita, Despesa, CapitalGiro, IndicadorFinanceiro
+from .models import Receita, Despesa, CapitalGiro, CapitalGiroArquivo, IndicadorFinanceiro, SaldoDiario
 
 
 @admin.register(Receita)
@@ -306,3 +306,111 @@ class IndicadorFinanceiroAdmin(admin.ModelAdmin):
             bool: True apenas se for superusuário
         """
         return request.user.is_superuser
+
+
+@admin.register(SaldoDiario)
+class SaldoDiarioAdmin(admin.ModelAdmin):
+    """
+    Configuração administrativa para o modelo SaldoDiario.
+    
+    Exibe o saldo do capital de giro ao final de cada dia.
+    """
+    
+    # Campos exibidos na listagem
+    list_display = [
+        'dia',
+        'saldo_final',
+        'entradas',
+        'saidas',
+        'movimentacoes'
+    ]
+    
+    # Navegação por data
+    date_hierarchy = 'dia'
+    
+    # Ordenação padrão (mais recentes primeiro)
+    ordering = ['-dia']
+    
+    # Número de itens por página
+    list_per_page = 31  # Um mês de dados
+    
+    def has_add_permission(self, request):
+        """
+        Desabilita a adição manual via admin.
+        
+        Saldos diários são atualizados a cada movimentação de capital.
+        
+        Returns:
+            bool: False (não permite adicionar)
+        """
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        """
+        Desabilita a edição via admin.
+        
+        Returns:
+            bool: False (não permite editar)
+        """
+        return False
+
+
+@admin.register(CapitalGiroArquivo)
+class CapitalGiroArquivoAdmin(admin.ModelAdmin):
+    """
+    Configuração administrativa para o modelo CapitalGiroArquivo.
+    
+    Consulta das movimentações de capital de meses arquivados, somente
+    leitura.
+    """
+    
+    # Campos exibidos na listagem
+    list_display = [
+        'tipo_movimentacao',
+        'valor_anterior',
+        'valor_novo',
+        'descricao',
+        'usuario',
+        'data_movimentacao'
+    ]
+    
+    # Campos que podem ser usados para filtrar
+    list_filter = [
+        'tipo_movimentacao',
+        'data_movimentacao'
+    ]
+    
+    # Navegação por data
+    date_hierarchy = 'data_movimentacao'
+    
+    # Número de itens por página
+    list_per_page = 50
+    
+    def has_add_permission(self, request):
+        """
+        Desabilita a adição manual via admin.
+        
+        Lançamentos são arquivados pelo comando ``arquivar_historico``.
+        
+        Returns:
+            bool: False (não permite adicionar)
+        """
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        """
+        Desabilita a edição via admin.
+        
+        Returns:
+            bool: False (não permite editar)
+        """
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        """
+        Desabilita a exclusão via admin.
+        
+        Returns:
+            bool: False (não permite excluir)
+        """
+        return False
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class FinanceiroConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'financeiro'
+
+    def ready(self):
+        # Registrar os sinais que mantêm os indicadores mensais atualizados
+        from . import signals  # noqa: F401
@@ -0,0 +1,28 @@
+"""
+Comando para recalcular os indicadores financeiros mensais.
+
+Necessário após cargas em massa de receitas/despesas que não disparam
+sinais (``bulk_create``, ``QuerySet.update``) ou para a carga inicial.
+
+Uso:
+    python manage.py reconstruir_indicadores
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+from django.core.management.base import BaseCommand
+
+from financeiro.models import IndicadorFinanceiro
+
+
+class Command(BaseCommand):
+    """Recalcula IndicadorFinanceiro a partir de todas as receitas e despesas."""
+
+    help = 'Recalcula os indicadores financeiros mensais a partir das receitas e despesas'
+
+    def handle(self, *args, **options):
+        meses = IndicadorFinanceiro.reconstruir()
+        self.stdout.write(self.style.SUCCESS(
+            f'{meses} meses de indicadores recalculados.'
+        ))
@@ -0,0 +1,28 @@
+"""
+Comando para recalcular os saldos diários do capital de giro.
+
+Necessário após cargas em massa no histórico de CapitalGiro que não passam
+por ``adicionar_capital``/``retirar_capital`` (``bulk_create``).
+
+Uso:
+    python manage.py reconstruir_saldos_diarios
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+from django.core.management.base import BaseCommand
+
+from financeiro.models import SaldoDiario
+
+
+class Command(BaseCommand):
+    """Recalcula SaldoDiario a partir de todo o histórico de CapitalGiro."""
+
+    help = 'Recalcula os saldos diários do capital de giro a partir do histórico'
+
+    def handle(self, *args, **options):
+        dias = SaldoDiario.reconstruir()
+        self.stdout.write(self.style.SUCCESS(
+            f'{dias} dias de saldo recalculados.'
+        ))
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:07
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+def criar_saldo_inicial(apps, schema_editor):
+    """Cria o registro de saldo a partir da última movimentação do histórico."""
+    CapitalGiro = apps.get_model('financeiro', 'CapitalGiro')
+    SaldoCapital = apps.get_model('financeiro', 'SaldoCapital')
+
+    ultima = CapitalGiro.objects.order_by('-data_movimentacao', '-id').first()
+    SaldoCapital.objects.update_or_create(
+        pk=1,
+        defaults={'valor': ultima.valor_novo if ultima else Decimal('0.00')},
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financeiro', '0002_indicadorfinanceiro_alter_despesa_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SaldoCapital',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('valor', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, verbose_name='Saldo Atual')),
+                ('data_atualizacao', models.DateTimeField(auto_now=True, verbose_name='Última Atualização')),
+            ],
+            options={
+                'verbose_name': 'Saldo do Capital de Giro',
+                'verbose_name_plural': 'Saldo do Capital de Giro',
+            },
+        ),
+        migrations.RunPython(criar_saldo_inicial, migrations.RunPython.noop),
+    ]
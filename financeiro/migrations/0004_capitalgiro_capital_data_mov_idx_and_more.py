@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financeiro', '0003_saldocapital'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='capitalgiro',
+            index=models.Index(fields=['data_movimentacao'], name='capital_data_mov_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='despesa',
+            index=models.Index(fields=['data', 'categoria'], name='despesa_data_categoria_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='receita',
+            index=models.Index(fields=['data', 'categoria'], name='receita_data_categoria_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:21
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def criar_saldos_diarios(apps, schema_editor):
+    """Grava o saldo de cada dia percorrendo o histórico em ordem."""
+    CapitalGiro = apps.get_model('financeiro', 'CapitalGiro')
+    SaldoDiario = apps.get_model('financeiro', 'SaldoDiario')
+
+    saldos = {}
+    movimentacoes = CapitalGiro.objects.order_by('id').values_list(
+        'data_movimentacao', 'valor_anterior', 'valor_novo'
+    )
+    for momento, valor_anterior, valor_novo in movimentacoes.iterator(chunk_size=2000):
+        dia = timezone.localdate(momento)
+        saldo = saldos.setdefault(dia, SaldoDiario(dia=dia, saldo_final=valor_novo))
+        delta = valor_novo - valor_anterior
+        saldo.saldo_final = valor_novo
+        saldo.entradas += max(delta, Decimal('0.00'))
+        saldo.saidas += max(-delta, Decimal('0.00'))
+        saldo.movimentacoes += 1
+
+    SaldoDiario.objects.bulk_create(saldos.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financeiro', '0004_capitalgiro_capital_data_mov_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SaldoDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia', models.DateField(unique=True, verbose_name='Dia')),
+                ('saldo_final', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Saldo Final')),
+                ('entradas', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, verbose_name='Entradas')),
+                ('saidas', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, verbose_name='Saídas')),
+                ('movimentacoes', models.IntegerField(default=0, verbose_name='Movimentações')),
+            ],
+            options={
+                'verbose_name': 'Saldo Diário do Capital de Giro',
+                'verbose_name_plural': 'Saldos Diários do Capital de Giro',
+                'ordering': ['-dia'],
+            },
+        ),
+        migrations.RunPython(criar_saldos_diarios, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financeiro', '0005_saldodiario'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CapitalGiroArquivo',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('valor_anterior', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Valor Anterior')),
+                ('valor_novo', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Valor Novo')),
+                ('tipo_movimentacao', models.CharField(choices=[('ENTRADA', 'Entrada de Capital'), ('SAIDA', 'Saída de Capital'), ('AJUSTE', 'Ajuste Manual')], max_length=10, verbose_name='Tipo de Movimentação')),
+                ('descricao', models.TextField(verbose_name='Descrição')),
+                ('data_movimentacao', models.DateTimeField(verbose_name='Data da Movimentação')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Responsável')),
+            ],
+            options={
+                'verbose_name': 'Capital de Giro Arquivado',
+                'verbose_name_plural': 'Histórico Arquivado de Capital de Giro',
+                'db_table': 'financeiro_capitalgiro_arquivo',
+                'ordering': ['-data_movimentacao'],
+                'indexes': [models.Index(fields=['data_movimentacao'], name='capital_arquivo_data_idx')],
+            },
+        ),
+    ]
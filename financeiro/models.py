@@ -8,11 +8,17 @@ Autor: Manus AI
 Data: 2025-12-02
 """
 
-from django.db import models
+import heapq
+
+from django.db import IntegrityError, models, transaction
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
 from decimal import Decimal
-from django.db.models import Sum
+from datetime import datetime, time, timedelta
+from django.db.models import Case, Count, F, Max, Sum, Value, When
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+from .periodos import intervalo_mes, primeiro_dia_mes
 
 
 class Receita(models.Model):
@@ -90,6 +96,10 @@ class Receita(models.Model):
         verbose_name = "Receita"
         verbose_name_plural = "Receitas"
         ordering = ['-data']  # Mais recentes primeiro
+        indexes = [
+            # Filtros por período (e categoria) nas listagens e indicadores
+            models.Index(fields=['data', 'categoria'], name='receita_data_categoria_idx'),
+        ]
     
     def __str__(self):
         """Retorna representação em string da receita."""
@@ -173,6 +183,10 @@ class Despesa(models.Model):
         verbose_name = "Despesa"
         verbose_name_plural = "Despesas"
         ordering = ['-data']  # Mais recentes primeiro
+        indexes = [
+            # Filtros por período (e categoria) nas listagens e indicadores
+            models.Index(fields=['data', 'categoria'], name='despesa_data_categoria_idx'),
+        ]
     
     def __str__(self):
         """Retorna representação em string da despesa."""
@@ -250,6 +264,9 @@ class CapitalGiro(models.Model):
         verbose_name = "Capital de Giro"
         verbose_name_plural = "Histórico de Capital de Giro"
         ordering = ['-data_movimentacao']
+        indexes = [
+            models.Index(fields=['data_movimentacao'], name='capital_data_mov_idx'),
+        ]
     
     def __str__(self):
         """Retorna representação em string da movimentação."""
@@ -269,13 +286,102 @@ class CapitalGiro(models.Model):
         """
         Obtém o valor atual do capital de giro.
         
+        O saldo é lido do registro único de SaldoCapital (consulta por
+        chave primária), sem percorrer o histórico de movimentações.
+        
         Returns:
             Decimal: Valor atual do capital de giro
         """
-        ultima_movimentacao = cls.objects.first()  # Mais recente
-        if ultima_movimentacao:
-            return ultima_movimentacao.valor_novo
-        return Decimal('0.00')
+        return SaldoCapital.obter_valor()
+    
+    @classmethod
+    def saldo_em(cls, momento):
+        """
+        Obtém o saldo do capital de giro em um momento do passado.
+        
+        Parte do saldo do dia anterior (SaldoDiario, consulta indexada) e
+        soma apenas as movimentações do próprio dia até ``momento``: o custo
+        não cresce com o tamanho do histórico. Dias já arquivados são lidos
+        de CapitalGiroArquivo.
+        
+        Args:
+            momento (datetime): Momento de referência (sem fuso, é tratado
+                como horário local)
+            
+        Returns:
+            Decimal: Saldo após as movimentações até ``momento``, inclusive
+        """
+        if timezone.is_naive(momento):
+            momento = timezone.make_aware(momento)
+        dia = timezone.localdate(momento)
+        inicio_dia = timezone.make_aware(datetime.combine(dia, time.min))
+        
+        variacao = Decimal('0.00')
+        for modelo in CapitalGiroArquivo.fontes(inicio_dia):
+            variacao += modelo.objects.filter(
+                data_movimentacao__gte=inicio_dia,
+                data_movimentacao__lte=momento
+            ).aggregate(
+                total=Sum(F('valor_novo') - F('valor_anterior'))
+            )['total'] or Decimal('0.00')
+        
+        return (SaldoDiario.saldo_ate(dia) + variacao).quantize(Decimal('0.01'))
+    
+    @classmethod
+    def _registrar_movimentacao(cls, delta, tipo, descricao, usuario):
+        """
+        Aplica uma variação no saldo e registra a movimentação no histórico.
+        
+        O saldo é alterado com um UPDATE atômico (``F('valor') + delta``)
+        dentro da mesma transação do registro do histórico. O UPDATE bloqueia
+        a linha do saldo até o fim da transação, então escritores concorrentes
+        são serializados e a cadeia valor_anterior → valor_novo não tem lacunas.
+        O saldo do dia (SaldoDiario) é atualizado na mesma transação.
+        
+        Args:
+            delta (Decimal): Variação do capital (negativa para saídas)
+            tipo (str): Tipo da movimentação (ENTRADA, SAIDA ou AJUSTE)
+            descricao (str): Descrição da movimentação
+            usuario (User): Usuário responsável
+            
+        Returns:
+            CapitalGiro: Instância da movimentação criada
+            
+        Raises:
+            ValueError: Se a saída for maior que o capital disponível
+        """
+        delta = Decimal(str(delta))
+        
+        with transaction.atomic():
+            saldo = SaldoCapital.objects.filter(pk=SaldoCapital.PK_UNICO)
+            if delta < 0:
+                # Só debita se houver saldo suficiente (condição no próprio UPDATE)
+                saldo = saldo.filter(valor__gte=-delta)
+            
+            if not saldo.update(valor=F('valor') + delta, data_atualizacao=timezone.now()):
+                if not SaldoCapital.objects.filter(pk=SaldoCapital.PK_UNICO).exists():
+                    # Registro do saldo ainda não existe: criar e tentar novamente
+                    # (get_or_create: outro escritor pode criá-lo ao mesmo tempo)
+                    SaldoCapital.objects.get_or_create(pk=SaldoCapital.PK_UNICO)
+                    return cls._registrar_movimentacao(delta, tipo, descricao, usuario)
+                
+                raise ValueError(
+                    f"Capital insuficiente! Disponível: R$ {cls.obter_capital_atual()}, "
+                    f"Solicitado: R$ {-delta}"
+                )
+            
+            valor_novo = cls.obter_capital_atual()
+            
+            movimentacao = cls.objects.create(
+                valor_anterior=valor_novo - delta,
+                valor_novo=valor_novo,
+                tipo_movimentacao=tipo,
+                descricao=descricao,
+                usuario=usuario
+            )
+            SaldoDiario.registrar(movimentacao)
+            
+            return movimentacao
     
     @classmethod
     def adicionar_capital(cls, valor, descricao, usuario):
@@ -290,16 +396,7 @@ class CapitalGiro(models.Model):
         Returns:
             CapitalGiro: Instância da movimentação criada
         """
-        capital_atual = cls.obter_capital_atual()
-        novo_capital = capital_atual + valor
-        
-        return cls.objects.create(
-            valor_anterior=capital_atual,
-            valor_novo=novo_capital,
-            tipo_movimentacao='ENTRADA',
-            descricao=descricao,
-            usuario=usuario
-        )
+        return cls._registrar_movimentacao(valor, 'ENTRADA', descricao, usuario)
     
     @classmethod
     def retirar_capital(cls, valor, descricao, usuario):
@@ -317,31 +414,338 @@ class CapitalGiro(models.Model):
         Raises:
             ValueError: Se não houver capital suficiente
         """
-        capital_atual = cls.obter_capital_atual()
+        return cls._registrar_movimentacao(-Decimal(str(valor)), 'SAIDA', descricao, usuario)
+    
+    @classmethod
+    def verificar_cadeia(cls):
+        """
+        Verifica a integridade do histórico de capital de giro.
         
-        if capital_atual < valor:
-            raise ValueError(
-                f"Capital insuficiente! Disponível: R$ {capital_atual}, "
-                f"Solicitado: R$ {valor}"
+        Percorre as movimentações em ordem de registro, arquivadas e
+        atuais, conferindo se o valor_anterior de cada uma é o valor_novo da
+        anterior, e se a última corresponde ao saldo atual.
+        
+        Returns:
+            list: IDs das movimentações que quebram a cadeia (vazia se íntegra)
+        """
+        quebras = []
+        valor_esperado = None
+        
+        movimentacoes = heapq.merge(*(
+            modelo.objects.order_by('id').values_list(
+                'id', 'valor_anterior', 'valor_novo'
+            ).iterator(chunk_size=2000)
+            for modelo in (CapitalGiroArquivo, cls)
+        ))
+        for pk, valor_anterior, valor_novo in movimentacoes:
+            if valor_esperado is not None and valor_anterior != valor_esperado:
+                quebras.append(pk)
+            valor_esperado = valor_novo
+        
+        if valor_esperado is not None and valor_esperado != cls.obter_capital_atual():
+            quebras.append(None)
+        
+        return quebras
+
+
+class SaldoCapital(models.Model):
+    """
+    Registro único com o saldo atual do capital de giro.
+    
+    Mantido atualizado por CapitalGiro a cada movimentação, permite ler o
+    saldo atual por chave primária em vez de buscar a última linha do
+    histórico.
+    
+    Attributes:
+        valor (Decimal): Saldo atual do capital de giro
+        data_atualizacao (datetime): Data da última atualização
+    """
+    
+    # Chave primária do único registro de saldo
+    PK_UNICO = 1
+    
+    valor = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name="Saldo Atual"
+    )
+    
+    data_atualizacao = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Última Atualização"
+    )
+    
+    class Meta:
+        verbose_name = "Saldo do Capital de Giro"
+        verbose_name_plural = "Saldo do Capital de Giro"
+    
+    def __str__(self):
+        """Retorna representação em string do saldo."""
+        return f"Saldo: R$ {self.valor}"
+    
+    @classmethod
+    def obter_valor(cls):
+        """
+        Obtém o saldo atual por chave primária.
+        
+        Returns:
+            Decimal: Saldo atual (zero se ainda não houver registro)
+        """
+        valor = cls.objects.filter(pk=cls.PK_UNICO).values_list('valor', flat=True).first()
+        if valor is None:
+            return Decimal('0.00')
+        return valor
+
+
+class SaldoDiario(models.Model):
+    """
+    Saldo do capital de giro ao final de cada dia com movimentações.
+    
+    Ponto de verificação do histórico de CapitalGiro: atualizado na mesma
+    transação de cada movimentação (``registrar``), permite obter o saldo
+    em qualquer momento (``CapitalGiro.saldo_em``) somando apenas as
+    movimentações de um dia, e a série diária do saldo sem percorrer o
+    histórico (``serie``). O comando ``reconstruir_saldos_diarios``
+    recalcula tudo a partir do histórico.
+    
+    Attributes:
+        dia (date): Dia de referência (data local)
+        saldo_final (Decimal): Saldo após a última movimentação do dia
+        entradas (Decimal): Total que entrou no capital no dia
+        saidas (Decimal): Total que saiu do capital no dia
+        movimentacoes (int): Quantidade de movimentações no dia
+    """
+    
+    dia = models.DateField(
+        unique=True,
+        verbose_name="Dia"
+    )
+    
+    saldo_final = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        verbose_name="Saldo Final"
+    )
+    
+    entradas = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name="Entradas"
+    )
+    
+    saidas = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name="Saídas"
+    )
+    
+    movimentacoes = models.IntegerField(
+        default=0,
+        verbose_name="Movimentações"
+    )
+    
+    class Meta:
+        verbose_name = "Saldo Diário do Capital de Giro"
+        verbose_name_plural = "Saldos Diários do Capital de Giro"
+        ordering = ['-dia']
+    
+    def __str__(self):
+        """Retorna representação em string do saldo diário."""
+        return f"Saldo de {self.dia.strftime('%d/%m/%Y')}: R$ {self.saldo_final}"
+    
+    @property
+    def saldo_inicial(self):
+        """Saldo antes da primeira movimentação do dia."""
+        return self.saldo_final - self.entradas + self.saidas
+    
+    @classmethod
+    def registrar(cls, movimentacao):
+        """
+        Aplica uma movimentação de capital no saldo do seu dia.
+        
+        Chamado por CapitalGiro dentro da transação da movimentação, que já
+        bloqueia o saldo atual: as movimentações chegam aqui em ordem e o
+        ``valor_novo`` da mais recente é o saldo final do dia.
+        
+        Args:
+            movimentacao (CapitalGiro): Movimentação recém-gravada
+        """
+        dia = timezone.localdate(movimentacao.data_movimentacao)
+        delta = movimentacao.calcular_diferenca()
+        entrada = max(delta, Decimal('0.00'))
+        saida = max(-delta, Decimal('0.00'))
+        
+        with transaction.atomic():
+            atualizados = cls.objects.filter(dia=dia).update(
+                saldo_final=movimentacao.valor_novo,
+                entradas=F('entradas') + entrada,
+                saidas=F('saidas') + saida,
+                movimentacoes=F('movimentacoes') + 1
             )
+            
+            if not atualizados:
+                # Primeira movimentação do dia
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(
+                            dia=dia,
+                            saldo_final=movimentacao.valor_novo,
+                            entradas=entrada,
+                            saidas=saida,
+                            movimentacoes=1
+                        )
+                except IntegrityError:
+                    # Outro processo criou o dia ao mesmo tempo
+                    return cls.registrar(movimentacao)
+    
+    @classmethod
+    def saldo_ate(cls, dia):
+        """
+        Saldo ao final do último dia com movimentações antes de ``dia``.
+        
+        Consulta indexada (``dia`` é único). Antes do primeiro dia, o saldo
+        é o valor anterior à primeira movimentação do histórico (arquivada,
+        se houver).
         
-        novo_capital = capital_atual - valor
+        Args:
+            dia (date): Dia de referência (exclusivo)
+            
+        Returns:
+            Decimal: Saldo no início de ``dia``
+        """
+        saldo = cls.objects.filter(dia__lt=dia).order_by('-dia').values_list(
+            'saldo_final', flat=True
+        ).first()
+        if saldo is None:
+            primeira = CapitalGiroArquivo.objects.order_by().values_list('id', 'valor_anterior').union(
+                CapitalGiro.objects.order_by().values_list('id', 'valor_anterior'), all=True
+            ).order_by('id').first()
+            saldo = primeira and primeira[1]
+        return Decimal('0.00') if saldo is None else saldo
+    
+    @classmethod
+    def serie(cls, inicio, fim):
+        """
+        Série diária do saldo do capital de giro.
+        
+        Duas consultas à tabela de saldos diários, qualquer que seja o
+        tamanho do histórico. Dias sem movimentação repetem o saldo do
+        anterior, com entradas e saídas zeradas.
+        
+        Args:
+            inicio (date): Primeiro dia
+            fim (date): Último dia
+            
+        Returns:
+            list: Dicionários com ``dia``, ``saldo``, ``entradas`` e ``saidas``
+        """
+        saldo = cls.saldo_ate(inicio)
+        dias = {
+            saldo_diario.dia: saldo_diario
+            for saldo_diario in cls.objects.filter(dia__gte=inicio, dia__lte=fim)
+        }
         
-        return cls.objects.create(
-            valor_anterior=capital_atual,
-            valor_novo=novo_capital,
-            tipo_movimentacao='SAIDA',
-            descricao=descricao,
-            usuario=usuario
+        serie = []
+        dia = inicio
+        while dia <= fim:
+            saldo_diario = dias.get(dia)
+            if saldo_diario:
+                saldo = saldo_diario.saldo_final
+            serie.append({
+                'dia': dia,
+                'saldo': saldo,
+                'entradas': saldo_diario.entradas if saldo_diario else Decimal('0.00'),
+                'saidas': saldo_diario.saidas if saldo_diario else Decimal('0.00'),
+            })
+            dia += timedelta(days=1)
+        return serie
+    
+    @classmethod
+    def totais_por_dia(cls, movimentacoes):
+        """
+        Calcula os saldos diários de um histórico de CapitalGiro.
+        
+        Uma consulta agrupada por dia (entradas, saídas e última
+        movimentação) e outra para o ``valor_novo`` da última de cada dia.
+        
+        Args:
+            movimentacoes (QuerySet): Histórico de CapitalGiro
+            
+        Returns:
+            list: Tuplas (dia, saldo final, entradas, saídas, movimentações)
+        """
+        delta = F('valor_novo') - F('valor_anterior')
+        zero = Value(Decimal('0.00'))
+        por_dia = list(
+            movimentacoes.order_by().annotate(
+                dia=TruncDate('data_movimentacao')
+            ).values('dia').annotate(
+                ultima=Max('id'),
+                entradas=Sum(Case(
+                    When(valor_novo__gt=F('valor_anterior'), then=delta),
+                    default=zero,
+                    output_field=models.DecimalField(max_digits=12, decimal_places=2)
+                )),
+                saidas=Sum(Case(
+                    When(valor_novo__lt=F('valor_anterior'), then=-delta),
+                    default=zero,
+                    output_field=models.DecimalField(max_digits=12, decimal_places=2)
+                )),
+                quantidade=Count('id')
+            ).values_list('dia', 'ultima', 'entradas', 'saidas', 'quantidade')
         )
+        
+        saldos = {}
+        ultimas = [linha[1] for linha in por_dia]
+        for posicao in range(0, len(ultimas), 500):
+            saldos.update(movimentacoes.model.objects.filter(
+                pk__in=ultimas[posicao:posicao + 500]
+            ).values_list('pk', 'valor_novo'))
+        
+        centavo = Decimal('0.01')
+        return [
+            (dia, saldos[ultima], entradas.quantize(centavo), saidas.quantize(centavo), quantidade)
+            for dia, ultima, entradas, saidas, quantidade in sorted(por_dia)
+        ]
+    
+    @classmethod
+    def reconstruir(cls):
+        """
+        Recalcula todos os saldos diários a partir do histórico de CapitalGiro.
+        
+        Necessário após cargas em massa no histórico que não passam por
+        ``CapitalGiro.adicionar_capital``/``retirar_capital``
+        (``bulk_create``). Inclui os lançamentos arquivados: o arquivamento
+        move meses inteiros, então nenhum dia fica dividido entre as tabelas.
+        
+        Returns:
+            int: Quantidade de dias gravados
+        """
+        saldos = [
+            cls(dia=dia, saldo_final=saldo, entradas=entradas, saidas=saidas, movimentacoes=quantidade)
+            for modelo in (CapitalGiroArquivo, CapitalGiro)
+            for dia, saldo, entradas, saidas, quantidade in cls.totais_por_dia(modelo.objects.all())
+        ]
+        
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(saldos, batch_size=500)
+        
+        return len(saldos)
 
 
 class IndicadorFinanceiro(models.Model):
     """
     Modelo que armazena indicadores financeiros calculados.
     
-    Este modelo é atualizado automaticamente com base nas movimentações
-    de estoque e transações financeiras.
+    Funciona como um acumulado mensal: cada inclusão, alteração ou exclusão
+    de Receita/Despesa aplica sua variação no mês correspondente (ver
+    financeiro/signals.py), permitindo consultar qualquer intervalo de meses
+    sem percorrer as receitas e despesas. O comando
+    ``reconstruir_indicadores`` recalcula tudo a partir do zero.
     
     Attributes:
         periodo (date): Período de referência (mês/ano)
@@ -410,19 +814,18 @@ class IndicadorFinanceiro(models.Model):
         Atualiza os valores de receitas, despesas, lucro e margem.
         """
         # Filtrar receitas e despesas do período
-        ano = self.periodo.year
-        mes = self.periodo.month
+        inicio, fim = intervalo_mes(self.periodo)
         
         # Total de receitas
         receitas = Receita.objects.filter(
-            data__year=ano,
-            data__month=mes
+            data__gte=inicio,
+            data__lt=fim
         ).aggregate(total=Sum('valor'))['total'] or Decimal('0.00')
         
         # Total de despesas
         despesas = Despesa.objects.filter(
-            data__year=ano,
-            data__month=mes
+            data__gte=inicio,
+            data__lt=fim
         ).aggregate(total=Sum('valor'))['total'] or Decimal('0.00')
         
         # Atualizar valores
@@ -431,9 +834,196 @@ class IndicadorFinanceiro(models.Model):
         self.lucro_bruto = receitas - despesas
         
         # Calcular margem de lucro
-        if receitas > 0:
-            self.margem_lucro = (self.lucro_bruto / receitas) * 100
-        else:
-            self.margem_lucro = Decimal('0.00')
+        self.margem_lucro = self.calcular_margem(receitas, self.lucro_bruto)
         
         self.save()
+    
+    @staticmethod
+    def calcular_margem(receitas, lucro_bruto):
+        """
+        Calcula a margem de lucro limitada à precisão do campo.
+        
+        Args:
+            receitas (Decimal): Total de receitas do período
+            lucro_bruto (Decimal): Receitas - despesas do período
+            
+        Returns:
+            Decimal: Margem em percentual, entre -999.99 e 999.99
+        """
+        if receitas <= 0:
+            return Decimal('0.00')
+        
+        margem = (lucro_bruto / receitas * 100).quantize(Decimal('0.01'))
+        return max(min(margem, Decimal('999.99')), Decimal('-999.99'))
+    
+    @classmethod
+    def registrar_variacao(cls, data, receitas=Decimal('0.00'), despesas=Decimal('0.00')):
+        """
+        Aplica uma variação de receitas/despesas no indicador do mês.
+        
+        Os totais são incrementados com expressões F() (UPDATE atômico), de
+        modo que gravações simultâneas no mesmo mês não se sobrescrevem.
+        
+        Args:
+            data (date): Data da receita/despesa
+            receitas (Decimal): Variação do total de receitas
+            despesas (Decimal): Variação do total de despesas
+        """
+        periodo = primeiro_dia_mes(data)
+        variacao_lucro = receitas - despesas
+        
+        with transaction.atomic():
+            atualizados = cls.objects.filter(periodo=periodo).update(
+                total_receitas=F('total_receitas') + receitas,
+                total_despesas=F('total_despesas') + despesas,
+                lucro_bruto=F('lucro_bruto') + variacao_lucro,
+                data_atualizacao=timezone.now()
+            )
+            
+            if not atualizados:
+                # Primeiro lançamento do mês
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(
+                            periodo=periodo,
+                            total_receitas=receitas,
+                            total_despesas=despesas,
+                            lucro_bruto=variacao_lucro
+                        )
+                except IntegrityError:
+                    # Outro processo criou o mês ao mesmo tempo
+                    return cls.registrar_variacao(data, receitas, despesas)
+            
+            # Recalcular a margem a partir dos totais já atualizados
+            total_receitas, lucro_bruto = cls.objects.values_list(
+                'total_receitas', 'lucro_bruto'
+            ).get(periodo=periodo)
+            cls.objects.filter(periodo=periodo).update(
+                margem_lucro=cls.calcular_margem(total_receitas, lucro_bruto)
+            )
+    
+    @classmethod
+    def reconstruir(cls):
+        """
+        Recalcula todos os indicadores mensais a partir das receitas e despesas.
+        
+        Usa duas consultas agrupadas por mês (uma para receitas e outra para
+        despesas) e regrava a tabela de indicadores em uma transação. Útil
+        para carga inicial e após alterações em massa que não disparam
+        sinais (``QuerySet.update``, ``bulk_create``).
+        
+        Returns:
+            int: Quantidade de meses gravados
+        """
+        def totais_por_mes(modelo):
+            return dict(
+                modelo.objects.order_by().annotate(
+                    mes=TruncMonth('data')
+                ).values('mes').annotate(
+                    total=Sum('valor')
+                ).values_list('mes', 'total')
+            )
+        
+        receitas = totais_por_mes(Receita)
+        despesas = totais_por_mes(Despesa)
+        
+        indicadores = []
+        for periodo in sorted(set(receitas) | set(despesas)):
+            total_receitas = receitas.get(periodo, Decimal('0.00'))
+            total_despesas = despesas.get(periodo, Decimal('0.00'))
+            lucro_bruto = total_receitas - total_despesas
+            indicadores.append(cls(
+                periodo=periodo,
+                total_receitas=total_receitas,
+                total_despesas=total_despesas,
+                lucro_bruto=lucro_bruto,
+                margem_lucro=cls.calcular_margem(total_receitas, lucro_bruto)
+            ))
+        
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(indicadores, batch_size=500)
+        
+        return len(indicadores)
+
+
+class CapitalGiroArquivo(models.Model):
+    """
+    Movimentação do capital de giro de um período encerrado, arquivada.
+    
+    O comando ``arquivar_historico`` move os lançamentos antigos para esta
+    tabela (mesmas colunas e mesmo id); ``restaurar_historico`` os devolve.
+    Os saldos diários (SaldoDiario) permanecem na base principal como
+    resumo do período.
+    
+    Attributes:
+        id (int): Id original da movimentação
+        valor_anterior (Decimal): Valor antes da movimentação
+        valor_novo (Decimal): Valor após a movimentação
+        tipo_movimentacao (str): ENTRADA, SAIDA ou AJUSTE
+        descricao (str): Descrição da movimentação
+        usuario (User): Usuário responsável pela movimentação
+        data_movimentacao (datetime): Data e hora da movimentação
+    """
+    
+    id = models.BigIntegerField(primary_key=True, verbose_name="ID")
+    
+    valor_anterior = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        verbose_name="Valor Anterior"
+    )
+    
+    valor_novo = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        verbose_name="Valor Novo"
+    )
+    
+    tipo_movimentacao = models.CharField(
+        max_length=10,
+        choices=CapitalGiro.TIPO_MOVIMENTACAO,
+        verbose_name="Tipo de Movimentação"
+    )
+    
+    descricao = models.TextField(verbose_name="Descrição")
+    
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.PROTECT,
+        related_name='+',
+        verbose_name="Responsável"
+    )
+    
+    data_movimentacao = models.DateTimeField(verbose_name="Data da Movimentação")
+    
+    class Meta:
+        db_table = 'financeiro_capitalgiro_arquivo'
+        verbose_name = "Capital de Giro Arquivado"
+        verbose_name_plural = "Histórico Arquivado de Capital de Giro"
+        ordering = ['-data_movimentacao']
+        indexes = [
+            models.Index(fields=['data_movimentacao'], name='capital_arquivo_data_idx'),
+        ]
+    
+    def __str__(self):
+        """Retorna representação em string da movimentação arquivada."""
+        return f"{self.tipo_movimentacao}: R$ {self.valor_anterior} → R$ {self.valor_novo} (arquivada)"
+    
+    @classmethod
+    def fontes(cls, inicio=None):
+        """
+        Tabelas com os lançamentos a partir de ``inicio``.
+        
+        Args:
+            inicio (datetime): Início do período consultado (None: desde o
+                início do histórico)
+            
+        Returns:
+            list: CapitalGiro e, se houver lançamentos arquivados a partir
+            de ``inicio``, esta classe
+        """
+        limite = cls.objects.aggregate(limite=Max('data_movimentacao'))['limite']
+        if limite is None or (inicio is not None and inicio > limite):
+            return [CapitalGiro]
+        return [CapitalGiro, cls]
@@ -0,0 +1,58 @@
+"""
+Funções auxiliares para períodos mensais do módulo Financeiro.
+
+Os indicadores financeiros são agrupados por mês, identificado pelo
+primeiro dia do mês (ex: 2025-12-01 representa dezembro/2025).
+
+Para filtrar um mês use ``intervalo_mes`` com ``data__gte``/``data__lt``
+em vez de ``data__year``/``data__month``: a comparação direta com a coluna
+pode ser atendida pelos índices, enquanto a extração de ano/mês aplica uma
+função sobre cada linha.
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+from datetime import date
+
+
+def primeiro_dia_mes(data):
+    """
+    Retorna o primeiro dia do mês de uma data.
+    
+    Args:
+        data (date): Data de referência
+        
+    Returns:
+        date: Primeiro dia do mês
+    """
+    return date(data.year, data.month, 1)
+
+
+def adicionar_meses(data, meses):
+    """
+    Desloca o mês de uma data, retornando o primeiro dia do mês resultante.
+    
+    Args:
+        data (date): Data de referência
+        meses (int): Quantidade de meses (negativa para voltar)
+        
+    Returns:
+        date: Primeiro dia do mês deslocado
+    """
+    indice = data.year * 12 + (data.month - 1) + meses
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def intervalo_mes(data):
+    """
+    Retorna o intervalo semiaberto [início, fim) do mês de uma data.
+    
+    Args:
+        data (date): Data de referência
+        
+    Returns:
+        tuple: (primeiro dia do mês, primeiro dia do mês seguinte)
+    """
+    inicio = primeiro_dia_mes(data)
+    return inicio, adicionar_meses(inicio, 1)
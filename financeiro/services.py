@@ -0,0 +1,92 @@
+"""
+Serviços do módulo Financeiro.
+
+Este arquivo concentra o registro de receitas e despesas junto com o seu
+efeito no capital de giro, usado pelas views de cadastro e pelo teste de
+carga (gestao_erp/carga.py).
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+from django.db import transaction
+
+from .models import CapitalGiro, Despesa, Receita
+
+
+def registrar_receita(descricao, valor, data, categoria, usuario):
+    """
+    Registra uma receita e a entrada correspondente no capital de giro.
+
+    A receita e o lançamento de capital são gravados na mesma transação.
+
+    Args:
+        descricao (str): Descrição da receita
+        valor (Decimal): Valor recebido
+        data (date ou str): Data da receita
+        categoria (str): Categoria (ver Receita.CATEGORIAS)
+        usuario (User): Usuário responsável
+
+    Returns:
+        Receita: Receita registrada
+    """
+    receita = Receita(
+        descricao=descricao,
+        valor=valor,
+        data=data,
+        categoria=categoria,
+        usuario=usuario
+    )
+
+    with transaction.atomic():
+        receita.save()
+
+        # Adicionar ao capital de giro
+        CapitalGiro.adicionar_capital(
+            valor=receita.valor,
+            descricao=f'Receita: {receita.descricao}',
+            usuario=usuario
+        )
+
+    return receita
+
+
+def registrar_despesa(descricao, valor, data, categoria, usuario):
+    """
+    Registra uma despesa e a saída correspondente do capital de giro.
+
+    A despesa e o lançamento de capital são gravados na mesma transação:
+    sem capital suficiente, nada é gravado.
+
+    Args:
+        descricao (str): Descrição da despesa
+        valor (Decimal): Valor pago
+        data (date ou str): Data da despesa
+        categoria (str): Categoria (ver Despesa.CATEGORIAS)
+        usuario (User): Usuário responsável
+
+    Returns:
+        Despesa: Despesa registrada
+
+    Raises:
+        ValueError: Se não houver capital suficiente
+    """
+    despesa = Despesa(
+        descricao=descricao,
+        valor=valor,
+        data=data,
+        categoria=categoria,
+        usuario=usuario
+    )
+
+    with transaction.atomic():
+        despesa.save()
+
+        # Retirar do capital de giro
+        CapitalGiro.retirar_capital(
+            valor=despesa.valor,
+            descricao=f'Despesa: {despesa.descricao}',
+            usuario=usuario
+        )
+
+    return despesa
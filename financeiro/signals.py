@@ -0,0 +1,93 @@
+"""
+Sinais do módulo Financeiro.
+
+Mantém o acumulado mensal de IndicadorFinanceiro sincronizado com cada
+inclusão, alteração ou exclusão de Receita e Despesa, e invalida os
+indicadores em cache do dashboard a cada lançamento financeiro.
+
+Observação: operações em massa que não disparam sinais
+(``QuerySet.update``, ``bulk_create``) exigem executar o comando
+``reconstruir_indicadores`` em seguida.
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from gestao_erp import cache
+from .models import CapitalGiro, Despesa, IndicadorFinanceiro, Receita
+
+
+def _valores(modelo, instancia):
+    """
+    Normaliza data e valor da instância (as views atribuem textos do POST).
+
+    Returns:
+        tuple: (date, Decimal)
+    """
+    data = modelo._meta.get_field('data').to_python(instancia.data)
+    valor = modelo._meta.get_field('valor').to_python(instancia.valor)
+    return data, valor
+
+
+def _aplicar(modelo, data, valor):
+    """Aplica a variação no indicador do mês, como receita ou despesa."""
+    if modelo is Receita:
+        IndicadorFinanceiro.registrar_variacao(data, receitas=valor)
+    else:
+        IndicadorFinanceiro.registrar_variacao(data, despesas=valor)
+
+
+@receiver(pre_save, sender=Receita)
+@receiver(pre_save, sender=Despesa)
+def guardar_valores_originais(sender, instance, raw=False, **kwargs):
+    """
+    Guarda data e valor gravados antes de uma alteração.
+
+    Na inclusão não há consulta; na alteração, o valor antigo é lido para
+    que o post_save possa estornar o mês original.
+    """
+    instance._valores_originais = None
+    if raw or instance.pk is None:
+        return
+
+    instance._valores_originais = sender.objects.filter(
+        pk=instance.pk
+    ).values_list('data', 'valor').first()
+
+
+@receiver(post_save, sender=Receita)
+@receiver(post_save, sender=Despesa)
+def atualizar_indicadores_apos_salvar(sender, instance, raw=False, **kwargs):
+    """Aplica a inclusão/alteração no acumulado mensal."""
+    if raw:
+        return
+
+    originais = getattr(instance, '_valores_originais', None)
+    if originais:
+        data_original, valor_original = originais
+        _aplicar(sender, data_original, -valor_original)
+
+    data, valor = _valores(sender, instance)
+    _aplicar(sender, data, valor)
+
+
+@receiver(post_delete, sender=Receita)
+@receiver(post_delete, sender=Despesa)
+def atualizar_indicadores_apos_excluir(sender, instance, **kwargs):
+    """Estorna a receita/despesa excluída do acumulado mensal."""
+    data, valor = _valores(sender, instance)
+    _aplicar(sender, data, -valor)
+
+
+@receiver(post_save, sender=Receita)
+@receiver(post_delete, sender=Receita)
+@receiver(post_save, sender=Despesa)
+@receiver(post_delete, sender=Despesa)
+@receiver(post_save, sender=CapitalGiro)
+@receiver(post_delete, sender=CapitalGiro)
+def invalidar_indicadores_financeiros(sender, **kwargs):
+    """Invalida os indicadores financeiros em cache."""
+    cache.invalidar('financeiro')
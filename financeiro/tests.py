@@ -1,3 +1,752 @@
-from django.test import TestCase
+"""
+Testes do módulo Financeiro.
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+import threading
+import tracemalloc
+from datetime import date, datetime
+from decimal import Decimal
+from io import StringIO
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from gestao_erp import arquivamento
+from . import services
+from gestao_erp import cache as cache_indicadores
+from .models import (
+    CapitalGiro, CapitalGiroArquivo, Despesa, IndicadorFinanceiro, Receita, SaldoCapital, SaldoDiario,
+)
+from .periodos import adicionar_meses, intervalo_mes, primeiro_dia_mes
+
+
+class CapitalGiroTests(TestCase):
+    """Testes do saldo e do histórico de capital de giro."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('financeiro', password='senha123')
+
+    def test_saldo_atual_lido_por_chave_primaria(self):
+        CapitalGiro.adicionar_capital(Decimal('100.00'), 'Aporte', self.usuario)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(CapitalGiro.obter_capital_atual(), Decimal('100.00'))
+
+    def test_movimentacoes_encadeiam_valores(self):
+        entrada = CapitalGiro.adicionar_capital(Decimal('100.00'), 'Aporte', self.usuario)
+        saida = CapitalGiro.retirar_capital(Decimal('30.50'), 'Compra', self.usuario)
+
+        self.assertEqual(entrada.valor_novo, saida.valor_anterior)
+        self.assertEqual(saida.valor_novo, Decimal('69.50'))
+        self.assertEqual(saida.tipo_movimentacao, 'SAIDA')
+        self.assertEqual(CapitalGiro.verificar_cadeia(), [])
+
+    def test_retirada_maior_que_saldo_nao_altera_nada(self):
+        CapitalGiro.adicionar_capital(Decimal('10.00'), 'Aporte', self.usuario)
+
+        with self.assertRaisesMessage(ValueError, 'Capital insuficiente'):
+            CapitalGiro.retirar_capital(Decimal('10.01'), 'Compra', self.usuario)
+
+        self.assertEqual(CapitalGiro.obter_capital_atual(), Decimal('10.00'))
+        self.assertEqual(CapitalGiro.objects.count(), 1)
+
+    def test_cria_registro_de_saldo_quando_ausente(self):
+        SaldoCapital.objects.all().delete()
+
+        CapitalGiro.adicionar_capital(Decimal('5.00'), 'Aporte', self.usuario)
+
+        self.assertEqual(SaldoCapital.obter_valor(), Decimal('5.00'))
+
+    def test_verificar_cadeia_detecta_lacuna(self):
+        CapitalGiro.adicionar_capital(Decimal('10.00'), 'Aporte', self.usuario)
+        quebrada = CapitalGiro.adicionar_capital(Decimal('10.00'), 'Aporte', self.usuario)
+        CapitalGiro.objects.filter(pk=quebrada.pk).update(valor_anterior=Decimal('0.00'))
+
+        self.assertEqual(CapitalGiro.verificar_cadeia(), [quebrada.pk])
+
+
+class CapitalGiroConcorrenciaTests(TransactionTestCase):
+    """Teste de estresse com escritores concorrentes no capital de giro."""
+
+    THREADS = 8
+    MOVIMENTACOES_POR_THREAD = 250
+
+    def test_escritores_concorrentes_nao_perdem_movimentacoes(self):
+        usuario = User.objects.create_user('carga', password='senha123')
+        CapitalGiro.adicionar_capital(Decimal('1000.00'), 'Capital inicial', usuario)
+        erros = []
+
+        def trabalhador(indice):
+            try:
+                for numero in range(self.MOVIMENTACOES_POR_THREAD):
+                    if numero % 2:
+                        CapitalGiro.retirar_capital(Decimal('0.50'), 'Saída', usuario)
+                    else:
+                        CapitalGiro.adicionar_capital(Decimal('1.25'), 'Entrada', usuario)
+            except Exception as erro:  # pragma: no cover - reportado abaixo
+                erros.append(erro)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=trabalhador, args=(indice,))
+            for indice in range(self.THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(erros, [])
+        total = self.THREADS * self.MOVIMENTACOES_POR_THREAD
+        self.assertEqual(CapitalGiro.objects.count(), total + 1)
+
+        pares = total // 2
+        esperado = Decimal('1000.00') + pares * Decimal('1.25') - pares * Decimal('0.50')
+        self.assertEqual(CapitalGiro.obter_capital_atual(), esperado)
+        self.assertEqual(CapitalGiro.verificar_cadeia(), [])
+        self.assertEqual(SaldoDiario.objects.aggregate(total=Sum('movimentacoes'))['total'], total + 1)
+        self.assertEqual(SaldoDiario.objects.order_by('-dia').first().saldo_final, esperado)
+
+
+class SaldoDiarioTests(TestCase):
+    """Testes dos saldos diários e do saldo do capital em um momento."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_superuser('tesoureiro', password='senha123')
+
+    def lancar(self, valor, momento=None):
+        """Registra uma movimentação; com ``momento``, move-a para o passado."""
+        if valor >= 0:
+            movimentacao = CapitalGiro.adicionar_capital(valor, 'Entrada', self.usuario)
+        else:
+            movimentacao = CapitalGiro.retirar_capital(-valor, 'Saída', self.usuario)
+        if momento:
+            CapitalGiro.objects.filter(pk=movimentacao.pk).update(data_movimentacao=momento)
+        return movimentacao
+
+    def momento(self, dia, hora):
+        return timezone.make_aware(datetime(2026, 3, dia, hora))
+
+    def criar_historico(self):
+        self.lancar(Decimal('100.00'), self.momento(2, 9))
+        self.lancar(Decimal('-30.00'), self.momento(2, 15))
+        self.lancar(Decimal('50.00'), self.momento(5, 10))
+        self.lancar(Decimal('-20.00'), self.momento(5, 23))
+        SaldoDiario.reconstruir()
+
+    def test_movimentacao_atualiza_saldo_do_dia(self):
+        self.lancar(Decimal('100.00'))
+        self.lancar(Decimal('-30.50'))
+
+        saldo = SaldoDiario.objects.get(dia=timezone.localdate())
+        self.assertEqual(saldo.saldo_final, Decimal('69.50'))
+        self.assertEqual(saldo.entradas, Decimal('100.00'))
+        self.assertEqual(saldo.saidas, Decimal('30.50'))
+        self.assertEqual(saldo.movimentacoes, 2)
+        self.assertEqual(saldo.saldo_inicial, Decimal('0.00'))
+
+    def test_reconstruir_confere_com_incremental(self):
+        self.lancar(Decimal('100.00'))
+        self.lancar(Decimal('-30.50'))
+        incremental = list(SaldoDiario.objects.values_list('dia', 'saldo_final', 'entradas', 'saidas', 'movimentacoes'))
+
+        self.assertEqual(SaldoDiario.reconstruir(), 1)
+        self.assertEqual(
+            list(SaldoDiario.objects.values_list('dia', 'saldo_final', 'entradas', 'saidas', 'movimentacoes')),
+            incremental
+        )
+
+    def test_reconstruir_agrupa_por_dia_local(self):
+        self.criar_historico()
+        # 23h em São Paulo já é o dia seguinte em UTC
+        self.assertEqual(
+            list(SaldoDiario.objects.order_by('dia').values_list('dia', 'saldo_final', 'entradas', 'saidas')),
+            [
+                (date(2026, 3, 2), Decimal('70.00'), Decimal('100.00'), Decimal('30.00')),
+                (date(2026, 3, 5), Decimal('100.00'), Decimal('50.00'), Decimal('20.00')),
+            ]
+        )
+
+    def test_saldo_em(self):
+        self.criar_historico()
+        casos = [
+            (self.momento(1, 12), Decimal('0.00')),
+            (self.momento(2, 9), Decimal('100.00')),
+            (self.momento(2, 12), Decimal('100.00')),
+            (self.momento(3, 12), Decimal('70.00')),
+            (self.momento(5, 22), Decimal('120.00')),
+            (self.momento(6, 0), Decimal('100.00')),
+            (datetime(2026, 3, 5, 12), Decimal('120.00')),
+        ]
+        for momento, esperado in casos:
+            with self.subTest(momento=momento):
+                # Verificação do arquivo, movimentações do dia e saldo do dia
+                # anterior; antes do primeiro dia, mais uma para o saldo inicial
+                with self.assertNumQueries(3 if momento.day > 2 else 4):
+                    self.assertEqual(CapitalGiro.saldo_em(momento), esperado)
+
+    def test_serie_repete_saldo_nos_dias_sem_movimentacao(self):
+        self.criar_historico()
+
+        with self.assertNumQueries(3):
+            serie = SaldoDiario.serie(date(2026, 3, 1), date(2026, 3, 6))
+
+        self.assertEqual([item['saldo'] for item in serie], [
+            Decimal('0.00'), Decimal('70.00'), Decimal('70.00'),
+            Decimal('70.00'), Decimal('100.00'), Decimal('100.00'),
+        ])
+        self.assertEqual(serie[3]['entradas'], Decimal('0.00'))
+        self.assertEqual(serie[4]['saidas'], Decimal('20.00'))
+
+    def test_saldo_com_historico_arquivado(self):
+        self.criar_historico()
+        self.lancar(Decimal('10.00'))
+        saldos = list(SaldoDiario.objects.values_list('dia', 'saldo_final', 'entradas', 'saidas'))
+
+        arquivamento.arquivar(date(2026, 3, 31))
+
+        self.assertEqual(CapitalGiroArquivo.objects.count(), 4)
+        self.assertEqual(CapitalGiro.objects.count(), 1)
+        self.assertEqual(CapitalGiro.saldo_em(self.momento(5, 12)), Decimal('120.00'))
+        self.assertEqual(CapitalGiro.verificar_cadeia(), [])
+        SaldoDiario.reconstruir()
+        self.assertEqual(
+            list(SaldoDiario.objects.values_list('dia', 'saldo_final', 'entradas', 'saidas')), saldos
+        )
+        # Sem saldos diários, o saldo inicial vem do primeiro lançamento arquivado
+        SaldoDiario.objects.all().delete()
+        CapitalGiroArquivo.objects.filter(pk=CapitalGiroArquivo.objects.order_by('id')[0].pk).update(
+            valor_anterior=Decimal('5.00')
+        )
+        self.assertEqual(SaldoDiario.saldo_ate(date(2026, 3, 1)), Decimal('5.00'))
+
+    def test_api_saldo_diario(self):
+        self.criar_historico()
+        self.client.force_login(self.usuario)
+
+        resposta = self.client.get(
+            reverse('financeiro:api_saldo_diario'), {'inicio': '2026-03-04', 'fim': '2026-03-06'}
+        )
+
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.json()['dados'], [
+            {'dia': '2026-03-04', 'saldo': 70.0, 'entradas': 0.0, 'saidas': 0.0},
+            {'dia': '2026-03-05', 'saldo': 100.0, 'entradas': 50.0, 'saidas': 20.0},
+            {'dia': '2026-03-06', 'saldo': 100.0, 'entradas': 0.0, 'saidas': 0.0},
+        ])
+
+    def test_api_saldo_diario_padrao_ultimos_30_dias(self):
+        self.client.force_login(self.usuario)
+
+        dados = self.client.get(reverse('financeiro:api_saldo_diario')).json()
+
+        self.assertEqual(len(dados['dados']), 30)
+        self.assertEqual(dados['fim'], timezone.localdate().isoformat())
+
+    def test_api_saldo_diario_parametros_invalidos(self):
+        self.client.force_login(self.usuario)
+        url = reverse('financeiro:api_saldo_diario')
+
+        for parametros in (
+            {'inicio': 'ontem'},
+            {'inicio': '2026-03-06', 'fim': '2026-03-01'},
+            {'inicio': '2020-01-01', 'fim': '2026-03-01'},
+        ):
+            with self.subTest(parametros=parametros):
+                self.assertEqual(self.client.get(url, parametros).status_code, 400)
+
+    def test_api_saldo_diario_exige_permissao(self):
+        User.objects.create_user('vendedor', password='senha123')
+        self.client.login(username='vendedor', password='senha123')
+
+        resposta = self.client.get(reverse('financeiro:api_saldo_diario'))
+
+        self.assertEqual(resposta.status_code, 403)
+
+    def test_comando_reconstruir_saldos_diarios(self):
+        self.criar_historico()
+        SaldoDiario.objects.all().delete()
+        saida = StringIO()
+
+        call_command('reconstruir_saldos_diarios', stdout=saida)
+
+        self.assertIn('2 dias', saida.getvalue())
+        self.assertEqual(CapitalGiro.saldo_em(self.momento(4, 12)), Decimal('70.00'))
+
+
+class IndicadorFinanceiroTests(TestCase):
+    """Testes do acumulado mensal mantido pelos sinais de Receita/Despesa."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('indicadores', password='senha123')
+
+    def lancar(self, modelo, valor, data):
+        return modelo.objects.create(
+            descricao='Lançamento', valor=Decimal(valor), data=data, usuario=self.usuario
+        )
+
+    def indicador(self, periodo):
+        return IndicadorFinanceiro.objects.get(periodo=periodo)
+
+    def test_inclusao_acumula_no_mes(self):
+        self.lancar(Receita, '200.00', date(2025, 3, 5))
+        self.lancar(Receita, '100.00', date(2025, 3, 20))
+        self.lancar(Despesa, '150.00', date(2025, 3, 31))
+
+        indicador = self.indicador(date(2025, 3, 1))
+        self.assertEqual(indicador.total_receitas, Decimal('300.00'))
+        self.assertEqual(indicador.total_despesas, Decimal('150.00'))
+        self.assertEqual(indicador.lucro_bruto, Decimal('150.00'))
+        self.assertEqual(indicador.margem_lucro, Decimal('50.00'))
+
+    def test_alteracao_move_valor_entre_meses(self):
+        receita = self.lancar(Receita, '80.00', date(2025, 1, 10))
+
+        receita.valor = Decimal('50.00')
+        receita.data = date(2025, 2, 10)
+        receita.save()
+
+        self.assertEqual(self.indicador(date(2025, 1, 1)).total_receitas, Decimal('0.00'))
+        self.assertEqual(self.indicador(date(2025, 2, 1)).total_receitas, Decimal('50.00'))
+
+    def test_exclusao_estorna_o_mes(self):
+        despesa = self.lancar(Despesa, '40.00', date(2025, 4, 1))
+        self.lancar(Receita, '10.00', date(2025, 4, 2))
+
+        despesa.delete()
+
+        indicador = self.indicador(date(2025, 4, 1))
+        self.assertEqual(indicador.total_despesas, Decimal('0.00'))
+        self.assertEqual(indicador.lucro_bruto, Decimal('10.00'))
+
+    def test_margem_limitada_a_precisao_do_campo(self):
+        self.lancar(Receita, '1.00', date(2025, 5, 1))
+        self.lancar(Despesa, '500.00', date(2025, 5, 2))
+
+        self.assertEqual(self.indicador(date(2025, 5, 1)).margem_lucro, Decimal('-999.99'))
+
+    def test_reconstruir_recalcula_a_partir_dos_lancamentos(self):
+        self.lancar(Receita, '70.00', date(2025, 6, 1))
+        self.lancar(Despesa, '20.00', date(2025, 7, 1))
+        IndicadorFinanceiro.objects.all().delete()
+        Receita.objects.update(valor=Decimal('90.00'))
+
+        saida = StringIO()
+        call_command('reconstruir_indicadores', stdout=saida)
+
+        self.assertIn('2 meses', saida.getvalue())
+        self.assertEqual(self.indicador(date(2025, 6, 1)).total_receitas, Decimal('90.00'))
+        self.assertEqual(self.indicador(date(2025, 7, 1)).total_despesas, Decimal('20.00'))
+
+
+class ApiIndicadoresTests(TestCase):
+    """Testes da API de indicadores mensais."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('api', password='senha123')
+        cls.mes_atual = primeiro_dia_mes(timezone.localdate())
+        for i in range(24):
+            Receita.objects.create(
+                descricao='Venda', valor=Decimal('10.00') * (i + 1),
+                data=adicionar_meses(cls.mes_atual, -i), usuario=cls.usuario
+            )
+        Despesa.objects.create(
+            descricao='Aluguel', valor=Decimal('5.00'), data=cls.mes_atual, usuario=cls.usuario
+        )
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+        self.url = reverse('financeiro:api_indicadores')
+
+    def test_serie_cronologica_com_meses_vazios_zerados(self):
+        resposta = self.client.get(self.url, {'meses': 30})
+
+        dados = resposta.json()['dados']
+        self.assertEqual(len(dados), 30)
+        self.assertEqual(dados[0]['receitas'], 0.0)
+        atual = self.mes_atual
+        self.assertEqual(dados[-1], {
+            'mes': f'{atual.month:02d}/{atual.year}',
+            'receitas': 10.0,
+            'despesas': 5.0,
+            'lucro': 5.0,
+        })
+        self.assertEqual(dados[-2]['receitas'], 20.0)
+
+    def test_numero_de_consultas_independe_dos_meses(self):
+        # usuário + indicadores (a sessão vem do cache)
+        with self.assertNumQueries(2):
+            self.client.get(self.url, {'meses': 6})
+        with self.assertNumQueries(2):
+            self.client.get(self.url, {'meses': 120})
+
+    def test_meses_limitado(self):
+        resposta = self.client.get(self.url, {'meses': 100000})
+
+        self.assertEqual(len(resposta.json()['dados']), 120)
+
+    def test_meses_invalido(self):
+        self.assertEqual(self.client.get(self.url, {'meses': 'abc'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'meses': 0}).status_code, 400)
+
+
+class PeriodosTests(TestCase):
+    """Testes das funções de período mensal."""
+
+    def test_intervalo_mes_semiaberto(self):
+        self.assertEqual(intervalo_mes(date(2025, 2, 14)), (date(2025, 2, 1), date(2025, 3, 1)))
+        self.assertEqual(intervalo_mes(date(2025, 12, 31)), (date(2025, 12, 1), date(2026, 1, 1)))
+
+    def test_adicionar_meses_atravessa_anos(self):
+        self.assertEqual(adicionar_meses(date(2025, 1, 20), -1), date(2024, 12, 1))
+        self.assertEqual(adicionar_meses(date(2025, 11, 1), 14), date(2027, 1, 1))
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Plano de consulta específico do SQLite')
+class IndicesFinanceiroTests(TestCase):
+    """Garante que os filtros por período usam índices (EXPLAIN QUERY PLAN)."""
+
+    def test_filtro_mensal_usa_indice_de_data(self):
+        inicio, fim = intervalo_mes(date(2025, 3, 10))
+
+        for modelo, indice in ((Receita, 'receita_data_categoria_idx'),
+                               (Despesa, 'despesa_data_categoria_idx')):
+            with self.subTest(modelo=modelo.__name__):
+                plano = modelo.objects.filter(data__gte=inicio, data__lt=fim).explain()
+                self.assertIn(indice, plano)
+
+    def test_filtro_por_data_e_categoria_usa_indice(self):
+        inicio, fim = intervalo_mes(date(2025, 3, 10))
+
+        plano = Despesa.objects.filter(
+            data__gte=inicio, data__lt=fim, categoria='ALUGUEL'
+        ).explain()
+
+        self.assertIn('despesa_data_categoria_idx', plano)
+
+    def test_movimentacoes_de_capital_por_data_usam_indice(self):
+        plano = CapitalGiro.objects.filter(
+            data_movimentacao__gte=timezone.now()
+        ).explain()
+
+        self.assertIn('capital_data_mov_idx', plano)
+
+
+class ListaReceitasPaginacaoTests(TestCase):
+    """Testes da paginação por cursor das listagens financeiras."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('listagem', password='senha123')
+        # Datas repetidas para exercitar o desempate pelo id
+        for i in range(7):
+            Receita.objects.create(
+                descricao=f'Receita {i}', valor=Decimal('10.00'),
+                data=date(2025, 1, 1 + i // 2), usuario=cls.usuario
+            )
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+        self.url = reverse('financeiro:lista_receitas')
+
+    def percorrer(self, url):
+        """Segue os links "próxima" e retorna as URLs e respostas visitadas."""
+        visitadas = []
+        while url:
+            resposta = self.client.get(url)
+            visitadas.append((url, resposta))
+            proxima = resposta.context['pagina'].url_proxima
+            url = self.url + proxima if proxima else None
+        return visitadas
+
+    def test_percorre_todas_as_receitas_sem_repetir(self):
+        paginas = self.percorrer(self.url + '?por_pagina=3')
+
+        ids = [r.pk for _, resposta in paginas for r in resposta.context['receitas']]
+        esperado = list(Receita.objects.order_by('-data', '-id').values_list('pk', flat=True))
+        self.assertEqual(len(paginas), 3)
+        self.assertEqual(ids, esperado)
+
+    def test_totais_consideram_todo_o_filtro(self):
+        resposta = self.client.get(self.url, {'por_pagina': 2})
+
+        self.assertEqual(len(resposta.context['receitas']), 2)
+        self.assertEqual(resposta.context['quantidade_receitas'], 7)
+        self.assertEqual(resposta.context['total_receitas'], Decimal('70.00'))
+
+    def test_link_anterior_retorna_a_pagina_anterior(self):
+        primeira = self.client.get(self.url, {'por_pagina': 3})
+        segunda = self.client.get(self.url + primeira.context['pagina'].url_proxima)
+
+        voltou = self.client.get(self.url + segunda.context['pagina'].url_anterior)
+
+        self.assertEqual(list(voltou.context['receitas']), list(primeira.context['receitas']))
+        self.assertIsNone(voltou.context['pagina'].url_anterior)
+
+    def test_paginas_profundas_usam_o_mesmo_numero_de_consultas(self):
+        paginas = self.percorrer(self.url + '?por_pagina=2')
+        url_primeira, url_ultima = paginas[0][0], paginas[-1][0]
+
+        with CaptureQueriesContext(connection) as consultas_primeira:
+            self.client.get(url_primeira)
+        with CaptureQueriesContext(connection) as consultas_ultima:
+            self.client.get(url_ultima)
+
+        self.assertEqual(len(consultas_primeira), len(consultas_ultima))
+        self.assertNotIn('OFFSET', consultas_ultima[-1]['sql'])
+
+    def test_cursor_invalido_volta_para_a_primeira_pagina(self):
+        resposta = self.client.get(self.url, {'apos': 'invalido', 'por_pagina': 3})
+
+        self.assertEqual(len(resposta.context['receitas']), 3)
+        self.assertIsNone(resposta.context['pagina'].url_anterior)
+
+    def test_tamanho_de_pagina_limitado(self):
+        resposta = self.client.get(self.url, {'por_pagina': 10 ** 6})
+
+        self.assertEqual(resposta.context['pagina'].tamanho, 200)
+
+
+class ExportacaoLancamentosTests(TestCase):
+    """Testes da exportação em CSV de receitas e despesas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_superuser('contador', password='senha123')
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def criar_receitas(self, quantidade):
+        Receita.objects.bulk_create([
+            Receita(
+                descricao=f'Venda {i}', valor=Decimal('12.50'), data=date(2025, 1, 1),
+                categoria='VENDA', usuario=self.usuario
+            )
+            for i in range(quantidade)
+        ], batch_size=1000)
+
+    def consumir(self, resposta):
+        """Lê a resposta em fluxo sem guardar o conteúdo e retorna o nº de linhas."""
+        return sum(parte.count(b'\n') for parte in resposta.streaming_content)
+
+    def test_exporta_com_os_filtros_da_listagem(self):
+        Despesa.objects.create(
+            descricao='Aluguel; sala 2', valor=Decimal('1500.00'),
+            data=date(2025, 3, 5), categoria='ALUGUEL', usuario=self.usuario
+        )
+        Despesa.objects.create(
+            descricao='Luz', valor=Decimal('200.00'),
+            data=date(2025, 3, 6), categoria='OUTROS', usuario=self.usuario
+        )
+        Despesa.objects.create(
+            descricao='Aluguel antigo', valor=Decimal('1400.00'),
+            data=date(2025, 2, 5), categoria='ALUGUEL', usuario=self.usuario
+        )
+
+        resposta = self.client.get(reverse('financeiro:exportar_despesas'), {
+            'data_inicio': '2025-03-01', 'categoria': 'ALUGUEL',
+        })
+
+        self.assertTrue(resposta.streaming)
+        self.assertEqual(resposta['Content-Disposition'], 'attachment; filename="despesas.csv"')
+        conteudo = b''.join(resposta.streaming_content).decode('utf-8')
+        self.assertEqual(conteudo.splitlines(), [
+            '\ufeffData;Descrição;Categoria;Valor;Usuário',
+            '05/03/2025;"Aluguel; sala 2";ALUGUEL;1500,00;contador',
+        ])
+
+    def test_neutraliza_formulas(self):
+        Receita.objects.create(
+            descricao='=HYPERLINK("http://exemplo.com","Clique")', valor=Decimal('10.00'),
+            data=date(2025, 3, 5), categoria='VENDA', usuario=self.usuario
+        )
+        Receita.objects.create(
+            descricao='-2+3', valor=Decimal('-5.00'),
+            data=date(2025, 3, 6), categoria='VENDA', usuario=self.usuario
+        )
+
+        resposta = self.client.get(reverse('financeiro:exportar_receitas'))
+
+        conteudo = b''.join(resposta.streaming_content).decode('utf-8')
+        self.assertEqual(conteudo.splitlines()[1:], [
+            '05/03/2025;"\'=HYPERLINK(""http://exemplo.com"",""Clique"")";VENDA;10,00;contador',
+            "06/03/2025;'-2+3;VENDA;-5,00;contador",
+        ])
+
+    def test_memoria_constante_independente_da_quantidade(self):
+        def pico_de_memoria():
+            resposta = self.client.get(reverse('financeiro:exportar_receitas'))
+            tracemalloc.start()
+            try:
+                linhas = self.consumir(resposta)
+                return linhas, tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        # Ambos acima de um bloco de leitura (TAMANHO_BLOCO linhas)
+        self.criar_receitas(3000)
+        linhas_pequeno, pico_pequeno = pico_de_memoria()
+        self.criar_receitas(27000)
+        linhas_grande, pico_grande = pico_de_memoria()
+
+        self.assertEqual(linhas_pequeno, 3001)
+        self.assertEqual(linhas_grande, 30001)
+        # 10x mais linhas sem crescimento proporcional do pico de memória
+        self.assertLess(pico_grande, pico_pequeno * 1.5)
+
+
+class CacheDashboardFinanceiroTests(TestCase):
+    """Testes do cache de indicadores do dashboard financeiro."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_superuser('diretor', password='senha123')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.usuario)
+        self.url = reverse('financeiro:dashboard')
+
+    def test_segunda_visita_le_indicadores_do_cache(self):
+        # Carrega o perfil de acesso no cache antes de medir
+        self.client.get(reverse('index'))
+        with CaptureQueriesContext(connection) as primeira:
+            self.client.get(self.url)
+        with CaptureQueriesContext(connection) as segunda:
+            self.client.get(self.url)
+
+        # capital de giro, receitas do mês e despesas do mês
+        self.assertEqual(len(primeira) - len(segunda), 3)
+        estatisticas = cache_indicadores.estatisticas()['financeiro']
+        self.assertEqual((estatisticas['acertos'], estatisticas['faltas']), (1, 1))
+        self.assertEqual(estatisticas['taxa_acerto'], 0.5)
+
+    def test_lancamento_invalida_indicadores(self):
+        self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Receita.objects.create(
+                descricao='Venda', valor=Decimal('80.00'),
+                data=timezone.localdate(), usuario=self.usuario
+            )
+            CapitalGiro.adicionar_capital(Decimal('80.00'), 'Venda', self.usuario)
+
+        resposta = self.client.get(self.url)
+
+        self.assertEqual(resposta.context['receitas_mes'], Decimal('80.00'))
+        self.assertEqual(resposta.context['capital_atual'], Decimal('80.00'))
+
+    def test_invalidacao_aguarda_o_commit(self):
+        versao = cache_indicadores.obter_versao('financeiro')
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            Despesa.objects.create(
+                descricao='Luz', valor=Decimal('10.00'),
+                data=timezone.localdate(), usuario=self.usuario
+            )
+            self.assertEqual(cache_indicadores.obter_versao('financeiro'), versao)
+
+        for callback in callbacks:
+            callback()
+        self.assertGreater(cache_indicadores.obter_versao('financeiro'), versao)
+
+    def test_versao_descartada_pelo_backend_nao_volta_atras(self):
+        cache_indicadores.obter_ou_calcular('financeiro', 'teste', lambda: 'antigo')
+        versao = cache_indicadores.obter_versao('financeiro')
+        with self.captureOnCommitCallbacks(execute=True):
+            cache_indicadores.invalidar('financeiro')
+
+        # Chave de versão removida pelo limite de entradas do backend
+        cache.delete(cache_indicadores._chave_versao('financeiro'))
+
+        self.assertGreater(cache_indicadores.obter_versao('financeiro'), versao + 1)
+        self.assertEqual(
+            cache_indicadores.obter_ou_calcular('financeiro', 'teste', lambda: 'novo'), 'novo'
+        )
+
+    def test_estatisticas_expostas_para_equipe(self):
+        self.client.get(self.url)
+
+        resposta = self.client.get(reverse('estatisticas_cache'))
+
+        self.assertEqual(resposta.json()['cache']['financeiro']['faltas'], 1)
+
+    def test_estatisticas_restritas_a_equipe(self):
+        self.client.force_login(User.objects.create_user('caixa', password='senha123'))
+
+        resposta = self.client.get(reverse('estatisticas_cache'))
+
+        self.assertEqual(resposta.status_code, 302)
+
+
+
+class RelatorioFinanceiroTests(TestCase):
+    """Testes do relatório financeiro."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_superuser('contador', password='senha123')
+        hoje = timezone.localdate()
+        Receita.objects.create(descricao='Venda', valor=Decimal('90.00'), data=hoje, usuario=cls.usuario)
+        Despesa.objects.create(
+            descricao='Aluguel', valor=Decimal('40.00'), data=hoje,
+            categoria='ALUGUEL', usuario=cls.usuario
+        )
+
+    def test_totais_por_categoria(self):
+        self.client.force_login(self.usuario)
+
+        resposta = self.client.get(reverse('financeiro:relatorio'))
+
+        self.assertEqual(resposta.context['resultado'], Decimal('50.00'))
+        self.assertContains(resposta, 'Venda de Produtos')
+        self.assertContains(resposta, 'Aluguel e Condomínio')
+
+
+
+class ServicosFinanceiroTests(TestCase):
+    """Testes do registro de receitas e despesas com o capital de giro."""
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('tesoureiro', password='senha123')
+
+    def test_receita_entra_no_capital(self):
+        services.registrar_receita('Consultoria', Decimal('80.00'), date(2025, 1, 10), 'SERVICO', self.usuario)
+
+        self.assertEqual(CapitalGiro.obter_capital_atual(), Decimal('80.00'))
+        self.assertEqual(Receita.objects.count(), 1)
+
+    def test_despesa_sem_capital_nao_grava_nada(self):
+        with self.assertRaises(ValueError):
+            services.registrar_despesa('Aluguel', Decimal('10.00'), date(2025, 1, 10), 'ALUGUEL', self.usuario)
+
+        self.assertFalse(Despesa.objects.exists())
+        self.assertFalse(CapitalGiro.objects.exists())
+
+
+
+
+
+
+
+
+
+
 
-# Create your tests here.
@@ -20,10 +20,12 @@ urlpatterns = [
     # Gestão de receitas
     path('receitas/', views.lista_receitas, name='lista_receitas'),
     path('receitas/cadastrar/', views.cadastrar_receita, name='cadastrar_receita'),
+    path('receitas/exportar/', views.exportar_receitas, name='exportar_receitas'),
     
     # Gestão de despesas
     path('despesas/', views.lista_despesas, name='lista_despesas'),
     path('despesas/cadastrar/', views.cadastrar_despesa, name='cadastrar_despesa'),
+    path('despesas/exportar/', views.exportar_despesas, name='exportar_despesas'),
     
     # Capital de giro
     path('capital-giro/', views.gerenciar_capital_giro, name='capital_giro'),
@@ -33,4 +35,5 @@ urlpatterns = [
     
     # API para gráficos
     path('api/indicadores/', views.api_indicadores, name='api_indicadores'),
+    path('api/saldo-diario/', views.api_saldo_diario, name='api_saldo_diario'),
 ]
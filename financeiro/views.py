@@ -8,18 +8,35 @@ Autor: Manus AI
 Data: 2025-12-02
 """
 
+import asyncio
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, permission_required
 from django.contrib import messages
-from django.db.models import Sum, Q
+from django.db.models import Count, Sum, Q
 from django.http import JsonResponse
-from datetime import datetime, timedelta
+from django.utils import timezone
+from datetime import date, datetime, timedelta
 from decimal import Decimal
-from .models import Receita, Despesa, CapitalGiro, IndicadorFinanceiro
+from gestao_erp import assincrono, cache
+from gestao_erp.exportacao import exportar_csv
+from gestao_erp.paginacao import paginar
+from gestao_erp.roteadores import usar_replica
+from . import services
+from .models import Receita, Despesa, CapitalGiro, IndicadorFinanceiro, SaldoDiario
+from .periodos import adicionar_meses, intervalo_mes, primeiro_dia_mes
+
+
+# Quantidade máxima de meses retornada por api_indicadores
+MAX_MESES_INDICADORES = 120
+
+# Dias retornados por api_saldo_diario: padrão e máximo
+DIAS_SALDO_DIARIO = 30
+MAX_DIAS_SALDO_DIARIO = 731
 
 
 @login_required
-def dashboard_financeiro(request):
+async def dashboard_financeiro(request):
     """
     View principal do dashboard financeiro.
     
@@ -29,40 +46,58 @@ def dashboard_financeiro(request):
     - Lucro/prejuízo do período
     - Gráficos e indicadores
     
+    View assíncrona: as consultas independentes (saldo, totais do mês e
+    lançamentos recentes) são executadas em paralelo (ver
+    gestao_erp/assincrono.py).
+    
     Args:
         request: Objeto HttpRequest do Django
         
     Returns:
         HttpResponse: Renderiza o template do dashboard
     """
-    # Obter capital de giro atual
-    capital_atual = CapitalGiro.obter_capital_atual()
-    
     # Obter período atual (mês corrente)
     hoje = datetime.now().date()
-    primeiro_dia_mes = hoje.replace(day=1)
-    
-    # Calcular totais do mês
-    receitas_mes = Receita.objects.filter(
-        data__year=hoje.year,
-        data__month=hoje.month
-    ).aggregate(total=Sum('valor'))['total'] or Decimal('0.00')
-    
-    despesas_mes = Despesa.objects.filter(
-        data__year=hoje.year,
-        data__month=hoje.month
-    ).aggregate(total=Sum('valor'))['total'] or Decimal('0.00')
+    inicio_mes, fim_mes = intervalo_mes(hoje)
+    
+    def total_mes(modelo):
+        return modelo.objects.filter(
+            data__gte=inicio_mes,
+            data__lt=fim_mes
+        ).aggregate(total=Sum('valor'))['total'] or Decimal('0.00')
+    
+    async def calcular_indicadores():
+        return await assincrono.em_paralelo(
+            # Capital de giro atual
+            capital_atual=CapitalGiro.obter_capital_atual,
+            
+            # Totais do mês
+            receitas_mes=lambda: total_mes(Receita),
+            despesas_mes=lambda: total_mes(Despesa),
+        )
+    
+    # Indicadores do mês em cache (invalidados a cada lançamento financeiro)
+    # e transações recentes, ao mesmo tempo
+    indicadores, recentes = await asyncio.gather(
+        cache.aobter_ou_calcular(
+            'financeiro', f'dashboard:{inicio_mes:%Y-%m}', calcular_indicadores
+        ),
+        assincrono.em_paralelo(
+            receitas_recentes=lambda: list(Receita.objects.select_related('usuario')[:5]),
+            despesas_recentes=lambda: list(Despesa.objects.select_related('usuario')[:5]),
+            # Movimentações de capital recentes
+            movimentacoes_capital=lambda: list(
+                CapitalGiro.objects.select_related('usuario')[:5]
+            ),
+        ),
+    )
+    capital_atual = indicadores['capital_atual']
+    receitas_mes = indicadores['receitas_mes']
+    despesas_mes = indicadores['despesas_mes']
     
     # Calcular lucro/prejuízo
     resultado_mes = receitas_mes - despesas_mes
     
-    # Obter transações recentes
-    receitas_recentes = Receita.objects.all().select_related('usuario')[:5]
-    despesas_recentes = Despesa.objects.all().select_related('usuario')[:5]
-    
-    # Obter movimentações de capital recentes
-    movimentacoes_capital = CapitalGiro.objects.all().select_related('usuario')[:5]
-    
     # Calcular indicadores
     if receitas_mes > 0:
         margem_lucro = (resultado_mes / receitas_mes) * 100
@@ -76,27 +111,28 @@ def dashboard_financeiro(request):
         'despesas_mes': despesas_mes,
         'resultado_mes': resultado_mes,
         'margem_lucro': margem_lucro,
-        'receitas_recentes': receitas_recentes,
-        'despesas_recentes': despesas_recentes,
-        'movimentacoes_capital': movimentacoes_capital,
+        'receitas_recentes': recentes['receitas_recentes'],
+        'despesas_recentes': recentes['despesas_recentes'],
+        'movimentacoes_capital': recentes['movimentacoes_capital'],
         'mes_atual': hoje.strftime('%B/%Y'),
     }
     
-    return render(request, 'financeiro/dashboard.html', context)
+    return await assincrono.renderizar(request, 'financeiro/dashboard.html', context)
 
 
-@login_required
-def lista_receitas(request):
+def filtrar_lancamentos(modelo, request):
     """
-    View para listar todas as receitas cadastradas.
+    Aplica os filtros de período e categoria das listagens financeiras.
     
-    Permite filtrar receitas por período e categoria.
+    Compartilhado entre as listagens e as exportações, para que o arquivo
+    exportado contenha exatamente o que a tela mostra.
     
     Args:
+        modelo: Receita ou Despesa
         request: Objeto HttpRequest do Django
         
     Returns:
-        HttpResponse: Renderiza o template com a lista de receitas
+        tuple: (QuerySet filtrado, dicionário com os filtros aplicados)
     """
     # Obter parâmetros de filtro
     data_inicio = request.GET.get('data_inicio')
@@ -104,29 +140,57 @@ def lista_receitas(request):
     categoria = request.GET.get('categoria')
     
     # Iniciar query
-    receitas = Receita.objects.all().select_related('usuario')
+    lancamentos = modelo.objects.all()
     
     # Aplicar filtros
     if data_inicio:
-        receitas = receitas.filter(data__gte=data_inicio)
+        lancamentos = lancamentos.filter(data__gte=data_inicio)
     if data_fim:
-        receitas = receitas.filter(data__lte=data_fim)
+        lancamentos = lancamentos.filter(data__lte=data_fim)
     if categoria:
-        receitas = receitas.filter(categoria=categoria)
+        lancamentos = lancamentos.filter(categoria=categoria)
+    
+    filtros = {
+        'data_inicio': data_inicio,
+        'data_fim': data_fim,
+        'categoria': categoria,
+    }
     
-    # Calcular total
-    total_receitas = receitas.aggregate(total=Sum('valor'))['total'] or Decimal('0.00')
+    return lancamentos, filtros
+
+
+@login_required
+def lista_receitas(request):
+    """
+    View para listar todas as receitas cadastradas.
+    
+    Permite filtrar receitas por período e categoria.
+    
+    Args:
+        request: Objeto HttpRequest do Django
+        
+    Returns:
+        HttpResponse: Renderiza o template com a lista de receitas
+    """
+    # Aplicar filtros de período e categoria
+    receitas, filtros = filtrar_lancamentos(Receita, request)
+    receitas = receitas.select_related('usuario')
+    
+    # Calcular total e quantidade do filtro completo (uma consulta)
+    totais = receitas.aggregate(total=Sum('valor'), quantidade=Count('id'))
+    total_receitas = totais['total'] or Decimal('0.00')
+    
+    # Paginar por cursor (mais recentes primeiro)
+    pagina = paginar(receitas, request, ordenacao=('-data', '-id'))
     
     # Preparar contexto
     context = {
-        'receitas': receitas,
+        'receitas': pagina.itens,
+        'pagina': pagina,
         'total_receitas': total_receitas,
+        'quantidade_receitas': totais['quantidade'],
         'categorias': Receita.CATEGORIAS,
-        'filtros': {
-            'data_inicio': data_inicio,
-            'data_fim': data_fim,
-            'categoria': categoria,
-        }
+        'filtros': filtros,
     }
     
     return render(request, 'financeiro/lista_receitas.html', context)
@@ -145,40 +209,76 @@ def lista_despesas(request):
     Returns:
         HttpResponse: Renderiza o template com a lista de despesas
     """
-    # Obter parâmetros de filtro
-    data_inicio = request.GET.get('data_inicio')
-    data_fim = request.GET.get('data_fim')
-    categoria = request.GET.get('categoria')
-    
-    # Iniciar query
-    despesas = Despesa.objects.all().select_related('usuario')
+    # Aplicar filtros de período e categoria
+    despesas, filtros = filtrar_lancamentos(Despesa, request)
+    despesas = despesas.select_related('usuario')
     
-    # Aplicar filtros
-    if data_inicio:
-        despesas = despesas.filter(data__gte=data_inicio)
-    if data_fim:
-        despesas = despesas.filter(data__lte=data_fim)
-    if categoria:
-        despesas = despesas.filter(categoria=categoria)
+    # Calcular total e quantidade do filtro completo (uma consulta)
+    totais = despesas.aggregate(total=Sum('valor'), quantidade=Count('id'))
+    total_despesas = totais['total'] or Decimal('0.00')
     
-    # Calcular total
-    total_despesas = despesas.aggregate(total=Sum('valor'))['total'] or Decimal('0.00')
+    # Paginar por cursor (mais recentes primeiro)
+    pagina = paginar(despesas, request, ordenacao=('-data', '-id'))
     
     # Preparar contexto
     context = {
-        'despesas': despesas,
+        'despesas': pagina.itens,
+        'pagina': pagina,
         'total_despesas': total_despesas,
+        'quantidade_despesas': totais['quantidade'],
         'categorias': Despesa.CATEGORIAS,
-        'filtros': {
-            'data_inicio': data_inicio,
-            'data_fim': data_fim,
-            'categoria': categoria,
-        }
+        'filtros': filtros,
     }
     
     return render(request, 'financeiro/lista_despesas.html', context)
 
 
+# Colunas exportadas de receitas e despesas (campo, título)
+COLUNAS_EXPORTACAO = [
+    ('data', 'Data'),
+    ('descricao', 'Descrição'),
+    ('categoria', 'Categoria'),
+    ('valor', 'Valor'),
+    ('usuario__username', 'Usuário'),
+]
+
+
+@login_required
+@permission_required('financeiro.view_receita', raise_exception=True)
+def exportar_receitas(request):
+    """
+    Exporta as receitas em CSV, com os mesmos filtros de lista_receitas.
+    
+    Args:
+        request: Objeto HttpRequest do Django
+        
+    Returns:
+        StreamingHttpResponse: Arquivo CSV gerado em fluxo
+    """
+    receitas, _ = filtrar_lancamentos(Receita, request)
+    return exportar_csv(
+        receitas.order_by('data', 'id'), COLUNAS_EXPORTACAO, 'receitas.csv'
+    )
+
+
+@login_required
+@permission_required('financeiro.view_despesa', raise_exception=True)
+def exportar_despesas(request):
+    """
+    Exporta as despesas em CSV, com os mesmos filtros de lista_despesas.
+    
+    Args:
+        request: Objeto HttpRequest do Django
+        
+    Returns:
+        StreamingHttpResponse: Arquivo CSV gerado em fluxo
+    """
+    despesas, _ = filtrar_lancamentos(Despesa, request)
+    return exportar_csv(
+        despesas.order_by('data', 'id'), COLUNAS_EXPORTACAO, 'despesas.csv'
+    )
+
+
 @login_required
 @permission_required('financeiro.add_receita', raise_exception=True)
 def cadastrar_receita(request):
@@ -193,22 +293,14 @@ def cadastrar_receita(request):
     """
     if request.method == 'POST':
         try:
-            # Criar nova receita
-            receita = Receita(
+            # Gravar a receita e o capital de giro juntos
+            receita = services.registrar_receita(
                 descricao=request.POST.get('descricao'),
-                valor=request.POST.get('valor'),
+                valor=Decimal(request.POST.get('valor')),
                 data=request.POST.get('data'),
                 categoria=request.POST.get('categoria', 'OUTROS'),
                 usuario=request.user
             )
-            receita.save()
-            
-            # Adicionar ao capital de giro
-            CapitalGiro.adicionar_capital(
-                valor=receita.valor,
-                descricao=f'Receita: {receita.descricao}',
-                usuario=request.user
-            )
             
             # Mensagem de sucesso
             messages.success(
@@ -244,22 +336,14 @@ def cadastrar_despesa(request):
     """
     if request.method == 'POST':
         try:
-            # Criar nova despesa
-            despesa = Despesa(
+            # Gravar a despesa e o capital de giro juntos
+            despesa = services.registrar_despesa(
                 descricao=request.POST.get('descricao'),
-                valor=request.POST.get('valor'),
+                valor=Decimal(request.POST.get('valor')),
                 data=request.POST.get('data'),
                 categoria=request.POST.get('categoria', 'OUTROS'),
                 usuario=request.user
             )
-            despesa.save()
-            
-            # Retirar do capital de giro
-            CapitalGiro.retirar_capital(
-                valor=despesa.valor,
-                descricao=f'Despesa: {despesa.descricao}',
-                usuario=request.user
-            )
             
             # Mensagem de sucesso
             messages.success(
@@ -346,6 +430,7 @@ def gerenciar_capital_giro(request):
 
 
 @login_required
+@usar_replica
 def relatorio_financeiro(request):
     """
     View para gerar relatório financeiro completo.
@@ -384,6 +469,18 @@ def relatorio_financeiro(request):
         total=Sum('valor')
     ).order_by('-total')
     
+    # Nome de exibição de cada categoria
+    rotulos_receita = dict(Receita.CATEGORIAS)
+    rotulos_despesa = dict(Despesa.CATEGORIAS)
+    receitas_por_categoria = [
+        dict(item, rotulo=rotulos_receita.get(item['categoria'], item['categoria']))
+        for item in receitas_por_categoria
+    ]
+    despesas_por_categoria = [
+        dict(item, rotulo=rotulos_despesa.get(item['categoria'], item['categoria']))
+        for item in despesas_por_categoria
+    ]
+    
     # Calcular totais gerais
     total_receitas = sum(item['total'] for item in receitas_por_categoria)
     total_despesas = sum(item['total'] for item in despesas_por_categoria)
@@ -405,6 +502,7 @@ def relatorio_financeiro(request):
 
 
 @login_required
+@usar_replica
 def api_indicadores(request):
     """
     API para retornar indicadores financeiros em JSON.
@@ -417,41 +515,84 @@ def api_indicadores(request):
     Returns:
         JsonResponse: Dados dos indicadores em formato JSON
     """
-    # Obter período
-    meses = int(request.GET.get('meses', 6))
+    # Obter período (limitado para evitar consultas arbitrariamente grandes)
+    try:
+        meses = int(request.GET.get('meses', 6))
+    except ValueError:
+        return JsonResponse({'erro': 'Parâmetro "meses" inválido.'}, status=400)
+    if meses < 1:
+        return JsonResponse({'erro': 'Parâmetro "meses" deve ser positivo.'}, status=400)
+    meses = min(meses, MAX_MESES_INDICADORES)
+    
+    # Uma única consulta ao acumulado mensal, em vez de somar cada mês
+    mes_atual = primeiro_dia_mes(timezone.localdate())
+    mes_inicial = adicionar_meses(mes_atual, -(meses - 1))
+    indicadores = {
+        indicador.periodo: indicador
+        for indicador in IndicadorFinanceiro.objects.filter(
+            periodo__gte=mes_inicial,
+            periodo__lte=mes_atual
+        )
+    }
     
-    # Calcular dados por mês
+    # Montar a série em ordem cronológica (meses sem lançamentos ficam zerados)
     dados = []
-    hoje = datetime.now().date()
-    
     for i in range(meses):
-        # Calcular o primeiro dia do mês
-        if hoje.month - i <= 0:
-            mes = 12 + (hoje.month - i)
-            ano = hoje.year - 1
-        else:
-            mes = hoje.month - i
-            ano = hoje.year
-        
-        # Calcular totais do mês
-        receitas = Receita.objects.filter(
-            data__year=ano,
-            data__month=mes
-        ).aggregate(total=Sum('valor'))['total'] or 0
-        
-        despesas = Despesa.objects.filter(
-            data__year=ano,
-            data__month=mes
-        ).aggregate(total=Sum('valor'))['total'] or 0
+        periodo = adicionar_meses(mes_inicial, i)
+        indicador = indicadores.get(periodo)
+        receitas = indicador.total_receitas if indicador else Decimal('0.00')
+        despesas = indicador.total_despesas if indicador else Decimal('0.00')
         
         dados.append({
-            'mes': f'{mes:02d}/{ano}',
+            'mes': f'{periodo.month:02d}/{periodo.year}',
             'receitas': float(receitas),
             'despesas': float(despesas),
             'lucro': float(receitas - despesas)
         })
     
-    # Inverter para ordem cronológica
-    dados.reverse()
-    
     return JsonResponse({'dados': dados})
+
+
+@login_required
+@permission_required('financeiro.view_capitalgiro', raise_exception=True)
+@usar_replica
+def api_saldo_diario(request):
+    """
+    API da série diária do saldo do capital de giro, para gráficos.
+    
+    Parâmetros GET: ``inicio`` e ``fim`` (AAAA-MM-DD; padrão: os últimos
+    30 dias até hoje). Lê apenas os saldos diários (SaldoDiario), sem
+    percorrer o histórico de movimentações.
+    
+    Args:
+        request: Objeto HttpRequest do Django
+        
+    Returns:
+        JsonResponse: Saldo final, entradas e saídas de cada dia
+    """
+    hoje = timezone.localdate()
+    try:
+        fim = date.fromisoformat(request.GET.get('fim') or hoje.isoformat())
+        inicio = date.fromisoformat(
+            request.GET.get('inicio') or (fim - timedelta(days=DIAS_SALDO_DIARIO - 1)).isoformat()
+        )
+    except ValueError:
+        return JsonResponse({'erro': 'Parâmetros "inicio" e "fim" devem usar AAAA-MM-DD.'}, status=400)
+    if inicio > fim:
+        return JsonResponse({'erro': '"inicio" deve ser anterior a "fim".'}, status=400)
+    if (fim - inicio).days >= MAX_DIAS_SALDO_DIARIO:
+        return JsonResponse(
+            {'erro': f'Período limitado a {MAX_DIAS_SALDO_DIARIO} dias.'}, status=400
+        )
+    
+    dados = [
+        {
+            'dia': item['dia'].isoformat(),
+            'saldo': float(item['saldo']),
+            'entradas': float(item['entradas']),
+            'saidas': float(item['saidas'])
+        }
+        for item in SaldoDiario.serie(inicio, fim)
+    ]
+    
+    return JsonResponse({'inicio': inicio.isoformat(), 'fim': fim.isoformat(), 'dados': dados})
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class GestaoErpConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'gestao_erp'
+    verbose_name = 'Gestão ERP'
+
+    def ready(self):
+        # Registrar os sinais que invalidam as permissões em cache
+        from . import signals  # noqa: F401
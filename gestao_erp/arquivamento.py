@@ -0,0 +1,238 @@
+"""
+Arquivamento do histórico de movimentações de estoque e de capital de giro.
+
+``arquivar`` move as movimentações de meses encerrados das tabelas
+principais para as tabelas ``*_arquivo`` (MovimentacaoEstoqueArquivo e
+CapitalGiroArquivo, mesmas colunas e mesmos ids), em lotes de uma
+transação cada. No lugar ficam os resumos:
+- ResumoMovimentacaoArquivada: totais mensais por produto e tipo,
+  atualizados no mesmo lote;
+- SaldoDiario: saldo, entradas e saídas do capital em cada dia (já
+  mantido a cada lançamento).
+
+As tabelas principais, as listagens do admin e os índices ficam do
+tamanho do período em aberto. As leituras que alcançam períodos
+arquivados (relatório de vendas, exportação, snapshots, saldo em um
+momento) consultam também as tabelas de arquivo (``fontes`` dos modelos
+de arquivo). ``restaurar`` devolve um mês às tabelas principais.
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, time as horario
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from estoque.models import MovimentacaoEstoque, MovimentacaoEstoqueArquivo, ResumoMovimentacaoArquivada
+from financeiro.models import CapitalGiro, CapitalGiroArquivo
+from financeiro.periodos import adicionar_meses, primeiro_dia_mes
+from gestao_erp import cache
+from gestao_erp.modelos import datas_informadas
+
+
+# Linhas movidas por transação
+TAMANHO_LOTE = 5000
+
+CAMPOS_MOVIMENTACAO = (
+    'id', 'produto_id', 'tipo', 'quantidade', 'valor_unitario',
+    'observacao', 'usuario_id', 'data_movimentacao',
+)
+CAMPOS_CAPITAL = (
+    'id', 'valor_anterior', 'valor_novo', 'tipo_movimentacao',
+    'descricao', 'usuario_id', 'data_movimentacao',
+)
+
+
+@dataclass
+class ResultadoArquivamento:
+    """Linhas movidas por ``arquivar`` ou ``restaurar``."""
+
+    movimentacoes: int = 0
+    lancamentos_capital: int = 0
+    meses: list = field(default_factory=list)
+    duracao: float = 0.0
+
+
+def inicio_do_mes(mes):
+    """Primeiro instante do mês no fuso local."""
+    return timezone.make_aware(datetime.combine(primeiro_dia_mes(mes), horario.min))
+
+
+def mes_local(momento):
+    """Primeiro dia do mês de ``momento`` no fuso local."""
+    return primeiro_dia_mes(timezone.localtime(momento).date())
+
+
+def _meses(modelos, filtro=Q()):
+    """Meses (no fuso local) com movimentações nos modelos."""
+    return sorted({
+        mes_local(momento)
+        for modelo in modelos
+        for momento in modelo.objects.filter(filtro).datetimes('data_movimentacao', 'month')
+    })
+
+
+def _acumular_resumo(linhas, sinal):
+    """
+    Soma (``sinal`` 1) ou subtrai (-1) as movimentações dos resumos mensais.
+
+    Três consultas por lote: resumos existentes, gravação e exclusão dos
+    que ficaram sem movimentações.
+    """
+    variacoes = {}
+    for linha in linhas:
+        chave = (linha['produto_id'], mes_local(linha['data_movimentacao']), linha['tipo'])
+        quantidade, valor, movimentacoes = variacoes.get(chave, (0, Decimal('0.00'), 0))
+        variacoes[chave] = (
+            quantidade + sinal * linha['quantidade'],
+            valor + sinal * linha['quantidade'] * linha['valor_unitario'],
+            movimentacoes + sinal,
+        )
+
+    existentes = {
+        (resumo.produto_id, resumo.mes, resumo.tipo): resumo
+        for resumo in ResumoMovimentacaoArquivada.objects.filter(
+            produto_id__in={chave[0] for chave in variacoes},
+            mes__in={chave[1] for chave in variacoes},
+        )
+    }
+
+    gravar, excluir = [], []
+    for (produto_id, mes, tipo), (quantidade, valor, movimentacoes) in variacoes.items():
+        resumo = existentes.get((produto_id, mes, tipo)) or ResumoMovimentacaoArquivada(
+            produto_id=produto_id, mes=mes, tipo=tipo
+        )
+        resumo.quantidade += quantidade
+        resumo.valor_total += valor
+        resumo.movimentacoes += movimentacoes
+        if resumo.movimentacoes > 0:
+            gravar.append(resumo)
+        elif resumo.pk:
+            excluir.append(resumo.pk)
+
+    ResumoMovimentacaoArquivada.objects.bulk_create(
+        gravar,
+        update_conflicts=True,
+        unique_fields=['produto', 'mes', 'tipo'],
+        update_fields=['quantidade', 'valor_total', 'movimentacoes'],
+    )
+    if excluir:
+        ResumoMovimentacaoArquivada.objects.filter(pk__in=excluir).delete()
+
+
+def _mover(origem, destino, filtro, campos, tamanho_lote, ao_mover=None):
+    """
+    Move as linhas de ``origem`` que atendem ``filtro`` para ``destino``.
+
+    Cada lote (em ordem de id) é copiado, passado a ``ao_mover`` e
+    excluído da origem na mesma transação: uma interrupção não perde nem
+    duplica linhas. A exclusão é direta, sem sinais: arquivar não é
+    alterar as movimentações.
+
+    Returns:
+        int: Linhas movidas
+    """
+    movidas = 0
+    while True:
+        with transaction.atomic():
+            linhas = list(
+                origem.objects.filter(filtro).order_by('pk').values(*campos)[:tamanho_lote]
+            )
+            if not linhas:
+                return movidas
+
+            destino.objects.bulk_create([destino(**linha) for linha in linhas])
+            if ao_mover:
+                ao_mover(linhas)
+            copiadas = origem.objects.filter(filtro, pk__lte=linhas[-1]['id'])
+            copiadas._raw_delete(copiadas.db)
+
+        movidas += len(linhas)
+
+
+def arquivar(ate, tamanho_lote=TAMANHO_LOTE):
+    """
+    Arquiva as movimentações de estoque e de capital até o mês de ``ate``.
+
+    Args:
+        ate (date): Último mês arquivado (qualquer dia do mês); precisa
+            estar encerrado
+        tamanho_lote (int): Linhas movidas por transação
+
+    Returns:
+        ResultadoArquivamento: Linhas movidas
+
+    Raises:
+        ValueError: Se o mês ainda não terminou
+    """
+    inicio = time.perf_counter()
+    if primeiro_dia_mes(ate) >= primeiro_dia_mes(timezone.localdate()):
+        raise ValueError('Só é possível arquivar meses encerrados.')
+
+    filtro = Q(data_movimentacao__lt=inicio_do_mes(adicionar_meses(ate, 1)))
+    resultado = ResultadoArquivamento(meses=_meses((MovimentacaoEstoque, CapitalGiro), filtro))
+
+    resultado.movimentacoes = _mover(
+        MovimentacaoEstoque, MovimentacaoEstoqueArquivo, filtro, CAMPOS_MOVIMENTACAO,
+        tamanho_lote, ao_mover=lambda linhas: _acumular_resumo(linhas, 1)
+    )
+    resultado.lancamentos_capital = _mover(
+        CapitalGiro, CapitalGiroArquivo, filtro, CAMPOS_CAPITAL, tamanho_lote
+    )
+
+    cache.invalidar('estoque', 'financeiro')
+    resultado.duracao = time.perf_counter() - inicio
+    return resultado
+
+
+def restaurar(mes, tamanho_lote=TAMANHO_LOTE):
+    """
+    Devolve as movimentações arquivadas de um mês às tabelas principais.
+
+    As movimentações voltam com os ids e as datas originais; o estoque e o
+    saldo atuais não são alterados (já as incluem).
+
+    Args:
+        mes (date): Mês restaurado (qualquer dia do mês)
+        tamanho_lote (int): Linhas movidas por transação
+
+    Returns:
+        ResultadoArquivamento: Linhas movidas
+    """
+    inicio = time.perf_counter()
+    filtro = Q(
+        data_movimentacao__gte=inicio_do_mes(mes),
+        data_movimentacao__lt=inicio_do_mes(adicionar_meses(mes, 1)),
+    )
+    resultado = ResultadoArquivamento(
+        meses=_meses((MovimentacaoEstoqueArquivo, CapitalGiroArquivo), filtro)
+    )
+
+    with datas_informadas(MovimentacaoEstoque, CapitalGiro):
+        resultado.movimentacoes = _mover(
+            MovimentacaoEstoqueArquivo, MovimentacaoEstoque, filtro, CAMPOS_MOVIMENTACAO,
+            tamanho_lote, ao_mover=lambda linhas: _acumular_resumo(linhas, -1)
+        )
+        resultado.lancamentos_capital = _mover(
+            CapitalGiroArquivo, CapitalGiro, filtro, CAMPOS_CAPITAL, tamanho_lote
+        )
+
+    cache.invalidar('estoque', 'financeiro')
+    resultado.duracao = time.perf_counter() - inicio
+    return resultado
+
+
+def meses_arquivados():
+    """
+    Meses com movimentações arquivadas (estoque ou capital).
+
+    Returns:
+        list: Primeiro dia de cada mês, em ordem
+    """
+    return _meses((MovimentacaoEstoqueArquivo, CapitalGiroArquivo))
@@ -0,0 +1,126 @@
+"""
+Consultas independentes executadas em paralelo nas views assíncronas.
+
+``em_paralelo`` recebe funções síncronas (consultas do ORM) e as executa
+ao mesmo tempo, cada uma em uma thread de um pool próprio
+(``settings.CONSULTAS_PARALELAS`` threads) e, portanto, em uma conexão
+própria com o banco. A latência do conjunto passa a ser a da consulta mais
+lenta, e não a soma de todas.
+
+As consultas voltam a ser executadas uma após a outra, na conexão da
+requisição, quando:
+- ``CONSULTAS_PARALELAS`` é menor que 2;
+- a conexão da requisição está dentro de uma transação (``ATOMIC_REQUESTS``
+  ou testes com ``TestCase``): outras conexões não enxergariam os dados
+  ainda não confirmados.
+
+As consultas paralelas são contadas na medição da requisição (ver
+desempenho.py). Ao final de cada uma, a conexão da thread é fechada ou
+mantida conforme ``CONN_MAX_AGE`` (ou devolvida ao pool, no PostgreSQL).
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.shortcuts import render
+
+from . import desempenho
+
+
+# Threads do pool quando CONSULTAS_PARALELAS não está configurado
+CONSULTAS_PARALELAS_PADRAO = 4
+
+_executores = {}
+_trava = threading.Lock()
+
+
+def _obter_executor(tamanho):
+    """Retorna o pool de threads com ``tamanho`` threads (criado uma vez)."""
+    with _trava:
+        if tamanho not in _executores:
+            _executores[tamanho] = ThreadPoolExecutor(
+                max_workers=tamanho, thread_name_prefix='consultas'
+            )
+        return _executores[tamanho]
+
+
+def _executar_isolada(funcao):
+    """Executa uma consulta em uma thread do pool, com a conexão dela."""
+    medicao = desempenho.medicao_atual()
+    try:
+        if medicao is None:
+            return funcao()
+        with connection.execute_wrapper(medicao):
+            return funcao()
+    finally:
+        close_old_connections()
+
+
+def _executar_em_sequencia(consultas):
+    return {nome: funcao() for nome, funcao in consultas.items()}
+
+
+def _em_transacao():
+    return connection.in_atomic_block
+
+
+async def em_paralelo(**consultas):
+    """
+    Executa consultas síncronas independentes ao mesmo tempo.
+
+    Cada função deve devolver dados já avaliados (listas, números,
+    dicionários), não querysets: a avaliação preguiçosa aconteceria depois,
+    fora da thread da consulta.
+
+    Exemplo::
+
+        dados = await em_paralelo(
+            capital=CapitalGiro.obter_capital_atual,
+            recentes=lambda: list(Receita.objects.all()[:5]),
+        )
+
+    Args:
+        **consultas (callable): Funções sem argumentos, por nome
+
+    Returns:
+        dict: Resultado de cada função, pelo mesmo nome
+    """
+    tamanho = getattr(settings, 'CONSULTAS_PARALELAS', CONSULTAS_PARALELAS_PADRAO)
+
+    if tamanho < 2 or len(consultas) < 2 or await sync_to_async(_em_transacao)():
+        return await sync_to_async(_executar_em_sequencia)(consultas)
+
+    executor = _obter_executor(tamanho)
+    resultados = await asyncio.gather(*(
+        sync_to_async(_executar_isolada, thread_sensitive=False, executor=executor)(funcao)
+        for funcao in consultas.values()
+    ))
+    return dict(zip(consultas, resultados))
+
+
+async def renderizar(request, template, context):
+    """
+    Renderiza um template a partir de uma view assíncrona.
+
+    A renderização (e os context processors, que consultam o banco) roda no
+    contexto síncrono. O usuário já carregado por ``request.auser()`` (em
+    ``login_required``) é reaproveitado: ``request.user`` tem um cache
+    separado e o buscaria de novo.
+
+    Args:
+        request: Objeto HttpRequest do Django
+        template (str): Nome do template
+        context (dict): Contexto do template
+
+    Returns:
+        HttpResponse: Resposta renderizada
+    """
+    request.user = await request.auser()
+    return await sync_to_async(render)(request, template, context)
@@ -0,0 +1,465 @@
+"""
+Configuração do banco de dados (SQLite ou PostgreSQL).
+
+``configuracao_banco`` monta a entrada de ``DATABASES`` a partir das
+variáveis de ambiente ``GESTAO_DB_*`` (ver settings.py): SQLite por padrão,
+PostgreSQL com ``GESTAO_DB_ENGINE=postgresql``.
+
+No PostgreSQL, as conexões vêm do pool nativo do Django (psycopg 3,
+``OPTIONS['pool']``) ou, com o pool desligado, são reaproveitadas entre
+requisições por ``CONN_MAX_AGE``. Os cursores do lado do servidor ficam
+ativos: ``QuerySet.iterator()`` (exportações CSV, verificação da cadeia do
+capital, reconstrução de indicadores) lê os dados em blocos sem carregar o
+resultado inteiro na memória.
+
+No SQLite, o perfil ``producao`` aplica em cada nova conexão:
+- ``journal_mode=WAL``: leitores não bloqueiam o escritor e vice-versa
+  (com o journal padrão, qualquer escrita bloqueia os dashboards);
+- ``synchronous=NORMAL``: seguro com WAL, evita um fsync por transação;
+- ``busy_timeout``: espera a trava em vez de falhar na hora;
+- ``cache_size``, ``mmap_size`` e ``temp_store``: mais páginas em memória e
+  tabelas temporárias (ordenações, agrupamentos) fora do disco.
+
+Também abre as transações com ``BEGIN IMMEDIATE``: a trava de escrita é
+obtida no início do ``transaction.atomic()``. Com ``BEGIN`` (DEFERRED),
+duas transações que leem e depois escrevem podem travar uma à outra, e o
+SQLite responde ``database is locked`` sem esperar o busy_timeout.
+
+O perfil ``padrao`` mantém o comportamento do SQLite sem ajustes (útil para
+comparar). ``medir_concorrencia`` mede leituras e escritas concorrentes em
+um banco temporário com cada perfil (comando ``benchmark_sqlite``).
+
+``configuracao_replica`` monta o alias ``replica``, usado pelos relatórios
+(ver roteadores.py): no SQLite, uma cópia do banco atualizada pelo comando
+``atualizar_replica`` e aberta só para leitura; no PostgreSQL, um servidor
+réplica (``GESTAO_DB_REPLICA_HOST``).
+
+Este módulo é importado por settings.py e não depende do Django nem do
+psycopg.
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+
+# Tempo (segundos) aguardando o banco liberar uma trava
+TEMPO_ESPERA = 20
+
+PERFIS_SQLITE = {
+    'padrao': {
+        'pragmas': {},
+        'transaction_mode': None,
+    },
+    'producao': {
+        'pragmas': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'busy_timeout': TEMPO_ESPERA * 1000,
+            # Negativo = tamanho em KiB (64 MiB por conexão)
+            'cache_size': -64000,
+            'mmap_size': 256 * 1024 * 1024,
+            'temp_store': 'MEMORY',
+        },
+        'transaction_mode': 'IMMEDIATE',
+    },
+}
+
+PERFIL_PADRAO = 'producao'
+
+
+def comando_inicial(pragmas):
+    """
+    Monta o ``init_command`` com os pragmas (um por comando).
+
+    Args:
+        pragmas (dict): Nome e valor de cada pragma
+
+    Returns:
+        str: Comandos separados por ``;``
+    """
+    return ';'.join(f'PRAGMA {nome}={valor}' for nome, valor in pragmas.items())
+
+
+def configuracao_sqlite(nome, nome_teste=None, perfil=PERFIL_PADRAO):
+    """
+    Monta a entrada de ``DATABASES`` para um banco SQLite.
+
+    Args:
+        nome (Path ou str): Arquivo do banco
+        nome_teste (Path ou str): Arquivo do banco de testes (opcional)
+        perfil (str): Chave de ``PERFIS_SQLITE``
+
+    Returns:
+        dict: Configuração do banco
+
+    Raises:
+        ValueError: Se o perfil não existir
+    """
+    if perfil not in PERFIS_SQLITE:
+        raise ValueError(
+            f"Perfil SQLite desconhecido: {perfil!r} (use {', '.join(PERFIS_SQLITE)})"
+        )
+    configuracao = PERFIS_SQLITE[perfil]
+
+    opcoes = {'timeout': TEMPO_ESPERA}
+    if configuracao['pragmas']:
+        opcoes['init_command'] = comando_inicial(configuracao['pragmas'])
+    if configuracao['transaction_mode']:
+        opcoes['transaction_mode'] = configuracao['transaction_mode']
+
+    banco = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': nome,
+        'OPTIONS': opcoes,
+    }
+    if nome_teste:
+        banco['TEST'] = {'NAME': nome_teste}
+    return banco
+
+
+def configuracao_postgresql(ambiente):
+    """
+    Monta a entrada de ``DATABASES`` para o PostgreSQL.
+
+    Variáveis lidas de ``ambiente``:
+    - ``GESTAO_DB_NOME``, ``GESTAO_DB_USUARIO``, ``GESTAO_DB_SENHA``,
+      ``GESTAO_DB_HOST`` e ``GESTAO_DB_PORTA``: conexão;
+    - ``GESTAO_DB_POOL`` (padrão ``1``): usa o pool de conexões, com
+      ``GESTAO_DB_POOL_MIN``/``GESTAO_DB_POOL_MAX`` conexões por processo;
+    - ``GESTAO_DB_CONN_MAX_AGE`` (padrão 60): segundos que uma conexão é
+      reaproveitada quando o pool está desligado;
+    - ``GESTAO_DB_SEM_CURSOR_SERVIDOR``: desliga os cursores do lado do
+      servidor (necessário atrás de um PgBouncer em modo transação).
+
+    Args:
+        ambiente (dict): Variáveis de ambiente
+
+    Returns:
+        dict: Configuração do banco
+    """
+    def ligado(nome, padrao):
+        return ambiente.get(nome, padrao).strip().lower() in ('1', 'true', 'sim')
+
+    banco = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': ambiente.get('GESTAO_DB_NOME', 'gestao_erp'),
+        'USER': ambiente.get('GESTAO_DB_USUARIO', ''),
+        'PASSWORD': ambiente.get('GESTAO_DB_SENHA', ''),
+        'HOST': ambiente.get('GESTAO_DB_HOST', 'localhost'),
+        'PORT': ambiente.get('GESTAO_DB_PORTA', '5432'),
+        'OPTIONS': {},
+        'DISABLE_SERVER_SIDE_CURSORS': ligado('GESTAO_DB_SEM_CURSOR_SERVIDOR', '0'),
+        'TEST': {'NAME': ambiente.get('GESTAO_DB_NOME_TESTE') or None},
+    }
+
+    if ligado('GESTAO_DB_POOL', '1'):
+        # Conexões persistentes e pool são exclusivos no Django
+        banco['CONN_MAX_AGE'] = 0
+        banco['OPTIONS']['pool'] = {
+            'min_size': int(ambiente.get('GESTAO_DB_POOL_MIN', 2)),
+            'max_size': int(ambiente.get('GESTAO_DB_POOL_MAX', 10)),
+            # Segundos aguardando uma conexão livre antes de falhar
+            'timeout': TEMPO_ESPERA,
+        }
+    else:
+        banco['CONN_MAX_AGE'] = int(ambiente.get('GESTAO_DB_CONN_MAX_AGE', 60))
+        banco['CONN_HEALTH_CHECKS'] = True
+
+    return banco
+
+
+def configuracao_banco(diretorio_base, ambiente=None):
+    """
+    Monta a entrada ``default`` de ``DATABASES`` a partir do ambiente.
+
+    ``GESTAO_DB_ENGINE`` escolhe o banco: ``sqlite`` (padrão, arquivos
+    ``db.sqlite3`` e ``test_db.sqlite3`` em ``diretorio_base``, perfil em
+    ``GESTAO_SQLITE_PERFIL``) ou ``postgresql`` (ver
+    ``configuracao_postgresql``).
+
+    Args:
+        diretorio_base (Path): Diretório do projeto
+        ambiente (dict): Variáveis de ambiente (padrão: ``os.environ``)
+
+    Returns:
+        dict: Configuração do banco
+
+    Raises:
+        ValueError: Banco ou perfil desconhecido
+    """
+    if ambiente is None:
+        ambiente = os.environ
+
+    motor = ambiente.get('GESTAO_DB_ENGINE', 'sqlite')
+    if motor == 'postgresql':
+        return configuracao_postgresql(ambiente)
+    if motor != 'sqlite':
+        raise ValueError(f'Banco desconhecido: {motor!r} (use sqlite ou postgresql)')
+
+    return configuracao_sqlite(
+        diretorio_base / 'db.sqlite3',
+        diretorio_base / 'test_db.sqlite3',
+        perfil=ambiente.get('GESTAO_SQLITE_PERFIL', PERFIL_PADRAO),
+    )
+
+
+def caminho_sqlite(nome):
+    """
+    Retorna o caminho do arquivo de um ``NAME`` do SQLite.
+
+    Args:
+        nome (Path ou str): Caminho ou URI (``file:caminho?mode=ro``)
+
+    Returns:
+        str: Caminho do arquivo
+    """
+    nome = str(nome)
+    if nome.startswith('file:'):
+        return nome[len('file:'):].split('?', 1)[0]
+    return nome
+
+
+def configuracao_replica(diretorio_base, principal, ambiente=None):
+    """
+    Monta a entrada ``replica`` de ``DATABASES`` (ou ``None`` sem réplica).
+
+    - SQLite: cópia ``db_replica.sqlite3`` em ``diretorio_base`` (ou
+      ``GESTAO_DB_REPLICA_NOME``), aberta em modo somente leitura. Ligada
+      por padrão; ``GESTAO_DB_REPLICA=0`` desliga. Enquanto o arquivo não
+      existir, os relatórios leem do banco principal.
+    - PostgreSQL: ligada quando ``GESTAO_DB_REPLICA_HOST`` está definida;
+      ``GESTAO_DB_REPLICA_PORTA``, ``_NOME``, ``_USUARIO`` e ``_SENHA``
+      substituem os valores do principal. As transações da conexão são
+      somente leitura.
+
+    Nos testes, a réplica espelha o banco de testes do principal
+    (``TEST['MIRROR']``).
+
+    Args:
+        diretorio_base (Path): Diretório do projeto
+        principal (dict): Configuração do alias ``default``
+        ambiente (dict): Variáveis de ambiente (padrão: ``os.environ``)
+
+    Returns:
+        dict ou None: Configuração da réplica
+    """
+    if ambiente is None:
+        ambiente = os.environ
+
+    if principal['ENGINE'].endswith('postgresql'):
+        if not ambiente.get('GESTAO_DB_REPLICA_HOST'):
+            return None
+        replica = {
+            **principal,
+            'HOST': ambiente['GESTAO_DB_REPLICA_HOST'],
+            'PORT': ambiente.get('GESTAO_DB_REPLICA_PORTA', principal['PORT']),
+            'NAME': ambiente.get('GESTAO_DB_REPLICA_NOME', principal['NAME']),
+            'USER': ambiente.get('GESTAO_DB_REPLICA_USUARIO', principal['USER']),
+            'PASSWORD': ambiente.get('GESTAO_DB_REPLICA_SENHA', principal['PASSWORD']),
+            'OPTIONS': {
+                **principal['OPTIONS'],
+                'options': '-c default_transaction_read_only=on',
+            },
+        }
+    else:
+        if ambiente.get('GESTAO_DB_REPLICA', '1').strip().lower() not in ('1', 'true', 'sim'):
+            return None
+        nome = ambiente.get('GESTAO_DB_REPLICA_NOME') or diretorio_base / 'db_replica.sqlite3'
+        # Sem WAL (a cópia é substituída por inteiro a cada atualização) e
+        # sem BEGIN IMMEDIATE (nada é escrito nela)
+        pragmas = {
+            nome_pragma: valor
+            for nome_pragma, valor in PERFIS_SQLITE[PERFIL_PADRAO]['pragmas'].items()
+            if nome_pragma not in ('journal_mode', 'synchronous')
+        }
+        replica = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': f'file:{nome}?mode=ro',
+            'OPTIONS': {'timeout': TEMPO_ESPERA, 'init_command': comando_inicial(pragmas)},
+        }
+
+    replica['TEST'] = {'MIRROR': 'default'}
+    return replica
+
+
+def copiar_sqlite(origem, destino, momento=None):
+    """
+    Copia um banco SQLite de forma consistente (API de backup do SQLite).
+
+    A cópia é gravada em um arquivo temporário e então substitui
+    ``destino`` de uma só vez: conexões abertas continuam lendo a cópia
+    anterior. A data de modificação do arquivo passa a ser ``momento``, o
+    início da cópia, que é o instante dos dados copiados (ver
+    ``roteadores.momento_replica``).
+
+    Args:
+        origem (str): Arquivo do banco principal
+        destino (str): Arquivo da cópia
+        momento (float): Timestamp registrado na cópia (padrão: agora)
+
+    Returns:
+        float: Timestamp registrado na cópia
+    """
+    if momento is None:
+        momento = time.time()
+    pasta = os.path.dirname(os.path.abspath(destino))
+    descritor, temporario = tempfile.mkstemp(prefix='.replica-', suffix='.sqlite3', dir=pasta)
+    os.close(descritor)
+    try:
+        fonte = sqlite3.connect(f'file:{origem}?mode=ro', uri=True, timeout=TEMPO_ESPERA)
+        copia = sqlite3.connect(temporario)
+        try:
+            fonte.backup(copia)
+            # A cópia herda o WAL da origem; no modo somente leitura, o WAL
+            # exigiria os arquivos -wal/-shm ao lado dela
+            copia.execute('PRAGMA journal_mode=DELETE')
+        finally:
+            copia.close()
+            fonte.close()
+        # mkstemp cria o arquivo só para o dono; a cópia segue a origem
+        os.chmod(temporario, os.stat(origem).st_mode & 0o777)
+        os.utime(temporario, (momento, momento))
+        os.replace(temporario, destino)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    return momento
+
+
+def _conectar(caminho, perfil):
+    """Abre uma conexão sqlite3 com os pragmas do perfil (autocommit manual)."""
+    conexao = sqlite3.connect(
+        caminho, timeout=TEMPO_ESPERA, isolation_level=None, check_same_thread=False
+    )
+    for nome, valor in PERFIS_SQLITE[perfil]['pragmas'].items():
+        conexao.execute(f'PRAGMA {nome}={valor}')
+    return conexao
+
+
+def medir_concorrencia(perfil, escritores=4, leitores=4, duracao=3.0, linhas=20000):
+    """
+    Mede leituras e escritas concorrentes em um banco temporário.
+
+    Cada escritor repete o padrão das escritas do sistema (ler o saldo,
+    atualizá-lo e gravar um lançamento na mesma transação); cada leitor
+    repete uma agregação sobre os lançamentos, como os dashboards.
+
+    Args:
+        perfil (str): Chave de ``PERFIS_SQLITE``
+        escritores (int): Threads escrevendo
+        leitores (int): Threads lendo
+        duracao (float): Segundos de carga
+        linhas (int): Lançamentos criados antes da carga
+
+    Returns:
+        dict: Escritas e leituras por segundo, travas (``database is
+        locked``), p95 de cada operação em ms e se o saldo final confere
+    """
+    modo = PERFIS_SQLITE[perfil]['transaction_mode']
+    inicio_transacao = f'BEGIN {modo}' if modo else 'BEGIN'
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'concorrencia.sqlite3')
+
+        conexao = _conectar(caminho, perfil)
+        conexao.executescript(
+            'CREATE TABLE saldo (id INTEGER PRIMARY KEY, valor INTEGER NOT NULL);'
+            'CREATE TABLE lancamento (id INTEGER PRIMARY KEY, valor INTEGER NOT NULL, '
+            'criado REAL NOT NULL);'
+        )
+        conexao.execute('BEGIN')
+        conexao.executemany(
+            'INSERT INTO lancamento (valor, criado) VALUES (?, ?)',
+            ((numero % 100, time.time()) for numero in range(linhas))
+        )
+        conexao.execute('INSERT INTO saldo (id, valor) VALUES (1, ?)', (linhas,))
+        conexao.execute('COMMIT')
+        conexao.close()
+
+        parar = threading.Event()
+        trava = threading.Lock()
+        medidas = {'escrita': [], 'leitura': [], 'travas': 0}
+
+        def escritor():
+            conexao = _conectar(caminho, perfil)
+            tempos, travas = [], 0
+            try:
+                while not parar.is_set():
+                    inicio = time.perf_counter()
+                    try:
+                        conexao.execute(inicio_transacao)
+                        valor = conexao.execute('SELECT valor FROM saldo WHERE id = 1').fetchone()[0]
+                        conexao.execute('UPDATE saldo SET valor = ? WHERE id = 1', (valor + 1,))
+                        conexao.execute(
+                            'INSERT INTO lancamento (valor, criado) VALUES (1, ?)', (time.time(),)
+                        )
+                        conexao.execute('COMMIT')
+                    except sqlite3.OperationalError as erro:
+                        if conexao.in_transaction:
+                            conexao.execute('ROLLBACK')
+                        if 'locked' not in str(erro):
+                            raise
+                        travas += 1
+                        continue
+                    tempos.append((time.perf_counter() - inicio) * 1000)
+            finally:
+                conexao.close()
+                with trava:
+                    medidas['escrita'].extend(tempos)
+                    medidas['travas'] += travas
+
+        def leitor():
+            conexao = _conectar(caminho, perfil)
+            tempos = []
+            try:
+                while not parar.is_set():
+                    inicio = time.perf_counter()
+                    conexao.execute('SELECT COUNT(*), SUM(valor) FROM lancamento').fetchone()
+                    tempos.append((time.perf_counter() - inicio) * 1000)
+            finally:
+                conexao.close()
+                with trava:
+                    medidas['leitura'].extend(tempos)
+
+        threads = (
+            [threading.Thread(target=escritor) for _ in range(escritores)]
+            + [threading.Thread(target=leitor) for _ in range(leitores)]
+        )
+        inicio = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(duracao)
+        parar.set()
+        for thread in threads:
+            thread.join()
+        decorrido = time.perf_counter() - inicio
+
+        # Cada escrita soma 1 ao saldo e grava um lançamento
+        conexao = _conectar(caminho, perfil)
+        saldo, total = conexao.execute(
+            'SELECT (SELECT valor FROM saldo WHERE id = 1), COUNT(*) FROM lancamento'
+        ).fetchone()
+        conexao.close()
+
+    def p95(tempos):
+        if len(tempos) < 2:
+            return tempos[0] if tempos else 0.0
+        return statistics.quantiles(tempos, n=20, method='inclusive')[-1]
+
+    return {
+        'perfil': perfil,
+        'escritas_s': round(len(medidas['escrita']) / decorrido, 1),
+        'leituras_s': round(len(medidas['leitura']) / decorrido, 1),
+        'travas': medidas['travas'],
+        'escrita_p95_ms': round(p95(medidas['escrita']), 2),
+        'leitura_p95_ms': round(p95(medidas['leitura']), 2),
+        'consistente': saldo == total == linhas + len(medidas['escrita']),
+    }
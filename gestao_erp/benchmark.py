@@ -0,0 +1,229 @@
+"""
+Benchmark das principais views sobre um volume de dados sintéticos.
+
+Mede, para cada view de ``VIEWS``:
+- latência (p50 e p95 de várias requisições, em ms);
+- número de consultas SQL de uma requisição;
+- pico de memória alocada em Python durante uma requisição (tracemalloc).
+
+Os indicadores em cache dos dashboards são invalidados antes de cada
+requisição, para medir o cálculo e não a leitura do cache. Sessão e
+perfil de acesso continuam em cache, como em produção.
+
+``comparar_paralelismo`` mede os dashboards assíncronos pelo caminho ASGI
+com as consultas em sequência e em paralelo (ver assincrono.py).
+
+Os resultados podem ser comparados com uma linha de base gravada
+(``benchmarks/baseline.json``): a view regride quando faz mais consultas
+que na base, ou quando latência ou memória passam da base multiplicada
+pela tolerância (diferenças absolutas pequenas são ignoradas, pois são
+ruído de medição).
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+import statistics
+import time
+import tracemalloc
+from contextlib import ExitStack
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from . import assincrono, cache
+
+
+# Views medidas: (nome da URL, parâmetros da requisição)
+VIEWS = [
+    ('estoque:dashboard', {}),
+    ('estoque:lista_produtos', {}),
+    ('estoque:relatorio', {}),
+    ('financeiro:dashboard', {}),
+    ('financeiro:relatorio', {}),
+    ('financeiro:api_indicadores', {'meses': 12}),
+]
+
+# Dashboards assíncronos comparados com consultas em sequência e em paralelo
+DASHBOARDS = ('estoque:dashboard', 'financeiro:dashboard')
+
+# Tolerância padrão sobre a linha de base (1.5 = até 50% acima)
+TOLERANCIA_PADRAO = 1.5
+
+# Diferenças abaixo destes valores não contam como regressão
+FOLGA_LATENCIA_MS = 5.0
+FOLGA_MEMORIA_KB = 256.0
+
+
+def medir_view(cliente, nome_url, parametros, repeticoes):
+    """
+    Mede latência, consultas e memória de uma view.
+
+    Args:
+        cliente (Client): Cliente de teste já autenticado
+        nome_url (str): Nome da URL da view
+        parametros (dict): Parâmetros GET
+        repeticoes (int): Requisições cronometradas
+
+    Returns:
+        dict: ``status``, ``consultas``, ``memoria_pico_kb``, ``p50_ms``
+        e ``p95_ms``
+    """
+    url = reverse(nome_url)
+
+    def requisitar():
+        cache.invalidar('estoque', 'financeiro')
+        return cliente.get(url, parametros)
+
+    # Aquecimento (conexão, templates compilados, perfil de acesso)
+    requisitar()
+
+    # Todas as conexões: os relatórios leem da réplica (ver roteadores.py).
+    # O wrapper não abre conexões que a requisição não usar.
+    capturadas = []
+
+    def contar(execute, sql, params, many, context):
+        capturadas.append(sql)
+        return execute(sql, params, many, context)
+
+    with ExitStack() as pilha:
+        for conexao in connections.all():
+            pilha.enter_context(conexao.execute_wrapper(contar))
+        resposta = requisitar()
+    consultas = len(capturadas)
+
+    tracemalloc.start()
+    try:
+        requisitar()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        requisitar()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+
+    return {
+        'status': resposta.status_code,
+        'consultas': consultas,
+        'memoria_pico_kb': round(pico / 1024, 1),
+        'p50_ms': round(statistics.median(tempos), 2),
+        'p95_ms': round(tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))], 2),
+    }
+
+
+def executar(usuario, repeticoes, views=VIEWS):
+    """
+    Mede todas as views com o usuário informado.
+
+    Args:
+        usuario (User): Usuário com acesso a todas as views
+        repeticoes (int): Requisições cronometradas por view
+        views (list): Tuplas (nome da URL, parâmetros)
+
+    Returns:
+        dict: Resultado por nome de URL
+    """
+    cliente = Client()
+    cliente.force_login(usuario)
+    return {
+        nome_url: medir_view(cliente, nome_url, parametros, repeticoes)
+        for nome_url, parametros in views
+    }
+
+
+def comparar(resultado, base, tolerancia=TOLERANCIA_PADRAO):
+    """
+    Compara um resultado com a linha de base.
+
+    Args:
+        resultado (dict): Resultado por view (ver ``executar``)
+        base (dict): Linha de base no mesmo formato
+        tolerancia (float): Fator máximo sobre a base para latência e memória
+
+    Returns:
+        list: Descrição de cada regressão (vazia se nenhuma)
+    """
+    regressoes = []
+    for nome_url, atual in resultado.items():
+        anterior = base.get(nome_url)
+        if anterior is None:
+            continue
+
+        if atual['status'] != anterior['status']:
+            regressoes.append(
+                f"{nome_url}: status {atual['status']} (base {anterior['status']})"
+            )
+        if atual['consultas'] > anterior['consultas']:
+            regressoes.append(
+                f"{nome_url}: {atual['consultas']} consultas (base {anterior['consultas']})"
+            )
+
+        for campo, unidade, folga in (
+            ('p50_ms', 'ms', FOLGA_LATENCIA_MS),
+            ('memoria_pico_kb', 'KB', FOLGA_MEMORIA_KB),
+        ):
+            limite = max(anterior[campo] * tolerancia, anterior[campo] + folga)
+            if atual[campo] > limite:
+                regressoes.append(
+                    f"{nome_url}: {campo} {atual[campo]} {unidade} "
+                    f"(base {anterior[campo]}, limite {limite:.1f})"
+                )
+    return regressoes
+
+
+def comparar_paralelismo(usuario, repeticoes, paralelas=assincrono.CONSULTAS_PARALELAS_PADRAO,
+                         dashboards=DASHBOARDS):
+    """
+    Mede os dashboards pelo caminho ASGI com e sem consultas em paralelo.
+
+    Cada dashboard é medido com ``CONSULTAS_PARALELAS=1`` (consultas em
+    sequência) e com ``paralelas`` threads, sempre com os indicadores em
+    cache invalidados.
+
+    Args:
+        usuario (User): Usuário com acesso aos dashboards
+        repeticoes (int): Requisições cronometradas por modo
+        paralelas (int): Threads do modo paralelo
+        dashboards (tuple): Nomes de URL medidos
+
+    Returns:
+        dict: Por nome de URL, ``sequencial`` e ``paralelo`` com ``status``,
+        ``p50_ms`` e ``p95_ms``
+    """
+    cliente = AsyncClient()
+    cliente.force_login(usuario)
+
+    async def medir(url):
+        async def requisitar():
+            await sync_to_async(cache.invalidar)('estoque', 'financeiro')
+            return await cliente.get(url)
+
+        # Aquecimento (conexões das threads, templates compilados)
+        resposta = await requisitar()
+
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            await requisitar()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        tempos.sort()
+        return {
+            'status': resposta.status_code,
+            'p50_ms': round(statistics.median(tempos), 2),
+            'p95_ms': round(tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))], 2),
+        }
+
+    resultado = {}
+    for nome_url in dashboards:
+        resultado[nome_url] = {}
+        for modo, tamanho in (('sequencial', 1), ('paralelo', paralelas)):
+            with override_settings(CONSULTAS_PARALELAS=tamanho):
+                resultado[nome_url][modo] = async_to_sync(medir)(reverse(nome_url))
+    return resultado
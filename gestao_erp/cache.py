@@ -0,0 +1,196 @@
+"""
+Cache dos indicadores dos dashboards e dos perfis de acesso.
+
+Os indicadores (dicionários de KPIs) e os perfis de acesso (grupos e
+permissões, ver permissoes.py) são guardados no cache configurado em
+``settings.CACHES`` sob chaves versionadas por namespace:
+
+    indicadores:<namespace>:v<versão>:<chave>
+
+Cada namespace (``estoque``, ``financeiro``, ``permissoes``) tem um número
+de versão no próprio cache. Gravações nos modelos correspondentes
+incrementam a versão (ver ``signals.py`` de cada app e de gestao_erp), o
+que torna todas as entradas antigas
+inacessíveis de uma só vez, sem precisar conhecer ou apagar cada chave; as
+entradas órfãs expiram pelo tempo de vida normal do cache.
+
+A chave de versão pode ser descartada pelo backend (limite de entradas do
+LocMemCache, memória do Redis). Por isso ela é recriada com o relógio em
+nanossegundos, e não com 1: a nova versão é sempre maior que as
+anteriores, e entradas gravadas sob uma versão antiga não voltam a ser
+lidas.
+
+Indicadores calculados com leituras da réplica (ver roteadores.py) não são
+guardados: os dados dela podem ser anteriores à versão atual.
+
+Acertos e faltas são contados no próprio cache, de modo que a taxa de
+acerto reflete todos os processos que compartilham o backend.
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+
+from . import roteadores
+
+
+# Namespaces em cache
+NAMESPACES = ('estoque', 'financeiro', 'permissoes')
+
+# Tempo de vida (segundos) das entradas de indicadores
+TEMPO_EXPIRACAO = 300
+
+_AUSENTE = object()
+
+
+def _chave_versao(namespace):
+    return f'indicadores:{namespace}:versao'
+
+
+def _chave_contador(namespace, tipo):
+    return f'indicadores:{namespace}:{tipo}'
+
+
+def _versao_inicial():
+    """Versão de um namespace sem versão no cache: maior que qualquer anterior."""
+    return time.time_ns()
+
+
+def _incrementar(chave, inicial=1):
+    """Incrementa um contador do cache, criando-o com ``inicial`` se necessário."""
+    try:
+        return cache.incr(chave)
+    except ValueError:
+        # Contador ainda não existe (ou foi removido pelo backend)
+        if cache.add(chave, inicial, timeout=None):
+            return inicial
+        return cache.incr(chave)
+
+
+def obter_versao(namespace):
+    """
+    Retorna a versão atual dos indicadores de um namespace.
+
+    Args:
+        namespace (str): Um dos ``NAMESPACES``
+
+    Returns:
+        int: Versão atual
+    """
+    return cache.get_or_set(_chave_versao(namespace), _versao_inicial, timeout=None)
+
+
+def invalidar(*namespaces):
+    """
+    Invalida os indicadores em cache dos namespaces informados.
+
+    Quando chamada dentro de uma transação, a invalidação acontece apenas
+    após o commit: se fosse imediata, uma requisição concorrente poderia
+    recalcular os indicadores com os dados ainda não confirmados e
+    guardá-los na nova versão.
+
+    Args:
+        *namespaces (str): Namespaces a invalidar
+    """
+    def incrementar_versoes():
+        for namespace in namespaces:
+            _incrementar(_chave_versao(namespace), inicial=_versao_inicial())
+
+    transaction.on_commit(incrementar_versoes)
+
+
+def _ler(namespace, chave):
+    """
+    Lê uma entrada de indicadores e conta o acerto ou a falta.
+
+    Returns:
+        tuple: (chave completa, valor ou ``_AUSENTE``)
+    """
+    chave_completa = f'indicadores:{namespace}:v{obter_versao(namespace)}:{chave}'
+
+    valor = cache.get(chave_completa, _AUSENTE)
+    if valor is not _AUSENTE:
+        _incrementar(_chave_contador(namespace, 'acertos'))
+    else:
+        _incrementar(_chave_contador(namespace, 'faltas'))
+    return chave_completa, valor
+
+
+def obter_ou_calcular(namespace, chave, calcular, timeout=TEMPO_EXPIRACAO):
+    """
+    Busca indicadores no cache ou os calcula e guarda.
+
+    Args:
+        namespace (str): Namespace dos indicadores
+        chave (str): Identificação dentro do namespace (ex: período)
+        calcular (callable): Função sem argumentos que calcula os indicadores
+        timeout (int): Tempo de vida da entrada em segundos
+
+    Returns:
+        Indicadores calculados ou lidos do cache
+    """
+    chave_completa, valor = _ler(namespace, chave)
+    if valor is not _AUSENTE:
+        return valor
+
+    valor = calcular()
+    if not roteadores.lendo_da_replica():
+        cache.set(chave_completa, valor, timeout)
+    return valor
+
+
+async def aobter_ou_calcular(namespace, chave, calcular, timeout=TEMPO_EXPIRACAO):
+    """
+    Versão assíncrona de ``obter_ou_calcular``, para views assíncronas.
+
+    Args:
+        namespace (str): Namespace dos indicadores
+        chave (str): Identificação dentro do namespace (ex: período)
+        calcular (callable): Função assíncrona sem argumentos que calcula
+            os indicadores
+        timeout (int): Tempo de vida da entrada em segundos
+
+    Returns:
+        Indicadores calculados ou lidos do cache
+    """
+    chave_completa, valor = await sync_to_async(_ler)(namespace, chave)
+    if valor is not _AUSENTE:
+        return valor
+
+    valor = await calcular()
+    if not await sync_to_async(roteadores.lendo_da_replica)():
+        await sync_to_async(cache.set)(chave_completa, valor, timeout)
+    return valor
+
+
+def estatisticas():
+    """
+    Retorna acertos, faltas e taxa de acerto por namespace.
+
+    Returns:
+        dict: ``{namespace: {'acertos', 'faltas', 'taxa_acerto', 'versao'}}``
+    """
+    chaves = {
+        (namespace, tipo): _chave_contador(namespace, tipo)
+        for namespace in NAMESPACES
+        for tipo in ('acertos', 'faltas')
+    }
+    valores = cache.get_many(list(chaves.values()))
+
+    resultado = {}
+    for namespace in NAMESPACES:
+        acertos = valores.get(chaves[namespace, 'acertos'], 0)
+        faltas = valores.get(chaves[namespace, 'faltas'], 0)
+        total = acertos + faltas
+        resultado[namespace] = {
+            'acertos': acertos,
+            'faltas': faltas,
+            'taxa_acerto': round(acertos / total, 4) if total else None,
+            'versao': obter_versao(namespace),
+        }
+    return resultado
@@ -0,0 +1,377 @@
+"""
+Teste de carga concorrente dos caminhos de escrita.
+
+Vários trabalhadores (threads ou processos) executam uma mistura de
+operações pela camada de serviços, a mesma usada pelas views:
+- movimentacao: ``estoque.services.registrar_movimentacao`` (venda ou compra
+  de um produto sorteado entre poucos, para forçar disputa pelas linhas);
+- receita: ``financeiro.services.registrar_receita``;
+- despesa: ``financeiro.services.registrar_despesa``.
+
+Cada tentativa é classificada como sucesso, rejeitada (regra de negócio,
+como estoque ou capital insuficiente), bloqueio (``database is locked`` e
+equivalentes) ou erro. O relatório traz vazão e latências p50/p95/p99 por
+operação.
+
+Depois da carga, ``verificar_invariantes`` confere que nada se perdeu:
+estoque de cada produto igual à soma das movimentações, cadeia do capital
+de giro íntegra e saldo igual à soma dos lançamentos.
+
+O banco deve estar vazio antes de ``preparar`` (o comando ``teste_carga``
+usa um banco de teste descartável).
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+import multiprocessing
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import OperationalError, connections
+from django.db.models import F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from estoque import services as servicos_estoque
+from estoque.models import MovimentacaoEstoque, Produto
+from estoque.reconciliacao import divergencias
+from financeiro import services as servicos_financeiro
+from financeiro.models import CapitalGiro, Despesa, Receita
+
+
+OPERACOES = ('movimentacao', 'receita', 'despesa')
+
+# Peso de cada operação na mistura padrão
+MIX_PADRAO = {'movimentacao': 60, 'receita': 25, 'despesa': 15}
+
+# Probabilidade de uma movimentação ser venda (as demais são compras)
+PROBABILIDADE_VENDA = 0.7
+
+ESTOQUE_INICIAL = 1000
+# Capital disponível depois da compra do estoque inicial
+CAPITAL_INICIAL = Decimal('100000.00')
+PRECO_CUSTO = Decimal('10.00')
+PRECO_VENDA = Decimal('15.00')
+
+SITUACOES = ('sucesso', 'rejeitada', 'bloqueio', 'erro')
+
+# Trechos de mensagem que indicam disputa de trava no banco
+MENSAGENS_BLOQUEIO = (
+    'database is locked',
+    'database table is locked',
+    'deadlock detected',
+    'could not serialize access',
+    'lock timeout',
+)
+
+
+@dataclass
+class ResultadoCarga:
+    """Tentativas registradas por um teste de carga."""
+
+    duracao: float = 0.0
+    # Tuplas (operação, situação, latência em ms)
+    tentativas: list = field(default_factory=list)
+    # Mensagens distintas das tentativas com erro inesperado
+    erros: list = field(default_factory=list)
+
+    def contar(self, operacao, situacao):
+        return sum(
+            1 for op, sit, _ in self.tentativas
+            if op == operacao and sit == situacao
+        )
+
+    def resumo(self):
+        """
+        Resume as tentativas por operação e no total.
+
+        Returns:
+            dict: Para cada operação (e ``total``): quantidade, contagem por
+            situação, operações bem-sucedidas por segundo e p50/p95/p99 em ms
+        """
+        grupos = {operacao: [] for operacao in OPERACOES}
+        for operacao, situacao, latencia in self.tentativas:
+            grupos[operacao].append((situacao, latencia))
+        grupos['total'] = [(sit, lat) for _, sit, lat in self.tentativas]
+
+        resumo = {}
+        for nome, itens in grupos.items():
+            if not itens:
+                continue
+            latencias = sorted(latencia for _, latencia in itens)
+            contagem = {situacao: 0 for situacao in SITUACOES}
+            for situacao, _ in itens:
+                contagem[situacao] += 1
+            resumo[nome] = {
+                'quantidade': len(itens),
+                **contagem,
+                'vazao': round(contagem['sucesso'] / self.duracao, 1) if self.duracao else 0.0,
+                **{
+                    f'p{percentil}_ms': round(_percentil(latencias, percentil), 2)
+                    for percentil in (50, 95, 99)
+                },
+            }
+        return resumo
+
+
+def _percentil(valores_ordenados, percentil):
+    """Percentil com interpolação linear (lista já ordenada)."""
+    if len(valores_ordenados) == 1:
+        return valores_ordenados[0]
+    return statistics.quantiles(valores_ordenados, n=100, method='inclusive')[percentil - 1]
+
+
+def interpretar_mix(texto):
+    """
+    Converte ``"movimentacao=60,receita=25,despesa=15"`` em pesos.
+
+    Operações omitidas ficam com peso zero.
+
+    Raises:
+        ValueError: Operação desconhecida, peso inválido ou todos zero
+    """
+    pesos = dict.fromkeys(OPERACOES, 0)
+    for parte in filter(None, (parte.strip() for parte in texto.split(','))):
+        operacao, _, peso = parte.partition('=')
+        operacao = operacao.strip()
+        if operacao not in pesos:
+            raise ValueError(f'Operação desconhecida: {operacao}')
+        try:
+            pesos[operacao] = int(peso)
+        except ValueError:
+            raise ValueError(f'Peso inválido para {operacao}: {peso!r}')
+        if pesos[operacao] < 0:
+            raise ValueError(f'Peso negativo para {operacao}')
+    if not any(pesos.values()):
+        raise ValueError('Informe ao menos uma operação com peso positivo.')
+    return pesos
+
+
+def preparar(usuario, produtos):
+    """
+    Cria os produtos disputados e o aporte de capital inicial.
+
+    O estoque inicial entra por uma movimentação de compra, para que a
+    invariante "estoque = soma das movimentações" valha desde o início.
+
+    Args:
+        usuario (User): Usuário responsável
+        produtos (int): Quantidade de produtos
+
+    Returns:
+        list: IDs dos produtos criados
+    """
+    # Aporte suficiente para a compra do estoque inicial, sobrando CAPITAL_INICIAL
+    aporte = CAPITAL_INICIAL + produtos * ESTOQUE_INICIAL * PRECO_CUSTO
+    CapitalGiro.adicionar_capital(aporte, 'Capital inicial (teste de carga)', usuario)
+
+    criados = Produto.objects.bulk_create([
+        Produto(
+            nome=f'Produto Carga {numero:03d}',
+            preco_custo=PRECO_CUSTO,
+            preco_venda=PRECO_VENDA,
+            estoque_atual=0,
+            usuario_criacao=usuario,
+        )
+        for numero in range(1, produtos + 1)
+    ])
+    for produto in criados:
+        servicos_estoque.registrar_movimentacao(
+            produto, 'ENTRADA', ESTOQUE_INICIAL, PRECO_CUSTO, usuario,
+            observacao='Estoque inicial (teste de carga)'
+        )
+    return [produto.pk for produto in criados]
+
+
+def _executar_operacao(operacao, aleatorio, produtos, usuario):
+    """Executa uma operação sorteada pela camada de serviços."""
+    if operacao == 'movimentacao':
+        produto = Produto.objects.only('nome', 'estoque_atual').get(pk=aleatorio.choice(produtos))
+        if aleatorio.random() < PROBABILIDADE_VENDA:
+            servicos_estoque.registrar_movimentacao(
+                produto, 'SAIDA', aleatorio.randint(1, 5), PRECO_VENDA, usuario,
+                observacao='Teste de carga'
+            )
+        else:
+            servicos_estoque.registrar_movimentacao(
+                produto, 'ENTRADA', aleatorio.randint(5, 20), PRECO_CUSTO, usuario,
+                observacao='Teste de carga'
+            )
+    elif operacao == 'receita':
+        servicos_financeiro.registrar_receita(
+            'Receita (teste de carga)',
+            Decimal(aleatorio.randint(100, 50000)) / 100,
+            timezone.localdate(),
+            'SERVICO',
+            usuario,
+        )
+    else:
+        servicos_financeiro.registrar_despesa(
+            'Despesa (teste de carga)',
+            Decimal(aleatorio.randint(100, 50000)) / 100,
+            timezone.localdate(),
+            'OUTROS',
+            usuario,
+        )
+
+
+def classificar_erro(erro):
+    """
+    Classifica a exceção de uma tentativa.
+
+    Returns:
+        str: ``bloqueio``, ``rejeitada`` ou ``erro``
+    """
+    if isinstance(erro, OperationalError):
+        mensagem = str(erro).lower()
+        if any(trecho in mensagem for trecho in MENSAGENS_BLOQUEIO):
+            return 'bloqueio'
+    if isinstance(erro, ValueError):
+        return 'rejeitada'
+    return 'erro'
+
+
+def trabalhador(indice, quantidade, semente, mix, produtos, usuario_id):
+    """
+    Executa ``quantidade`` operações sorteadas e mede cada uma.
+
+    Roda em uma thread ou em um processo filho; a conexão com o banco é
+    aberta no próprio trabalhador e fechada ao final.
+
+    Returns:
+        tuple: (tentativas, mensagens de erro inesperado)
+    """
+    aleatorio = random.Random(semente * 1000 + indice)
+    operacoes = list(mix)
+    pesos = [mix[operacao] for operacao in operacoes]
+    tentativas, erros = [], []
+
+    try:
+        usuario = User.objects.get(pk=usuario_id)
+        for _ in range(quantidade):
+            operacao = aleatorio.choices(operacoes, pesos)[0]
+            inicio = time.perf_counter()
+            try:
+                _executar_operacao(operacao, aleatorio, produtos, usuario)
+                situacao = 'sucesso'
+            except Exception as erro:
+                situacao = classificar_erro(erro)
+                if situacao == 'erro':
+                    erros.append(f'{operacao}: {type(erro).__name__}: {erro}')
+            tentativas.append((operacao, situacao, (time.perf_counter() - inicio) * 1000))
+    finally:
+        connections.close_all()
+
+    return tentativas, erros
+
+
+def executar(usuario, produtos, operacoes, concorrencia, mix=None, semente=42, processos=False):
+    """
+    Executa o teste de carga.
+
+    Args:
+        usuario (User): Usuário responsável pelos lançamentos
+        produtos (list): IDs dos produtos disputados (ver ``preparar``)
+        operacoes (int): Total de operações, dividido entre os trabalhadores
+        concorrencia (int): Número de trabalhadores simultâneos
+        mix (dict): Peso de cada operação (padrão: ``MIX_PADRAO``)
+        semente (int): Semente dos sorteios
+        processos (bool): Usa processos (fork) em vez de threads
+
+    Returns:
+        ResultadoCarga: Tentativas e duração total
+    """
+    mix = {operacao: peso for operacao, peso in (mix or MIX_PADRAO).items() if peso}
+    cotas = [
+        operacoes // concorrencia + (1 if indice < operacoes % concorrencia else 0)
+        for indice in range(concorrencia)
+    ]
+
+    if processos:
+        # Processos filhos não podem herdar conexões abertas do pai
+        connections.close_all()
+        executor = ProcessPoolExecutor(
+            max_workers=concorrencia, mp_context=multiprocessing.get_context('fork')
+        )
+    else:
+        executor = ThreadPoolExecutor(max_workers=concorrencia)
+
+    resultado = ResultadoCarga()
+    inicio = time.perf_counter()
+    with executor:
+        futuros = [
+            executor.submit(trabalhador, indice, cota, semente, mix, produtos, usuario.pk)
+            for indice, cota in enumerate(cotas) if cota
+        ]
+        for futuro in futuros:
+            tentativas, erros = futuro.result()
+            resultado.tentativas.extend(tentativas)
+            resultado.erros.extend(erros)
+    resultado.duracao = time.perf_counter() - inicio
+    resultado.erros = sorted(set(resultado.erros))
+    return resultado
+
+
+def verificar_invariantes(resultado=None):
+    """
+    Confere a consistência do banco depois da carga.
+
+    - estoque de cada produto = entradas - saídas registradas;
+    - cadeia do capital de giro íntegra (``CapitalGiro.verificar_cadeia``);
+    - saldo = aporte inicial + receitas - despesas + vendas - compras;
+    - com ``resultado``: cada sucesso gravou exatamente um registro.
+
+    Args:
+        resultado (ResultadoCarga): Tentativas da carga (opcional)
+
+    Returns:
+        list: Descrição de cada violação (vazia se tudo confere)
+    """
+    violacoes = []
+
+    for _, nome, estoque, soma in divergencias(Produto.objects.all()):
+        violacoes.append(f'{nome}: estoque {estoque}, soma das movimentações {soma}')
+
+    quebras = CapitalGiro.verificar_cadeia()
+    if quebras:
+        violacoes.append(f'Cadeia do capital de giro quebrada em {len(quebras)} pontos: {quebras[:10]}')
+
+    zero = Value(Decimal('0.00'))
+
+    def somar(queryset, expressao):
+        return queryset.aggregate(total=Coalesce(Sum(expressao), zero))['total']
+
+    # Aporte inicial: primeiro lançamento do histórico (ver ``preparar``)
+    aporte = CapitalGiro.objects.order_by('id').values_list('valor_novo', flat=True).first()
+    valor_movimentacao = F('quantidade') * F('valor_unitario')
+    esperado = (
+        (aporte or Decimal('0.00'))
+        + somar(Receita.objects, 'valor')
+        - somar(Despesa.objects, 'valor')
+        + somar(MovimentacaoEstoque.objects.filter(tipo='SAIDA'), valor_movimentacao)
+        - somar(MovimentacaoEstoque.objects.filter(tipo='ENTRADA'), valor_movimentacao)
+    )
+    saldo = CapitalGiro.obter_capital_atual()
+    if saldo != esperado:
+        violacoes.append(f'Saldo do capital de giro R$ {saldo}, esperado R$ {esperado}')
+
+    if resultado is not None:
+        registros = {
+            'movimentacao': MovimentacaoEstoque.objects.filter(
+                ~Q(observacao__startswith='Estoque inicial')
+            ).count(),
+            'receita': Receita.objects.count(),
+            'despesa': Despesa.objects.count(),
+        }
+        for operacao, total in registros.items():
+            sucessos = resultado.contar(operacao, 'sucesso')
+            if total != sucessos:
+                violacoes.append(f'{operacao}: {sucessos} sucessos, {total} registros gravados')
+
+    return violacoes
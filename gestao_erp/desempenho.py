@@ -0,0 +1,308 @@
+"""
+Medição de consultas SQL e tempos de resposta por view.
+
+Cada requisição recebe uma ``Medicao`` (ver middleware.py) que conta as
+consultas e o tempo gasto no banco (``connection.execute_wrapper``), o
+tempo de renderização de templates (``DjangoTemplatesMedidos``) e a
+latência total. Os resultados são:
+
+- enviados no cabeçalho ``Server-Timing`` (visível nas ferramentas de
+  desenvolvedor do navegador);
+- comparados com o orçamento da view em ``settings.ORCAMENTOS_DESEMPENHO``
+  (requisições acima do orçamento são registradas no log);
+- agregados em memória por nome de URL, para consulta em
+  ``/monitoramento/metricas/``.
+
+Os agregados são por processo: com vários workers, cada um expõe os seus.
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from statistics import quantiles
+
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates
+
+
+logger = logging.getLogger(__name__)
+
+# Latências guardadas por view para o cálculo de percentis
+AMOSTRAS_POR_VIEW = 1000
+
+# Chave de ORCAMENTOS_DESEMPENHO aplicada às views sem orçamento próprio
+ORCAMENTO_PADRAO = '*'
+
+_medicao_atual = ContextVar('medicao_desempenho', default=None)
+
+_agregados = {}
+_trava = threading.Lock()
+
+
+class Medicao:
+    """
+    Consultas e tempos de uma requisição.
+
+    A instância é usada como ``execute_wrapper`` das conexões, então cada
+    consulta executada durante a requisição passa por ``__call__``.
+    """
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.consultas = 0
+        self.tempo_banco = 0.0
+        self.tempo_templates = 0.0
+        self.tempo_total = None
+        self._templates_abertos = 0
+        # Consultas paralelas (assincrono.py) chegam de várias threads
+        self._trava = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            with self._trava:
+                self.consultas += 1
+                self.tempo_banco += time.perf_counter() - inicio
+
+    def encerrar(self):
+        """Fixa a latência total da requisição."""
+        self.tempo_total = time.perf_counter() - self.inicio
+
+    def server_timing(self):
+        """
+        Monta o valor do cabeçalho ``Server-Timing`` (durações em ms).
+
+        O tempo de templates inclui as consultas feitas durante a
+        renderização (querysets avaliados no template). Com consultas em
+        paralelo (assincrono.py), o tempo de banco é a soma de todas e pode
+        passar da latência total.
+        """
+        return ', '.join([
+            f'db;dur={self.tempo_banco * 1000:.1f};desc="{self.consultas} consultas"',
+            f'tpl;dur={self.tempo_templates * 1000:.1f}',
+            f'total;dur={self.tempo_total * 1000:.1f}',
+        ])
+
+
+def medicao_atual():
+    """Retorna a medição da requisição em andamento (ou None)."""
+    return _medicao_atual.get()
+
+
+def iniciar_medicao():
+    """
+    Inicia a medição de uma requisição no contexto atual.
+
+    Returns:
+        tuple: (Medicao, token para ``finalizar_medicao``)
+    """
+    medicao = Medicao()
+    return medicao, _medicao_atual.set(medicao)
+
+
+def finalizar_medicao(token):
+    """Remove a medição do contexto atual."""
+    _medicao_atual.reset(token)
+
+
+def obter_orcamento(nome_url):
+    """
+    Retorna o orçamento de uma view.
+
+    Args:
+        nome_url (str): Nome da URL (ex: ``estoque:relatorio``)
+
+    Returns:
+        dict: ``consultas`` e/ou ``tempo_ms``, ou {} sem orçamento
+    """
+    orcamentos = getattr(settings, 'ORCAMENTOS_DESEMPENHO', {})
+    return orcamentos.get(nome_url, orcamentos.get(ORCAMENTO_PADRAO, {}))
+
+
+def verificar_orcamento(nome_url, medicao):
+    """
+    Compara a medição com o orçamento da view.
+
+    Args:
+        nome_url (str): Nome da URL
+        medicao (Medicao): Medição encerrada
+
+    Returns:
+        list: Descrição de cada limite ultrapassado (vazia se dentro)
+    """
+    orcamento = obter_orcamento(nome_url)
+    estouros = []
+
+    limite = orcamento.get('consultas')
+    if limite is not None and medicao.consultas > limite:
+        estouros.append(f'{medicao.consultas} consultas (limite {limite})')
+
+    limite = orcamento.get('tempo_ms')
+    tempo_ms = medicao.tempo_total * 1000
+    if limite is not None and tempo_ms > limite:
+        estouros.append(f'{tempo_ms:.0f} ms (limite {limite} ms)')
+
+    return estouros
+
+
+def registrar(nome_url, metodo, medicao, status):
+    """
+    Agrega a medição de uma requisição e registra estouros de orçamento.
+
+    Args:
+        nome_url (str): Nome da URL
+        metodo (str): Método HTTP
+        medicao (Medicao): Medição encerrada
+        status (int): Código de status da resposta
+    """
+    estouros = verificar_orcamento(nome_url, medicao)
+    if estouros:
+        logger.warning(
+            'Orçamento de desempenho excedido em %s %s: %s',
+            metodo, nome_url, '; '.join(estouros)
+        )
+
+    with _trava:
+        agregado = _agregados.get(nome_url)
+        if agregado is None:
+            agregado = _agregados[nome_url] = {
+                'requisicoes': 0,
+                'erros': 0,
+                'estouros': 0,
+                'consultas': 0,
+                'consultas_max': 0,
+                'tempo_banco': 0.0,
+                'tempo_templates': 0.0,
+                'tempo_total': 0.0,
+                'latencias': deque(maxlen=AMOSTRAS_POR_VIEW),
+            }
+        agregado['requisicoes'] += 1
+        agregado['erros'] += status >= 500
+        agregado['estouros'] += bool(estouros)
+        agregado['consultas'] += medicao.consultas
+        agregado['consultas_max'] = max(agregado['consultas_max'], medicao.consultas)
+        agregado['tempo_banco'] += medicao.tempo_banco
+        agregado['tempo_templates'] += medicao.tempo_templates
+        agregado['tempo_total'] += medicao.tempo_total
+        agregado['latencias'].append(medicao.tempo_total)
+
+
+def _percentis(latencias):
+    """p50, p95 e p99 em ms."""
+    if len(latencias) < 2:
+        valor = latencias[0] * 1000 if latencias else None
+        return valor, valor, valor
+    cortes = quantiles(latencias, n=100, method='inclusive')
+    return cortes[49] * 1000, cortes[94] * 1000, cortes[98] * 1000
+
+
+def metricas():
+    """
+    Retorna os agregados por view.
+
+    Returns:
+        dict: ``{nome_url: {...}}`` com contagens, médias e percentis
+        (tempos em ms); percentis sobre as últimas ``AMOSTRAS_POR_VIEW``
+    """
+    with _trava:
+        copia = {
+            nome: dict(agregado, latencias=list(agregado['latencias']))
+            for nome, agregado in _agregados.items()
+        }
+
+    resultado = {}
+    for nome, agregado in sorted(copia.items()):
+        requisicoes = agregado['requisicoes']
+        p50, p95, p99 = _percentis(agregado['latencias'])
+        resultado[nome] = {
+            'requisicoes': requisicoes,
+            'erros': agregado['erros'],
+            'estouros_orcamento': agregado['estouros'],
+            'orcamento': obter_orcamento(nome),
+            'consultas_media': round(agregado['consultas'] / requisicoes, 2),
+            'consultas_max': agregado['consultas_max'],
+            'tempo_banco_medio_ms': round(agregado['tempo_banco'] * 1000 / requisicoes, 2),
+            'tempo_templates_medio_ms': round(agregado['tempo_templates'] * 1000 / requisicoes, 2),
+            'tempo_medio_ms': round(agregado['tempo_total'] * 1000 / requisicoes, 2),
+            'p50_ms': round(p50, 2),
+            'p95_ms': round(p95, 2),
+            'p99_ms': round(p99, 2),
+        }
+    return resultado
+
+
+def metricas_texto():
+    """
+    Formata os agregados no formato texto do Prometheus.
+
+    Returns:
+        str: Uma métrica por linha, rotulada pela view
+    """
+    series = [
+        ('gestao_requisicoes_total', 'counter', 'requisicoes'),
+        ('gestao_erros_total', 'counter', 'erros'),
+        ('gestao_estouros_orcamento_total', 'counter', 'estouros_orcamento'),
+        ('gestao_consultas_media', 'gauge', 'consultas_media'),
+        ('gestao_tempo_banco_medio_ms', 'gauge', 'tempo_banco_medio_ms'),
+        ('gestao_tempo_templates_medio_ms', 'gauge', 'tempo_templates_medio_ms'),
+        ('gestao_latencia_p50_ms', 'gauge', 'p50_ms'),
+        ('gestao_latencia_p95_ms', 'gauge', 'p95_ms'),
+        ('gestao_latencia_p99_ms', 'gauge', 'p99_ms'),
+    ]
+    dados = metricas()
+
+    linhas = []
+    for metrica, tipo, campo in series:
+        linhas.append(f'# TYPE {metrica} {tipo}')
+        for nome, valores in dados.items():
+            linhas.append(f'{metrica}{{view="{nome}"}} {valores[campo]}')
+    return '\n'.join(linhas) + '\n'
+
+
+def limpar_metricas():
+    """Descarta os agregados (usado em testes e benchmarks)."""
+    with _trava:
+        _agregados.clear()
+
+
+class TemplateMedido:
+    """Template do backend Django que soma seu tempo de renderização."""
+
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, nome):
+        return getattr(self.template, nome)
+
+    def render(self, context=None, request=None):
+        medicao = medicao_atual()
+        if medicao is None:
+            return self.template.render(context, request)
+
+        # Templates renderizados dentro de outro (ex: render_to_string em
+        # uma tag) já estão contados no tempo do externo
+        medicao._templates_abertos += 1
+        inicio = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            medicao._templates_abertos -= 1
+            if not medicao._templates_abertos:
+                medicao.tempo_templates += time.perf_counter() - inicio
+
+
+class DjangoTemplatesMedidos(DjangoTemplates):
+    """Backend de templates do Django com medição de renderização."""
+
+    def from_string(self, template_code):
+        return TemplateMedido(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TemplateMedido(super().get_template(template_name))
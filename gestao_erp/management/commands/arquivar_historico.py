@@ -0,0 +1,60 @@
+"""
+Comando para arquivar o histórico de movimentações de meses encerrados.
+
+Move as movimentações de estoque e de capital de giro até o mês informado
+(inclusive) para as tabelas de arquivo, deixando os resumos mensais por
+produto e os saldos diários do capital na base principal. Pode rodar
+mensalmente (cron ou agendador), arquivando o mês anterior ao último.
+
+Uso:
+    python manage.py arquivar_historico --ate 2025-06
+    python manage.py arquivar_historico --ate 2025-06 --lote 2000
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gestao_erp.arquivamento import TAMANHO_LOTE, arquivar
+
+
+class Command(BaseCommand):
+    """Move movimentações de meses encerrados para as tabelas de arquivo."""
+
+    help = 'Arquiva as movimentações de estoque e de capital até o mês informado'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ate', required=True, help='Último mês arquivado, AAAA-MM')
+        parser.add_argument(
+            '--lote', type=int, default=TAMANHO_LOTE,
+            help=f'Linhas movidas por transação (padrão: {TAMANHO_LOTE})'
+        )
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError('--lote deve ser maior que zero.')
+        try:
+            ate = date.fromisoformat(f"{options['ate']}-01")
+        except ValueError:
+            raise CommandError('Mês inválido em --ate (use AAAA-MM).')
+
+        try:
+            resultado = arquivar(ate, tamanho_lote=options['lote'])
+        except ValueError as erro:
+            raise CommandError(str(erro))
+
+        if not resultado.meses:
+            self.stdout.write(self.style.SUCCESS(
+                f'Nenhuma movimentação a arquivar até {ate:%m/%Y}.'
+            ))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{resultado.movimentacoes} movimentações de estoque e '
+            f'{resultado.lancamentos_capital} de capital arquivadas '
+            f'({resultado.meses[0]:%m/%Y} a {resultado.meses[-1]:%m/%Y}) '
+            f'em {resultado.duracao:.1f}s.'
+        ))
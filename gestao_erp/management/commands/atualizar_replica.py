@@ -0,0 +1,75 @@
+"""
+Comando para atualizar a cópia SQLite usada como réplica dos relatórios.
+
+Copia o banco principal para o arquivo do alias ``replica`` (ver
+``gestao_erp.banco.copiar_sqlite``). Com ``--intervalo``, repete a cópia
+até ser interrompido; o intervalo deve ficar bem abaixo de
+``REPLICA_ATRASO_MAXIMO``, senão os relatórios voltam a ler do principal
+entre uma cópia e outra.
+
+No PostgreSQL a réplica é mantida pela replicação do próprio servidor e
+este comando não se aplica.
+
+Uso:
+    python manage.py atualizar_replica
+    python manage.py atualizar_replica --intervalo 60
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from gestao_erp import roteadores
+from gestao_erp.banco import caminho_sqlite, copiar_sqlite
+
+
+class Command(BaseCommand):
+    """Copia o banco SQLite principal para a réplica dos relatórios."""
+
+    help = 'Atualiza a cópia SQLite usada pelos relatórios (alias replica)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            help='Repete a cópia a cada N segundos (padrão: copia uma vez)'
+        )
+
+    def handle(self, *args, **options):
+        intervalo = options['intervalo']
+        if intervalo is not None and intervalo <= 0:
+            raise CommandError('O intervalo deve ser positivo.')
+        if not roteadores.replica_configurada():
+            raise CommandError('Nenhuma réplica configurada (GESTAO_DB_REPLICA=0?).')
+
+        principal = connections[DEFAULT_DB_ALIAS]
+        replica = connections[roteadores.REPLICA]
+        if principal.vendor != 'sqlite' or replica.vendor != 'sqlite':
+            raise CommandError(
+                'A cópia só se aplica ao SQLite; no PostgreSQL use a replicação do servidor.'
+            )
+
+        origem = caminho_sqlite(principal.settings_dict['NAME'])
+        destino = caminho_sqlite(replica.settings_dict['NAME'])
+        if origem == destino:
+            raise CommandError('A réplica e o banco principal são o mesmo arquivo.')
+
+        if intervalo is not None and intervalo >= roteadores.atraso_maximo():
+            self.stderr.write(
+                'Intervalo maior que REPLICA_ATRASO_MAXIMO: os relatórios lerão do '
+                'principal entre uma cópia e outra.'
+            )
+
+        while True:
+            inicio = time.perf_counter()
+            copiar_sqlite(origem, destino)
+            self.stdout.write(self.style.SUCCESS(
+                f'Réplica atualizada em {time.perf_counter() - inicio:.2f}s: {destino}'
+            ))
+            if intervalo is None:
+                break
+            time.sleep(intervalo)
@@ -0,0 +1,84 @@
+"""
+Comando para medir os dashboards assíncronos com e sem consultas paralelas.
+
+Cria um banco de teste separado (o banco configurado não é alterado),
+gera dados sintéticos e mede os dashboards pelo caminho ASGI, com as
+consultas em sequência (``CONSULTAS_PARALELAS=1``) e em paralelo.
+
+Uso:
+    python manage.py benchmark_dashboards
+    python manage.py benchmark_dashboards --produtos 5000 --dias 365 --paralelas 6
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from estoque.dados_sinteticos import GeradorDadosSinteticos
+from gestao_erp import assincrono, benchmark, cache
+
+
+class Command(BaseCommand):
+    """Compara a latência dos dashboards com consultas em sequência e em paralelo."""
+
+    help = 'Mede os dashboards assíncronos com e sem consultas em paralelo'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--produtos', type=int, default=2000)
+        parser.add_argument('--dias', type=int, default=180)
+        parser.add_argument('--vendas-por-dia', type=int, default=500)
+        parser.add_argument('--semente', type=int, default=42)
+        parser.add_argument('--repeticoes', type=int, default=15)
+        parser.add_argument(
+            '--paralelas',
+            type=int,
+            default=assincrono.CONSULTAS_PARALELAS_PADRAO,
+            help='Threads do modo paralelo (padrão: %(default)s)'
+        )
+
+    def handle(self, *args, **options):
+        if min(options['produtos'], options['dias'], options['repeticoes']) < 1:
+            raise CommandError('Produtos, dias e repetições devem ser positivos.')
+        if options['paralelas'] < 2:
+            raise CommandError('O modo paralelo precisa de ao menos 2 threads.')
+
+        setup_test_environment(debug=False)
+        bancos = setup_databases(verbosity=0, interactive=False)
+        try:
+            usuario = User.objects.create_superuser('benchmark', password=None)
+            dados = GeradorDadosSinteticos(usuario, semente=options['semente']).gerar(
+                options['produtos'], options['dias'], options['vendas_por_dia']
+            )
+            self.stdout.write(
+                f'{dados.produtos} produtos e {dados.movimentacoes} movimentações '
+                f'gerados em {dados.duracao:.1f}s ({connection.vendor})'
+            )
+            resultado = benchmark.comparar_paralelismo(
+                usuario, options['repeticoes'], options['paralelas']
+            )
+        finally:
+            cache.invalidar('permissoes', 'estoque', 'financeiro')
+            teardown_databases(bancos, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write(
+            f"{'view':24} {'seq. p50':>9} {'seq. p95':>9} {'par. p50':>9} {'par. p95':>9} {'ganho':>7}"
+        )
+        for nome_url, modos in resultado.items():
+            sequencial, paralelo = modos['sequencial'], modos['paralelo']
+            if sequencial['status'] != 200 or paralelo['status'] != 200:
+                raise CommandError(f'{nome_url} respondeu {sequencial["status"]}/{paralelo["status"]}.')
+            ganho = 1 - paralelo['p50_ms'] / sequencial['p50_ms'] if sequencial['p50_ms'] else 0
+            self.stdout.write(
+                f"{nome_url:24} {sequencial['p50_ms']:>7.2f}ms {sequencial['p95_ms']:>7.2f}ms "
+                f"{paralelo['p50_ms']:>7.2f}ms {paralelo['p95_ms']:>7.2f}ms {ganho:>7.0%}"
+            )
@@ -0,0 +1,55 @@
+"""
+Comando para comparar a concorrência do SQLite com e sem os ajustes.
+
+Mede, em bancos temporários, leituras e escritas simultâneas com cada
+perfil de ``gestao_erp.banco.PERFIS_SQLITE`` (o banco configurado não é
+usado).
+
+Uso:
+    python manage.py benchmark_sqlite
+    python manage.py benchmark_sqlite --escritores 8 --leitores 8 --duracao 10
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gestao_erp.banco import PERFIS_SQLITE, medir_concorrencia
+
+
+class Command(BaseCommand):
+    """Compara leituras e escritas concorrentes entre os perfis do SQLite."""
+
+    help = 'Compara a concorrência do SQLite entre os perfis padrao e producao'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escritores', type=int, default=4)
+        parser.add_argument('--leitores', type=int, default=4)
+        parser.add_argument('--duracao', type=float, default=3.0, help='Segundos por perfil')
+        parser.add_argument(
+            '--perfil',
+            action='append',
+            choices=list(PERFIS_SQLITE),
+            help='Perfil a medir (repetível; padrão: todos)'
+        )
+
+    def handle(self, *args, **options):
+        if min(options['escritores'], options['leitores']) < 0 or options['duracao'] <= 0:
+            raise CommandError('Escritores, leitores e duração não podem ser negativos.')
+
+        self.stdout.write(
+            f"{'perfil':10} {'escritas/s':>11} {'leituras/s':>11} {'travas':>7} "
+            f"{'escrita p95':>12} {'leitura p95':>12} {'consistente':>12}"
+        )
+        for perfil in options['perfil'] or PERFIS_SQLITE:
+            medida = medir_concorrencia(
+                perfil, options['escritores'], options['leitores'], options['duracao']
+            )
+            self.stdout.write(
+                f"{perfil:10} {medida['escritas_s']:>11.1f} {medida['leituras_s']:>11.1f} "
+                f"{medida['travas']:>7} {medida['escrita_p95_ms']:>10.2f}ms "
+                f"{medida['leitura_p95_ms']:>10.2f}ms {'sim' if medida['consistente'] else 'NÃO':>12}"
+            )
+            if not medida['consistente']:
+                raise CommandError(f'Saldo inconsistente no perfil {perfil}.')
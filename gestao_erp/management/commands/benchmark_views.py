@@ -0,0 +1,161 @@
+"""
+Comando para medir as principais views e compará-las com a linha de base.
+
+Cria um banco de teste separado (o banco configurado não é alterado),
+gera dados sintéticos, mede as views de ``gestao_erp.benchmark.VIEWS`` e
+grava o resultado em JSON. Com uma linha de base, termina com erro se
+alguma view regredir.
+
+Uso:
+    python manage.py benchmark_views
+    python manage.py benchmark_views --produtos 5000 --dias 365 --saida resultado.json
+    python manage.py benchmark_views --atualizar-baseline
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+from django.utils import timezone
+
+from estoque.dados_sinteticos import GeradorDadosSinteticos
+from gestao_erp import benchmark, cache
+
+
+BASELINE_PADRAO = Path(settings.BASE_DIR) / 'benchmarks' / 'baseline.json'
+
+# Parâmetros que precisam coincidir com os da linha de base
+PARAMETROS_DADOS = ('produtos', 'dias', 'vendas_por_dia', 'semente')
+
+
+class Command(BaseCommand):
+    """Mede latência, consultas e memória das views sobre dados sintéticos."""
+
+    help = 'Mede as principais views sobre dados sintéticos e compara com a linha de base'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--produtos', type=int, default=2000)
+        parser.add_argument('--dias', type=int, default=180)
+        parser.add_argument('--vendas-por-dia', type=int, default=500)
+        parser.add_argument('--semente', type=int, default=42)
+        parser.add_argument('--repeticoes', type=int, default=15)
+        parser.add_argument('--saida', help='Arquivo JSON para gravar o resultado')
+        parser.add_argument(
+            '--baseline',
+            default=str(BASELINE_PADRAO),
+            help='Linha de base para comparação (padrão: benchmarks/baseline.json)'
+        )
+        parser.add_argument(
+            '--tolerancia',
+            type=float,
+            default=benchmark.TOLERANCIA_PADRAO,
+            help=f'Fator máximo sobre a base (padrão: {benchmark.TOLERANCIA_PADRAO})'
+        )
+        parser.add_argument(
+            '--atualizar-baseline',
+            action='store_true',
+            help='Grava o resultado como nova linha de base em vez de comparar'
+        )
+
+    def handle(self, *args, **options):
+        if min(options['produtos'], options['dias'], options['repeticoes']) < 1:
+            raise CommandError('Produtos, dias e repetições devem ser positivos.')
+        if options['tolerancia'] < 1:
+            raise CommandError('A tolerância deve ser maior ou igual a 1.')
+
+        configuracao = {
+            parametro: options[parametro]
+            for parametro in PARAMETROS_DADOS + ('repeticoes',)
+        }
+        resultado = {
+            'configuracao': configuracao,
+            'banco': connection.vendor,
+            'data': timezone.now().isoformat(timespec='seconds'),
+            'views': self.medir(configuracao),
+        }
+
+        self.exibir(resultado['views'])
+
+        if options['saida']:
+            self.gravar(options['saida'], resultado)
+
+        caminho_base = Path(options['baseline'])
+        if options['atualizar_baseline']:
+            self.gravar(caminho_base, resultado)
+            return
+
+        if not caminho_base.exists():
+            self.stdout.write(f'Sem linha de base em {caminho_base}; nada a comparar.')
+            return
+
+        base = json.loads(caminho_base.read_text(encoding='utf-8'))
+        diferentes = [
+            parametro for parametro in PARAMETROS_DADOS
+            if base['configuracao'].get(parametro) != configuracao[parametro]
+        ]
+        if diferentes or base.get('banco') != resultado['banco']:
+            raise CommandError(
+                'A linha de base foi gerada com outros dados ou outro banco '
+                f"({', '.join(diferentes) or 'banco'}); use os mesmos parâmetros "
+                'ou --atualizar-baseline.'
+            )
+
+        regressoes = benchmark.comparar(resultado['views'], base['views'], options['tolerancia'])
+        if regressoes:
+            for regressao in regressoes:
+                self.stderr.write(regressao)
+            raise CommandError(f'{len(regressoes)} regressões em relação à linha de base.')
+
+        self.stdout.write(self.style.SUCCESS('Nenhuma regressão em relação à linha de base.'))
+
+    def medir(self, configuracao):
+        """Gera os dados em um banco de teste e mede as views."""
+        # DEBUG desligado como em produção (e como no executor de testes)
+        setup_test_environment(debug=False)
+        bancos = setup_databases(verbosity=0, interactive=False)
+        try:
+            usuario = User.objects.create_superuser('benchmark', password=None)
+            dados = GeradorDadosSinteticos(usuario, semente=configuracao['semente']).gerar(
+                configuracao['produtos'], configuracao['dias'], configuracao['vendas_por_dia']
+            )
+            self.stdout.write(
+                f'{dados.produtos} produtos e {dados.movimentacoes} movimentações '
+                f'gerados em {dados.duracao:.1f}s ({connection.vendor})'
+            )
+            return benchmark.executar(usuario, configuracao['repeticoes'])
+        finally:
+            # Perfis de acesso do banco de teste não podem sobrar em um
+            # cache compartilhado com o banco real
+            cache.invalidar('permissoes', 'estoque', 'financeiro')
+            teardown_databases(bancos, verbosity=0)
+            teardown_test_environment()
+
+    def exibir(self, views):
+        self.stdout.write(
+            f"{'view':32} {'status':>6} {'consultas':>9} {'p50 ms':>9} {'p95 ms':>9} {'pico KB':>9}"
+        )
+        for nome_url, medida in views.items():
+            self.stdout.write(
+                f"{nome_url:32} {medida['status']:>6} {medida['consultas']:>9} "
+                f"{medida['p50_ms']:>9.2f} {medida['p95_ms']:>9.2f} {medida['memoria_pico_kb']:>9.1f}"
+            )
+
+    def gravar(self, caminho, resultado):
+        caminho = Path(caminho)
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        caminho.write_text(
+            json.dumps(resultado, indent=2, ensure_ascii=False) + '\n', encoding='utf-8'
+        )
+        self.stdout.write(f'Resultado gravado em {caminho}')
@@ -0,0 +1,55 @@
+"""
+Comando para devolver um mês arquivado às tabelas principais.
+
+As movimentações voltam com os ids e as datas originais e os resumos
+mensais do mês são descontados.
+
+Uso:
+    python manage.py restaurar_historico --mes 2025-06
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gestao_erp.arquivamento import TAMANHO_LOTE, meses_arquivados, restaurar
+
+
+class Command(BaseCommand):
+    """Move as movimentações arquivadas de um mês de volta às tabelas principais."""
+
+    help = 'Restaura as movimentações arquivadas de um mês'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mes', required=True, help='Mês restaurado, AAAA-MM')
+        parser.add_argument(
+            '--lote', type=int, default=TAMANHO_LOTE,
+            help=f'Linhas movidas por transação (padrão: {TAMANHO_LOTE})'
+        )
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError('--lote deve ser maior que zero.')
+        try:
+            mes = date.fromisoformat(f"{options['mes']}-01")
+        except ValueError:
+            raise CommandError('Mês inválido em --mes (use AAAA-MM).')
+
+        resultado = restaurar(mes, tamanho_lote=options['lote'])
+
+        if not resultado.meses:
+            arquivados = ', '.join(f'{arquivado:%m/%Y}' for arquivado in meses_arquivados())
+            self.stdout.write(self.style.WARNING(
+                f'Nenhuma movimentação arquivada em {mes:%m/%Y}. '
+                f'Meses arquivados: {arquivados or "nenhum"}.'
+            ))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{resultado.movimentacoes} movimentações de estoque e '
+            f'{resultado.lancamentos_capital} de capital restauradas '
+            f'({mes:%m/%Y}) em {resultado.duracao:.1f}s.'
+        ))
@@ -0,0 +1,87 @@
+"""
+Comando para rodar a suíte de testes em SQLite e em PostgreSQL.
+
+O PostgreSQL é uma instância temporária criada com initdb/pg_ctl (ver
+``gestao_erp.paridade``); requer os binários do PostgreSQL e o psycopg
+(``pip install -r requirements-postgresql.txt``).
+
+Uso:
+    python manage.py testar_backends
+    python manage.py testar_backends --banco postgresql --pg-bin /usr/lib/postgresql/16/bin
+    python manage.py testar_backends estoque
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+import importlib.util
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from gestao_erp import paridade
+
+
+class Command(BaseCommand):
+    """Roda os testes em cada banco suportado e compara os resultados."""
+
+    help = 'Roda a suíte de testes em SQLite e PostgreSQL (instância temporária)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'apps',
+            nargs='*',
+            default=list(paridade.APPS_TESTADOS),
+            help='Apps testados (padrão: %(default)s)'
+        )
+        parser.add_argument(
+            '--banco',
+            action='append',
+            choices=paridade.BANCOS,
+            help='Banco a testar (repetível; padrão: todos)'
+        )
+        parser.add_argument('--pg-bin', help='Diretório do initdb e do pg_ctl')
+
+    def handle(self, *args, **options):
+        bancos = options['banco'] or paridade.BANCOS
+        resultados = []
+
+        for banco in bancos:
+            self.stdout.write(f'Testando com {banco}...')
+            if banco == 'sqlite':
+                resultado = paridade.executar_suite(
+                    banco, {'GESTAO_DB_ENGINE': 'sqlite'}, settings.BASE_DIR, options['apps']
+                )
+            else:
+                resultado = self.testar_postgresql(options)
+            resultados.append(resultado)
+
+        self.stdout.write(f"{'banco':12} {'testes':>7} {'pulados':>8} {'falhas':>7} {'duração':>9}")
+        for resultado in resultados:
+            self.stdout.write(
+                f'{resultado.banco:12} {resultado.testes:>7} {resultado.pulados:>8} '
+                f'{resultado.falhas:>7} {resultado.duracao:>8.1f}s'
+            )
+
+        falharam = [resultado for resultado in resultados if not resultado.sucesso]
+        for resultado in falharam:
+            self.stderr.write(f'--- {resultado.banco} ---\n{resultado.saida[-5000:]}')
+        if falharam:
+            raise CommandError(
+                f"A suíte falhou em: {', '.join(resultado.banco for resultado in falharam)}."
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Suíte aprovada em: {', '.join(bancos)}."))
+
+    def testar_postgresql(self, options):
+        if importlib.util.find_spec('psycopg') is None:
+            raise CommandError(
+                'psycopg não instalado; use pip install -r requirements-postgresql.txt.'
+            )
+        try:
+            with paridade.PostgresTemporario(options['pg_bin']) as postgres:
+                return paridade.executar_suite(
+                    'postgresql', postgres.ambiente(), settings.BASE_DIR, options['apps']
+                )
+        except (FileNotFoundError, RuntimeError) as erro:
+            raise CommandError(str(erro))
@@ -0,0 +1,148 @@
+"""
+Comando para o teste de carga concorrente dos caminhos de escrita.
+
+Cria um banco de teste separado (o banco configurado não é alterado),
+executa movimentações de estoque, receitas e despesas a partir de vários
+trabalhadores simultâneos e confere as invariantes ao final. Termina com
+erro se alguma invariante for violada.
+
+Uso:
+    python manage.py teste_carga
+    python manage.py teste_carga --operacoes 5000 --concorrencia 16 --produtos 5
+    python manage.py teste_carga --processos --mix movimentacao=80,despesa=20 --saida carga.json
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+import json
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+from django.utils import timezone
+
+from gestao_erp import cache, carga
+
+
+class Command(BaseCommand):
+    """Dispara escritas concorrentes e confere a consistência do banco."""
+
+    help = 'Teste de carga concorrente de movimentações, receitas e despesas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--operacoes', type=int, default=2000)
+        parser.add_argument('--concorrencia', type=int, default=8)
+        parser.add_argument(
+            '--produtos',
+            type=int,
+            default=10,
+            help='Produtos disputados (menos produtos, mais disputa)'
+        )
+        parser.add_argument(
+            '--mix',
+            default=','.join(f'{op}={peso}' for op, peso in carga.MIX_PADRAO.items()),
+            help='Peso de cada operação (padrão: %(default)s)'
+        )
+        parser.add_argument('--semente', type=int, default=42)
+        parser.add_argument(
+            '--processos',
+            action='store_true',
+            help='Usa processos em vez de threads'
+        )
+        parser.add_argument('--saida', help='Arquivo JSON para gravar o resultado')
+
+    def handle(self, *args, **options):
+        if min(options['operacoes'], options['concorrencia'], options['produtos']) < 1:
+            raise CommandError('Operações, concorrência e produtos devem ser positivos.')
+        try:
+            mix = carga.interpretar_mix(options['mix'])
+        except ValueError as erro:
+            raise CommandError(str(erro))
+
+        configuracao = {
+            'operacoes': options['operacoes'],
+            'concorrencia': options['concorrencia'],
+            'produtos': options['produtos'],
+            'mix': mix,
+            'semente': options['semente'],
+            'modo': 'processos' if options['processos'] else 'threads',
+        }
+
+        resultado, violacoes = self.executar(configuracao)
+        resumo = resultado.resumo()
+        self.exibir(resumo, resultado.duracao)
+
+        for erro in resultado.erros[:20]:
+            self.stderr.write(f'  {erro}')
+
+        if options['saida']:
+            caminho = Path(options['saida'])
+            caminho.parent.mkdir(parents=True, exist_ok=True)
+            caminho.write_text(json.dumps({
+                'configuracao': configuracao,
+                'banco': connection.vendor,
+                'data': timezone.now().isoformat(timespec='seconds'),
+                'duracao_s': round(resultado.duracao, 3),
+                'resumo': resumo,
+                'violacoes': violacoes,
+            }, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+            self.stdout.write(f'Resultado gravado em {caminho}')
+
+        if violacoes:
+            for violacao in violacoes:
+                self.stderr.write(violacao)
+            raise CommandError(f'{len(violacoes)} invariantes violadas após a carga.')
+
+        total = resumo['total']
+        self.stdout.write(self.style.SUCCESS(
+            f"Invariantes conferidas: {total['sucesso']} operações gravadas, "
+            f"{total['bloqueio']} bloqueios, {total['erro']} erros."
+        ))
+
+    def executar(self, configuracao):
+        """Prepara um banco de teste, executa a carga e confere as invariantes."""
+        setup_test_environment(debug=False)
+        bancos = setup_databases(verbosity=0, interactive=False)
+        try:
+            usuario = User.objects.create_superuser('carga', password=None)
+            produtos = carga.preparar(usuario, configuracao['produtos'])
+            self.stdout.write(
+                f"{configuracao['operacoes']} operações em {configuracao['concorrencia']} "
+                f"{configuracao['modo']} ({connection.vendor})"
+            )
+            resultado = carga.executar(
+                usuario,
+                produtos,
+                configuracao['operacoes'],
+                configuracao['concorrencia'],
+                mix=configuracao['mix'],
+                semente=configuracao['semente'],
+                processos=configuracao['modo'] == 'processos',
+            )
+            return resultado, carga.verificar_invariantes(resultado)
+        finally:
+            cache.invalidar('permissoes', 'estoque', 'financeiro')
+            teardown_databases(bancos, verbosity=0)
+            teardown_test_environment()
+
+    def exibir(self, resumo, duracao):
+        self.stdout.write(
+            f"{'operação':14} {'total':>6} {'ok':>6} {'rejeit.':>7} {'bloq.':>6} {'erros':>6} "
+            f"{'op/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+        )
+        for nome, linha in resumo.items():
+            self.stdout.write(
+                f"{nome:14} {linha['quantidade']:>6} {linha['sucesso']:>6} "
+                f"{linha['rejeitada']:>7} {linha['bloqueio']:>6} {linha['erro']:>6} "
+                f"{linha['vazao']:>8.1f} {linha['p50_ms']:>8.2f} {linha['p95_ms']:>8.2f} "
+                f"{linha['p99_ms']:>8.2f}"
+            )
+        self.stdout.write(f'Duração: {duracao:.2f}s')
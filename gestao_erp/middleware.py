@@ -0,0 +1,162 @@
+"""
+Middleware do projeto Gestão ERP.
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from . import desempenho, roteadores
+
+
+# Nome usado nas métricas para requisições sem rota (404)
+SEM_ROTA = '(sem rota)'
+
+
+def _medir_conexoes(medicao):
+    """
+    Passa as consultas das conexões da thread atual pela medição.
+
+    As conexões do Django são por thread: nas requisições assíncronas, o
+    ORM roda na thread de ``sync_to_async``, e é lá que esta função deve
+    ser chamada (e a pilha devolvida, fechada).
+
+    Returns:
+        ExitStack: Pilha que remove os ``execute_wrapper`` ao ser fechada
+    """
+    pilha = ExitStack()
+    for conexao in connections.all():
+        pilha.enter_context(conexao.execute_wrapper(medicao))
+    return pilha
+
+
+class MedicaoDesempenhoMiddleware:
+    """
+    Mede consultas SQL, tempo de banco, de templates e latência total de
+    cada requisição (ver desempenho.py).
+
+    Deve ser o primeiro da lista ``MIDDLEWARE`` para incluir as consultas
+    de sessão e autenticação feitas pelos demais. Funciona nos modos
+    síncrono e assíncrono, então as views assíncronas (dashboards) não são
+    convertidas para síncronas ao passar por ele.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        medicao, token = desempenho.iniciar_medicao()
+        try:
+            with _medir_conexoes(medicao):
+                response = self.get_response(request)
+        finally:
+            desempenho.finalizar_medicao(token)
+        return self._concluir(request, response, medicao)
+
+    async def __acall__(self, request):
+        medicao, token = desempenho.iniciar_medicao()
+        try:
+            pilha = await sync_to_async(_medir_conexoes)(medicao)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(pilha.close)()
+        finally:
+            desempenho.finalizar_medicao(token)
+        return self._concluir(request, response, medicao)
+
+    def _concluir(self, request, response, medicao):
+        """Registra a medição (ou a adia até o fim do envio em fluxo)."""
+        nome_url = SEM_ROTA
+        if request.resolver_match is not None:
+            nome_url = request.resolver_match.view_name
+
+        if response.streaming:
+            # O corpo é gerado depois que o middleware retorna: a medição
+            # continua durante o envio e é registrada ao final
+            medir_fluxo = self._medir_fluxo_assincrono if response.is_async else self._medir_fluxo
+            response.streaming_content = medir_fluxo(
+                response.streaming_content, medicao, nome_url,
+                request.method, response.status_code
+            )
+        else:
+            medicao.encerrar()
+            desempenho.registrar(nome_url, request.method, medicao, response.status_code)
+            if getattr(settings, 'DESEMPENHO_SERVER_TIMING', True):
+                response['Server-Timing'] = medicao.server_timing()
+        return response
+
+    def _medir_fluxo(self, conteudo, medicao, nome_url, metodo, status):
+        """Repassa o conteúdo em fluxo contando as consultas feitas nele."""
+        try:
+            with _medir_conexoes(medicao):
+                yield from conteudo
+        finally:
+            medicao.encerrar()
+            desempenho.registrar(nome_url, metodo, medicao, status)
+
+    async def _medir_fluxo_assincrono(self, conteudo, medicao, nome_url, metodo, status):
+        """Versão de ``_medir_fluxo`` para conteúdo em fluxo assíncrono."""
+        try:
+            pilha = await sync_to_async(_medir_conexoes)(medicao)
+            try:
+                async for parte in conteudo:
+                    yield parte
+            finally:
+                await sync_to_async(pilha.close)()
+        finally:
+            medicao.encerrar()
+            desempenho.registrar(nome_url, metodo, medicao, status)
+
+
+class FixacaoPrincipalMiddleware:
+    """
+    Registra no cookie ``roteadores.COOKIE_ULTIMA_ESCRITA`` o momento das
+    requisições de escrita (POST, PUT, PATCH, DELETE).
+
+    Até a réplica alcançar esse momento, as leituras desse navegador nas
+    views com ``usar_replica`` vão para o banco principal (ver
+    roteadores.py). Funciona nos modos síncrono e assíncrono.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self._marcar_escrita(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self._marcar_escrita(request, await self.get_response(request))
+
+    def _marcar_escrita(self, request, response):
+        if request.method in roteadores.METODOS_ESCRITA and roteadores.replica_configurada():
+            response.set_cookie(
+                roteadores.COOKIE_ULTIMA_ESCRITA,
+                f'{time.time():.3f}',
+                max_age=roteadores.atraso_maximo(),
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
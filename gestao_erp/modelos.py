@@ -0,0 +1,41 @@
+"""
+Utilitários de modelos compartilhados entre os apps.
+
+``datas_informadas`` permite gravar registros com as datas que o código
+informa, em vez das preenchidas por ``auto_now``/``auto_now_add``: usado
+pela geração de dados sintéticos (histórico no passado) e pelo
+arquivamento (linhas restauradas mantêm as datas originais).
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+from contextlib import contextmanager
+
+
+@contextmanager
+def datas_informadas(*modelos):
+    """
+    Desliga ``auto_now``/``auto_now_add`` dos modelos durante o bloco.
+
+    Permite gravar datas do passado com ``bulk_create``. A alteração vale
+    para o processo inteiro: use apenas em comandos, nunca em views.
+
+    Args:
+        *modelos: Classes de modelo afetadas
+    """
+    campos = [
+        campo
+        for modelo in modelos
+        for campo in modelo._meta.concrete_fields
+        if getattr(campo, 'auto_now', False) or getattr(campo, 'auto_now_add', False)
+    ]
+    originais = [(campo, campo.auto_now, campo.auto_now_add) for campo in campos]
+    for campo in campos:
+        campo.auto_now = campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo, auto_now, auto_now_add in originais:
+            campo.auto_now = auto_now
+            campo.auto_now_add = auto_now_add
@@ -0,0 +1,191 @@
+"""
+Paginação por cursor (keyset) para as listagens do sistema.
+
+Em vez de OFFSET, cada página é buscada a partir da última linha da página
+anterior: ``WHERE (data, id) < (ultima_data, ultimo_id) ORDER BY data DESC,
+id DESC LIMIT n``. Com um índice nas colunas de ordenação o custo de uma
+página é o mesmo na primeira ou na milésima página, e os links continuam
+estáveis quando novas linhas são inseridas.
+
+O cursor é a chave de ordenação da linha de referência codificada em
+base64 na URL (parâmetros ``apos`` e ``antes``).
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+# Tamanho de página padrão e máximo aceito no parâmetro ``por_pagina``
+TAMANHO_PAGINA_PADRAO = 50
+TAMANHO_PAGINA_MAXIMO = 200
+
+
+class Pagina:
+    """
+    Uma página de resultados e os links para as páginas vizinhas.
+
+    Attributes:
+        itens (list): Objetos da página, na ordem de exibição
+        tamanho (int): Tamanho de página utilizado
+        url_proxima (str): Query string da próxima página (ou None)
+        url_anterior (str): Query string da página anterior (ou None)
+        url_primeira (str): Query string da primeira página
+    """
+
+    def __init__(self, itens, tamanho, url_proxima, url_anterior, url_primeira):
+        self.itens = itens
+        self.tamanho = tamanho
+        self.url_proxima = url_proxima
+        self.url_anterior = url_anterior
+        self.url_primeira = url_primeira
+
+    def __iter__(self):
+        return iter(self.itens)
+
+    def __len__(self):
+        return len(self.itens)
+
+    def __bool__(self):
+        return bool(self.itens)
+
+
+def _codificar_cursor(valores):
+    """Codifica a chave de ordenação de uma linha para uso na URL."""
+    texto = json.dumps([str(valor) for valor in valores])
+    return base64.urlsafe_b64encode(texto.encode()).decode().rstrip('=')
+
+
+def _decodificar_cursor(cursor, campos):
+    """
+    Decodifica um cursor, convertendo cada valor para o tipo do campo.
+
+    Returns:
+        list: Valores da chave de ordenação, ou None se o cursor for inválido
+    """
+    try:
+        texto = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        valores = json.loads(texto)
+        if not isinstance(valores, list) or len(valores) != len(campos):
+            return None
+        return [campo.to_python(valor) for campo, valor in zip(campos, valores)]
+    except (ValueError, TypeError, ValidationError):
+        return None
+
+
+def _filtro_apos(ordenacao, valores):
+    """
+    Monta o filtro "linha vem depois de ``valores``" para a ordenação dada.
+
+    Para ``('-data', '-id')`` gera ``data <= v0 AND (data < v0 OR id < v1)``:
+    equivalente à comparação de tuplas, mas com a primeira coluna como
+    limite de intervalo, o que permite ao banco usar o índice.
+    """
+    nome, *_ = ordenacao
+    operador = 'lt' if nome.startswith('-') else 'gt'
+    nome = nome.lstrip('-')
+
+    if len(ordenacao) == 1:
+        return Q(**{f'{nome}__{operador}': valores[0]})
+
+    restante = _filtro_apos(ordenacao[1:], valores[1:])
+    return Q(**{f'{nome}__{operador}e': valores[0]}) & (
+        Q(**{f'{nome}__{operador}': valores[0]}) | restante
+    )
+
+
+def _inverter(ordenacao):
+    """Inverte o sentido de cada campo de ordenação."""
+    return tuple(
+        nome[1:] if nome.startswith('-') else f'-{nome}' for nome in ordenacao
+    )
+
+
+def _query_string(request, **parametros):
+    """Copia os parâmetros GET da requisição substituindo os informados."""
+    query = request.GET.copy()
+    for nome in ('apos', 'antes'):
+        query.pop(nome, None)
+    for nome, valor in parametros.items():
+        query[nome] = valor
+    return '?' + query.urlencode()
+
+
+def obter_tamanho_pagina(request, padrao=TAMANHO_PAGINA_PADRAO):
+    """
+    Lê o parâmetro ``por_pagina``, limitado a ``TAMANHO_PAGINA_MAXIMO``.
+
+    Valores inválidos resultam no tamanho padrão.
+    """
+    try:
+        tamanho = int(request.GET.get('por_pagina', padrao))
+    except ValueError:
+        return padrao
+    return max(1, min(tamanho, TAMANHO_PAGINA_MAXIMO))
+
+
+def paginar(queryset, request, ordenacao, tamanho_padrao=TAMANHO_PAGINA_PADRAO):
+    """
+    Pagina um queryset por cursor.
+
+    A ordenação deve terminar em um campo único (normalmente ``id``) para
+    que o cursor identifique uma posição sem ambiguidade.
+
+    Args:
+        queryset (QuerySet): Consulta já filtrada
+        request: Objeto HttpRequest do Django (lê ``apos``, ``antes`` e
+            ``por_pagina``)
+        ordenacao (tuple): Campos de ordenação, ex: ``('-data', '-id')``
+        tamanho_padrao (int): Tamanho de página quando não informado
+
+    Returns:
+        Pagina: Itens da página e links de navegação
+    """
+    tamanho = obter_tamanho_pagina(request, tamanho_padrao)
+    nomes = [nome.lstrip('-') for nome in ordenacao]
+    campos = [queryset.model._meta.get_field(nome) for nome in nomes]
+
+    apos = request.GET.get('apos')
+    antes = request.GET.get('antes')
+    cursor_apos = _decodificar_cursor(apos, campos) if apos else None
+    cursor_antes = _decodificar_cursor(antes, campos) if antes else None
+
+    # Busca uma linha a mais para saber se existe outra página no mesmo sentido
+    if cursor_antes is not None:
+        ordem_inversa = _inverter(ordenacao)
+        itens = list(
+            queryset.filter(_filtro_apos(ordem_inversa, cursor_antes))
+            .order_by(*ordem_inversa)[:tamanho + 1]
+        )
+        tem_anterior = len(itens) > tamanho
+        itens = itens[:tamanho][::-1]
+        tem_proxima = True
+    else:
+        if cursor_apos is not None:
+            queryset = queryset.filter(_filtro_apos(ordenacao, cursor_apos))
+        itens = list(queryset.order_by(*ordenacao)[:tamanho + 1])
+        tem_proxima = len(itens) > tamanho
+        itens = itens[:tamanho]
+        tem_anterior = cursor_apos is not None
+
+    def chave(objeto):
+        return _codificar_cursor(getattr(objeto, nome) for nome in nomes)
+
+    url_proxima = url_anterior = None
+    if itens and tem_proxima:
+        url_proxima = _query_string(request, apos=chave(itens[-1]))
+    if itens and tem_anterior:
+        url_anterior = _query_string(request, antes=chave(itens[0]))
+
+    return Pagina(
+        itens=itens,
+        tamanho=tamanho,
+        url_proxima=url_proxima,
+        url_anterior=url_anterior,
+        url_primeira=_query_string(request),
+    )
@@ -0,0 +1,203 @@
+"""
+Execução da suíte de testes em SQLite e PostgreSQL.
+
+Cada banco roda a suíte em um processo separado (``manage.py test`` com
+as variáveis ``GESTAO_DB_*`` do banco), já que o banco é escolhido quando
+as configurações são carregadas. O PostgreSQL é uma instância local
+descartável criada com ``initdb``/``pg_ctl`` em um diretório temporário,
+acessada só por socket Unix, sem contêiner nem servidor instalado como
+serviço.
+
+Os testes que dependem de um banco específico (planos de consulta, FTS5,
+pragmas do SQLite) são pulados no outro; todos os demais precisam passar
+nos dois bancos.
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+import glob
+import os
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+
+APPS_TESTADOS = ('estoque', 'financeiro', 'gestao_erp')
+
+BANCOS = ('sqlite', 'postgresql')
+
+
+@dataclass
+class ResultadoSuite:
+    """Resultado da suíte de testes em um banco."""
+
+    banco: str
+    sucesso: bool
+    testes: int
+    pulados: int
+    falhas: int
+    duracao: float
+    saida: str
+
+
+def interpretar_saida(saida):
+    """
+    Extrai os totais do resumo do executor de testes do Django.
+
+    Args:
+        saida (str): Saída de ``manage.py test``
+
+    Returns:
+        tuple: (testes executados, pulados, falhas + erros)
+    """
+    executados = re.search(r'^Ran (\d+) tests?', saida, re.MULTILINE)
+    pulados = re.search(r'skipped=(\d+)', saida)
+    falhas = sum(int(n) for n in re.findall(r'(?:failures|errors)=(\d+)', saida))
+    return (
+        int(executados.group(1)) if executados else 0,
+        int(pulados.group(1)) if pulados else 0,
+        falhas,
+    )
+
+
+def _porta_livre():
+    with socket.socket() as conexao:
+        conexao.bind(('127.0.0.1', 0))
+        return conexao.getsockname()[1]
+
+
+class PostgresTemporario:
+    """
+    Instância local e descartável do PostgreSQL.
+
+    Uso::
+
+        with PostgresTemporario() as postgres:
+            ambiente = postgres.ambiente()
+
+    Os programas ``initdb`` e ``pg_ctl`` são procurados em ``binarios``, na
+    variável ``GESTAO_PG_BIN``, no PATH e em ``/usr/lib/postgresql/*/bin``.
+    """
+
+    def __init__(self, binarios=None):
+        self.binarios = binarios or os.environ.get('GESTAO_PG_BIN')
+        self.pasta = None
+        self.porta = None
+
+    def programa(self, nome):
+        """
+        Localiza um programa do PostgreSQL.
+
+        Raises:
+            FileNotFoundError: Se o programa não for encontrado
+        """
+        candidatos = []
+        if self.binarios:
+            candidatos.append(os.path.join(self.binarios, nome))
+        candidatos.append(shutil.which(nome))
+        candidatos.extend(sorted(glob.glob(f'/usr/lib/postgresql/*/bin/{nome}'), reverse=True))
+        for candidato in candidatos:
+            if candidato and os.access(candidato, os.X_OK):
+                return candidato
+        raise FileNotFoundError(
+            f'{nome} não encontrado; instale o PostgreSQL ou informe GESTAO_PG_BIN.'
+        )
+
+    def __enter__(self):
+        initdb, pg_ctl = self.programa('initdb'), self.programa('pg_ctl')
+        self.pasta = tempfile.mkdtemp(prefix='gestao_pg_')
+        dados = os.path.join(self.pasta, 'dados')
+        self.porta = _porta_livre()
+        try:
+            subprocess.run(
+                [initdb, '-D', dados, '-U', 'postgres', '-A', 'trust', '-E', 'UTF8', '--no-sync'],
+                check=True, capture_output=True, text=True
+            )
+            # Só socket Unix no diretório temporário; durabilidade desligada
+            # (o banco é descartado ao final)
+            opcoes = (
+                f"-p {self.porta} -k {self.pasta} -c listen_addresses='' "
+                "-c fsync=off -c synchronous_commit=off -c full_page_writes=off"
+            )
+            subprocess.run(
+                [pg_ctl, '-D', dados, '-l', os.path.join(self.pasta, 'postgres.log'),
+                 '-o', opcoes, '-w', 'start'],
+                check=True, capture_output=True, text=True
+            )
+        except subprocess.CalledProcessError as erro:
+            shutil.rmtree(self.pasta, ignore_errors=True)
+            raise RuntimeError(
+                f'Falha ao iniciar o PostgreSQL temporário: {(erro.stderr or erro.stdout).strip()}'
+            ) from erro
+        return self
+
+    def __exit__(self, *excecao):
+        try:
+            subprocess.run(
+                [self.programa('pg_ctl'), '-D', os.path.join(self.pasta, 'dados'),
+                 '-m', 'fast', '-w', 'stop'],
+                capture_output=True
+            )
+        finally:
+            shutil.rmtree(self.pasta, ignore_errors=True)
+
+    def ambiente(self):
+        """Variáveis ``GESTAO_DB_*`` para conectar nesta instância."""
+        return {
+            'GESTAO_DB_ENGINE': 'postgresql',
+            'GESTAO_DB_NOME': 'postgres',
+            'GESTAO_DB_USUARIO': 'postgres',
+            'GESTAO_DB_SENHA': '',
+            # Diretório do socket Unix
+            'GESTAO_DB_HOST': self.pasta,
+            'GESTAO_DB_PORTA': str(self.porta),
+            # Réplica na mesma instância (somente leitura); nos testes ela
+            # espelha o banco de testes, como no SQLite
+            'GESTAO_DB_REPLICA_HOST': self.pasta,
+        }
+
+
+def executar_suite(banco, ambiente, diretorio_projeto, apps=APPS_TESTADOS):
+    """
+    Roda ``manage.py test`` em um processo com as variáveis do banco.
+
+    Args:
+        banco (str): Nome do banco (para o relatório)
+        ambiente (dict): Variáveis ``GESTAO_DB_*`` do banco
+        diretorio_projeto (Path): Diretório do manage.py
+        apps (tuple): Apps testados
+
+    Returns:
+        ResultadoSuite: Totais e saída da suíte
+    """
+    variaveis = {
+        nome: valor for nome, valor in os.environ.items()
+        if not nome.startswith('GESTAO_DB_')
+    }
+    variaveis.update(ambiente)
+
+    inicio = time.perf_counter()
+    processo = subprocess.run(
+        [sys.executable, str(Path(diretorio_projeto) / 'manage.py'), 'test', *apps, '--noinput'],
+        cwd=diretorio_projeto, env=variaveis, capture_output=True, text=True
+    )
+    duracao = time.perf_counter() - inicio
+
+    saida = processo.stdout + processo.stderr
+    testes, pulados, falhas = interpretar_saida(saida)
+    return ResultadoSuite(
+        banco=banco,
+        sucesso=processo.returncode == 0,
+        testes=testes,
+        pulados=pulados,
+        falhas=falhas,
+        duracao=duracao,
+        saida=saida,
+    )
@@ -0,0 +1,97 @@
+"""
+Resolução de grupos e permissões com cache.
+
+Cada página autenticada consulta as permissões do usuário (decoradores
+``@permission_required``, ``has_perm`` e ``perms.*`` nos templates) e a
+página inicial consulta seus grupos. O ``ModelBackend`` padrão faz duas
+consultas por requisição para as permissões, e cada ``groups.filter()``
+é mais uma.
+
+Aqui os grupos e as permissões de um usuário são carregados juntos uma
+única vez e guardados:
+- na própria instância do usuário (vale para o restante da requisição);
+- no cache compartilhado (namespace ``permissoes`` de gestao_erp/cache.py),
+  invalidado quando grupos, permissões ou vínculos usuário/grupo mudam,
+  seja pelo admin ou pelo ``setup_permissions.py`` (ver signals.py).
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+from django.contrib.auth.backends import ModelBackend
+
+from . import cache
+
+
+# Atributo da instância do usuário com o perfil carregado na requisição
+_ATRIBUTO_PERFIL = '_perfil_acesso'
+
+
+def _calcular_perfil(usuario):
+    """Consulta grupos e permissões do usuário no banco."""
+    return {
+        'grupos': tuple(usuario.groups.order_by('id').values_list('name', flat=True)),
+        'permissoes': frozenset(ModelBackend().get_all_permissions(usuario)),
+    }
+
+
+def carregar_perfil(usuario):
+    """
+    Retorna os grupos e as permissões de um usuário autenticado.
+
+    Args:
+        usuario (User): Usuário autenticado e ativo
+
+    Returns:
+        dict: ``grupos`` (nomes, na ordem de cadastro) e ``permissoes``
+        (``app_label.codename``)
+    """
+    perfil = getattr(usuario, _ATRIBUTO_PERFIL, None)
+    if perfil is None:
+        # Superusuário tem um conjunto de permissões diferente; a chave muda
+        # se o status for alterado
+        chave = f'usuario:{usuario.pk}:{int(usuario.is_superuser)}'
+        perfil = cache.obter_ou_calcular(
+            'permissoes', chave, lambda: _calcular_perfil(usuario)
+        )
+        setattr(usuario, _ATRIBUTO_PERFIL, perfil)
+    return perfil
+
+
+def obter_grupos(usuario):
+    """
+    Retorna os nomes dos grupos do usuário (vazio se não autenticado).
+
+    Args:
+        usuario (User): Usuário da requisição
+
+    Returns:
+        tuple: Nomes dos grupos, na ordem de cadastro
+    """
+    if not usuario.is_authenticated:
+        return ()
+    return carregar_perfil(usuario)['grupos']
+
+
+def grupos_usuario(request):
+    """
+    Context processor com os grupos do usuário (``grupos_usuario``).
+
+    Substitui ``user.groups`` nos templates, que consultaria o banco a cada
+    página.
+    """
+    return {'grupos_usuario': obter_grupos(request.user)}
+
+
+class BackendPermissoesEmCache(ModelBackend):
+    """
+    ModelBackend que lê as permissões do perfil em cache.
+
+    A autenticação (usuário e senha) e as permissões por objeto continuam
+    as do ModelBackend.
+    """
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        return set(carregar_perfil(user_obj)['permissoes'])
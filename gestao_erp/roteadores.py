@@ -0,0 +1,189 @@
+"""
+Leituras dos relatórios na réplica do banco.
+
+As views decoradas com ``usar_replica`` (relatórios e API de indicadores)
+fazem suas leituras no alias ``replica`` (ver ``banco.configuracao_replica``),
+tirando essa carga do banco principal, que atende as vendas e os
+lançamentos. Todas as escritas vão para o principal, sempre
+(``RoteadorReplica.db_for_write``), inclusive as feitas dentro das views
+decoradas.
+
+A réplica está atrasada em relação ao principal. Para que quem acabou de
+gravar veja o que gravou, ``FixacaoPrincipalMiddleware`` registra em um
+cookie o momento da última requisição de escrita (POST, PUT, PATCH,
+DELETE) do navegador. A requisição usa a réplica apenas quando:
+- a réplica está configurada e seu momento (``momento_replica``) é
+  conhecido;
+- o atraso da réplica não passa de ``settings.REPLICA_ATRASO_MAXIMO``
+  segundos;
+- a réplica já contém a última escrita do navegador;
+- a conexão principal não está em uma transação (``ATOMIC_REQUESTS`` ou
+  testes com ``TestCase``): a transação enxerga dados que a réplica ainda
+  não tem.
+Em qualquer outro caso, as leituras vão para o principal.
+
+Enquanto lê da réplica, a requisição não grava indicadores no cache
+compartilhado (ver cache.py): o valor calculado a partir de dados
+atrasados ficaria guardado sob a versão atual.
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+import os
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .banco import caminho_sqlite
+
+
+# Alias da réplica em settings.DATABASES
+REPLICA = 'replica'
+
+# Atraso máximo (segundos) quando REPLICA_ATRASO_MAXIMO não está configurado
+ATRASO_MAXIMO_PADRAO = 300
+
+# Cookie com o momento da última escrita do navegador
+COOKIE_ULTIMA_ESCRITA = 'gestao_ultima_escrita'
+
+METODOS_ESCRITA = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+_lendo_da_replica = ContextVar('lendo_da_replica', default=False)
+
+
+def replica_configurada():
+    """Indica se o alias ``replica`` existe em ``DATABASES``."""
+    return REPLICA in settings.DATABASES
+
+
+def atraso_maximo():
+    return getattr(settings, 'REPLICA_ATRASO_MAXIMO', ATRASO_MAXIMO_PADRAO)
+
+
+def momento_replica():
+    """
+    Retorna até que momento a réplica tem os dados do principal.
+
+    - SQLite: data de modificação da cópia, registrada por
+      ``atualizar_replica`` como o início da cópia;
+    - PostgreSQL: momento da última transação aplicada na réplica (ou
+      agora, se ela não tem nada pendente).
+
+    Returns:
+        float ou None: Timestamp, ou ``None`` se não houver réplica
+        disponível
+    """
+    if not replica_configurada():
+        return None
+
+    conexao = connections[REPLICA]
+    if conexao.vendor == 'sqlite':
+        try:
+            return os.path.getmtime(caminho_sqlite(conexao.settings_dict['NAME']))
+        except OSError:
+            return None
+
+    with conexao.cursor() as cursor:
+        cursor.execute(
+            'SELECT CASE WHEN NOT pg_is_in_recovery() '
+            'OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() '
+            'THEN now() ELSE pg_last_xact_replay_timestamp() END'
+        )
+        momento = cursor.fetchone()[0]
+    return momento.timestamp() if momento else None
+
+
+def ultima_escrita(request):
+    """Momento da última escrita do navegador (0 se não houver)."""
+    try:
+        return float(request.COOKIES.get(COOKIE_ULTIMA_ESCRITA, 0))
+    except ValueError:
+        return 0.0
+
+
+def pode_usar_replica(request):
+    """
+    Decide se as leituras da requisição podem ir para a réplica.
+
+    Args:
+        request: Objeto HttpRequest do Django
+
+    Returns:
+        bool: ``True`` se a réplica está em dia para esta requisição
+    """
+    if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return False
+    momento = momento_replica()
+    if momento is None:
+        return False
+    if time.time() - momento > atraso_maximo():
+        return False
+    return momento >= ultima_escrita(request)
+
+
+def lendo_da_replica():
+    """Indica se as leituras do contexto atual estão indo para a réplica."""
+    return _lendo_da_replica.get() and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+
+
+def usar_replica(view):
+    """
+    Decorator que envia as leituras da view para a réplica, quando em dia.
+
+    Funciona com views síncronas e assíncronas. As escritas da view
+    continuam indo para o banco principal.
+
+    Uso::
+
+        @login_required
+        @usar_replica
+        def relatorio(request):
+            ...
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def envoltorio(request, *args, **kwargs):
+            token = _lendo_da_replica.set(await sync_to_async(pode_usar_replica)(request))
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _lendo_da_replica.reset(token)
+    else:
+        @wraps(view)
+        def envoltorio(request, *args, **kwargs):
+            token = _lendo_da_replica.set(pode_usar_replica(request))
+            try:
+                return view(request, *args, **kwargs)
+            finally:
+                _lendo_da_replica.reset(token)
+
+    return envoltorio
+
+
+class RoteadorReplica:
+    """
+    Roteador de bancos (``settings.DATABASE_ROUTERS``).
+
+    Leituras vão para a réplica apenas dentro de ``usar_replica``; escritas
+    e migrações, sempre para o principal.
+    """
+
+    def db_for_read(self, model, **hints):
+        if lendo_da_replica():
+            return REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Os dois aliases têm os mesmos dados
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA
@@ -21,8 +21,11 @@ Autor: Manus AI
 Data: 2025-12-02
 """
 
+import os
 from pathlib import Path
 
+from gestao_erp.banco import configuracao_banco, configuracao_replica
+
 # =============================================================================
 # CAMINHOS DO PROJETO
 # =============================================================================
@@ -62,6 +65,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',    # Gerenciamento de arquivos estáticos
     
     # Aplicações do projeto
+    'gestao_erp',   # Recursos comuns (cache de permissões, monitoramento)
     'estoque',      # Módulo de controle de estoque
     'financeiro',   # Módulo de controle financeiro
 ]
@@ -74,6 +78,8 @@ INSTALLED_APPS = [
 # Middleware são componentes que processam requisições/respostas
 # A ordem é importante!
 MIDDLEWARE = [
+    'gestao_erp.middleware.MedicaoDesempenhoMiddleware',      # Consultas e tempos (primeiro)
+    'gestao_erp.middleware.FixacaoPrincipalMiddleware',       # Escritas recentes leem do principal
     'django.middleware.security.SecurityMiddleware',           # Segurança
     'django.contrib.sessions.middleware.SessionMiddleware',    # Sessões
     'django.middleware.common.CommonMiddleware',               # Funcionalidades comuns
@@ -101,7 +107,8 @@ WSGI_APPLICATION = 'gestao_erp.wsgi.application'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # Backend padrão do Django com medição do tempo de renderização
+        'BACKEND': 'gestao_erp.desempenho.DjangoTemplatesMedidos',
         
         # Diretórios onde o Django procura por templates
         'DIRS': [BASE_DIR / 'templates'],
@@ -116,6 +123,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',    # Objeto request
                 'django.contrib.auth.context_processors.auth',   # Usuário autenticado
                 'django.contrib.messages.context_processors.messages',  # Mensagens
+                'gestao_erp.permissoes.grupos_usuario',          # Grupos (em cache)
             ],
         },
     },
@@ -126,27 +134,76 @@ TEMPLATES = [
 # CONFIGURAÇÕES DE BANCO DE DADOS
 # =============================================================================
 
-# Por padrão, usa SQLite (ideal para desenvolvimento)
-# Em produção, considere usar PostgreSQL ou MySQL
+# Escolhido pela variável de ambiente GESTAO_DB_ENGINE (gestao_erp/banco.py):
+#
+# - sqlite (padrão): arquivo db.sqlite3, com o perfil de GESTAO_SQLITE_PERFIL
+#   - producao (padrão): WAL, synchronous=NORMAL, busy_timeout, cache/mmap
+#     em memória e BEGIN IMMEDIATE nas transações
+#   - padrao: SQLite sem ajustes (journal de rollback, BEGIN DEFERRED)
+#   O banco de testes fica em arquivo (o padrão em memória não aceita
+#   conexões de várias threads, usadas nos testes de concorrência).
+#
+# - postgresql: requer psycopg (pip install -r requirements-postgresql.txt)
+#   GESTAO_DB_NOME, GESTAO_DB_USUARIO, GESTAO_DB_SENHA, GESTAO_DB_HOST,
+#   GESTAO_DB_PORTA: conexão
+#   GESTAO_DB_POOL (padrão 1), GESTAO_DB_POOL_MIN, GESTAO_DB_POOL_MAX: pool
+#   GESTAO_DB_CONN_MAX_AGE (padrão 60): conexões persistentes, sem pool
+#   GESTAO_DB_SEM_CURSOR_SERVIDOR=1: atrás de PgBouncer em modo transação
+#
+# Réplica para os relatórios (alias 'replica', ver gestao_erp/roteadores.py):
+# - sqlite: cópia db_replica.sqlite3 (GESTAO_DB_REPLICA_NOME), atualizada com
+#   "python manage.py atualizar_replica"; GESTAO_DB_REPLICA=0 desliga
+# - postgresql: servidor réplica em GESTAO_DB_REPLICA_HOST (e, se diferentes
+#   do principal, GESTAO_DB_REPLICA_PORTA, _NOME, _USUARIO, _SENHA)
 DATABASES = {
+    'default': configuracao_banco(BASE_DIR),
+}
+
+_replica = configuracao_replica(BASE_DIR, DATABASES['default'])
+if _replica is not None:
+    DATABASES['replica'] = _replica
+
+DATABASE_ROUTERS = ['gestao_erp.roteadores.RoteadorReplica']
+
+# Atraso máximo (segundos) da réplica: mais atrasada que isso, os relatórios
+# leem do principal. Também é o tempo que um navegador lê do principal após
+# uma escrita, enquanto a réplica não a alcança.
+# Variável de ambiente: GESTAO_REPLICA_ATRASO_MAXIMO
+REPLICA_ATRASO_MAXIMO = int(os.environ.get('GESTAO_REPLICA_ATRASO_MAXIMO', 300))
+
+
+# =============================================================================
+# CONFIGURAÇÕES DE CACHE
+# =============================================================================
+
+# Backend escolhido pela variável de ambiente GESTAO_CACHE_BACKEND:
+# - locmem (padrão): memória do processo, sem dependências
+# - arquivo: diretório em GESTAO_CACHE_LOCATION (padrão: BASE_DIR/cache),
+#   compartilhado entre processos da mesma máquina
+# - redis: servidor em GESTAO_CACHE_LOCATION (ex: redis://localhost:6379/0),
+#   compartilhado entre máquinas; requer o pacote redis
+# Os indicadores dos dashboards usam este cache (ver gestao_erp/cache.py).
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'arquivo': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+}
+
+_cache_backend = os.environ.get('GESTAO_CACHE_BACKEND', 'locmem')
+_cache_location = os.environ.get('GESTAO_CACHE_LOCATION') or {
+    'locmem': 'gestao-erp',
+    'arquivo': str(BASE_DIR / 'cache'),
+    'redis': 'redis://localhost:6379/0',
+}[_cache_backend]
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': CACHE_BACKENDS[_cache_backend],
+        'LOCATION': _cache_location,
+        'KEY_PREFIX': 'gestao_erp',
     }
 }
 
-# Exemplo de configuração para PostgreSQL (comentado):
-# DATABASES = {
-#     'default': {
-#         'ENGINE': 'django.db.backends.postgresql',
-#         'NAME': 'gestao_erp',
-#         'USER': 'seu_usuario',
-#         'PASSWORD': 'sua_senha',
-#         'HOST': 'localhost',
-#         'PORT': '5432',
-#     }
-# }
-
 
 # =============================================================================
 # VALIDAÇÃO DE SENHAS
@@ -231,6 +288,16 @@ LOGOUT_REDIRECT_URL = '/login/'
 # URL da página de login
 LOGIN_URL = '/login/'
 
+# Backend que guarda grupos e permissões de cada usuário no cache
+# (ver gestao_erp/permissoes.py); a autenticação é a do ModelBackend
+AUTHENTICATION_BACKENDS = [
+    'gestao_erp.permissoes.BackendPermissoesEmCache',
+]
+
+# Sessões lidas do cache e gravadas também no banco: a maioria das
+# requisições não consulta a tabela de sessões
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
 
 # =============================================================================
 # CONFIGURAÇÕES GERAIS
@@ -289,6 +356,47 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # DEFAULT_FROM_EMAIL = 'seu_email@gmail.com'
 
 
+# =============================================================================
+# ORÇAMENTOS DE DESEMPENHO (ver gestao_erp/desempenho.py)
+# =============================================================================
+
+# Limites por nome de URL: número de consultas SQL e latência total (ms).
+# Requisições acima do limite são registradas no log 'gestao_erp'.
+# A chave '*' vale para as views sem orçamento próprio.
+ORCAMENTOS_DESEMPENHO = {
+    '*': {'consultas': 30, 'tempo_ms': 1000},
+    'index': {'consultas': 5},
+    'estoque:dashboard': {'consultas': 10, 'tempo_ms': 300},
+    'estoque:lista_produtos': {'consultas': 10, 'tempo_ms': 300},
+    'estoque:relatorio': {'consultas': 10, 'tempo_ms': 500},
+    'estoque:api_busca_produtos': {'consultas': 5, 'tempo_ms': 200},
+    'estoque:api_autocompletar_produtos': {'consultas': 5, 'tempo_ms': 100},
+    'financeiro:dashboard': {'consultas': 10, 'tempo_ms': 300},
+    'financeiro:lista_receitas': {'consultas': 10, 'tempo_ms': 300},
+    'financeiro:lista_despesas': {'consultas': 10, 'tempo_ms': 300},
+    'financeiro:relatorio': {'consultas': 15, 'tempo_ms': 500},
+    'financeiro:api_indicadores': {'consultas': 5, 'tempo_ms': 200},
+}
+
+# Envia o cabeçalho Server-Timing com os tempos de banco, templates e total.
+# Expõe detalhes internos: em produção, mantenha desativado ou restrinja
+# no proxy
+DESEMPENHO_SERVER_TIMING = DEBUG
+
+
+# Threads usadas pelos dashboards assíncronos para executar consultas
+# independentes em paralelo (ver gestao_erp/assincrono.py); cada thread usa
+# uma conexão própria com o banco. Com 1, as consultas rodam em sequência.
+# No SQLite as consultas rodam no próprio processo e disputam a CPU, então
+# o padrão é limitado ao número de núcleos; no PostgreSQL o tempo de cada
+# consulta é em boa parte espera pelo servidor.
+# Variável de ambiente: GESTAO_CONSULTAS_PARALELAS
+CONSULTAS_PARALELAS = int(os.environ.get(
+    'GESTAO_CONSULTAS_PARALELAS',
+    4 if DATABASES['default']['ENGINE'].endswith('postgresql') else min(4, os.cpu_count() or 1)
+))
+
+
 # =============================================================================
 # CONFIGURAÇÕES DE LOGGING (para debug e monitoramento)
 # =============================================================================
@@ -314,9 +422,13 @@ LOGGING = {
             'level': 'INFO',
             'propagate': True,
         },
+        'gestao_erp': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
 # Criar diretório de logs se não existir
-import os
 os.makedirs(BASE_DIR / 'logs', exist_ok=True)
@@ -0,0 +1,42 @@
+"""
+Sinais do projeto Gestão ERP.
+
+Invalida os perfis de acesso em cache (grupos e permissões, ver
+permissoes.py) sempre que grupos, permissões ou os vínculos entre eles e
+os usuários mudam, seja pelo admin ou pelo ``setup_permissions.py``.
+
+A gravação do próprio usuário não invalida o cache: o login atualiza
+``last_login`` a cada acesso, e a mudança de ``is_superuser`` já muda a
+chave do perfil.
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from . import cache
+
+
+User = get_user_model()
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidar_permissoes_vinculos(sender, action, **kwargs):
+    """Usuário entrou/saiu de grupo ou permissões foram atribuídas."""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        cache.invalidar('permissoes')
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def invalidar_permissoes_cadastro(sender, **kwargs):
+    """Grupo ou permissão criado, renomeado ou excluído."""
+    cache.invalidar('permissoes')
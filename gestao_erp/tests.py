@@ -0,0 +1,642 @@
+"""
+Testes do projeto gestao_erp (infraestrutura compartilhada pelos apps).
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import skipUnless
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import Group, Permission, User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection, connections
+from django.test import (
+    AsyncClient, RequestFactory, TestCase, TransactionTestCase, override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from estoque.models import Produto
+from estoque.tests import criar_produtos
+from financeiro import services
+from financeiro.models import CapitalGiro, Despesa, Receita, SaldoCapital
+from . import assincrono, banco, benchmark, carga, desempenho, paridade, roteadores
+from . import cache as cache_indicadores
+from .banco import caminho_sqlite
+
+
+class PermissoesEmCacheTests(TestCase):
+    """Testes do cache de grupos e permissões dos usuários."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.grupo = Group.objects.create(name='Gerentes')
+        cls.grupo.permissions.add(
+            Permission.objects.get(codename='view_receita', content_type__app_label='financeiro')
+        )
+        cls.usuario = User.objects.create_user('gerente', password='senha123')
+        cls.usuario.groups.add(cls.grupo)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.usuario)
+        self.url = reverse('financeiro:exportar_receitas')
+
+    def test_grupos_e_permissoes_lidos_do_cache(self):
+        with CaptureQueriesContext(connection) as primeira:
+            self.client.get(reverse('index'))
+        with CaptureQueriesContext(connection) as segunda:
+            resposta = self.client.get(reverse('index'))
+
+        self.assertTrue(resposta.context['is_gerente'])
+        self.assertFalse(resposta.context['is_admin'])
+        self.assertTrue(any('auth_group' in q['sql'] for q in primeira))
+        # apenas o usuário da sessão
+        self.assertEqual(len(segunda), 1)
+        self.assertIn('FROM "auth_user" WHERE', segunda[0]['sql'])
+        self.assertContains(resposta, 'Gerentes')
+
+    def test_remover_do_grupo_invalida_permissoes(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.usuario.groups.remove(self.grupo)
+
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_alterar_permissoes_do_grupo_invalida(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.grupo.permissions.set([])
+
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_usuario_inativo_sem_permissoes(self):
+        self.usuario.is_active = False
+
+        self.assertEqual(self.usuario.get_all_permissions(), set())
+
+
+@override_settings(DESEMPENHO_SERVER_TIMING=True)
+class MedicaoDesempenhoTests(TestCase):
+    """Testes do middleware de consultas e tempos por view."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_superuser('auditor', password='senha123')
+        criar_produtos(cls.usuario, 3)
+
+    def setUp(self):
+        desempenho.limpar_metricas()
+        self.client.force_login(self.usuario)
+        self.url = reverse('estoque:relatorio')
+
+    def test_server_timing_conta_as_consultas(self):
+        with CaptureQueriesContext(connection) as capturadas:
+            resposta = self.client.get(self.url)
+
+        cabecalho = resposta['Server-Timing']
+        self.assertIn(f'desc="{len(capturadas)} consultas"', cabecalho)
+        self.assertIn('tpl;dur=', cabecalho)
+        self.assertIn('total;dur=', cabecalho)
+
+    @override_settings(DESEMPENHO_SERVER_TIMING=False)
+    def test_server_timing_desativado(self):
+        self.assertNotIn('Server-Timing', self.client.get(self.url))
+
+    def test_metricas_agregadas_por_view(self):
+        for _ in range(3):
+            self.client.get(self.url)
+
+        metricas = desempenho.metricas()['estoque:relatorio']
+
+        self.assertEqual(metricas['requisicoes'], 3)
+        self.assertGreater(metricas['consultas_media'], 0)
+        self.assertGreater(metricas['tempo_templates_medio_ms'], 0)
+        self.assertLessEqual(metricas['p50_ms'], metricas['p99_ms'])
+
+    @override_settings(ORCAMENTOS_DESEMPENHO={'estoque:relatorio': {'consultas': 1}})
+    def test_estouro_de_orcamento_registrado_no_log(self):
+        with self.assertLogs('gestao_erp.desempenho', 'WARNING') as logs:
+            self.client.get(self.url)
+
+        self.assertIn('estoque:relatorio', logs.output[0])
+        self.assertIn('(limite 1)', logs.output[0])
+        self.assertEqual(desempenho.metricas()['estoque:relatorio']['estouros_orcamento'], 1)
+
+    def test_exportacao_em_fluxo_medida_ate_o_fim(self):
+        with CaptureQueriesContext(connection) as capturadas:
+            resposta = self.client.get(reverse('estoque:exportar_movimentacoes'))
+            self.assertNotIn('estoque:exportar_movimentacoes', desempenho.metricas())
+            antes_do_envio = len(capturadas)
+
+            b''.join(resposta.streaming_content)
+
+        # a consulta das linhas é feita durante o envio
+        self.assertGreater(len(capturadas), antes_do_envio)
+        self.assertEqual(
+            desempenho.metricas()['estoque:exportar_movimentacoes']['consultas_media'],
+            len(capturadas)
+        )
+
+    def test_dump_de_metricas(self):
+        self.client.get(self.url)
+
+        dados = self.client.get(reverse('metricas')).json()
+        texto = self.client.get(reverse('metricas'), {'formato': 'texto'}).content.decode()
+
+        self.assertEqual(dados['views']['estoque:relatorio']['requisicoes'], 1)
+        self.assertIn('gestao_requisicoes_total{view="estoque:relatorio"} 1', texto)
+
+
+class BenchmarkViewsTests(TestCase):
+    """Testes da medição de views e da comparação com a linha de base."""
+
+    base = {
+        'financeiro:dashboard': {
+            'status': 200, 'consultas': 7, 'memoria_pico_kb': 200.0, 'p50_ms': 40.0, 'p95_ms': 50.0,
+        },
+    }
+
+    def resultado(self, **alteracoes):
+        return {'financeiro:dashboard': dict(self.base['financeiro:dashboard'], **alteracoes)}
+
+    def test_medicao_de_view(self):
+        usuario = User.objects.create_superuser('medidor', password='senha123')
+
+        resultado = benchmark.executar(usuario, 3, [('financeiro:api_indicadores', {'meses': 12})])
+
+        medida = resultado['financeiro:api_indicadores']
+        self.assertEqual(medida['status'], 200)
+        self.assertEqual(medida['consultas'], 2)
+        self.assertGreater(medida['memoria_pico_kb'], 0)
+        self.assertLessEqual(medida['p50_ms'], medida['p95_ms'])
+
+    def test_dentro_da_tolerancia(self):
+        # 40 ms * 1.5 = 60 ms; memória dentro da folga absoluta
+        resultado = self.resultado(p50_ms=59.0, memoria_pico_kb=420.0, p95_ms=500.0)
+
+        self.assertEqual(benchmark.comparar(resultado, self.base), [])
+
+    def test_regressoes(self):
+        resultado = self.resultado(consultas=8, p50_ms=61.0, status=500)
+
+        regressoes = benchmark.comparar(resultado, self.base)
+
+        self.assertEqual(len(regressoes), 3)
+        self.assertIn('8 consultas (base 7)', ' '.join(regressoes))
+
+    def test_folga_absoluta_em_views_rapidas(self):
+        base = {'v': {'status': 200, 'consultas': 1, 'memoria_pico_kb': 10.0, 'p50_ms': 1.0}}
+        resultado = {'v': dict(base['v'], p50_ms=5.5)}
+
+        self.assertEqual(benchmark.comparar(resultado, base), [])
+
+
+class TesteCargaTests(TransactionTestCase):
+    """Testes do teste de carga concorrente (gestao_erp.carga)."""
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('carga', password='senha123')
+
+    def test_carga_com_threads_mantem_invariantes(self):
+        produtos = carga.preparar(self.usuario, 2)
+
+        resultado = carga.executar(self.usuario, produtos, 120, 4, semente=7)
+
+        self.assertEqual(resultado.erros, [])
+        self.assertEqual(len(resultado.tentativas), 120)
+        resumo = resultado.resumo()
+        self.assertEqual(resumo['total']['quantidade'], 120)
+        self.assertLessEqual(resumo['total']['p50_ms'], resumo['total']['p99_ms'])
+        self.assertEqual(carga.verificar_invariantes(resultado), [])
+
+    def test_invariantes_detectam_inconsistencias(self):
+        produtos = carga.preparar(self.usuario, 1)
+        Produto.objects.filter(pk=produtos[0]).update(estoque_atual=1)
+        SaldoCapital.objects.update(valor=Decimal('1.00'))
+
+        violacoes = carga.verificar_invariantes()
+
+        self.assertEqual(len(violacoes), 3)
+        self.assertIn('soma das movimentações 1000', violacoes[0])
+
+    def test_classificacao_de_erros(self):
+        self.assertEqual(carga.classificar_erro(OperationalError('database is locked')), 'bloqueio')
+        self.assertEqual(carga.classificar_erro(ValueError('Estoque insuficiente')), 'rejeitada')
+        self.assertEqual(carga.classificar_erro(OperationalError('disk I/O error')), 'erro')
+
+    def test_interpretar_mix(self):
+        self.assertEqual(
+            carga.interpretar_mix('movimentacao=3, despesa=1'),
+            {'movimentacao': 3, 'receita': 0, 'despesa': 1}
+        )
+        for invalido in ('venda=1', 'receita=x', 'receita=0'):
+            with self.subTest(mix=invalido), self.assertRaises(ValueError):
+                carga.interpretar_mix(invalido)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Perfil específico do SQLite')
+class BancoSqliteTests(TestCase):
+    """Testes do perfil de produção do SQLite (gestao_erp.banco)."""
+
+    def pragma(self, nome):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {nome}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_aplicados_na_conexao(self):
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma('busy_timeout'), banco.TEMPO_ESPERA * 1000)
+        self.assertEqual(self.pragma('temp_store'), 2)  # MEMORY
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+    def test_configuracao_por_perfil(self):
+        padrao = banco.configuracao_sqlite('db.sqlite3', perfil='padrao')
+        self.assertEqual(padrao['OPTIONS'], {'timeout': banco.TEMPO_ESPERA})
+        self.assertNotIn('TEST', padrao)
+
+        producao = banco.configuracao_sqlite('db.sqlite3', 'teste.sqlite3')
+        self.assertIn('PRAGMA journal_mode=WAL', producao['OPTIONS']['init_command'])
+        self.assertEqual(producao['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+        self.assertEqual(producao['TEST'], {'NAME': 'teste.sqlite3'})
+
+        with self.assertRaises(ValueError):
+            banco.configuracao_sqlite('db.sqlite3', perfil='rapido')
+
+    def test_concorrencia_sem_travas_no_perfil_de_producao(self):
+        medida = banco.medir_concorrencia('producao', escritores=3, leitores=2, duracao=0.3, linhas=500)
+
+        self.assertTrue(medida['consistente'])
+        self.assertEqual(medida['travas'], 0)
+        self.assertGreater(medida['escritas_s'], 0)
+        self.assertGreater(medida['leituras_s'], 0)
+
+    def test_copia_da_replica(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            origem = os.path.join(pasta, 'principal.sqlite3')
+            destino = os.path.join(pasta, 'replica.sqlite3')
+            conexao = sqlite3.connect(origem)
+            conexao.execute('PRAGMA journal_mode=WAL')
+            conexao.execute('CREATE TABLE item (valor INTEGER)')
+            conexao.execute('INSERT INTO item VALUES (7)')
+            conexao.commit()
+
+            momento = banco.copiar_sqlite(origem, destino, momento=1_700_000_000)
+            conexao.close()
+
+            self.assertEqual(os.path.getmtime(destino), momento)
+            copia = sqlite3.connect(f'file:{destino}?mode=ro', uri=True)
+            try:
+                self.assertEqual(copia.execute('SELECT valor FROM item').fetchone(), (7,))
+                self.assertEqual(copia.execute('PRAGMA journal_mode').fetchone(), ('delete',))
+                with self.assertRaises(sqlite3.OperationalError):
+                    copia.execute('INSERT INTO item VALUES (8)')
+            finally:
+                copia.close()
+            self.assertEqual(sorted(os.listdir(pasta)), ['principal.sqlite3', 'replica.sqlite3'])
+
+
+class ConfiguracaoBancoTests(TestCase):
+    """Testes da escolha do banco pelas variáveis de ambiente."""
+
+    def test_sqlite_por_padrao(self):
+        configuracao = banco.configuracao_banco(Path('/projeto'), {})
+
+        self.assertEqual(configuracao['ENGINE'], 'django.db.backends.sqlite3')
+        self.assertEqual(configuracao['NAME'], Path('/projeto/db.sqlite3'))
+        self.assertEqual(configuracao['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+
+    def test_postgresql_com_pool(self):
+        configuracao = banco.configuracao_banco(Path('/projeto'), {
+            'GESTAO_DB_ENGINE': 'postgresql',
+            'GESTAO_DB_NOME': 'erp',
+            'GESTAO_DB_POOL_MAX': '20',
+        })
+
+        self.assertEqual(configuracao['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual(configuracao['NAME'], 'erp')
+        self.assertEqual(configuracao['CONN_MAX_AGE'], 0)
+        self.assertEqual(configuracao['OPTIONS']['pool']['max_size'], 20)
+        self.assertFalse(configuracao['DISABLE_SERVER_SIDE_CURSORS'])
+
+    def test_postgresql_com_conexoes_persistentes(self):
+        configuracao = banco.configuracao_banco(Path('/projeto'), {
+            'GESTAO_DB_ENGINE': 'postgresql',
+            'GESTAO_DB_POOL': '0',
+            'GESTAO_DB_CONN_MAX_AGE': '300',
+            'GESTAO_DB_SEM_CURSOR_SERVIDOR': '1',
+        })
+
+        self.assertNotIn('pool', configuracao['OPTIONS'])
+        self.assertEqual(configuracao['CONN_MAX_AGE'], 300)
+        self.assertTrue(configuracao['CONN_HEALTH_CHECKS'])
+        self.assertTrue(configuracao['DISABLE_SERVER_SIDE_CURSORS'])
+
+    def test_replica_sqlite(self):
+        principal = banco.configuracao_banco(Path('/projeto'), {})
+        replica = banco.configuracao_replica(Path('/projeto'), principal, {})
+
+        self.assertEqual(replica['NAME'], 'file:/projeto/db_replica.sqlite3?mode=ro')
+        self.assertEqual(banco.caminho_sqlite(replica['NAME']), '/projeto/db_replica.sqlite3')
+        self.assertNotIn('journal_mode', replica['OPTIONS']['init_command'])
+        self.assertNotIn('transaction_mode', replica['OPTIONS'])
+        self.assertEqual(replica['TEST'], {'MIRROR': 'default'})
+        self.assertIsNone(banco.configuracao_replica(Path('/projeto'), principal, {'GESTAO_DB_REPLICA': '0'}))
+
+    def test_replica_postgresql(self):
+        ambiente = {'GESTAO_DB_ENGINE': 'postgresql', 'GESTAO_DB_NOME': 'erp'}
+        principal = banco.configuracao_banco(Path('/projeto'), ambiente)
+        self.assertIsNone(banco.configuracao_replica(Path('/projeto'), principal, ambiente))
+
+        ambiente['GESTAO_DB_REPLICA_HOST'] = 'replica.interna'
+        replica = banco.configuracao_replica(Path('/projeto'), principal, ambiente)
+
+        self.assertEqual(replica['HOST'], 'replica.interna')
+        self.assertEqual(replica['NAME'], 'erp')
+        self.assertEqual(replica['OPTIONS']['pool'], principal['OPTIONS']['pool'])
+        self.assertIn('default_transaction_read_only=on', replica['OPTIONS']['options'])
+        self.assertNotIn('options', principal['OPTIONS'])
+
+    def test_banco_desconhecido(self):
+        with self.assertRaises(ValueError):
+            banco.configuracao_banco(Path('/projeto'), {'GESTAO_DB_ENGINE': 'oracle'})
+
+    def test_resumo_da_suite(self):
+        saida = 'Ran 102 tests in 30.052s\n\nFAILED (failures=2, errors=1, skipped=4)\n'
+
+        self.assertEqual(paridade.interpretar_saida(saida), (102, 4, 3))
+        self.assertEqual(paridade.interpretar_saida('Ran 1 test in 0.1s\n\nOK\n'), (1, 0, 0))
+
+
+def identificar_thread():
+    """Consulta trivial que devolve a thread em que foi executada."""
+    SaldoCapital.objects.exists()
+    return threading.get_ident()
+
+
+class ConsultasParalelasTests(TransactionTestCase):
+    """Testes das consultas em paralelo dos dashboards assíncronos."""
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = User.objects.create_superuser('painel', password='senha123')
+
+    @override_settings(CONSULTAS_PARALELAS=3)
+    def test_consultas_em_threads_do_pool(self):
+        medicao, token = desempenho.iniciar_medicao()
+        try:
+            resultado = async_to_sync(assincrono.em_paralelo)(
+                a=identificar_thread, b=identificar_thread, total=Receita.objects.count
+            )
+        finally:
+            desempenho.finalizar_medicao(token)
+
+        self.assertEqual(set(resultado), {'a', 'b', 'total'})
+        self.assertEqual(resultado['total'], 0)
+        self.assertNotIn(threading.get_ident(), {resultado['a'], resultado['b']})
+        # Consultas das outras threads contadas na medição da requisição
+        self.assertEqual(medicao.consultas, 3)
+
+    @override_settings(CONSULTAS_PARALELAS=1)
+    def test_consultas_em_sequencia(self):
+        resultado = async_to_sync(assincrono.em_paralelo)(a=identificar_thread, b=identificar_thread)
+
+        self.assertEqual(resultado['a'], resultado['b'])
+
+    @override_settings(CONSULTAS_PARALELAS=4)
+    def test_dashboards_pelo_caminho_asgi(self):
+        CapitalGiro.adicionar_capital(Decimal('500.00'), 'Aporte', self.usuario)
+        services.registrar_receita('Venda', Decimal('80.00'), timezone.localdate(), 'VENDA', self.usuario)
+        cliente = AsyncClient()
+        cliente.force_login(self.usuario)
+
+        async def requisitar(url):
+            return await cliente.get(url)
+
+        resposta = async_to_sync(requisitar)(reverse('financeiro:dashboard'))
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.context['capital_atual'], Decimal('580.00'))
+        self.assertEqual(resposta.context['receitas_mes'], Decimal('80.00'))
+        self.assertEqual(len(resposta.context['receitas_recentes']), 1)
+
+        resposta = async_to_sync(requisitar)(reverse('estoque:dashboard'))
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.context['total_produtos'], 0)
+
+    # Com DEBUG, o Django registra cada middleware ou view convertido de
+    # síncrono para assíncrono ("Synchronous handler adapted for ...")
+    @override_settings(DEBUG=True, CONSULTAS_PARALELAS=1)
+    def test_dashboards_assincronos_sem_conversao(self):
+        cliente = AsyncClient()
+        cliente.force_login(self.usuario)
+
+        async def requisitar(url):
+            return await cliente.get(url)
+
+        for url in (reverse('financeiro:dashboard'), reverse('estoque:dashboard')):
+            with self.subTest(url=url):
+                with self.assertNoLogs('django.request', 'DEBUG'), \
+                        CaptureQueriesContext(connection) as capturadas:
+                    resposta = async_to_sync(requisitar)(url)
+
+                self.assertEqual(resposta.status_code, 200)
+                # Consultas do ORM (na thread de sync_to_async) medidas
+                self.assertGreater(len(capturadas), 0)
+                self.assertIn(f'desc="{len(capturadas)} consultas"', resposta['Server-Timing'])
+
+
+class ConsultasParalelasEmTransacaoTests(TestCase):
+    """Dentro de uma transação, as consultas usam a conexão da requisição."""
+
+    @override_settings(CONSULTAS_PARALELAS=4)
+    def test_transacao_aberta_executa_em_sequencia(self):
+        resultado = async_to_sync(assincrono.em_paralelo)(a=identificar_thread, b=identificar_thread)
+
+        self.assertEqual(resultado['a'], resultado['b'])
+
+
+def marcar_replica_atualizada(momento=None):
+    """
+    Registra o momento da réplica (nos testes, ela espelha o banco de
+    testes). No PostgreSQL, o momento é o do servidor.
+    """
+    replica = connections[roteadores.REPLICA]
+    if replica.vendor == 'sqlite':
+        momento = time.time() if momento is None else momento
+        os.utime(caminho_sqlite(replica.settings_dict['NAME']), (momento, momento))
+
+
+def requisicao_get():
+    return RequestFactory().get('/')
+
+
+def consultas_escrita(contexto):
+    """SQL de um CaptureQueriesContext que não é leitura."""
+    return [
+        consulta['sql'] for consulta in contexto.captured_queries
+        if not consulta['sql'].lstrip().upper().startswith('SELECT')
+    ]
+
+
+def consultas_dados(contexto):
+    """SQL de um CaptureQueriesContext que lê tabelas dos apps."""
+    return [
+        consulta['sql'] for consulta in contexto.captured_queries
+        if 'financeiro_' in consulta['sql'] or 'estoque_' in consulta['sql']
+    ]
+
+
+class ReplicaRelatoriosTests(TransactionTestCase):
+    """Testes do roteamento das leituras dos relatórios para a réplica."""
+
+    databases = {'default', roteadores.REPLICA}
+
+    @classmethod
+    def tearDownClass(cls):
+        # O banco de testes só é removido sem conexões abertas: o Django
+        # fecha o pool do principal, mas não o da réplica (espelho)
+        replica = connections[roteadores.REPLICA]
+        if replica.vendor == 'postgresql':
+            replica.close_pool()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = User.objects.create_superuser('relatorios', password='senha123')
+        self.client.force_login(self.usuario)
+        services.registrar_receita(
+            'Venda', Decimal('120.00'), timezone.localdate(), 'VENDA', self.usuario
+        )
+        marcar_replica_atualizada()
+
+    def requisitar(self, url):
+        with CaptureQueriesContext(connections['default']) as principal, \
+                CaptureQueriesContext(connections[roteadores.REPLICA]) as replica:
+            resposta = self.client.get(url)
+        self.assertEqual(resposta.status_code, 200)
+        return resposta, principal, replica
+
+    def test_relatorios_leem_da_replica(self):
+        for url in (reverse('financeiro:api_indicadores'), reverse('financeiro:relatorio'),
+                    reverse('estoque:relatorio')):
+            with self.subTest(url=url):
+                resposta, principal, replica = self.requisitar(url)
+
+                self.assertNotEqual(consultas_dados(replica), [])
+                self.assertEqual(consultas_escrita(replica), [])
+                # No principal, só sessão e usuário (login_required)
+                self.assertFalse(any(
+                    'financeiro_' in consulta['sql'] or 'estoque_' in consulta['sql']
+                    for consulta in principal.captured_queries
+                ))
+
+        resposta, _, _ = self.requisitar(reverse('financeiro:api_indicadores'))
+        self.assertEqual(resposta.json()['dados'][-1]['receitas'], 120.0)
+
+    def test_escritas_na_view_vao_para_o_principal(self):
+        @roteadores.usar_replica
+        def view(request):
+            # Lido da réplica e gravado de volta
+            receita = Receita.objects.get(descricao='Venda')
+            self.assertEqual(receita._state.db, roteadores.REPLICA)
+            receita.descricao = 'Venda revisada'
+            receita.save()
+            Receita.objects.filter(pk=receita.pk).update(valor=Decimal('130.00'))
+            services.registrar_despesa(
+                'Frete', Decimal('10.00'), timezone.localdate(), 'OUTROS', self.usuario
+            )
+            return receita
+
+        with CaptureQueriesContext(connections[roteadores.REPLICA]) as replica:
+            receita = view(requisicao_get())
+
+        self.assertEqual(consultas_escrita(replica), [])
+        self.assertEqual(receita._state.db, 'default')
+        self.assertEqual(Receita.objects.get(pk=receita.pk).valor, Decimal('130.00'))
+        self.assertEqual(Despesa.objects.count(), 1)
+
+    def test_escrita_recente_le_do_principal(self):
+        resposta = self.client.post(reverse('financeiro:cadastrar_receita'), {
+            'descricao': 'Serviço', 'valor': '50.00',
+            'data': timezone.localdate().isoformat(), 'categoria': 'SERVICO',
+        })
+        self.assertEqual(resposta.status_code, 302)
+        cookie = resposta.cookies[roteadores.COOKIE_ULTIMA_ESCRITA]
+        self.assertAlmostEqual(float(cookie.value), time.time(), delta=5)
+        self.assertEqual(cookie['max-age'], roteadores.atraso_maximo())
+
+        # Réplica ainda anterior à escrita
+        self.client.cookies[roteadores.COOKIE_ULTIMA_ESCRITA] = str(time.time() + 60)
+        resposta, principal, replica = self.requisitar(reverse('financeiro:api_indicadores'))
+        # No PostgreSQL, a réplica ainda informa seu atraso (momento_replica)
+        self.assertEqual(consultas_dados(replica), [])
+        self.assertEqual(resposta.json()['dados'][-1]['receitas'], 170.0)
+
+        # Réplica já contém a escrita
+        self.client.cookies[roteadores.COOKIE_ULTIMA_ESCRITA] = str(time.time() - 60)
+        _, _, replica = self.requisitar(reverse('financeiro:api_indicadores'))
+        self.assertNotEqual(consultas_dados(replica), [])
+
+    @override_settings(REPLICA_ATRASO_MAXIMO=-1)
+    def test_replica_atrasada_le_do_principal(self):
+        _, principal, replica = self.requisitar(reverse('financeiro:api_indicadores'))
+
+        self.assertEqual(consultas_dados(replica), [])
+        self.assertTrue(any(
+            'financeiro_indicadorfinanceiro' in consulta['sql']
+            for consulta in principal.captured_queries
+        ))
+
+    def test_indicadores_da_replica_nao_vao_para_o_cache(self):
+        calculos = []
+
+        def calcular():
+            calculos.append(Receita.objects.count())
+            return calculos[-1]
+
+        @roteadores.usar_replica
+        def view(request):
+            return cache_indicadores.obter_ou_calcular('financeiro', 'replica', calcular)
+
+        view(requisicao_get())
+        view(requisicao_get())
+        self.assertEqual(len(calculos), 2)
+
+        cache_indicadores.obter_ou_calcular('financeiro', 'replica', calcular)
+        cache_indicadores.obter_ou_calcular('financeiro', 'replica', calcular)
+        self.assertEqual(len(calculos), 3)
+
+
+class ReplicaEmTransacaoTests(TestCase):
+    """Dentro de uma transação, as leituras ficam no principal."""
+
+    def test_transacao_aberta_usa_o_principal(self):
+        marcar_replica_atualizada()
+
+        @roteadores.usar_replica
+        def view(request):
+            return roteadores.lendo_da_replica(), Receita.objects.all().db
+
+        self.assertEqual(view(requisicao_get()), (False, 'default'))
+        self.assertEqual(roteadores.RoteadorReplica().db_for_write(Receita), 'default')
+        self.assertFalse(roteadores.RoteadorReplica().allow_migrate(roteadores.REPLICA, 'financeiro'))
+
+    @skipUnless(connection.vendor == 'sqlite', 'Cópia da réplica só existe no SQLite')
+    def test_atualizar_replica_recusa_o_proprio_banco(self):
+        # Nos testes, a réplica espelha o banco de testes
+        with self.assertRaisesMessage(CommandError, 'mesmo arquivo'):
+            call_command('atualizar_replica', stdout=StringIO())
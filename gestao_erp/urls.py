@@ -12,6 +12,7 @@ from django.urls import path, include
 from django.shortcuts import render, redirect
 from django.contrib.auth import views as auth_views
 from django.contrib.auth.decorators import login_required
+from . import permissoes, views
 
 
 @login_required
@@ -29,13 +30,14 @@ def index(request):
     """
     # Verificar grupo do usuário para personalizar a página inicial
     usuario = request.user
+    grupos = permissoes.obter_grupos(usuario)
     
     # Contexto para o template
     context = {
         'usuario': usuario,
-        'is_admin': usuario.groups.filter(name='Administradores').exists(),
-        'is_gerente': usuario.groups.filter(name='Gerentes').exists(),
-        'is_funcionario': usuario.groups.filter(name='Funcionários').exists(),
+        'is_admin': 'Administradores' in grupos,
+        'is_gerente': 'Gerentes' in grupos,
+        'is_funcionario': 'Funcionários' in grupos,
     }
     
     return render(request, 'index.html', context)
@@ -59,6 +61,10 @@ urlpatterns = [
         next_page='login'
     ), name='logout'),
     
+    # Monitoramento
+    path('monitoramento/cache/', views.estatisticas_cache, name='estatisticas_cache'),
+    path('monitoramento/metricas/', views.metricas, name='metricas'),
+    
     # Módulos do sistema
     path('estoque/', include('estoque.urls')),
     path('financeiro/', include('financeiro.urls')),
@@ -0,0 +1,45 @@
+"""
+Views gerais do projeto Gestão ERP.
+
+Autor: Manus AI
+Data: 2025-12-02
+"""
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse, JsonResponse
+
+from . import cache, desempenho
+
+
+@staff_member_required
+def estatisticas_cache(request):
+    """
+    Retorna acertos, faltas e taxa de acerto do cache de indicadores.
+    
+    Args:
+        request: Objeto HttpRequest do Django
+        
+    Returns:
+        JsonResponse: Estatísticas por namespace
+    """
+    return JsonResponse({'cache': cache.estatisticas()})
+
+
+@staff_member_required
+def metricas(request):
+    """
+    Retorna consultas e tempos agregados por view desde o início do processo.
+    
+    Com ``?formato=texto`` a resposta usa o formato texto do Prometheus.
+    
+    Args:
+        request: Objeto HttpRequest do Django
+        
+    Returns:
+        HttpResponse: Métricas por nome de URL
+    """
+    if request.GET.get('formato') == 'texto':
+        return HttpResponse(
+            desempenho.metricas_texto(), content_type='text/plain; version=0.0.4'
+        )
+    return JsonResponse({'views': desempenho.metricas()})